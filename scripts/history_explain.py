@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+EXPLAIN ANALYZE запросов PromptHistoryRepository на синтетическом журнале (user-019).
+
+Каждый метод репозитория, читающий prompt_history, вызывается как в сервисе;
+все выполненные им SQL-запросы перехватываются (before_cursor_execute) и
+повторяются как EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) с теми же
+параметрами. Для каждого запроса печатаются узлы сканирования (тип + индекс),
+Heap Fetches для Index Only Scan и время выполнения — видно, какой индекс
+выбран и обходится ли запрос без чтения heap.
+
+Схема создаётся из ORM (те же индексы, что в миграции 0009) во временной
+схеме, заполняется --rows строками за --days дней, после чего делается
+VACUUM ANALYZE (visibility map нужна для index-only scan). Схема удаляется
+в конце.
+
+user-021: если на сервере доступно pg_trgm, дополнительно создаются
+trigram-индексы миграции 0010 — для планов запросов "journal: search".
+
+user-023: rollup caller_hourly_stats заполняется по засеянным строкам;
+"stats: by caller" читает его, "stats: by caller, raw" — эталонные GROUP BY.
+
+user-024: так же заполняются model_hourly_stats (для "stats: weighted by
+model") и суточные скетчи model_latency_sketches; "latency: quantiles"
+сливает скетчи, "latency: quantiles, raw" — percentile_disc по строкам окна.
+
+user-025: заполняется rollup графиков history_series_stats (минутные бакеты
+старше горизонта сворачиваются в часовые, как в retention-прогоне);
+"timeseries: ..." читает его, "timeseries: ..., raw" — GROUP BY по бакетам
+сырых строк.
+
+Запуск (внутри контейнера data-api, DATABASE_URL уже задан):
+  docker compose exec free-ai-selector-data-postgres-api \\
+      python3 /app/history_explain.py --rows 200000
+Локально — из каталога services/free-ai-selector-data-postgres-api:
+  PYTHONPATH=. python ../../scripts/history_explain.py --plans
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable
+
+# Путь к приложению: /app в контейнере, либо текущий каталог при локальном запуске.
+sys.path.insert(0, "/app")
+sys.path.insert(0, os.getcwd())
+
+SCHEMA = "history_explain"
+
+from sqlalchemy import event, text  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine  # noqa: E402
+from sqlalchemy.pool import NullPool  # noqa: E402
+
+from app.infrastructure.database.models import Base  # noqa: E402
+from app.infrastructure.repositories.caller_hourly_stats_repository import (  # noqa: E402
+    CallerHourlyStatsRepository,
+)
+from app.infrastructure.repositories.history_series_stats_repository import (  # noqa: E402
+    HistorySeriesStatsRepository,
+)
+from app.infrastructure.repositories.model_hourly_stats_repository import (  # noqa: E402
+    ModelHourlyStatsRepository,
+)
+from app.infrastructure.repositories.model_latency_sketch_repository import (  # noqa: E402
+    ModelLatencySketchRepository,
+)
+from app.infrastructure.repositories.prompt_history_repository import (  # noqa: E402
+    PromptHistoryRepository,
+)
+
+SEED_SQL = """
+INSERT INTO prompt_history (
+    user_id, prompt_text, selected_model_id, response_text, response_time,
+    success, error_message, caller, http_status, requested_model, cache_hit, created_at
+)
+SELECT
+    'user-' || (g % :users),
+    'prompt ' || g,
+    1 + (g * 7) % :models,
+    'response ' || g,
+    round((0.2 + random() * 5)::numeric, 3),
+    ok,
+    CASE WHEN ok THEN NULL ELSE 'error' END,
+    'project-' || (g % :callers),
+    CASE WHEN ok THEN 200 WHEN g % 3 = 0 THEN 429 ELSE 500 END,
+    CASE WHEN g % 4 = 0 THEN 'model-' || (g % :models) END,
+    g % 20 = 0,
+    now() - (:days * 86400.0 * g / :rows) * interval '1 second'
+FROM generate_series(1, :rows) AS g,
+     LATERAL (SELECT random() > 0.08 AS ok) AS outcome
+"""
+
+
+def _queries(
+    now: datetime, deep_cursor: tuple[datetime, int]
+) -> dict[str, Callable[[PromptHistoryRepository], Awaitable[Any]]]:
+    """Вызовы репозитория: имя -> корутина (все чтения prompt_history)."""
+    return {
+        "journal: recent": lambda r: r.get_recent(limit=50),
+        "journal: recent, deep cursor": lambda r: r.get_recent(limit=50, cursor=deep_cursor),
+        "journal: caller": lambda r: r.get_filtered(caller="project-3", limit=50),
+        "journal: caller, deep cursor": lambda r: r.get_filtered(
+            caller="project-3", limit=50, cursor=deep_cursor
+        ),
+        "journal: failures": lambda r: r.get_filtered(success=False, limit=50),
+        "journal: date range": lambda r: r.get_filtered(
+            date_from=now - timedelta(days=2), date_to=now - timedelta(days=1), limit=50
+        ),
+        "journal: user": lambda r: r.get_by_user("user-42", limit=50),
+        "journal: search": lambda r: r.get_filtered(q="prompt 4242", limit=50),
+        "journal: search, summary": lambda r: r.get_summaries(80, q="prompt 4242", limit=50),
+        "journal: model": lambda r: r.get_by_model(3, limit=50),
+        "stats: recent by model": lambda r: r.get_recent_stats_for_all_models(window_days=7),
+        "stats: weighted by model": lambda r: r.get_recent_weighted_stats_for_all_models(
+            window_days=7
+        ),
+        "stats: period": lambda r: r.get_statistics_for_period(now - timedelta(days=1), now),
+        "stats: period, model": lambda r: r.get_statistics_for_period(
+            now - timedelta(days=7), now, model_id=3
+        ),
+        "stats: by caller": lambda r: r.get_stats_grouped_by_caller(window_days=7),
+        "stats: by caller, raw": lambda r: r._get_stats_grouped_by_caller_raw(window_days=7),
+        "latency: quantiles": lambda r: r.get_latency_quantiles(
+            timedelta(days=7), [0.5, 0.9, 0.99]
+        ),
+        "latency: quantiles, 30d": lambda r: r.get_latency_quantiles(
+            timedelta(days=30), [0.5, 0.9, 0.99]
+        ),
+        "latency: quantiles, raw": lambda r: r._get_latency_quantiles_raw(
+            timedelta(days=7), [0.5, 0.9, 0.99]
+        ),
+        "latency: quantiles, 30d, raw": lambda r: r._get_latency_quantiles_raw(
+            timedelta(days=30), [0.5, 0.9, 0.99]
+        ),
+        "timeseries: hour by model, 24h": lambda r: r.get_timeseries(
+            "hour", "model", timedelta(hours=24), [0.5, 0.9, 0.99]
+        ),
+        "timeseries: day by caller, 30d": lambda r: r.get_timeseries(
+            "day", "caller", timedelta(days=30), [0.5, 0.9, 0.99]
+        ),
+        "timeseries: hour by model, 24h, raw": lambda r: r._get_timeseries_raw(
+            "hour", "model", timedelta(hours=24), [0.5, 0.9, 0.99]
+        ),
+        "timeseries: day by caller, 30d, raw": lambda r: r._get_timeseries_raw(
+            "day", "caller", timedelta(days=30), [0.5, 0.9, 0.99]
+        ),
+        "retention: boundary": lambda r: r.get_retention_boundary(keep_count=100000),
+    }
+
+
+def _scan_nodes(plan: dict) -> list[str]:
+    """Узлы чтения таблицы/индекса: 'Index Only Scan ix_... (heap fetches 0)'."""
+    nodes = []
+    node_type = plan.get("Node Type", "")
+    if "Relation Name" in plan or "Index Name" in plan:
+        target = plan.get("Index Name") or plan.get("Relation Name")
+        label = f"{node_type} {target}"
+        if node_type == "Index Only Scan":
+            label += f" (heap fetches {plan.get('Heap Fetches', 0)})"
+        nodes.append(label)
+    for child in plan.get("Plans", []):
+        nodes.extend(_scan_nodes(child))
+    return nodes
+
+
+async def _explain(session: AsyncSession, statement: str, parameters: Any) -> dict:
+    connection = await session.connection()
+    result = await connection.exec_driver_sql(
+        "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + statement, parameters
+    )
+    plan = result.scalar_one()
+    return (json.loads(plan) if isinstance(plan, str) else plan)[0]
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000, help="строк в prompt_history")
+    parser.add_argument("--days", type=int, default=30, help="период данных, дней")
+    parser.add_argument("--plans", action="store_true", help="печатать полные планы")
+    args = parser.parse_args()
+
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        print("DATABASE_URL is not set", file=sys.stderr)
+        return 2
+
+    engine = create_async_engine(
+        database_url,
+        poolclass=NullPool,
+        connect_args={"server_settings": {"search_path": SCHEMA}},
+    )
+    captured: list[tuple[str, Any]] = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany) -> None:
+        if not statement.lstrip().upper().startswith("EXPLAIN"):
+            captured.append((statement, parameters))
+
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(
+                text(SEED_SQL),
+                {"rows": args.rows, "days": args.days, "users": 500, "models": 20, "callers": 10},
+            )
+            trgm_available = (
+                await conn.execute(
+                    text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+                )
+            ).first()
+            if trgm_available:
+                await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                for column in ("prompt_text", "error_message"):
+                    await conn.execute(
+                        text(
+                            f"CREATE INDEX ix_prompt_history_{column}_trgm "
+                            f"ON prompt_history USING gin ({column} gin_trgm_ops)"
+                        )
+                    )
+            else:
+                print("pg_trgm is not available: search queries run without trigram indexes")
+            seeded = (
+                await conn.execute(
+                    text(
+                        "SELECT array_agg(id), min(created_at), max(created_at) "
+                        "FROM prompt_history"
+                    )
+                )
+            ).one()
+            await CallerHourlyStatsRepository(AsyncSession(bind=conn)).apply_history(*seeded)
+            await ModelHourlyStatsRepository(AsyncSession(bind=conn)).apply_history(*seeded)
+            await ModelLatencySketchRepository(AsyncSession(bind=conn)).apply_history(*seeded)
+            series = HistorySeriesStatsRepository(AsyncSession(bind=conn))
+            await series.apply_history(*seeded)
+            await series.prune_expired()
+        autocommit = await engine.connect()
+        await (await autocommit.execution_options(isolation_level="AUTOCOMMIT")).execute(
+            text(
+                "VACUUM ANALYZE prompt_history, caller_hourly_stats, model_hourly_stats, "
+                "model_latency_sketches, history_series_stats"
+            )
+        )
+        await autocommit.close()
+
+        async with AsyncSession(engine) as session:
+            row = (
+                await session.execute(
+                    text(
+                        "SELECT created_at, id FROM prompt_history "
+                        "ORDER BY created_at DESC, id DESC OFFSET :depth LIMIT 1"
+                    ),
+                    {"depth": args.rows // 2},
+                )
+            ).one()
+            repository = PromptHistoryRepository(session)
+            event.listen(engine.sync_engine, "before_cursor_execute", _capture)
+
+            for name, call in _queries(datetime.utcnow(), (row[0], row[1])).items():
+                captured.clear()
+                await call(repository)
+                for index, (statement, parameters) in enumerate(list(captured), start=1):
+                    explained = await _explain(session, statement, parameters)
+                    label = name if len(captured) == 1 else f"{name} [{index}]"
+                    scans = ", ".join(_scan_nodes(explained["Plan"])) or "-"
+                    print(f"{label:<34}{explained['Execution Time']:>9.2f} ms  {scans}")
+                    if args.plans:
+                        print(json.dumps(explained["Plan"], indent=2))
+            await session.rollback()
+    finally:
+        if event.contains(engine.sync_engine, "before_cursor_execute", _capture):
+            event.remove(engine.sync_engine, "before_cursor_execute", _capture)
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await engine.dispose()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк write-путей AIModelRepository: UPDATE + SELECT vs UPDATE ... RETURNING (user-017).
+
+increment-success / increment-failure / availability / active / stats
+вызываются несколько раз на каждый промпт. Раньше каждый вызов делал
+UPDATE, flush и отдельный SELECT по ID (availability — ещё SELECT до
+UPDATE для аудита). Скрипт замеряет на каждый вызов:
+  before — прежняя последовательность запросов (воспроизведена здесь же)
+  after  — текущие методы репозитория (один UPDATE ... RETURNING)
+
+Число SQL-запросов считается по событию before_cursor_execute; латентность —
+медиана по --calls вызовам, каждый вызов в своей транзакции (как в роутах).
+Данные пишутся во временную схему, которая удаляется в конце.
+
+Запуск (внутри контейнера data-api, DATABASE_URL уже задан):
+  docker compose exec free-ai-selector-data-postgres-api \\
+      python3 /app/model_write_benchmark.py --calls 500
+Локально — из каталога services/free-ai-selector-data-postgres-api:
+  PYTHONPATH=. python ../../scripts/model_write_benchmark.py
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Awaitable, Callable, Optional
+
+# Путь к приложению: /app в контейнере, либо текущий каталог при локальном запуске.
+sys.path.insert(0, "/app")
+sys.path.insert(0, os.getcwd())
+
+SCHEMA = "model_write_benchmark"
+
+from sqlalchemy import event, text, update  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine  # noqa: E402
+from sqlalchemy.pool import NullPool  # noqa: E402
+
+from app.domain.models import AIModel  # noqa: E402
+from app.infrastructure.database.models import AIModelORM, Base  # noqa: E402
+from app.infrastructure.repositories.ai_model_repository import (  # noqa: E402
+    AIModelRepository,
+)
+
+
+# --- before: последовательность запросов до user-017 -------------------------
+
+
+async def _legacy_update(
+    repository: AIModelRepository, model_id: int, values: dict
+) -> Optional[AIModel]:
+    await repository.session.execute(
+        update(AIModelORM).where(AIModelORM.id == model_id).values(**values)
+    )
+    await repository.session.flush()
+    return await repository.get_by_id(model_id)
+
+
+def _increment_values(counter: str) -> dict:
+    now = datetime.utcnow()
+    column = getattr(AIModelORM, counter)
+    return {
+        counter: column + 1,
+        "request_count": AIModelORM.request_count + 1,
+        "total_response_time": AIModelORM.total_response_time + Decimal("1.5"),
+        "last_checked": now,
+        "updated_at": now,
+    }
+
+
+async def _legacy_availability(repository: AIModelRepository, model_id: int) -> None:
+    # Роут читал модель для audit payload до UPDATE
+    await repository.get_by_id(model_id)
+    await _legacy_update(
+        repository,
+        model_id,
+        {
+            "available_at": datetime.utcnow() + timedelta(seconds=30),
+            "updated_at": datetime.utcnow(),
+        },
+    )
+
+
+BEFORE: dict[str, Callable[[AIModelRepository, int], Awaitable[object]]] = {
+    "increment_success": lambda r, m: _legacy_update(r, m, _increment_values("success_count")),
+    "increment_failure": lambda r, m: _legacy_update(r, m, _increment_values("failure_count")),
+    "set_active": lambda r, m: _legacy_update(
+        r, m, {"is_active": True, "updated_at": datetime.utcnow()}
+    ),
+    "set_availability": _legacy_availability,
+    "update_stats": lambda r, m: _legacy_update(
+        r, m, {"request_count": 7, "updated_at": datetime.utcnow()}
+    ),
+}
+
+# --- after: текущие методы репозитория ---------------------------------------
+
+AFTER: dict[str, Callable[[AIModelRepository, int], Awaitable[object]]] = {
+    "increment_success": lambda r, m: r.increment_success(m, Decimal("1.5")),
+    "increment_failure": lambda r, m: r.increment_failure(m, Decimal("1.5")),
+    "set_active": lambda r, m: r.set_active(m, True),
+    "set_availability": lambda r, m: r.set_availability_returning_previous(m, 30),
+    "update_stats": lambda r, m: r.update_stats(m, request_count=7),
+}
+
+
+class _QueryCounter:
+    """Счётчик SQL-запросов движка (BEGIN/COMMIT идут мимо курсора и не считаются)."""
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, *args: object) -> None:
+        self.count += 1
+
+
+async def _measure(
+    engine,
+    counter: _QueryCounter,
+    operation: Callable[[AIModelRepository, int], Awaitable[object]],
+    model_ids: list[int],
+    calls: int,
+) -> tuple[float, float]:
+    """(медиана мс на вызов, SQL-запросов на вызов)."""
+    timings = []
+    queries = 0
+    for i in range(calls):
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            repository = AIModelRepository(session)
+            before = counter.count
+            started = time.perf_counter()
+            await operation(repository, model_ids[i % len(model_ids)])
+            await session.commit()
+            timings.append((time.perf_counter() - started) * 1000)
+            queries += counter.count - before
+    return statistics.median(timings), queries / calls
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=300, help="вызовов на операцию")
+    parser.add_argument("--models", type=int, default=16, help="число моделей")
+    args = parser.parse_args()
+
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        print("DATABASE_URL is not set", file=sys.stderr)
+        return 2
+
+    admin = create_async_engine(database_url, poolclass=NullPool)
+    async with admin.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+
+    # Пул как в сервисе: соединение переиспользуется между вызовами
+    engine = create_async_engine(
+        database_url, connect_args={"server_settings": {"search_path": SCHEMA}}
+    )
+    counter = _QueryCounter()
+    event.listen(engine.sync_engine, "before_cursor_execute", counter)
+    results = []
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with AsyncSession(engine) as session:
+            session.add_all(
+                AIModelORM(
+                    name=f"model-{i}",
+                    provider="benchmark",
+                    api_endpoint="https://example.invalid",
+                )
+                for i in range(args.models)
+            )
+            await session.commit()
+            model_ids = list(
+                (await session.execute(text("SELECT id FROM ai_models ORDER BY id"))).scalars()
+            )
+
+        for name in AFTER:
+            before_ms, before_queries = await _measure(
+                engine, counter, BEFORE[name], model_ids, args.calls
+            )
+            after_ms, after_queries = await _measure(
+                engine, counter, AFTER[name], model_ids, args.calls
+            )
+            results.append((name, before_queries, after_queries, before_ms, after_ms))
+    finally:
+        await engine.dispose()
+        async with admin.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await admin.dispose()
+
+    print(f"{'operation':<20}{'queries before':>16}{'after':>8}{'ms before':>12}{'after':>9}")
+    for name, before_queries, after_queries, before_ms, after_ms in results:
+        print(
+            f"{name:<20}{before_queries:>16.1f}{after_queries:>8.1f}"
+            f"{before_ms:>12.2f}{after_ms:>9.2f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк decay-взвешенной статистики моделей: rollup vs сырой запрос (user-014).
+
+GET /models?include_recent=true вызывает
+PromptHistoryRepository.get_recent_weighted_stats_for_all_models(). Скрипт
+генерирует синтетическую историю за окно, обновляет rollup
+model_hourly_stats так же, как это делают INSERT-пути, и замеряет:
+  raw    — _get_recent_weighted_stats_raw(): POW(decay, hours_ago) на строку
+           + percentile_cont(0.5) по всем строкам окна
+  rollup — get_recent_weighted_stats_for_all_models(): веса из ~168 часовых
+           бакетов на модель, POW только для неполного первого часа,
+           медиана — из мс-гистограмм тех же бакетов
+
+Результаты обоих путей сравниваются на равенство. Данные пишутся во
+временную схему (search_path), после VACUUM ANALYZE замеряются, затем схема
+удаляется — рабочие таблицы не затрагиваются.
+
+Запуск (внутри контейнера data-api, DATABASE_URL уже задан):
+  docker compose exec free-ai-selector-data-postgres-api \\
+      python3 /app/weighted_stats_benchmark.py --rows 200000
+Локально — из каталога services/free-ai-selector-data-postgres-api:
+  PYTHONPATH=. python ../../scripts/weighted_stats_benchmark.py
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+# Путь к приложению: /app в контейнере, либо текущий каталог при локальном запуске.
+sys.path.insert(0, "/app")
+sys.path.insert(0, os.getcwd())
+
+SCHEMA = "weighted_stats_benchmark"
+
+from sqlalchemy import insert, text  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine  # noqa: E402
+from sqlalchemy.pool import NullPool  # noqa: E402
+
+from app.domain.services import rating_params  # noqa: E402
+from app.infrastructure.database.models import Base, PromptHistoryORM  # noqa: E402
+from app.infrastructure.repositories.model_hourly_stats_repository import (  # noqa: E402
+    ModelHourlyStatsRepository,
+)
+from app.infrastructure.repositories.prompt_history_repository import (  # noqa: E402
+    BULK_INSERT_CHUNK_SIZE,
+    PromptHistoryRepository,
+)
+
+
+def _synthetic_rows(count: int, models: int, days: int, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    rows = []
+    for _ in range(count):
+        outcome = rng.random()
+        success = outcome < 0.8
+        rows.append(
+            {
+                "user_id": "benchmark",
+                "prompt_text": "p",
+                "selected_model_id": rng.randint(1, models),
+                "response_text": "r" if success else None,
+                # Латентность LLM: логнормальная, медиана ~2с, ms-точность
+                "response_time": Decimal(min(round(rng.lognormvariate(7.6, 0.6)), 60000))
+                / 1000,
+                "success": success,
+                "error_message": None if success else "e",
+                "http_status": 200 if success else (429 if outcome < 0.9 else 500),
+                "cache_hit": False,
+                "created_at": now - timedelta(seconds=rng.uniform(0, days * 86400)),
+            }
+        )
+    return rows
+
+
+async def _timed(coro_factory, repeat: int) -> tuple[float, dict]:
+    """Медиана времени (мс) из repeat прогонов и результат последнего."""
+    timings = []
+    result: dict = {}
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = await coro_factory()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), result
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=50000, help="строк истории в окне")
+    parser.add_argument("--models", type=int, default=16, help="число моделей")
+    parser.add_argument("--window-days", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=10, help="прогонов на путь")
+    parser.add_argument("--seed", type=int, default=14)
+    args = parser.parse_args()
+
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        print("DATABASE_URL is not set", file=sys.stderr)
+        return 2
+
+    admin = create_async_engine(database_url, poolclass=NullPool)
+    async with admin.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+
+    engine = create_async_engine(
+        database_url,
+        poolclass=NullPool,
+        connect_args={"server_settings": {"search_path": SCHEMA}},
+    )
+    decay = rating_params.decay_per_hour()
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        print(f"seeding {args.rows} rows over {args.window_days} days ...")
+        rows = _synthetic_rows(args.rows, args.models, args.window_days, args.seed)
+        async with AsyncSession(engine) as session:
+            rollup = ModelHourlyStatsRepository(session)
+            for start in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+                result = await session.execute(
+                    insert(PromptHistoryORM)
+                    .values(rows[start : start + BULK_INSERT_CHUNK_SIZE])
+                    .returning(PromptHistoryORM.id, PromptHistoryORM.created_at)
+                )
+                inserted = result.all()
+                await rollup.apply_history(
+                    [row.id for row in inserted],
+                    min(row.created_at for row in inserted),
+                    max(row.created_at for row in inserted),
+                )
+            await session.commit()
+
+        async with engine.connect() as conn:
+            autocommit = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await autocommit.execute(text("VACUUM ANALYZE prompt_history, model_hourly_stats"))
+
+        # Одна транзакция: оба пути видят один now() и одно окно
+        async with AsyncSession(engine) as session:
+            repository = PromptHistoryRepository(session)
+            raw_ms, raw = await _timed(
+                lambda: repository._get_recent_weighted_stats_raw(args.window_days, decay),
+                args.repeat,
+            )
+            rollup_ms, fast = await _timed(
+                lambda: repository.get_recent_weighted_stats_for_all_models(
+                    args.window_days, decay
+                ),
+                args.repeat,
+            )
+    finally:
+        await engine.dispose()
+        async with admin.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await admin.dispose()
+
+    identical = raw == fast
+    print(f"models:   {len(raw)}")
+    print(f"raw:      {raw_ms:9.2f} ms (median of {args.repeat})")
+    print(f"rollup:   {rollup_ms:9.2f} ms (median of {args.repeat})")
+    print(f"speedup:  {raw_ms / rollup_ms:9.1f}x")
+    print(f"identical output: {identical}")
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
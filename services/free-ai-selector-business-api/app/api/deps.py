@@ -0,0 +1,32 @@
+"""
+FastAPI dependencies for AI Manager Platform - Business API Service (user-002).
+
+Provides the process-wide pooled DataAPIClient to route handlers.
+"""
+
+from fastapi import Request
+
+from app.infrastructure.http_clients.data_api_client import DataAPIClient
+
+
+def get_data_api_client(request: Request) -> DataAPIClient:
+    """
+    FastAPI dependency: shared DataAPIClient created in the lifespan.
+
+    One long-lived client (and its keep-alive pool) serves every request, so
+    the 3–4 Data API calls per prompt reuse warm connections instead of
+    opening a fresh pool per request. When the lifespan has not run (e.g. an
+    ASGI app mounted without startup), the client is created on first use
+    and closed by the regular shutdown path.
+
+    Args:
+        request: Incoming request (used to reach app.state)
+
+    Returns:
+        Process-wide DataAPIClient instance
+    """
+    client = getattr(request.app.state, "data_api_client", None)
+    if client is None:
+        client = DataAPIClient()
+        request.app.state.data_api_client = client
+    return client
@@ -3,15 +3,35 @@ Analytics & Journal proxy routes for AI Manager Platform - Business API Service
 
 The Data API is not reachable from the browser, so these endpoints proxy
 per-project ("caller") analytics and the request journal (inspector) through
-the existing DataAPIClient over HTTP. Access is gated by the external nginx
-proxy; no auth is implemented here.
+the shared process-wide DataAPIClient (user-002) over HTTP. Access is gated by
+the external nginx proxy; no auth is implemented here.
+
+user-018: the journal is keyset-paginated — pass ``cursor`` from the
+X-Next-Cursor response header to get the next page.
+
+user-020: ``view=summary`` returns metadata and short previews instead of
+full prompt/response texts; /history/{id} still returns the full record.
+
+user-021: ``q`` searches prompt and error texts (substring, case-insensitive,
+at least 3 characters — shorter queries are rejected by the Data API with 422).
+
+user-022: /history/export streams the Data API export (NDJSON or CSV) through
+without buffering it.
+
+user-025: /analytics/timeseries proxies per-model / per-caller series of
+minute, hour or day buckets (requests, outcomes, latency quantiles) for the
+web UI charts.
 """
 
-from typing import List, Optional
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, HTTPException, Request, status
+import httpx
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 
-from app.infrastructure.http_clients.data_api_client import DataAPIClient
+from app.api.deps import get_data_api_client
+from app.infrastructure.http_clients.data_api_client import NEXT_CURSOR_HEADER, DataAPIClient
 from app.utils.logger import get_logger
 from app.utils.security import sanitize_error_message
 
@@ -21,10 +41,16 @@ router = APIRouter(tags=["Analytics"])
 
 
 @router.get("/analytics/by-project", summary="Per-project (caller) usage analytics")
-async def get_analytics_by_project(request: Request, window_days: int = 7) -> List[dict]:
-    """Per-project aggregates: request count, success rate, avg latency, top model."""
-    request_id = getattr(request.state, "request_id", None)
-    data_api_client = DataAPIClient(request_id=request_id)
+async def get_analytics_by_project(
+    window_days: float = Query(7, gt=0, le=365),
+    data_api_client: DataAPIClient = Depends(get_data_api_client),
+) -> List[dict]:
+    """
+    Per-project aggregates: request count, success rate, avg latency, top model.
+
+    user-023: any window length (fractions of a day too); the Data API
+    answers from an hourly rollup.
+    """
     try:
         return await data_api_client.get_caller_statistics(window_days=window_days)
     except Exception as e:
@@ -33,31 +59,99 @@ async def get_analytics_by_project(request: Request, window_days: int = 7) -> Li
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch analytics: {sanitize_error_message(e)}",
         )
-    finally:
-        await data_api_client.close()
+
+
+@router.get("/analytics/timeseries", summary="Time series of requests, errors and latency")
+async def get_analytics_timeseries(
+    granularity: Literal["minute", "hour", "day"] = "hour",
+    group_by: Literal["model", "caller"] = "model",
+    window: str = "24h",
+    q: str = "0.5,0.9,0.99",
+    model_id: Optional[int] = None,
+    caller: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=100),
+    data_api_client: DataAPIClient = Depends(get_data_api_client),
+) -> dict:
+    """
+    Bucketed series per model or project: requests, successes, hard failures,
+    429s and latency quantiles.
+
+    user-025: every point is one rollup row in the Data API, so charts over
+    long windows do not scan the journal.
+    """
+    try:
+        return await data_api_client.get_timeseries(
+            granularity=granularity,
+            group_by=group_by,
+            window=window,
+            quantiles=q,
+            model_id=model_id,
+            caller=caller,
+            limit=limit,
+        )
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code in (
+            status.HTTP_400_BAD_REQUEST,
+            status.HTTP_422_UNPROCESSABLE_ENTITY,
+        ):
+            raise HTTPException(
+                status_code=e.response.status_code,
+                detail=_upstream_detail(e.response, "Invalid timeseries parameters"),
+            )
+        logger.error("analytics_timeseries_failed", error=sanitize_error_message(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch timeseries: {sanitize_error_message(e)}",
+        )
+    except Exception as e:
+        logger.error("analytics_timeseries_failed", error=sanitize_error_message(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch timeseries: {sanitize_error_message(e)}",
+        )
 
 
 @router.get("/history", summary="Request journal (filtered list)")
 async def get_history(
-    request: Request,
+    response: Response,
     caller: Optional[str] = None,
     success: Optional[bool] = None,
     date_from: Optional[str] = None,
     date_to: Optional[str] = None,
     limit: int = 100,
     offset: int = 0,
+    cursor: Optional[str] = None,
+    view: Optional[Literal["full", "summary"]] = None,
+    preview_chars: Optional[int] = None,
+    q: Optional[str] = None,
+    data_api_client: DataAPIClient = Depends(get_data_api_client),
 ) -> List[dict]:
-    """Journal list with optional filters by caller / success / date range."""
-    request_id = getattr(request.state, "request_id", None)
-    data_api_client = DataAPIClient(request_id=request_id)
+    """Journal list with optional filters by caller / success / date range / text."""
     try:
-        return await data_api_client.get_history(
+        records, next_cursor = await data_api_client.get_history_page(
             caller=caller,
             success=success,
             date_from=date_from,
             date_to=date_to,
             limit=limit,
             offset=offset,
+            cursor=cursor,
+            view=view,
+            preview_chars=preview_chars,
+            q=q,
+        )
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == status.HTTP_400_BAD_REQUEST:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        if e.response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Invalid journal parameters",
+            )
+        logger.error("get_history_failed", error=sanitize_error_message(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch history: {sanitize_error_message(e)}",
         )
     except Exception as e:
         logger.error("get_history_failed", error=sanitize_error_message(e))
@@ -65,15 +159,69 @@ async def get_history(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch history: {sanitize_error_message(e)}",
         )
-    finally:
-        await data_api_client.close()
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return records
+
+
+@router.get(
+    "/history/export",
+    response_class=StreamingResponse,
+    summary="Request journal export (NDJSON / CSV stream)",
+)
+async def export_history(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    caller: Optional[str] = None,
+    success: Optional[bool] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    q: Optional[str] = None,
+    data_api_client: DataAPIClient = Depends(get_data_api_client),
+) -> StreamingResponse:
+    """Every journal record matching the filters, streamed from the Data API as-is."""
+    try:
+        upstream = await data_api_client.open_history_export(
+            export_format=format,
+            caller=caller,
+            success=success,
+            date_from=date_from,
+            date_to=date_to,
+            q=q,
+        )
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Invalid export parameters",
+            )
+        logger.error("export_history_failed", error=sanitize_error_message(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to export history: {sanitize_error_message(e)}",
+        )
+    except Exception as e:
+        logger.error("export_history_failed", error=sanitize_error_message(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to export history: {sanitize_error_message(e)}",
+        )
+    headers = {}
+    if "content-disposition" in upstream.headers:
+        headers["Content-Disposition"] = upstream.headers["content-disposition"]
+    return StreamingResponse(
+        upstream.aiter_bytes(),
+        media_type=upstream.headers.get("content-type"),
+        headers=headers,
+        background=BackgroundTask(upstream.aclose),
+    )
 
 
 @router.get("/history/{history_id}", summary="Request journal entry detail")
-async def get_history_detail(history_id: int, request: Request) -> dict:
+async def get_history_detail(
+    history_id: int,
+    data_api_client: DataAPIClient = Depends(get_data_api_client),
+) -> dict:
     """Full drill-down for a single request: prompt, params, response, status."""
-    request_id = getattr(request.state, "request_id", None)
-    data_api_client = DataAPIClient(request_id=request_id)
     try:
         record = await data_api_client.get_history_by_id(history_id)
         if record is None:
@@ -90,5 +238,12 @@ async def get_history_detail(history_id: int, request: Request) -> dict:
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch history record: {sanitize_error_message(e)}",
         )
-    finally:
-        await data_api_client.close()
+
+
+def _upstream_detail(response: httpx.Response, fallback: str) -> str:
+    """Human-readable ``detail`` of a Data API 4xx response (string details only)."""
+    try:
+        detail = response.json().get("detail")
+    except ValueError:
+        return fallback
+    return detail if isinstance(detail, str) else fallback
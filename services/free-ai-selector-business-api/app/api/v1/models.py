@@ -1,11 +1,19 @@
 """
 Model Statistics API routes for AI Manager Platform - Business API Service
+
+user-024: /models/stats carries p50/p90/p99 latency per model, fetched from
+the Data API latency endpoint concurrently with the model list.
 """
 
+import asyncio
+import os
+from typing import Dict, Optional
+
 from app.utils.security import sanitize_error_message
 
-from fastapi import APIRouter, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, status
 
+from app.api.deps import get_data_api_client
 from app.api.v1.schemas import AIModelStatsResponse, ModelsStatsResponse
 from app.infrastructure.http_clients.data_api_client import DataAPIClient
 from app.utils.logger import get_logger
@@ -14,11 +22,16 @@ logger = get_logger(__name__)
 
 router = APIRouter(prefix="/models", tags=["Models"])
 
+# user-024: Окно квантилей латентности в /models/stats ("90m", "24h", "7d")
+MODELS_STATS_LATENCY_WINDOW = os.getenv("MODELS_STATS_LATENCY_WINDOW", "24h")
+
 
 @router.get(
     "/stats", response_model=ModelsStatsResponse, summary="Get all models statistics"
 )
-async def get_models_stats(request: Request) -> ModelsStatsResponse:
+async def get_models_stats(
+    data_api_client: DataAPIClient = Depends(get_data_api_client),
+) -> ModelsStatsResponse:
     """
     Get statistics for all AI models.
 
@@ -26,7 +39,7 @@ async def get_models_stats(request: Request) -> ModelsStatsResponse:
     for all active models.
 
     Args:
-        request: FastAPI request object (for request ID)
+        data_api_client: Shared Data API client (user-002)
 
     Returns:
         ModelsStatsResponse with all models statistics
@@ -34,15 +47,12 @@ async def get_models_stats(request: Request) -> ModelsStatsResponse:
     Raises:
         HTTPException: 500 if Data API request fails
     """
-    # Get request ID from middleware
-    request_id = getattr(request.state, "request_id", None)
-
-    # Create Data API client
-    data_api_client = DataAPIClient(request_id=request_id)
-
     try:
-        # Fetch all models (including inactive for stats)
-        models = await data_api_client.get_all_models(active_only=False)
+        # Fetch all models (including inactive for stats) and latency tails together
+        models, latency = await asyncio.gather(
+            data_api_client.get_all_models(active_only=False),
+            _fetch_latency(data_api_client),
+        )
 
         # Convert to response schema (используем реальные метрики из Data API)
         model_stats = [
@@ -55,6 +65,9 @@ async def get_models_stats(request: Request) -> ModelsStatsResponse:
                 average_response_time=model.average_response_time,
                 total_requests=model.request_count,
                 is_active=model.is_active,
+                latency_p50=latency.get(model.id, {}).get("0.5"),
+                latency_p90=latency.get(model.id, {}).get("0.9"),
+                latency_p99=latency.get(model.id, {}).get("0.99"),
             )
             for model in models
         ]
@@ -68,6 +81,21 @@ async def get_models_stats(request: Request) -> ModelsStatsResponse:
             detail=f"Failed to fetch models statistics: {sanitize_error_message(e)}",
         )
 
-    finally:
-        # Close HTTP client
-        await data_api_client.close()
+
+async def _fetch_latency(
+    data_api_client: DataAPIClient,
+) -> Dict[int, Dict[str, Optional[float]]]:
+    """
+    Latency quantiles for /models/stats; an outage only blanks the p* fields.
+
+    Args:
+        data_api_client: Shared Data API client
+
+    Returns:
+        Dict model_id -> {quantile: seconds}, empty if the Data API failed
+    """
+    try:
+        return await data_api_client.get_models_latency(window=MODELS_STATS_LATENCY_WINDOW)
+    except Exception as e:
+        logger.warning("fetch_models_latency_failed", error=sanitize_error_message(e))
+        return {}
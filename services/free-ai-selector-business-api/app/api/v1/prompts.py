@@ -1,18 +1,24 @@
 """
 Prompt Processing API routes for AI Manager Platform - Business API Service
+
+user-006: POST /prompts/process/stream returns the answer as Server-Sent Events.
+user-007: Opt-in exact-match response cache (``cache`` field or X-Response-Cache header).
 """
 
+import json
 import os
+from typing import AsyncIterator
 
 from app.utils.security import sanitize_error_message
 
-from fastapi import APIRouter, HTTPException, Request, status
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
 
+from app.api.deps import get_data_api_client
 from app.api.v1.schemas import ErrorResponse, ProcessPromptRequest, ProcessPromptResponse
 from app.application.use_cases.process_prompt import ProcessPromptUseCase
 from app.domain.exceptions import AllProvidersRateLimited, ServiceUnavailable
-from app.domain.models import PromptRequest
+from app.domain.models import PromptRequest, PromptStreamEvent
 from app.infrastructure.http_clients.data_api_client import DataAPIClient
 from app.utils.logger import get_logger
 
@@ -21,6 +27,10 @@ logger = get_logger(__name__)
 # F025: Rate limit для /process endpoint
 PROCESS_RATE_LIMIT = os.getenv("PROCESS_RATE_LIMIT", "100/minute")
 
+# user-007: Заголовок opt-in для кеша ответов (поле "cache" в теле приоритетнее)
+RESPONSE_CACHE_HEADER = "X-Response-Cache"
+_TRUTHY_HEADER_VALUES = {"1", "true", "yes", "on"}
+
 router = APIRouter(prefix="/prompts", tags=["Prompts"])
 
 
@@ -35,7 +45,9 @@ router = APIRouter(prefix="/prompts", tags=["Prompts"])
     },
 )
 async def process_prompt(
-    prompt_data: ProcessPromptRequest, request: Request
+    prompt_data: ProcessPromptRequest,
+    request: Request,
+    data_api_client: DataAPIClient = Depends(get_data_api_client),
 ) -> ProcessPromptResponse:
     """
     Process user prompt with best available AI model.
@@ -45,7 +57,8 @@ async def process_prompt(
 
     Args:
         prompt_data: User's prompt text
-        request: FastAPI request object (for request ID)
+        request: FastAPI request object (for X-Client-Id header)
+        data_api_client: Shared Data API client (user-002)
 
     Returns:
         ProcessPromptResponse with AI-generated text and metadata
@@ -54,32 +67,12 @@ async def process_prompt(
         HTTPException: 500 if all AI providers fail
         HTTPException: 503 if no active models available
     """
-    # Get request ID from middleware
-    request_id = getattr(request.state, "request_id", None)
-
-    # Create Data API client with request ID for tracing
-    data_api_client = DataAPIClient(request_id=request_id)
-
     try:
         # Create use case
         use_case = ProcessPromptUseCase(data_api_client)
 
-        # Identify the calling project via the X-Client-Id header (e.g. "sensedar",
-        # "taro"). Falls back to "api_user" when absent. user_id stays "api_user"
-        # for REST (the Telegram bot supplies real user IDs); caller is the
-        # per-project analytics dimension.
-        caller = request.headers.get("X-Client-Id") or "api_user"
-
         # Execute prompt processing
-        prompt_request = PromptRequest(
-            user_id="api_user",
-            prompt_text=prompt_data.prompt,
-            model_name=prompt_data.model_name,
-            system_prompt=prompt_data.system_prompt,
-            response_format=prompt_data.response_format,
-            tags=prompt_data.tags,
-            caller=caller,
-        )
+        prompt_request = _build_prompt_request(prompt_data, request)
 
         response = await use_case.execute(prompt_request)
 
@@ -93,52 +86,14 @@ async def process_prompt(
             # F023: Per-request telemetry
             attempts=response.attempts,
             fallback_used=response.fallback_used,
+            cached=response.cached,
         )
 
     except AllProvidersRateLimited as e:
-        # F025: Все провайдеры rate-limited → HTTP 429
-        retry_after = e.retry_after_seconds
-        logger.warning(
-            "backpressure_applied",
-            status=429,
-            reason="all_rate_limited",
-            retry_after=retry_after,
-            attempts=e.attempts,
-        )
-        return JSONResponse(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            headers={"Retry-After": str(retry_after)},
-            content=ErrorResponse(
-                error="all_rate_limited",
-                message="All AI providers are rate limited. Please retry later.",
-                retry_after=retry_after,
-                attempts=e.attempts,
-                providers_tried=e.providers_tried,
-                providers_available=0,
-            ).model_dump(),
-        )
+        return _rate_limited_response(e)
 
     except ServiceUnavailable as e:
-        # F025: Сервис недоступен → HTTP 503
-        retry_after = e.retry_after_seconds
-        logger.warning(
-            "backpressure_applied",
-            status=503,
-            reason=e.reason,
-            retry_after=retry_after,
-        )
-        return JSONResponse(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            headers={"Retry-After": str(retry_after)},
-            content=ErrorResponse(
-                error="service_unavailable",
-                message=str(e),
-                retry_after=retry_after,
-                attempts=0,
-                providers_tried=0,
-                providers_available=0,
-            ).model_dump(),
-        )
+        return _service_unavailable_response(e)
 
     except Exception as e:
         # F023 FR-012: Включить error_type в detail для диагностики
@@ -149,6 +104,164 @@ async def process_prompt(
             detail=f"Failed to process prompt [{error_type}]: {sanitize_error_message(e)}",
         )
 
+
+@router.post(
+    "/process/stream",
+    status_code=status.HTTP_200_OK,
+    summary="Process prompt with AI (Server-Sent Events)",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"text/event-stream": {}}, "description": "SSE stream"},
+        429: {"model": ErrorResponse, "description": "All providers rate limited"},
+        503: {"model": ErrorResponse, "description": "Service unavailable"},
+    },
+)
+async def process_prompt_stream(
+    prompt_data: ProcessPromptRequest,
+    request: Request,
+    data_api_client: DataAPIClient = Depends(get_data_api_client),
+):
+    """
+    Process user prompt and stream the answer as Server-Sent Events (user-006).
+
+    Events: ``start`` (selected model), ``token`` (``{"text": ...}`` chunks),
+    then ``done`` (telemetry) or ``error`` (provider failed mid-stream).
+    Provider fallback happens only before the first token; if every provider
+    fails before that, the regular JSON 429/503/500 responses are returned.
+
+    Args:
+        prompt_data: User's prompt text
+        request: FastAPI request object (for X-Client-Id header)
+        data_api_client: Shared Data API client (user-002)
+
+    Returns:
+        StreamingResponse with media type text/event-stream
+
+    Raises:
+        HTTPException: 500 if all AI providers fail before the first token
+    """
+    use_case = ProcessPromptUseCase(data_api_client)
+    events = use_case.execute_stream(_build_prompt_request(prompt_data, request))
+
+    # Первое событие ждём до отправки заголовков: ошибки выбора модели и
+    # отказ всех провайдеров остаются обычными HTTP 429/503/500.
+    try:
+        first_event = await events.__anext__()
+    except AllProvidersRateLimited as e:
+        return _rate_limited_response(e)
+    except ServiceUnavailable as e:
+        return _service_unavailable_response(e)
+    except Exception as e:
+        error_type = type(e).__name__
+        logger.error(
+            "process_prompt_stream_failed",
+            error_type=error_type,
+            error=sanitize_error_message(e),
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to process prompt [{error_type}]: {sanitize_error_message(e)}",
+        )
+
+    return StreamingResponse(
+        _sse_body(first_event, events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _build_prompt_request(
+    prompt_data: ProcessPromptRequest, request: Request
+) -> PromptRequest:
+    """Map the API schema to the domain PromptRequest."""
+    # Identify the calling project via the X-Client-Id header (e.g. "sensedar",
+    # "taro"). Falls back to "api_user" when absent. user_id stays "api_user"
+    # for REST (the Telegram bot supplies real user IDs); caller is the
+    # per-project analytics dimension.
+    caller = request.headers.get("X-Client-Id") or "api_user"
+
+    use_cache = prompt_data.cache
+    if use_cache is None:
+        header_value = request.headers.get(RESPONSE_CACHE_HEADER, "")
+        use_cache = header_value.strip().lower() in _TRUTHY_HEADER_VALUES
+
+    return PromptRequest(
+        user_id="api_user",
+        prompt_text=prompt_data.prompt,
+        model_name=prompt_data.model_name,
+        system_prompt=prompt_data.system_prompt,
+        response_format=prompt_data.response_format,
+        tags=prompt_data.tags,
+        caller=caller,
+        routing=prompt_data.routing,
+        race_width=prompt_data.race_width,
+        use_cache=use_cache,
+    )
+
+
+def _rate_limited_response(e: AllProvidersRateLimited) -> JSONResponse:
+    """F025: Все провайдеры rate-limited → HTTP 429."""
+    retry_after = e.retry_after_seconds
+    logger.warning(
+        "backpressure_applied",
+        status=429,
+        reason="all_rate_limited",
+        retry_after=retry_after,
+        attempts=e.attempts,
+    )
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        headers={"Retry-After": str(retry_after)},
+        content=ErrorResponse(
+            error="all_rate_limited",
+            message="All AI providers are rate limited. Please retry later.",
+            retry_after=retry_after,
+            attempts=e.attempts,
+            providers_tried=e.providers_tried,
+            providers_available=0,
+        ).model_dump(),
+    )
+
+
+def _service_unavailable_response(e: ServiceUnavailable) -> JSONResponse:
+    """F025: Сервис недоступен → HTTP 503."""
+    retry_after = e.retry_after_seconds
+    logger.warning(
+        "backpressure_applied",
+        status=503,
+        reason=e.reason,
+        retry_after=retry_after,
+    )
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": str(retry_after)},
+        content=ErrorResponse(
+            error="service_unavailable",
+            message=str(e),
+            retry_after=retry_after,
+            attempts=0,
+            providers_tried=0,
+            providers_available=0,
+        ).model_dump(),
+    )
+
+
+def _format_sse(event: PromptStreamEvent) -> str:
+    """Serialize one event in text/event-stream wire format."""
+    return f"event: {event.event}\ndata: {json.dumps(event.data, ensure_ascii=False)}\n\n"
+
+
+async def _sse_body(
+    first_event: PromptStreamEvent,
+    events: AsyncIterator[PromptStreamEvent],
+) -> AsyncIterator[str]:
+    """SSE body: the already awaited first event, then the rest of the stream."""
+    try:
+        yield _format_sse(first_event)
+        async for event in events:
+            yield _format_sse(event)
     finally:
-        # Close HTTP client
-        await data_api_client.close()
+        # execute_stream — async-генератор: закрываем его при обрыве клиента
+        aclose = getattr(events, "aclose", None)
+        if aclose is not None:
+            await aclose()
@@ -6,8 +6,9 @@ Endpoints for testing and managing AI providers.
 
 from app.utils.security import sanitize_error_message
 
-from fastapi import APIRouter, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, status
 
+from app.api.deps import get_data_api_client
 from app.application.use_cases.test_all_providers import TestAllProvidersUseCase
 from app.infrastructure.http_clients.data_api_client import DataAPIClient
 from app.utils.logger import get_logger
@@ -22,7 +23,9 @@ router = APIRouter(prefix="/providers", tags=["Providers"])
     status_code=status.HTTP_200_OK,
     summary="Test all AI providers",
 )
-async def test_all_providers(request: Request) -> dict:
+async def test_all_providers(
+    data_api_client: DataAPIClient = Depends(get_data_api_client),
+) -> dict:
     """
     Test all registered AI providers with a simple prompt.
 
@@ -39,7 +42,7 @@ async def test_all_providers(request: Request) -> dict:
     user prompts and health worker checks.
 
     Args:
-        request: FastAPI request object (for request ID)
+        data_api_client: Shared Data API client (user-002)
 
     Returns:
         {
@@ -67,12 +70,6 @@ async def test_all_providers(request: Request) -> dict:
     Raises:
         HTTPException: 500 if testing fails catastrophically
     """
-    # Get request ID from middleware
-    request_id = getattr(request.state, "request_id", None)
-
-    # Create Data API client with request ID for tracing
-    data_api_client = DataAPIClient(request_id=request_id)
-
     try:
         logger.info("test_all_providers_started")
 
@@ -101,7 +98,3 @@ async def test_all_providers(request: Request) -> dict:
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to test providers: {sanitize_error_message(e)}",
         )
-
-    finally:
-        # Close HTTP client
-        await data_api_client.close()
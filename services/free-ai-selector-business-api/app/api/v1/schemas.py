@@ -3,7 +3,7 @@ Pydantic schemas for AI Manager Platform - Business API Service
 """
 
 from decimal import Decimal
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseModel, Field, field_validator
 
@@ -41,6 +41,36 @@ class ProcessPromptRequest(BaseModel):
         description="Optional list of tags to filter models (e.g. ['fast', 'json']). Models must have ALL requested tags.",
     )
 
+    # user-004: Hedged requests across the fallback chain
+    # user-005: "race" fans out to the top-K candidates at once
+    routing: Optional[Literal["sequential", "hedged", "race"]] = Field(
+        None,
+        description=(
+            "Fallback routing mode. 'hedged' starts the next candidate in parallel "
+            "when the current one is slower than its observed p90; 'race' calls "
+            "the race_width best candidates at once and returns the first valid "
+            "answer. Default: server setting (HEDGE_ENABLED)"
+        ),
+    )
+    race_width: Optional[int] = Field(
+        None,
+        ge=1,
+        description=(
+            "Number of candidates called at once in 'race' routing (default: "
+            "RACE_DEFAULT_WIDTH = 3). Values above the server's RACE_MAX_WIDTH "
+            "(default: 5) are clamped to it"
+        ),
+    )
+
+    # user-007: Exact-match response cache (opt-in per request)
+    cache: Optional[bool] = Field(
+        None,
+        description=(
+            "Serve identical prompts from the response cache. Overrides the "
+            "X-Response-Cache header; default: off"
+        ),
+    )
+
     @field_validator("response_format")
     @classmethod
     def validate_response_format(cls, v: Optional[dict]) -> Optional[dict]:
@@ -68,6 +98,8 @@ class ProcessPromptResponse(BaseModel):
     # F023: Per-request telemetry
     attempts: int = Field(1, description="Number of models tried before success")
     fallback_used: bool = Field(False, description="Whether fallback model was used")
+    # user-007: Response cache telemetry
+    cached: bool = Field(False, description="Whether the response was served from cache")
 
 
 # =============================================================================
@@ -86,6 +118,10 @@ class AIModelStatsResponse(BaseModel):
     average_response_time: float = Field(..., description="Average response time in seconds")
     total_requests: int = Field(..., description="Total request count")
     is_active: bool = Field(..., description="Whether model is active")
+    # user-024: Хвосты латентности за MODELS_STATS_LATENCY_WINDOW (null — нет вызовов)
+    latency_p50: Optional[float] = Field(None, description="Median latency in seconds")
+    latency_p90: Optional[float] = Field(None, description="90th percentile latency in seconds")
+    latency_p99: Optional[float] = Field(None, description="99th percentile latency in seconds")
 
 
 class ModelsStatsResponse(BaseModel):
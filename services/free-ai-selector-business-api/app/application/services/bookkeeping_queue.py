@@ -0,0 +1,298 @@
+"""
+Write-behind Queue for post-response bookkeeping.
+
+user-009: Статистика моделей (increment_success / increment_failure) и
+история промптов (create_history) больше не добавляют 2–4 синхронных round
+trip в Data API к латентности ответа. Use case кладёт событие в ограниченную
+in-process очередь и сразу возвращает ответ; фоновый worker сбрасывает события
+пачками.
+
+Поведение:
+    - submit(): событие в очередь; при переполнении событие отбрасывается
+      (drops в метриках) — ответ пользователю важнее бухгалтерии
+    - submit(urgent=True): cooldown (set_availability) не ждёт пачку и не
+      отбрасывается — отдельная задача отправляет его сразу
+    - Пока worker не запущен (тесты, скрипты без lifespan), запись идёт
+      синхронно, как раньше, и ошибки пробрасываются вызывающему
+    - shutdown(): стоп-метка ставится в конец очереди; worker дописывает
+      текущую пачку и всё, что стоит до метки, до закрытия DataAPIClient
+    - user-011: create_history одной пачки уходят одним
+      create_history_bulk (POST /history/bulk) на клиента
+
+Configuration:
+    BOOKKEEPING_QUEUE_MAX_SIZE: Ёмкость очереди, событий (default: 10000)
+    BOOKKEEPING_BATCH_SIZE: Максимум событий в одном сбросе (default: 100)
+    BOOKKEEPING_FLUSH_INTERVAL: Сколько ждать добора пачки после первого
+        события, сек (default: 0.2)
+    BOOKKEEPING_DRAIN_TIMEOUT: Лимит дренирования при остановке, сек
+        (default: 10)
+"""
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, ClassVar, Optional
+
+from app.infrastructure.http_clients.data_api_client import DataAPIClient
+from app.utils.logger import get_logger
+from app.utils.security import sanitize_error_message
+
+logger = get_logger(__name__)
+
+BOOKKEEPING_QUEUE_MAX_SIZE = int(os.getenv("BOOKKEEPING_QUEUE_MAX_SIZE", "10000"))
+BOOKKEEPING_BATCH_SIZE = int(os.getenv("BOOKKEEPING_BATCH_SIZE", "100"))
+BOOKKEEPING_FLUSH_INTERVAL = float(os.getenv("BOOKKEEPING_FLUSH_INTERVAL", "0.2"))
+BOOKKEEPING_DRAIN_TIMEOUT = float(os.getenv("BOOKKEEPING_DRAIN_TIMEOUT", "10"))
+
+
+@dataclass
+class BookkeepingEvent:
+    """Отложенный вызов метода DataAPIClient."""
+
+    client: DataAPIClient
+    operation: str  # "increment_success" | "increment_failure" | "create_history" | ...
+    kwargs: dict[str, Any]
+
+
+class BookkeepingQueue:
+    """Ограниченная write-behind очередь для записей в Data API.
+
+    Использует class-level state (паттерн CircuitBreakerManager): одна очередь
+    и один worker на процесс; start()/shutdown() вызываются из lifespan.
+    """
+
+    # None в очереди — стоп-метка shutdown()
+    _queue: ClassVar[Optional["asyncio.Queue[Optional[BookkeepingEvent]]"]] = None
+    _worker: ClassVar[Optional["asyncio.Task[None]"]] = None
+    _urgent_tasks: ClassVar[set["asyncio.Task[None]"]] = set()
+    # Метрики
+    _enqueued: ClassVar[int] = 0
+    _dropped: ClassVar[int] = 0
+    _flushed: ClassVar[int] = 0
+    _failed: ClassVar[int] = 0
+    _flushes: ClassVar[int] = 0
+    _last_flush_ms: ClassVar[float] = 0.0
+    _max_flush_ms: ClassVar[float] = 0.0
+    _total_flush_ms: ClassVar[float] = 0.0
+
+    @classmethod
+    def start(cls) -> None:
+        """Создать очередь и запустить фоновый worker (идемпотентно)."""
+        if cls.is_running():
+            return
+        cls._queue = asyncio.Queue(maxsize=BOOKKEEPING_QUEUE_MAX_SIZE)
+        cls._worker = asyncio.create_task(cls._run_worker())
+        logger.info(
+            "bookkeeping_queue_started",
+            max_size=BOOKKEEPING_QUEUE_MAX_SIZE,
+            batch_size=BOOKKEEPING_BATCH_SIZE,
+        )
+
+    @classmethod
+    def is_running(cls) -> bool:
+        """Worker запущен и принимает события."""
+        return cls._worker is not None and not cls._worker.done()
+
+    @classmethod
+    async def submit(
+        cls,
+        client: DataAPIClient,
+        operation: str,
+        urgent: bool = False,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Поставить запись в Data API в очередь.
+
+        Args:
+            client: Клиент, через который выполнить вызов
+            operation: Имя метода DataAPIClient
+            urgent: Отправить сразу, минуя пачку (cooldown)
+            **kwargs: Аргументы метода
+
+        Raises:
+            Exception: Только в синхронном режиме (worker не запущен) —
+                ошибка самого вызова, как до user-009
+        """
+        event = BookkeepingEvent(client=client, operation=operation, kwargs=kwargs)
+        if not cls.is_running() or cls._queue is None:
+            await cls._call(event)
+            return
+
+        if urgent:
+            task = asyncio.create_task(cls._apply(event))
+            cls._urgent_tasks.add(task)
+            task.add_done_callback(cls._urgent_tasks.discard)
+            return
+
+        try:
+            cls._queue.put_nowait(event)
+            cls._enqueued += 1
+        except asyncio.QueueFull:
+            cls._dropped += 1
+            logger.warning(
+                "bookkeeping_event_dropped",
+                operation=operation,
+                queue_depth=cls._queue.qsize(),
+                dropped_total=cls._dropped,
+            )
+
+    @classmethod
+    def metrics(cls) -> dict[str, Any]:
+        """Метрики очереди: глубина, отбрасывания, латентность сброса."""
+        return {
+            "running": cls.is_running(),
+            "depth": cls._queue.qsize() if cls._queue is not None else 0,
+            "max_size": BOOKKEEPING_QUEUE_MAX_SIZE,
+            "enqueued": cls._enqueued,
+            "dropped": cls._dropped,
+            "flushed": cls._flushed,
+            "failed": cls._failed,
+            "flushes": cls._flushes,
+            "urgent_in_flight": len(cls._urgent_tasks),
+            "last_flush_ms": round(cls._last_flush_ms, 3),
+            "max_flush_ms": round(cls._max_flush_ms, 3),
+            "avg_flush_ms": round(cls._total_flush_ms / cls._flushes, 3)
+            if cls._flushes
+            else 0.0,
+        }
+
+    @classmethod
+    async def shutdown(cls) -> None:
+        """
+        Остановить worker и дренировать очередь (вызывается из lifespan).
+
+        Worker не отменяется: за последним событием встаёт стоп-метка, и он
+        сам дописывает собранную пачку, начатый сброс и остаток очереди.
+        Новые события после начала остановки пишутся синхронно.
+        """
+        worker = cls._worker
+        queue = cls._queue
+        cls._worker = None
+        if worker is None or queue is None:
+            return
+
+        pending = queue.qsize()
+        urgent = list(cls._urgent_tasks)
+
+        async def drain() -> None:
+            await queue.put(None)
+            await worker
+            if urgent:
+                await asyncio.gather(*urgent, return_exceptions=True)
+
+        try:
+            # По таймауту wait_for отменяет drain(), а с ним и worker
+            await asyncio.wait_for(drain(), timeout=BOOKKEEPING_DRAIN_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.error("bookkeeping_drain_timeout", pending=queue.qsize())
+        cls._queue = None
+        logger.info("bookkeeping_queue_stopped", drained=pending, **cls.metrics())
+
+    @classmethod
+    def reset(cls) -> None:
+        """Сбросить состояние и метрики (для тестов)."""
+        worker = cls._worker
+        if worker is not None and not worker.done() and not worker.get_loop().is_closed():
+            worker.cancel()
+        cls._queue = None
+        cls._worker = None
+        cls._urgent_tasks = set()
+        cls._enqueued = 0
+        cls._dropped = 0
+        cls._flushed = 0
+        cls._failed = 0
+        cls._flushes = 0
+        cls._last_flush_ms = 0.0
+        cls._max_flush_ms = 0.0
+        cls._total_flush_ms = 0.0
+
+    @classmethod
+    async def _run_worker(cls) -> None:
+        """Собирать события в пачки и сбрасывать их в Data API до стоп-метки."""
+        queue = cls._queue
+        assert queue is not None
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = loop.time() + BOOKKEEPING_FLUSH_INTERVAL
+            while len(batch) < BOOKKEEPING_BATCH_SIZE:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    event = await asyncio.wait_for(queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if event is None:
+                    stopping = True
+                    break
+                batch.append(event)
+            await cls._flush(batch)
+
+    @classmethod
+    async def _flush(cls, batch: list[BookkeepingEvent]) -> None:
+        """Отправить пачку событий конкурентно через пул соединений."""
+        started = time.perf_counter()
+        writes: list[Awaitable[None]] = []
+        histories: dict[int, list[BookkeepingEvent]] = {}
+        for event in batch:
+            if event.operation == "create_history":
+                histories.setdefault(id(event.client), []).append(event)
+            else:
+                writes.append(cls._apply(event))
+        for events in histories.values():
+            if len(events) == 1:
+                writes.append(cls._apply(events[0]))
+            else:
+                writes.append(cls._apply_history_bulk(events))
+        await asyncio.gather(*writes)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        cls._flushes += 1
+        cls._last_flush_ms = elapsed_ms
+        cls._max_flush_ms = max(cls._max_flush_ms, elapsed_ms)
+        cls._total_flush_ms += elapsed_ms
+        logger.debug(
+            "bookkeeping_flushed",
+            events=len(batch),
+            flush_ms=round(elapsed_ms, 3),
+            queue_depth=cls._queue.qsize() if cls._queue is not None else 0,
+        )
+
+    @classmethod
+    async def _apply(cls, event: BookkeepingEvent) -> None:
+        """Выполнить событие; ошибка логируется и не прерывает пачку."""
+        try:
+            await cls._call(event)
+            cls._flushed += 1
+        except Exception as e:
+            cls._failed += 1
+            logger.error(
+                "bookkeeping_write_failed",
+                operation=event.operation,
+                error=sanitize_error_message(e),
+            )
+
+    @classmethod
+    async def _apply_history_bulk(cls, events: list[BookkeepingEvent]) -> None:
+        """Записать историю нескольких событий одним запросом (user-011)."""
+        try:
+            await events[0].client.create_history_bulk([event.kwargs for event in events])
+            cls._flushed += len(events)
+        except Exception as e:
+            cls._failed += len(events)
+            logger.error(
+                "bookkeeping_write_failed",
+                operation="create_history_bulk",
+                events=len(events),
+                error=sanitize_error_message(e),
+            )
+
+    @staticmethod
+    async def _call(event: BookkeepingEvent) -> None:
+        await getattr(event.client, event.operation)(**event.kwargs)
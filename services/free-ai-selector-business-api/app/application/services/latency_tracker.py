@@ -0,0 +1,63 @@
+"""
+Latency Tracker for AI Provider Calls.
+
+user-004: In-memory окно последних успешных латентностей по модели. Используется
+hedging-режимом fallback-цикла, чтобы запускать запасной вызов, когда текущий
+кандидат отвечает дольше своего наблюдаемого p90.
+
+Configuration:
+    LATENCY_WINDOW_SIZE: Сколько последних замеров хранить на модель (default: 100)
+"""
+
+import math
+import os
+from collections import deque
+from typing import ClassVar, Optional
+
+LATENCY_WINDOW_SIZE = int(os.getenv("LATENCY_WINDOW_SIZE", "100"))
+
+
+class LatencyTracker:
+    """In-memory скользящее окно латентностей успешных вызовов.
+
+    Использует class-level dict (паттерн CircuitBreakerManager).
+    Thread-safe в asyncio (single-threaded event loop).
+    """
+
+    _samples: ClassVar[dict[int, deque[float]]] = {}
+
+    @classmethod
+    def record(cls, model_id: int, seconds: float) -> None:
+        """Записать длительность успешного вызова модели."""
+        window = cls._samples.get(model_id)
+        if window is None:
+            window = deque(maxlen=LATENCY_WINDOW_SIZE)
+            cls._samples[model_id] = window
+        window.append(seconds)
+
+    @classmethod
+    def quantile(
+        cls, model_id: int, q: float, min_samples: int = 1
+    ) -> Optional[float]:
+        """
+        Квантиль латентности модели (nearest-rank).
+
+        Args:
+            model_id: ID модели
+            q: Квантиль в диапазоне (0, 1]
+            min_samples: Минимум замеров, иначе None
+
+        Returns:
+            Латентность в секундах или None, если замеров недостаточно
+        """
+        window = cls._samples.get(model_id)
+        if not window or len(window) < min_samples:
+            return None
+        ordered = sorted(window)
+        rank = max(1, math.ceil(q * len(ordered)))
+        return ordered[rank - 1]
+
+    @classmethod
+    def reset(cls) -> None:
+        """Сбросить все замеры (для тестов)."""
+        cls._samples = {}
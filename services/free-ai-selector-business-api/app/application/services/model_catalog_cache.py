@@ -0,0 +1,184 @@
+"""
+Model Catalog Cache for prompt routing.
+
+user-003: In-memory кеш каталога моделей, чтобы выбор модели не требовал
+HTTP round trip в Data API (и тяжёлой агрегации в Postgres) на каждый промпт.
+
+Поведение:
+    - age < MODEL_CATALOG_REFRESH_AFTER: снимок отдаётся как есть
+    - REFRESH_AFTER <= age < MAX_STALENESS: снимок отдаётся сразу,
+      обновление запускается в фоне (stale-while-revalidate)
+    - age >= MAX_STALENESS (или снимка нет): синхронная загрузка из Data API
+    - mark_unavailable(): локальный write-through cooldown — модель пропадает
+      из выдачи сразу, не дожидаясь следующего обновления
+
+Configuration:
+    MODEL_CATALOG_MAX_STALENESS: Максимальный возраст снимка, сек (default: 30).
+        0 отключает кеш — каждый вызов идёт в Data API.
+    MODEL_CATALOG_REFRESH_AFTER: Возраст снимка для фонового обновления, сек
+        (default: 5)
+"""
+
+import asyncio
+import os
+import time
+from typing import ClassVar, Optional
+
+from app.domain.models import AIModelInfo
+from app.infrastructure.http_clients.data_api_client import DataAPIClient
+from app.utils.logger import get_logger
+from app.utils.security import sanitize_error_message
+
+logger = get_logger(__name__)
+
+MODEL_CATALOG_MAX_STALENESS = float(os.getenv("MODEL_CATALOG_MAX_STALENESS", "30"))
+MODEL_CATALOG_REFRESH_AFTER = float(os.getenv("MODEL_CATALOG_REFRESH_AFTER", "5"))
+
+
+class ModelCatalogCache:
+    """In-memory кеш доступных моделей (active + available + recent stats).
+
+    Использует class-level state (паттерн CircuitBreakerManager): один снимок
+    на процесс, общий для всех запросов. Безопасен в asyncio (single-threaded
+    event loop); конкурентные синхронные загрузки схлопываются через lock.
+    """
+
+    _models: ClassVar[Optional[list[AIModelInfo]]] = None
+    _fetched_at: ClassVar[float] = 0.0
+    # model_id -> monotonic deadline локального cooldown
+    _cooldowns: ClassVar[dict[int, float]] = {}
+    _refresh_task: ClassVar[Optional["asyncio.Task[None]"]] = None
+    _lock: ClassVar[Optional[asyncio.Lock]] = None
+
+    @classmethod
+    async def get_models(cls, data_api_client: DataAPIClient) -> list[AIModelInfo]:
+        """
+        Вернуть каталог доступных моделей с учётом staleness и cooldown.
+
+        Args:
+            data_api_client: Клиент Data API для (фоновой) загрузки
+
+        Returns:
+            Список доступных моделей (копия снимка без моделей в cooldown)
+
+        Raises:
+            httpx.HTTPError: Если синхронная загрузка не удалась
+        """
+        if MODEL_CATALOG_MAX_STALENESS <= 0:
+            return await cls._fetch(data_api_client)
+
+        age = time.monotonic() - cls._fetched_at
+        if cls._models is None or age >= MODEL_CATALOG_MAX_STALENESS:
+            await cls._refresh_blocking(data_api_client)
+        elif age >= MODEL_CATALOG_REFRESH_AFTER:
+            cls._schedule_refresh(data_api_client)
+
+        return cls._visible(cls._models or [])
+
+    @classmethod
+    def mark_unavailable(cls, model_id: int, retry_after_seconds: int) -> None:
+        """
+        Локально применить cooldown модели (write-through к Data API).
+
+        Модель исчезает из выдачи немедленно и остаётся скрытой до истечения
+        cooldown, даже если параллельное обновление вернёт её из Data API.
+
+        Args:
+            model_id: ID модели
+            retry_after_seconds: Длительность cooldown в секундах
+        """
+        deadline = time.monotonic() + retry_after_seconds
+        cls._cooldowns[model_id] = max(deadline, cls._cooldowns.get(model_id, 0.0))
+        logger.debug(
+            "model_catalog_cooldown_applied",
+            model_id=model_id,
+            retry_after_seconds=retry_after_seconds,
+        )
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """Пометить снимок устаревшим: следующий get_models загрузит заново."""
+        cls._fetched_at = 0.0
+        cls._models = None
+
+    @classmethod
+    async def shutdown(cls) -> None:
+        """Остановить фоновое обновление (вызывается из lifespan)."""
+        task = cls._refresh_task
+        cls._refresh_task = None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    @classmethod
+    def reset(cls) -> None:
+        """Сбросить состояние кеша (для тестов)."""
+        task = cls._refresh_task
+        if task is not None and not task.done():
+            task.cancel()
+        cls._models = None
+        cls._fetched_at = 0.0
+        cls._cooldowns = {}
+        cls._refresh_task = None
+        cls._lock = None
+
+    @classmethod
+    def _visible(cls, models: list[AIModelInfo]) -> list[AIModelInfo]:
+        """Отфильтровать модели с активным локальным cooldown."""
+        if not cls._cooldowns:
+            return list(models)
+        now = time.monotonic()
+        expired = [mid for mid, deadline in cls._cooldowns.items() if deadline <= now]
+        for model_id in expired:
+            del cls._cooldowns[model_id]
+        return [m for m in models if m.id not in cls._cooldowns]
+
+    @classmethod
+    async def _fetch(cls, data_api_client: DataAPIClient) -> list[AIModelInfo]:
+        """Загрузить каталог из Data API (тот же запрос, что раньше в execute)."""
+        return await data_api_client.get_all_models(
+            active_only=True,
+            available_only=True,
+            include_recent=True,
+        )
+
+    @classmethod
+    def _store(cls, models: list[AIModelInfo]) -> None:
+        cls._models = models
+        cls._fetched_at = time.monotonic()
+
+    @classmethod
+    async def _refresh_blocking(cls, data_api_client: DataAPIClient) -> None:
+        """Синхронная загрузка; конкурентные вызовы ждут одну загрузку."""
+        if cls._lock is None:
+            cls._lock = asyncio.Lock()
+        fetched_before = cls._fetched_at
+        async with cls._lock:
+            # Другой запрос уже обновил снимок, пока мы ждали lock
+            if cls._models is not None and cls._fetched_at != fetched_before:
+                return
+            cls._store(await cls._fetch(data_api_client))
+
+    @classmethod
+    def _schedule_refresh(cls, data_api_client: DataAPIClient) -> None:
+        """Запустить фоновое обновление, если оно ещё не идёт."""
+        if cls._refresh_task is not None and not cls._refresh_task.done():
+            return
+        cls._refresh_task = asyncio.create_task(cls._refresh_background(data_api_client))
+
+    @classmethod
+    async def _refresh_background(cls, data_api_client: DataAPIClient) -> None:
+        """Фоновое обновление: ошибка не трогает снимок до MAX_STALENESS."""
+        try:
+            cls._store(await cls._fetch(data_api_client))
+            logger.debug("model_catalog_refreshed", models=len(cls._models or []))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(
+                "model_catalog_refresh_failed",
+                error=sanitize_error_message(e),
+            )
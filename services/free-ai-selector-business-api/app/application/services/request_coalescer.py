@@ -0,0 +1,102 @@
+"""
+Request Coalescer (single-flight) for identical in-flight prompts.
+
+user-008: При всплеске одинаковых промптов (retry storm клиента, fan-out
+задачи) каждый запрос вызывал провайдера сам и сжигал квоту. Coalescer
+пропускает к провайдеру только первый запрос (лидер); конкурентные дубликаты
+с тем же ключом ждут результат лидера.
+
+Поведение:
+    - Ключ: нормализованный запрос (ResponseCache.build_key)
+    - Результат/исключение лидера получают все ожидающие дубликаты
+    - Отмена лидера (клиент отключился) не роняет дубликаты: один из них
+      становится новым лидером
+    - После завершения лидера ключ освобождается — следующий запрос снова
+      идёт к провайдеру (кеширование ответов — задача ResponseCache)
+
+Configuration:
+    REQUEST_COALESCING_ENABLED: Включить single-flight (default: true),
+        читается в ProcessPromptUseCase
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, ClassVar, TypeVar
+
+T = TypeVar("T")
+
+
+class _LeaderCancelled(Exception):
+    """Leader was cancelled before producing a result."""
+
+
+class RequestCoalescer:
+    """In-process single-flight по ключу запроса.
+
+    Использует class-level dict (паттерн CircuitBreakerManager).
+    Thread-safe в asyncio (single-threaded event loop).
+    """
+
+    _inflight: ClassVar[dict[str, "asyncio.Future[Any]"]] = {}
+
+    @classmethod
+    async def run(cls, key: str, factory: Callable[[], Awaitable[T]]) -> tuple[T, bool]:
+        """
+        Выполнить factory() один раз на ключ среди конкурентных вызовов.
+
+        Args:
+            key: Ключ нормализованного запроса
+            factory: Корутина-фабрика, вызываемая только лидером
+
+        Returns:
+            Tuple (результат, is_follower). is_follower=True — результат
+            получен от другого (лидирующего) вызова
+
+        Raises:
+            Exception: Исключение лидера (для дубликатов — то же самое)
+        """
+        while True:
+            future = cls._inflight.get(key)
+            if future is None:
+                break
+            try:
+                return await asyncio.shield(future), True
+            except _LeaderCancelled:
+                # Лидер отменён — повторяем: первый проснувшийся станет лидером
+                continue
+
+        future = asyncio.get_running_loop().create_future()
+        cls._inflight[key] = future
+        try:
+            result = await factory()
+        except asyncio.CancelledError:
+            cls._fail(future, _LeaderCancelled())
+            raise
+        except BaseException as e:
+            cls._fail(future, e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            if cls._inflight.get(key) is future:
+                del cls._inflight[key]
+
+    @classmethod
+    def in_flight(cls) -> int:
+        """Количество ключей с активным лидером (для логов и тестов)."""
+        return len(cls._inflight)
+
+    @classmethod
+    def reset(cls) -> None:
+        """Сбросить состояние (для тестов)."""
+        cls._inflight = {}
+
+    @staticmethod
+    def _fail(future: "asyncio.Future[Any]", error: BaseException) -> None:
+        """Передать ошибку ожидающим дубликатам."""
+        if future.done():
+            return
+        future.set_exception(error)
+        # Пометить исключение полученным: без дубликатов asyncio иначе
+        # залогирует "Future exception was never retrieved"
+        future.exception()
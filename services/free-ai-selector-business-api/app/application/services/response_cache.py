@@ -0,0 +1,176 @@
+"""
+Exact-match Response Cache for deterministic prompts.
+
+user-007: In-memory LRU/TTL кеш ответов перед ProcessPromptUseCase. Проекты
+(X-Client-Id) повторно присылают одинаковые классификационные и extraction
+промпты — попадание в кеш не вызывает провайдера и не пишет статистику
+моделей в Data API.
+
+Поведение:
+    - Ключ: SHA-256 от prompt_text, system_prompt, response_format, tags
+      (отсортированы — фильтр тегов не зависит от порядка) и model_name
+    - Кеш opt-in: используется только если вызывающий явно попросил
+      (поле ``cache`` или заголовок X-Response-Cache)
+    - Вытеснение: LRU по суммарному размеру ответов + TTL на запись
+
+Configuration:
+    RESPONSE_CACHE_MAX_BYTES: Бюджет памяти на ответы, байт (default: 16 MiB).
+        0 отключает кеш.
+    RESPONSE_CACHE_TTL_SECONDS: Время жизни записи, сек (default: 3600)
+"""
+
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import ClassVar, Optional
+
+from app.domain.models import PromptRequest
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "3600"))
+
+# Приблизительные накладные расходы на запись (ключ, dataclass, узел OrderedDict)
+_ENTRY_OVERHEAD_BYTES = 256
+
+
+@dataclass
+class CachedResponse:
+    """Закешированный успешный ответ модели."""
+
+    response_text: str
+    model_id: int
+    model_name: str
+    model_provider: str
+    expires_at: float  # time.monotonic() deadline
+    size: int
+
+
+class ResponseCache:
+    """In-memory exact-match кеш ответов (LRU по памяти + TTL).
+
+    Использует class-level state (паттерн CircuitBreakerManager): один кеш на
+    процесс. Безопасен в asyncio (single-threaded event loop).
+    """
+
+    _entries: ClassVar["OrderedDict[str, CachedResponse]"] = OrderedDict()
+    _total_bytes: ClassVar[int] = 0
+
+    @staticmethod
+    def build_key(request: PromptRequest) -> str:
+        """
+        Вычислить ключ кеша для запроса.
+
+        Args:
+            request: Исходный запрос (до F011-B/F022 переписывания промпта)
+
+        Returns:
+            Hex SHA-256 канонического JSON полей запроса
+        """
+        material = json.dumps(
+            {
+                "prompt_text": request.prompt_text,
+                "system_prompt": request.system_prompt,
+                "response_format": request.response_format,
+                "tags": sorted(request.tags) if request.tags else None,
+                "model_name": request.model_name,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        """Кеш включён, если задан ненулевой бюджет памяти."""
+        return RESPONSE_CACHE_MAX_BYTES > 0
+
+    @classmethod
+    def get(cls, key: str) -> Optional[CachedResponse]:
+        """
+        Найти неистёкшую запись и отметить её как недавно использованную.
+
+        Args:
+            key: Ключ из build_key()
+
+        Returns:
+            CachedResponse или None (промах или запись истекла)
+        """
+        entry = cls._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            cls._remove(key)
+            return None
+        cls._entries.move_to_end(key)
+        return entry
+
+    @classmethod
+    def put(
+        cls,
+        key: str,
+        response_text: str,
+        model_id: int,
+        model_name: str,
+        model_provider: str,
+    ) -> None:
+        """
+        Сохранить успешный ответ, вытесняя LRU-записи сверх бюджета памяти.
+
+        Ответ крупнее всего бюджета не кешируется.
+
+        Args:
+            key: Ключ из build_key()
+            response_text: Текст ответа модели
+            model_id: ID модели, давшей ответ
+            model_name: Имя модели
+            model_provider: Провайдер модели
+        """
+        if not cls.is_enabled():
+            return
+        size = (
+            len(response_text.encode("utf-8"))
+            + len(model_name)
+            + len(model_provider)
+            + _ENTRY_OVERHEAD_BYTES
+        )
+        if size > RESPONSE_CACHE_MAX_BYTES:
+            return
+
+        if key in cls._entries:
+            cls._remove(key)
+        cls._entries[key] = CachedResponse(
+            response_text=response_text,
+            model_id=model_id,
+            model_name=model_name,
+            model_provider=model_provider,
+            expires_at=time.monotonic() + RESPONSE_CACHE_TTL_SECONDS,
+            size=size,
+        )
+        cls._total_bytes += size
+
+        while cls._total_bytes > RESPONSE_CACHE_MAX_BYTES:
+            evicted_key, _ = next(iter(cls._entries.items()))
+            cls._remove(evicted_key)
+            logger.debug("response_cache_evicted", total_bytes=cls._total_bytes)
+
+    @classmethod
+    def stats(cls) -> dict:
+        """Текущий размер кеша (для логов и тестов)."""
+        return {"entries": len(cls._entries), "total_bytes": cls._total_bytes}
+
+    @classmethod
+    def reset(cls) -> None:
+        """Очистить кеш (для тестов)."""
+        cls._entries = OrderedDict()
+        cls._total_bytes = 0
+
+    @classmethod
+    def _remove(cls, key: str) -> None:
+        entry = cls._entries.pop(key)
+        cls._total_bytes -= entry.size
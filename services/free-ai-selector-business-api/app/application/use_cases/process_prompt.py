@@ -20,19 +20,60 @@ F023: Error Resilience and Telemetry
 - Exponential backoff: 2s → 4s → 8s with jitter (MAX_RETRIES=3)
 - Per-request telemetry: attempts, fallback_used in response
 
+user-003: Model catalog cache
+- Models come from ModelCatalogCache (stale-while-revalidate) instead of a
+  Data API round trip per prompt
+- Cooldowns set here are written through to the cache immediately
+
+user-004: Hedged requests (opt-in, routing="hedged")
+- If the in-flight candidate is slower than its observed p90 (or a fixed
+  delay), the next candidate starts in parallel; first valid answer wins
+- Cancelled losers are neutral: no stats, no circuit breaker update
+
+user-005: Race routing (routing="race", race_width=K)
+- The K best candidates are called at once; first valid answer wins
+
+user-006: Streaming (execute_stream)
+- Provider-side token streaming; fallback to the next candidate only while
+  no token has been sent yet
+
+user-007: Exact-match response cache (opt-in, request.use_cache)
+- A hit skips provider calls and model stats writes; history row has cache_hit
+
+user-008: Request coalescing (single-flight)
+- Concurrent identical prompts share one fallback chain run; every request
+  still writes its own history row with its caller
+
+user-009: Write-behind bookkeeping
+- Stats and history writes go through BookkeepingQueue and no longer delay
+  the response; cooldowns (set_availability) are sent immediately
+
+user-010: Composite outcome write
+- Success stats and the history row are one Data API transaction
+  (record_outcome → POST /outcomes)
+- A failed attempt is one record_outcome too: failure counter plus the
+  F023 cooldown, sent immediately when a cooldown is present
+
 Note:
     Provider instances are obtained from ProviderRegistry (F008 SSOT).
     Provider metadata (api_format) is stored in the database.
     API key env var names are resolved via ProviderRegistry (F018 SSOT).
 """
 
+import asyncio
 import os
 import time
+from dataclasses import dataclass, field
 from decimal import Decimal
-from typing import Optional
+from typing import Any, AsyncGenerator, AsyncIterator, NoReturn, Optional
 
+from app.application.services.bookkeeping_queue import BookkeepingQueue
 from app.application.services.circuit_breaker import CircuitBreakerManager
 from app.application.services.error_classifier import classify_error
+from app.application.services.latency_tracker import LatencyTracker
+from app.application.services.model_catalog_cache import ModelCatalogCache
+from app.application.services.request_coalescer import RequestCoalescer
+from app.application.services.response_cache import CachedResponse, ResponseCache
 from app.application.services.retry_service import retry_with_exponential_backoff
 from app.domain.exceptions import (
     AllProvidersRateLimited,
@@ -44,7 +85,12 @@ from app.domain.exceptions import (
     TimeoutError,
     ValidationError,
 )
-from app.domain.models import AIModelInfo, PromptRequest, PromptResponse
+from app.domain.models import (
+    AIModelInfo,
+    PromptRequest,
+    PromptResponse,
+    PromptStreamEvent,
+)
 from app.infrastructure.ai_providers.base import AIProviderBase
 from app.infrastructure.ai_providers.registry import ProviderRegistry
 from app.infrastructure.http_clients.data_api_client import DataAPIClient
@@ -76,6 +122,72 @@ SERVICE_UNAVAILABLE_RETRY_AFTER = int(
 # Fix E: Minimum quality gate — не маршрутизировать на ненадёжные модели
 MINIMUM_RELIABILITY_THRESHOLD = float(os.getenv("MINIMUM_RELIABILITY_THRESHOLD", "0.3"))
 
+# user-004: Routing modes и hedging
+ROUTING_SEQUENTIAL = "sequential"
+ROUTING_HEDGED = "hedged"
+ROUTING_RACE = "race"
+HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "false").lower() == "true"
+DEFAULT_ROUTING = ROUTING_HEDGED if HEDGE_ENABLED else ROUTING_SEQUENTIAL
+# "p90" — наблюдаемый p90 кандидата (fixed, пока замеров < HEDGE_MIN_SAMPLES)
+HEDGE_DELAY_STRATEGY = os.getenv("HEDGE_DELAY_STRATEGY", "p90").lower()
+HEDGE_DELAY_SECONDS = float(os.getenv("HEDGE_DELAY_SECONDS", "5.0"))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+HEDGE_MAX_PARALLEL = int(os.getenv("HEDGE_MAX_PARALLEL", "2"))
+
+# user-005: Race routing — сколько лучших кандидатов вызывать одновременно
+RACE_DEFAULT_WIDTH = int(os.getenv("RACE_DEFAULT_WIDTH", "3"))
+RACE_MAX_WIDTH = int(os.getenv("RACE_MAX_WIDTH", "5"))
+
+# user-008: Single-flight для одинаковых промптов в полёте
+REQUEST_COALESCING_ENABLED = (
+    os.getenv("REQUEST_COALESCING_ENABLED", "true").lower() == "true"
+)
+
+
+class _InvalidJSONResponse(Exception):
+    """Provider answered, but not with valid JSON (response_format=json_object)."""
+
+    def __init__(self, json_error: ValueError):
+        super().__init__(str(json_error))
+        self.json_error = json_error
+
+
+@dataclass
+class _InFlightCall:
+    """A candidate call running as an asyncio task (user-004)."""
+
+    model: AIModelInfo
+    attempt: int
+    started: float  # time.perf_counter() at launch
+
+
+@dataclass
+class _FallbackState:
+    """Candidate cursor and F023/F025 counters shared by one execute() run."""
+
+    candidates: list[AIModelInfo]
+    next_index: int = 0
+    attempts: int = 0
+    skipped_by_cb: int = 0
+    providers_tried: int = 0
+    error_types: list[type] = field(default_factory=list)
+    retry_after_values: list[int] = field(default_factory=list)
+    last_error_message: Optional[str] = None
+
+    @property
+    def has_more_candidates(self) -> bool:
+        return self.next_index < len(self.candidates)
+
+
+@dataclass
+class _ChainOutcome:
+    """Result of one fallback chain run, shareable between coalesced requests."""
+
+    model: Optional[AIModelInfo]  # None → every candidate failed
+    response_text: Optional[str]
+    state: _FallbackState
+    response_time: Decimal
+
 
 class ProcessPromptUseCase:
     """
@@ -110,7 +222,8 @@ class ProcessPromptUseCase:
         1. Get available models (active_only + available_only)
         2. Filter to configured providers only (has API key)
         3. Sort by effective_reliability_score
-        4. Try each model with retry for 5xx/timeout
+        4. Try each model with retry for 5xx/timeout (hedged routing starts
+           the next candidate in parallel when the current one is slow)
         5. On 429: set_availability() and continue to next model
         6. On success: record stats and return
 
@@ -123,6 +236,584 @@ class ProcessPromptUseCase:
         Raises:
             Exception: If all providers fail
         """
+        # Step 0 (user-007): exact-match response cache. Ключ считается по
+        # исходному запросу — до F011-B/F022 переписывания промпта.
+        cache_key: Optional[str] = None
+        if request.use_cache and ResponseCache.is_enabled():
+            lookup_started = time.time()
+            cache_key = ResponseCache.build_key(request)
+            cached = ResponseCache.get(cache_key)
+            if cached is not None:
+                return await self._serve_cached(
+                    request, cached, Decimal(str(time.time() - lookup_started))
+                )
+
+        # Steps 1-3.5: model selection (shared with execute_stream, user-006)
+        coalesce_key = cache_key or ResponseCache.build_key(request)
+        request, candidate_models = await self._prepare_candidates(request)
+        first_model = candidate_models[0]
+
+        # Step 4: fallback chain. user-008: одинаковые запросы в полёте
+        # схлопываются — провайдера вызывает только лидер, дубликаты ждут его.
+        start_time = time.time()
+        is_follower = False
+        if REQUEST_COALESCING_ENABLED:
+            outcome, is_follower = await RequestCoalescer.run(
+                coalesce_key,
+                lambda: self._run_fallback_chain(request, candidate_models),
+            )
+        else:
+            outcome = await self._run_fallback_chain(request, candidate_models)
+        successful_model = outcome.model
+        response_text = outcome.response_text
+        state = outcome.state
+
+        if is_follower:
+            # Время ожидания этого запроса, а не цепочки лидера
+            response_time = Decimal(str(time.time() - start_time))
+            logger.info(
+                "request_coalesced",
+                caller=request.caller,
+                success=successful_model is not None,
+            )
+        else:
+            response_time = outcome.response_time
+
+        # Check if any model succeeded
+        if successful_model is None or response_text is None:
+            await self._raise_all_failed(request, candidate_models, state, response_time)
+
+        # Steps 5-6: success statistics + prompt history. user-008: статистику
+        # модели пишет только лидер, историю — каждый запрос со своим caller.
+        await self._record_prompt_success(
+            request,
+            successful_model,
+            response_text,
+            response_time,
+            record_stats=not is_follower,
+        )
+        if cache_key is not None:
+            ResponseCache.put(
+                cache_key,
+                response_text=response_text,
+                model_id=successful_model.id,
+                model_name=successful_model.name,
+                model_provider=successful_model.provider,
+            )
+
+        return PromptResponse(
+            prompt_text=request.prompt_text,
+            response_text=response_text,
+            selected_model_name=successful_model.name,
+            selected_model_provider=successful_model.provider,
+            response_time=response_time,
+            success=True,
+            error_message=None,
+            # F023: Per-request telemetry
+            attempts=state.attempts,
+            fallback_used=(successful_model.id != first_model.id),
+        )
+
+    async def _run_fallback_chain(
+        self, request: PromptRequest, candidate_models: list[AIModelInfo]
+    ) -> "_ChainOutcome":
+        """
+        Run the full fallback loop over the candidates (step 4).
+
+        F012: FR-9. user-004: в режиме "hedged" медленный кандидат получает
+        параллельного дублёра вместо того, чтобы блокировать цепочку на весь
+        TIMEOUT провайдера. user-005: в режиме "race" сразу стартуют
+        race_width лучших кандидатов.
+
+        Per-call bookkeeping (cooldowns, failure stats, circuit breaker) is
+        done here; per-prompt success stats and history are left to the
+        caller, so the outcome can be shared by coalesced requests (user-008).
+
+        Args:
+            request: Effective prompt request
+            candidate_models: Ordered candidates from _prepare_candidates
+
+        Returns:
+            _ChainOutcome; model is None when every candidate failed
+        """
+        start_time = time.time()
+        routing = request.routing or DEFAULT_ROUTING
+        state = _FallbackState(candidates=candidate_models)
+        pending: dict[asyncio.Task, _InFlightCall] = {}
+        successful_model: Optional[AIModelInfo] = None
+        response_text: Optional[str] = None
+        parallel, max_parallel = self._routing_parallelism(routing, request.race_width)
+        if routing == ROUTING_RACE:
+            logger.info(
+                "race_started",
+                race_width=parallel,
+                candidates=len(candidate_models),
+            )
+
+        try:
+            while successful_model is None:
+                while len(pending) < parallel and self._launch_next_call(
+                    request, state, pending
+                ):
+                    pass
+                if not pending:
+                    break
+
+                timeout = None
+                if parallel < max_parallel and state.has_more_candidates:
+                    timeout = self._hedge_timeout(pending)
+                done, _ = await asyncio.wait(
+                    set(pending),
+                    timeout=timeout,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    # user-004: текущий кандидат медленнее порога — запускаем запасной
+                    parallel += 1
+                    slow_call = max(pending.values(), key=lambda c: c.attempt)
+                    logger.info(
+                        "hedge_triggered",
+                        model=slow_call.model.name,
+                        provider=slow_call.model.provider,
+                        hedge_delay_seconds=round(timeout or 0.0, 3),
+                        in_flight=len(pending),
+                    )
+                    continue
+
+                for task in sorted(done, key=lambda t: pending[t].attempt):
+                    call = pending.pop(task)
+                    error = task.exception()
+                    if error is not None and not isinstance(error, Exception):
+                        # CancelledError и т.п. — не сбой провайдера, пробрасываем
+                        raise error
+                    if error is not None:
+                        await self._record_call_failure(call, error, state, start_time)
+                    elif successful_model is None:
+                        successful_model = call.model
+                        winner_text: str = task.result()
+                        response_text = winner_text
+                        self._record_call_success(call, winner_text)
+                    else:
+                        self._record_discarded_call(call)
+        finally:
+            await self._cancel_pending_calls(pending)
+
+        return _ChainOutcome(
+            model=successful_model,
+            response_text=response_text,
+            state=state,
+            response_time=Decimal(str(time.time() - start_time)),
+        )
+
+    async def execute_stream(
+        self, request: PromptRequest
+    ) -> AsyncIterator[PromptStreamEvent]:
+        """
+        Streaming variant of execute() for Server-Sent Events (user-006).
+
+        Candidates are tried one by one in the same order as execute(). A
+        candidate whose stream fails before the first token is recorded as a
+        failed call (cooldown, stats, circuit breaker) and the next one starts.
+        After the first token the answer is committed to that provider: a
+        mid-stream failure ends the stream with an "error" event.
+
+        Retries, hedged/race routing and JSON post-validation do not apply:
+        time-to-first-token wins over retrying, and the answer is already sent
+        when it could be validated. response_format is still passed to the
+        provider.
+
+        Args:
+            request: PromptRequest with user_id and prompt_text
+
+        Yields:
+            PromptStreamEvent: "start", then "token" chunks, then "done" or "error"
+
+        Raises:
+            ServiceUnavailable, AllProvidersRateLimited, Exception: before the
+                first event, exactly as execute() does
+        """
+        request, candidate_models = await self._prepare_candidates(request)
+        first_model = candidate_models[0]
+        start_time = time.time()
+        state = _FallbackState(candidates=candidate_models)
+
+        while True:
+            call = self._next_call(request, state)
+            if call is None:
+                break
+
+            chunks = self._stream_model(call.model, request)
+            try:
+                first_token = await self._first_stream_token(chunks, call.model)
+            except Exception as e:
+                await chunks.aclose()
+                await self._record_call_failure(call, e, state, start_time)
+                continue
+
+            model = call.model
+            logger.info(
+                "stream_first_token",
+                attempt=call.attempt,
+                model=model.name,
+                provider=model.provider,
+                ttft_ms=round((time.perf_counter() - call.started) * 1000.0, 2),
+            )
+            yield PromptStreamEvent(
+                event="start",
+                data={
+                    "selected_model": model.name,
+                    "provider": model.provider,
+                    "attempts": call.attempt,
+                },
+            )
+            yield PromptStreamEvent(event="token", data={"text": first_token})
+
+            parts = [first_token]
+            try:
+                async for chunk in chunks:
+                    parts.append(chunk)
+                    yield PromptStreamEvent(event="token", data={"text": chunk})
+            except Exception as e:
+                await self._record_call_failure(call, e, state, start_time)
+                await self._record_stream_interrupted(
+                    request, model, "".join(parts), state, start_time
+                )
+                yield PromptStreamEvent(
+                    event="error",
+                    data={
+                        "error": "stream_interrupted",
+                        "message": state.last_error_message,
+                    },
+                )
+                return
+            finally:
+                await chunks.aclose()
+
+            response_text = "".join(parts)
+            self._record_call_success(call, response_text)
+            response_time = Decimal(str(time.time() - start_time))
+            await self._record_prompt_success(request, model, response_text, response_time)
+            yield PromptStreamEvent(
+                event="done",
+                data={
+                    "selected_model": model.name,
+                    "provider": model.provider,
+                    "response_time_seconds": float(response_time),
+                    "attempts": state.attempts,
+                    "fallback_used": model.id != first_model.id,
+                },
+            )
+            return
+
+        response_time = Decimal(str(time.time() - start_time))
+        await self._raise_all_failed(request, candidate_models, state, response_time)
+
+    async def _stream_model(
+        self, model: AIModelInfo, request: PromptRequest
+    ) -> AsyncGenerator[str, None]:
+        """Provider-side token stream for one candidate (user-006)."""
+        provider = self._get_provider_for_model(model)
+        async for chunk in provider.stream(
+            request.prompt_text,
+            system_prompt=request.system_prompt,
+            response_format=request.response_format,
+        ):
+            if chunk:
+                yield chunk
+
+    async def _first_stream_token(
+        self, chunks: AsyncIterator[str], model: AIModelInfo
+    ) -> str:
+        """
+        Wait for the first non-empty chunk of a candidate stream (user-006).
+
+        Raises:
+            ProviderError: Stream ended without producing any text
+        """
+        async for chunk in chunks:
+            return chunk
+        raise ProviderError(f"Empty response from {model.provider}/{model.name}")
+
+    async def _record_stream_interrupted(
+        self,
+        request: PromptRequest,
+        model: AIModelInfo,
+        partial_text: str,
+        state: "_FallbackState",
+        start_time: float,
+    ) -> None:
+        """Record history for a stream that failed after the first token (user-006)."""
+        try:
+            await BookkeepingQueue.submit(
+                self.data_api_client,
+                "create_history",
+                user_id=request.user_id,
+                prompt_text=request.prompt_text,
+                selected_model_id=model.id,
+                response_text=partial_text or None,
+                response_time=Decimal(str(time.time() - start_time)),
+                success=False,
+                error_message=state.last_error_message,
+                caller=request.caller,
+                http_status=500,
+                requested_model=request.model_name,
+            )
+        except Exception as history_error:
+            logger.error(
+                "history_record_failed",
+                error=sanitize_error_message(history_error),
+            )
+
+    async def _raise_all_failed(
+        self,
+        request: PromptRequest,
+        candidate_models: list[AIModelInfo],
+        state: "_FallbackState",
+        response_time: Decimal,
+    ) -> NoReturn:
+        """
+        Record the failed prompt in history and raise the F025 backpressure error.
+
+        Args:
+            request: Prompt request
+            candidate_models: Candidates that were considered
+            state: Fallback counters collected by the loop
+            response_time: Time spent on the whole fallback chain
+
+        Raises:
+            ServiceUnavailable: Every candidate was circuit-breaker-skipped
+            AllProvidersRateLimited: Every attempted provider returned 429
+            Exception: Any other combination of failures
+        """
+        attempts = state.attempts
+        error_types = state.error_types
+        retry_after_values = state.retry_after_values
+        skipped_by_cb = state.skipped_by_cb
+        providers_tried = state.providers_tried
+        last_error_message = state.last_error_message
+
+        # All models failed
+        # F024: CB статусы для диагностики
+        cb_statuses = CircuitBreakerManager.get_all_statuses()
+        logger.error(
+            "all_models_failed",
+            models_tried=len(candidate_models),
+            attempts=attempts,
+            last_error=last_error_message,
+            circuit_breaker_statuses=cb_statuses,
+        )
+
+        # Determine the HTTP status the route is about to return to the caller,
+        # so the journal records the real outcome (503 / 429 / 500).
+        if attempts == 0:
+            failure_http_status = 503
+        elif error_types and all(t == RateLimitError for t in error_types):
+            failure_http_status = 429
+        else:
+            failure_http_status = 500
+
+        # p7u-2A: never record a silent failure. When every candidate was
+        # circuit-breaker-skipped, no attempt set last_error_message, so make
+        # the journal explain why (instead of a NULL error_message).
+        if last_error_message is None:
+            last_error_message = (
+                f"All {skipped_by_cb} candidate provider(s) skipped: circuit breaker open"
+                if skipped_by_cb
+                else "All providers failed without a captured error"
+            )
+
+        # p7u-2C: floor the recorded time so instant (circuit-breaker-skipped)
+        # failures are visible as 0.001s instead of a misleading 0.000s.
+        recorded_response_time = max(response_time, Decimal("0.001"))
+
+        # Record history with failure
+        try:
+            await BookkeepingQueue.submit(
+                self.data_api_client,
+                "create_history",
+                user_id=request.user_id,
+                prompt_text=request.prompt_text,
+                selected_model_id=candidate_models[0].id,
+                response_text=None,
+                response_time=recorded_response_time,
+                success=False,
+                error_message=last_error_message,
+                caller=request.caller,
+                http_status=failure_http_status,
+                requested_model=request.model_name,
+            )
+        except Exception as history_error:
+            logger.error(
+                "history_record_failed",
+                error=sanitize_error_message(history_error),
+            )
+
+        # F025: определить причину отказа для backpressure
+        if attempts == 0:
+            raise ServiceUnavailable(
+                message="All providers unavailable (circuit breaker open)",
+                retry_after_seconds=SERVICE_UNAVAILABLE_RETRY_AFTER,
+                reason="all_circuit_breaker_open",
+            )
+
+        if error_types and all(t == RateLimitError for t in error_types):
+            retry_after = (
+                min(retry_after_values)
+                if retry_after_values
+                else ALL_RATE_LIMITED_RETRY_AFTER
+            )
+            raise AllProvidersRateLimited(
+                message=f"All {providers_tried} providers are rate limited",
+                retry_after_seconds=retry_after,
+                attempts=attempts,
+                providers_tried=providers_tried,
+            )
+
+        raise Exception(
+            f"All AI providers failed. Last error: {last_error_message}"
+        )
+
+    async def _serve_cached(
+        self,
+        request: PromptRequest,
+        cached: CachedResponse,
+        response_time: Decimal,
+    ) -> PromptResponse:
+        """
+        Return a cached answer (user-007).
+
+        No provider call and no model statistics: the model did not do any
+        work. The history row is still written (marked cache_hit) so that
+        per-project analytics and the journal see the request.
+
+        Args:
+            request: Prompt request
+            cached: Cache entry
+            response_time: Time spent on the cache lookup
+
+        Returns:
+            PromptResponse with cached=True and attempts=0
+        """
+        logger.info(
+            "response_cache_hit",
+            model=cached.model_name,
+            provider=cached.model_provider,
+            caller=request.caller,
+        )
+        try:
+            await BookkeepingQueue.submit(
+                self.data_api_client,
+                "create_history",
+                user_id=request.user_id,
+                prompt_text=request.prompt_text,
+                selected_model_id=cached.model_id,
+                response_text=cached.response_text,
+                response_time=response_time,
+                success=True,
+                error_message=None,
+                caller=request.caller,
+                http_status=200,
+                requested_model=request.model_name,
+                cache_hit=True,
+            )
+        except Exception as history_error:
+            logger.error(
+                "history_record_failed",
+                error=sanitize_error_message(history_error),
+            )
+
+        return PromptResponse(
+            prompt_text=request.prompt_text,
+            response_text=cached.response_text,
+            selected_model_name=cached.model_name,
+            selected_model_provider=cached.model_provider,
+            response_time=response_time,
+            success=True,
+            error_message=None,
+            attempts=0,
+            fallback_used=False,
+            cached=True,
+        )
+
+    async def _record_prompt_success(
+        self,
+        request: PromptRequest,
+        model: AIModelInfo,
+        response_text: str,
+        response_time: Decimal,
+        record_stats: bool = True,
+    ) -> None:
+        """
+        Record success statistics and the prompt history row.
+
+        user-010: счётчик и история уходят одним вызовом record_outcome;
+        follower без статистики пишет только историю.
+
+        Args:
+            request: Prompt request
+            model: Model that produced the answer
+            response_text: Final response text
+            response_time: Time spent on the whole fallback chain
+            record_stats: False for coalesced followers (user-008): the model
+                served one call, the leader already counted it
+        """
+        history: dict[str, Any] = {
+            "user_id": request.user_id,
+            "prompt_text": request.prompt_text,
+            "selected_model_id": model.id,
+            "response_text": response_text,
+            "response_time": response_time,
+            "success": True,
+            "error_message": None,
+            "caller": request.caller,
+            "http_status": 200,
+            "requested_model": request.model_name,
+        }
+
+        # Steps 5-6: success statistics + prompt history.
+        # user-010: одна транзакция Data API (POST /outcomes) вместо двух вызовов
+        if record_stats:
+            try:
+                await BookkeepingQueue.submit(
+                    self.data_api_client,
+                    "record_outcome",
+                    model_id=model.id,
+                    result="success",
+                    response_time=float(response_time),
+                    history=history,
+                )
+            except Exception as outcome_error:
+                logger.error(
+                    "outcome_record_failed",
+                    model=model.name,
+                    error=sanitize_error_message(outcome_error),
+                )
+            return
+
+        try:
+            await BookkeepingQueue.submit(self.data_api_client, "create_history", **history)
+        except Exception as history_error:
+            logger.error(
+                "history_record_failed",
+                error=sanitize_error_message(history_error),
+            )
+
+    async def _prepare_candidates(
+        self, request: PromptRequest
+    ) -> tuple[PromptRequest, list[AIModelInfo]]:
+        """
+        Select and order candidate models for a prompt (steps 1-3.5).
+
+        Args:
+            request: Incoming prompt request
+
+        Returns:
+            Tuple of (effective request, candidate_models). The request may be
+            rewritten: JSON fallback system prompt (F011-B) or truncation (F022).
+
+        Raises:
+            ServiceUnavailable: No active/configured/capable/healthy model
+        """
         # F011-B: Log system_prompt and response_format presence
         logger.info(
             "processing_prompt",
@@ -133,12 +824,9 @@ class ProcessPromptUseCase:
             has_response_format=request.response_format is not None,
         )
 
-        # Step 1: Fetch available models from Data API (F012: available_only)
-        models = await self.data_api_client.get_all_models(
-            active_only=True,
-            available_only=True,
-            include_recent=True,
-        )
+        # Step 1: Available models (F012: available_only) from the in-memory
+        # catalog cache (user-003); falls back to Data API when stale
+        models = await ModelCatalogCache.get_models(self.data_api_client)
 
         if not models:
             logger.error("no_active_models_available")
@@ -187,6 +875,8 @@ class ProcessPromptUseCase:
                 response_format=None,
                 tags=request.tags,
                 caller=request.caller,
+                routing=request.routing,
+                race_width=request.race_width,
             )
 
         # Step 2.6: Filter by tags if requested
@@ -289,22 +979,76 @@ class ProcessPromptUseCase:
                 response_format=request.response_format,
                 tags=request.tags,
                 caller=request.caller,
+                routing=request.routing,
+                race_width=request.race_width,
             )
 
-        # Step 4: Full fallback loop (F012: FR-9)
-        start_time = time.time()
-        last_error_message: Optional[str] = None
-        successful_model: Optional[AIModelInfo] = None
-        response_text: Optional[str] = None
-        # F023: Telemetry counters
-        attempts = 0
-        # F025: агрегация типов ошибок для backpressure
-        error_types: list[type] = []
-        retry_after_values: list[int] = []
-        skipped_by_cb: int = 0
-        providers_tried: int = 0
-
-        for model in candidate_models:
+        return request, candidate_models
+
+    def _routing_parallelism(
+        self, routing: str, race_width: Optional[int]
+    ) -> tuple[int, int]:
+        """
+        Initial and maximum number of concurrent candidate calls.
+
+        Args:
+            routing: "sequential", "hedged" (user-004) or "race" (user-005)
+            race_width: Requested race width (race routing only); clamped to
+                [1, RACE_MAX_WIDTH] — the API accepts any value >= 1
+
+        Returns:
+            Tuple of (initial_parallel, max_parallel)
+        """
+        if routing == ROUTING_RACE:
+            width = min(max(race_width or RACE_DEFAULT_WIDTH, 1), RACE_MAX_WIDTH)
+            return width, width
+        if routing == ROUTING_HEDGED:
+            return 1, max(HEDGE_MAX_PARALLEL, 1)
+        return 1, 1
+
+    def _launch_next_call(
+        self,
+        request: PromptRequest,
+        state: "_FallbackState",
+        pending: dict[asyncio.Task, "_InFlightCall"],
+    ) -> bool:
+        """
+        Start the next candidate whose circuit breaker allows a call.
+
+        Args:
+            request: Prompt request to send
+            state: Shared fallback counters and cursor
+            pending: In-flight calls (new task is added here)
+
+        Returns:
+            True if a call was started, False if candidates are exhausted
+        """
+        call = self._next_call(request, state)
+        if call is None:
+            return False
+        task = asyncio.create_task(self._call_model(call.model, request))
+        pending[task] = call
+        return True
+
+    def _next_call(
+        self, request: PromptRequest, state: "_FallbackState"
+    ) -> Optional["_InFlightCall"]:
+        """
+        Take the next candidate whose circuit breaker allows a call.
+
+        Counts the attempt and emits model_call_start telemetry.
+
+        Args:
+            request: Prompt request to send
+            state: Shared fallback counters and cursor
+
+        Returns:
+            In-flight call descriptor, or None if candidates are exhausted
+        """
+        while state.has_more_candidates:
+            model = state.candidates[state.next_index]
+            state.next_index += 1
+
             # F024: Circuit breaker — пропуск провайдера в OPEN
             if not CircuitBreakerManager.is_available(model.provider):
                 logger.debug(
@@ -312,14 +1056,13 @@ class ProcessPromptUseCase:
                     model=model.name,
                     provider=model.provider,
                 )
-                skipped_by_cb += 1
+                state.skipped_by_cb += 1
                 continue
 
-            attempts += 1
-            model_attempt_started = time.perf_counter()
+            state.attempts += 1
             logger.info(
                 "model_call_start",
-                attempt=attempts,
+                attempt=state.attempts,
                 model_id=model.id,
                 model=model.name,
                 provider=model.provider,
@@ -329,7 +1072,7 @@ class ProcessPromptUseCase:
             audit_event(
                 "model_call_start",
                 {
-                    "attempt": attempts,
+                    "attempt": state.attempts,
                     "model_id": model.id,
                     "model": model.name,
                     "provider": model.provider,
@@ -337,328 +1080,260 @@ class ProcessPromptUseCase:
                     "requested_model_name": request.model_name,
                 },
             )
-            try:
-                provider = self._get_provider_for_model(model)
+            return _InFlightCall(
+                model=model,
+                attempt=state.attempts,
+                started=time.perf_counter(),
+            )
+        return None
 
-                # Generate with retry for 5xx/timeout (F012: FR-2)
-                response_text = await self._generate_with_retry(
-                    provider=provider,
-                    request=request,
-                    model=model,
-                )
+    async def _call_model(self, model: AIModelInfo, request: PromptRequest) -> str:
+        """
+        Single candidate call: generate with retry, reject empty/invalid output.
 
-                # Empty response check (mirrors test_all_providers.py logic)
-                if not response_text or not response_text.strip():
-                    raise ProviderError(
-                        f"Empty response from {model.provider}/{model.name}"
-                    )
+        Args:
+            model: Candidate model
+            request: Prompt request
 
-                # Валидация JSON-ответа если запрошен response_format
-                if (
-                    request.response_format
-                    and request.response_format.get("type") == "json_object"
-                ):
-                    from app.utils.json_validator import validate_json_response
-
-                    try:
-                        response_text = validate_json_response(response_text)
-                    except ValueError as json_err:
-                        logger.warning(
-                            "json_validation_failed",
-                            model=model.name,
-                            provider=model.provider,
-                            error=str(json_err),
-                            response_preview=response_text[:200],
-                        )
-                        await self._handle_transient_error(model, json_err, start_time)
-                        last_error_message = f"Invalid JSON from {model.provider}"
-                        error_types.append(ValidationError)
-                        providers_tried += 1
-                        continue
-
-                # Success!
-                successful_model = model
-                model_duration_ms = round(
-                    (time.perf_counter() - model_attempt_started) * 1000.0, 2
-                )
-                # F024: Circuit breaker — запись успеха
-                CircuitBreakerManager.record_success(model.provider)
-                logger.info(
-                    "generation_success",
-                    model=model.name,
-                    provider=model.provider,
-                )
-                logger.info(
-                    "model_call_success",
-                    attempt=attempts,
-                    model_id=model.id,
-                    model=model.name,
-                    provider=model.provider,
-                    duration_ms=model_duration_ms,
-                    response_chars=len(response_text),
-                )
-                audit_event(
-                    "model_call_success",
-                    {
-                        "attempt": attempts,
-                        "model_id": model.id,
-                        "model": model.name,
-                        "provider": model.provider,
-                        "duration_ms": model_duration_ms,
-                        "response_chars": len(response_text),
-                    },
-                )
-                break
+        Returns:
+            Validated response text
 
-            except RateLimitError as e:
-                # F014: Rate limit - don't count as failure, set availability
-                await self._handle_rate_limit(model, e)
-                last_error_message = sanitize_error_message(e)
-                model_duration_ms = round(
-                    (time.perf_counter() - model_attempt_started) * 1000.0, 2
-                )
-                logger.warning(
-                    "model_call_error",
-                    attempt=attempts,
-                    model_id=model.id,
-                    model=model.name,
-                    provider=model.provider,
-                    duration_ms=model_duration_ms,
-                    error_type=type(e).__name__,
-                    error=last_error_message,
-                    retry_after_seconds=e.retry_after_seconds,
-                )
-                audit_event(
-                    "model_call_error",
-                    {
-                        "attempt": attempts,
-                        "model_id": model.id,
-                        "model": model.name,
-                        "provider": model.provider,
-                        "duration_ms": model_duration_ms,
-                        "error_type": type(e).__name__,
-                        "error": last_error_message,
-                        "retry_after_seconds": e.retry_after_seconds,
-                    },
-                )
-                # F025: трекинг типа ошибки
-                error_types.append(type(e))
-                providers_tried += 1
-                if e.retry_after_seconds:
-                    retry_after_values.append(e.retry_after_seconds)
+        Raises:
+            ProviderError: Classified provider failure (incl. empty response)
+            _InvalidJSONResponse: Response is not valid JSON when JSON requested
+        """
+        provider = self._get_provider_for_model(model)
 
-            except (
-                ServerError,
-                TimeoutError,
-                AuthenticationError,
-                ValidationError,
-                ProviderError,
-            ) as e:
-                # F024: Circuit breaker — запись ошибки
-                CircuitBreakerManager.record_failure(model.provider)
-                # F014: Transient errors - record as failure
-                await self._handle_transient_error(model, e, start_time)
-                last_error_message = sanitize_error_message(e)
-                model_duration_ms = round(
-                    (time.perf_counter() - model_attempt_started) * 1000.0, 2
-                )
-                logger.warning(
-                    "model_call_error",
-                    attempt=attempts,
-                    model_id=model.id,
-                    model=model.name,
-                    provider=model.provider,
-                    duration_ms=model_duration_ms,
-                    error_type=type(e).__name__,
-                    error=last_error_message,
-                )
-                audit_event(
-                    "model_call_error",
-                    {
-                        "attempt": attempts,
-                        "model_id": model.id,
-                        "model": model.name,
-                        "provider": model.provider,
-                        "duration_ms": model_duration_ms,
-                        "error_type": type(e).__name__,
-                        "error": last_error_message,
-                    },
-                )
-                # F025: трекинг типа ошибки
-                error_types.append(type(e))
-                providers_tried += 1
+        # Generate with retry for 5xx/timeout (F012: FR-2)
+        response_text = await self._generate_with_retry(
+            provider=provider,
+            request=request,
+            model=model,
+        )
 
-            except Exception as e:
-                # F014: Unexpected error - classify and handle
-                classified = classify_error(e)
-                if isinstance(classified, RateLimitError):
-                    # F024: RateLimitError НЕ считается failure для CB
-                    await self._handle_rate_limit(model, classified)
-                    # F025: трекинг типа ошибки
-                    error_types.append(RateLimitError)
-                    if classified.retry_after_seconds:
-                        retry_after_values.append(classified.retry_after_seconds)
-                else:
-                    # F024: Circuit breaker — запись ошибки
-                    CircuitBreakerManager.record_failure(model.provider)
-                    await self._handle_transient_error(model, classified, start_time)
-                    # F025: трекинг типа ошибки
-                    error_types.append(type(classified))
-                last_error_message = sanitize_error_message(e)
-                model_duration_ms = round(
-                    (time.perf_counter() - model_attempt_started) * 1000.0, 2
-                )
+        # Empty response check (mirrors test_all_providers.py logic)
+        if not response_text or not response_text.strip():
+            raise ProviderError(f"Empty response from {model.provider}/{model.name}")
+
+        # Валидация JSON-ответа если запрошен response_format
+        if request.response_format and request.response_format.get("type") == "json_object":
+            from app.utils.json_validator import validate_json_response
+
+            try:
+                return validate_json_response(response_text)
+            except ValueError as json_err:
                 logger.warning(
-                    "model_call_error",
-                    attempt=attempts,
-                    model_id=model.id,
+                    "json_validation_failed",
                     model=model.name,
                     provider=model.provider,
-                    duration_ms=model_duration_ms,
-                    error_type=type(classified).__name__,
-                    error=last_error_message,
+                    error=str(json_err),
+                    response_preview=response_text[:200],
                 )
-                audit_event(
-                    "model_call_error",
-                    {
-                        "attempt": attempts,
-                        "model_id": model.id,
-                        "model": model.name,
-                        "provider": model.provider,
-                        "duration_ms": model_duration_ms,
-                        "error_type": type(classified).__name__,
-                        "error": last_error_message,
-                    },
-                )
-                providers_tried += 1
+                raise _InvalidJSONResponse(json_err) from json_err
 
-        response_time = Decimal(str(time.time() - start_time))
+        return response_text
 
-        # Check if any model succeeded
-        if successful_model is None or response_text is None:
-            # All models failed
-            # F024: CB статусы для диагностики
-            cb_statuses = CircuitBreakerManager.get_all_statuses()
-            logger.error(
-                "all_models_failed",
-                models_tried=len(candidate_models),
-                attempts=attempts,
-                last_error=last_error_message,
-                circuit_breaker_statuses=cb_statuses,
-            )
-
-            # Determine the HTTP status the route is about to return to the caller,
-            # so the journal records the real outcome (503 / 429 / 500).
-            if attempts == 0:
-                failure_http_status = 503
-            elif error_types and all(t == RateLimitError for t in error_types):
-                failure_http_status = 429
-            else:
-                failure_http_status = 500
-
-            # p7u-2A: never record a silent failure. When every candidate was
-            # circuit-breaker-skipped, no attempt set last_error_message, so make
-            # the journal explain why (instead of a NULL error_message).
-            if last_error_message is None:
-                last_error_message = (
-                    f"All {skipped_by_cb} candidate provider(s) skipped: circuit breaker open"
-                    if skipped_by_cb
-                    else "All providers failed without a captured error"
-                )
+    def _hedge_timeout(self, pending: dict[asyncio.Task, "_InFlightCall"]) -> float:
+        """
+        Seconds left before the newest in-flight call earns a hedge (user-004).
 
-            # p7u-2C: floor the recorded time so instant (circuit-breaker-skipped)
-            # failures are visible as 0.001s instead of a misleading 0.000s.
-            recorded_response_time = max(response_time, Decimal("0.001"))
+        Args:
+            pending: In-flight calls
 
-            # Record history with failure
-            try:
-                await self.data_api_client.create_history(
-                    user_id=request.user_id,
-                    prompt_text=request.prompt_text,
-                    selected_model_id=candidate_models[0].id,
-                    response_text=None,
-                    response_time=recorded_response_time,
-                    success=False,
-                    error_message=last_error_message,
-                    caller=request.caller,
-                    http_status=failure_http_status,
-                    requested_model=request.model_name,
-                )
-            except Exception as history_error:
-                logger.error(
-                    "history_record_failed",
-                    error=sanitize_error_message(history_error),
-                )
+        Returns:
+            Remaining delay (>= 0) measured from the newest call's start
+        """
+        newest = max(pending.values(), key=lambda c: c.attempt)
+        elapsed = time.perf_counter() - newest.started
+        return max(0.0, self._hedge_delay(newest.model) - elapsed)
 
-            # F025: определить причину отказа для backpressure
-            if attempts == 0:
-                raise ServiceUnavailable(
-                    message="All providers unavailable (circuit breaker open)",
-                    retry_after_seconds=SERVICE_UNAVAILABLE_RETRY_AFTER,
-                    reason="all_circuit_breaker_open",
-                )
+    def _hedge_delay(self, model: AIModelInfo) -> float:
+        """
+        Hedge delay for a model: observed p90 or the fixed fallback (user-004).
 
-            if error_types and all(t == RateLimitError for t in error_types):
-                retry_after = (
-                    min(retry_after_values)
-                    if retry_after_values
-                    else ALL_RATE_LIMITED_RETRY_AFTER
-                )
-                raise AllProvidersRateLimited(
-                    message=f"All {providers_tried} providers are rate limited",
-                    retry_after_seconds=retry_after,
-                    attempts=attempts,
-                    providers_tried=providers_tried,
-                )
+        Args:
+            model: Model currently in flight
 
-            raise Exception(
-                f"All AI providers failed. Last error: {last_error_message}"
+        Returns:
+            Delay in seconds before a backup call is started
+        """
+        if HEDGE_DELAY_STRATEGY == "p90":
+            observed = LatencyTracker.quantile(
+                model.id, 0.9, min_samples=HEDGE_MIN_SAMPLES
             )
+            if observed is not None:
+                return observed
+        return HEDGE_DELAY_SECONDS
+
+    def _record_call_success(self, call: "_InFlightCall", response_text: str) -> None:
+        """Record the winning call: circuit breaker, latency window, logs."""
+        model = call.model
+        duration = time.perf_counter() - call.started
+        model_duration_ms = round(duration * 1000.0, 2)
+        # F024: Circuit breaker — запись успеха
+        CircuitBreakerManager.record_success(model.provider)
+        LatencyTracker.record(model.id, duration)
+        logger.info(
+            "generation_success",
+            model=model.name,
+            provider=model.provider,
+        )
+        logger.info(
+            "model_call_success",
+            attempt=call.attempt,
+            model_id=model.id,
+            model=model.name,
+            provider=model.provider,
+            duration_ms=model_duration_ms,
+            response_chars=len(response_text),
+        )
+        audit_event(
+            "model_call_success",
+            {
+                "attempt": call.attempt,
+                "model_id": model.id,
+                "model": model.name,
+                "provider": model.provider,
+                "duration_ms": model_duration_ms,
+                "response_chars": len(response_text),
+            },
+        )
 
-        # Step 5: Update success statistics
-        try:
-            await self.data_api_client.increment_success(
-                model_id=successful_model.id, response_time=float(response_time)
-            )
-        except Exception as stats_error:
-            logger.error(
-                "stats_update_failed",
-                model=successful_model.name,
-                error=sanitize_error_message(stats_error),
-            )
+    def _record_discarded_call(self, call: "_InFlightCall") -> None:
+        """
+        A hedged/raced duplicate also succeeded but lost (user-004, user-005).
 
-        # Step 6: Record prompt history
-        try:
-            await self.data_api_client.create_history(
-                user_id=request.user_id,
-                prompt_text=request.prompt_text,
-                selected_model_id=successful_model.id,
-                response_text=response_text,
-                response_time=response_time,
-                success=True,
-                error_message=None,
-                caller=request.caller,
-                http_status=200,
-                requested_model=request.model_name,
+        The provider is healthy, so the circuit breaker and latency window learn
+        from it; model statistics stay neutral because the answer was not used.
+        """
+        model = call.model
+        duration = time.perf_counter() - call.started
+        CircuitBreakerManager.record_success(model.provider)
+        LatencyTracker.record(model.id, duration)
+        logger.info(
+            "model_call_discarded",
+            attempt=call.attempt,
+            model_id=model.id,
+            model=model.name,
+            provider=model.provider,
+            duration_ms=round(duration * 1000.0, 2),
+        )
+
+    async def _cancel_pending_calls(
+        self, pending: dict[asyncio.Task, "_InFlightCall"]
+    ) -> None:
+        """
+        Cancel calls that lost to the winner; their outcome is neutral.
+
+        Cancelled calls (hedge or race losers, user-004/user-005) touch neither
+        model statistics nor the circuit breaker: they were stopped by us, not
+        by the provider, so reliability scores are not skewed.
+        """
+        if not pending:
+            return
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        for call in pending.values():
+            model_duration_ms = round((time.perf_counter() - call.started) * 1000.0, 2)
+            logger.info(
+                "model_call_cancelled",
+                attempt=call.attempt,
+                model_id=call.model.id,
+                model=call.model.name,
+                provider=call.model.provider,
+                duration_ms=model_duration_ms,
             )
-        except Exception as history_error:
-            logger.error(
-                "history_record_failed",
-                error=sanitize_error_message(history_error),
+            audit_event(
+                "model_call_cancelled",
+                {
+                    "attempt": call.attempt,
+                    "model_id": call.model.id,
+                    "model": call.model.name,
+                    "provider": call.model.provider,
+                    "duration_ms": model_duration_ms,
+                },
             )
+        pending.clear()
 
-        return PromptResponse(
-            prompt_text=request.prompt_text,
-            response_text=response_text,
-            selected_model_name=successful_model.name,
-            selected_model_provider=successful_model.provider,
-            response_time=response_time,
-            success=True,
-            error_message=None,
-            # F023: Per-request telemetry
-            attempts=attempts,
-            fallback_used=(successful_model.id != first_model.id),
-        )
+    async def _record_call_failure(
+        self,
+        call: "_InFlightCall",
+        error: Exception,
+        state: "_FallbackState",
+        start_time: float,
+    ) -> None:
+        """
+        Record a failed candidate call: cooldown/stats/circuit breaker, telemetry.
+
+        Args:
+            call: Finished call
+            error: Exception raised by the call
+            state: Shared fallback counters (F025 backpressure aggregation)
+            start_time: Request start time for response_time calculation
+        """
+        model = call.model
+
+        if isinstance(error, _InvalidJSONResponse):
+            await self._handle_transient_error(model, error.json_error, start_time)
+            state.last_error_message = f"Invalid JSON from {model.provider}"
+            state.error_types.append(ValidationError)
+            state.providers_tried += 1
+            return
+
+        retry_after_seconds: Optional[int] = None
+        if isinstance(error, RateLimitError):
+            # F014: Rate limit - don't count as failure, set availability
+            await self._handle_rate_limit(model, error)
+            classified: Exception = error
+            retry_after_seconds = error.retry_after_seconds
+        elif isinstance(
+            error,
+            (
+                ServerError,
+                TimeoutError,
+                AuthenticationError,
+                ValidationError,
+                ProviderError,
+            ),
+        ):
+            # F024: Circuit breaker — запись ошибки
+            CircuitBreakerManager.record_failure(model.provider)
+            # F014: Transient errors - record as failure
+            await self._handle_transient_error(model, error, start_time)
+            classified = error
+        else:
+            # F014: Unexpected error - classify and handle
+            classified = classify_error(error)
+            if isinstance(classified, RateLimitError):
+                # F024: RateLimitError НЕ считается failure для CB
+                await self._handle_rate_limit(model, classified)
+            else:
+                # F024: Circuit breaker — запись ошибки
+                CircuitBreakerManager.record_failure(model.provider)
+                await self._handle_transient_error(model, classified, start_time)
+
+        # F025: трекинг типа ошибки
+        state.error_types.append(type(classified))
+        if isinstance(classified, RateLimitError) and classified.retry_after_seconds:
+            state.retry_after_values.append(classified.retry_after_seconds)
+        state.providers_tried += 1
+        state.last_error_message = sanitize_error_message(error)
+
+        model_duration_ms = round((time.perf_counter() - call.started) * 1000.0, 2)
+        log_fields = {
+            "attempt": call.attempt,
+            "model_id": model.id,
+            "model": model.name,
+            "provider": model.provider,
+            "duration_ms": model_duration_ms,
+            "error_type": type(classified).__name__,
+            "error": state.last_error_message,
+        }
+        if isinstance(error, RateLimitError):
+            log_fields["retry_after_seconds"] = retry_after_seconds
+        logger.warning("model_call_error", **log_fields)
+        audit_event("model_call_error", log_fields)
 
     def _build_candidate_models(
         self,
@@ -867,8 +1542,13 @@ class ProcessPromptUseCase:
             provider=model.provider,
             retry_after_seconds=retry_after,
         )
+        # user-003: write-through — модель сразу исчезает из кеша каталога
+        ModelCatalogCache.mark_unavailable(model.id, retry_after)
         try:
-            await self.data_api_client.set_availability(
+            await BookkeepingQueue.submit(
+                self.data_api_client,
+                "set_availability",
+                urgent=True,
                 model_id=model.id,
                 retry_after_seconds=retry_after,
                 reason="rate_limit",
@@ -892,7 +1572,10 @@ class ProcessPromptUseCase:
         Handle transient error: log, optionally set cooldown, and record failure.
 
         F023: AuthenticationError и ValidationError получают cooldown 24ч
-        в дополнение к increment_failure.
+        в дополнение к счётчику неудач.
+
+        user-010: счётчик и cooldown уходят одним record_outcome; с cooldown
+        вызов отправляется сразу (urgent), без него — в общей пачке.
 
         Args:
             model: Model info for logging and API calls
@@ -909,19 +1592,25 @@ class ProcessPromptUseCase:
         )
 
         # F023 FR-001/FR-002: Cooldown для постоянных ошибок
+        cooldown: Optional[dict[str, Any]] = None
         if isinstance(error, AuthenticationError):
-            await self._set_cooldown_safe(
+            cooldown = self._permanent_error_cooldown(
                 model, AUTH_ERROR_COOLDOWN_SECONDS, type(error).__name__
             )
         elif isinstance(error, ValidationError):
-            await self._set_cooldown_safe(
+            cooldown = self._permanent_error_cooldown(
                 model, VALIDATION_ERROR_COOLDOWN_SECONDS, type(error).__name__
             )
 
         try:
-            await self.data_api_client.increment_failure(
+            await BookkeepingQueue.submit(
+                self.data_api_client,
+                "record_outcome",
+                urgent=cooldown is not None,
                 model_id=model.id,
+                result="failure",
                 response_time=float(response_time),
+                cooldown=cooldown,
             )
         except Exception as stats_error:
             logger.error(
@@ -930,19 +1619,22 @@ class ProcessPromptUseCase:
                 error=sanitize_error_message(stats_error),
             )
 
-    async def _set_cooldown_safe(
+    def _permanent_error_cooldown(
         self,
         model: AIModelInfo,
         cooldown_seconds: int,
         error_type: str,
-    ) -> None:
+    ) -> dict[str, Any]:
         """
-        Set provider cooldown with graceful error handling (F023).
+        Provider cooldown for a permanent error (F023).
 
         Args:
-            model: Model info for logging and API calls
+            model: Model info for logging
             cooldown_seconds: Duration of cooldown in seconds
             error_type: Error type name for logging
+
+        Returns:
+            Cooldown part of record_outcome
         """
         logger.warning(
             "permanent_error_cooldown",
@@ -951,17 +1643,11 @@ class ProcessPromptUseCase:
             error_type=error_type,
             cooldown_seconds=cooldown_seconds,
         )
-        try:
-            await self.data_api_client.set_availability(
-                model_id=model.id,
-                retry_after_seconds=cooldown_seconds,
-                reason="permanent_error",
-                error_type=error_type,
-                source="process_prompt",
-            )
-        except Exception as avail_error:
-            logger.error(
-                "set_availability_failed",
-                model=model.name,
-                error=sanitize_error_message(avail_error),
-            )
+        # user-003: write-through — модель сразу исчезает из кеша каталога
+        ModelCatalogCache.mark_unavailable(model.id, cooldown_seconds)
+        return {
+            "retry_after_seconds": cooldown_seconds,
+            "reason": "permanent_error",
+            "error_type": error_type,
+            "source": "process_prompt",
+        }
@@ -55,6 +55,10 @@ class PromptRequest:
     response_format: Optional[dict] = None  # Structured output specification
     tags: Optional[list[str]] = None  # Filter models by provider tags
     caller: Optional[str] = None  # External project identity (X-Client-Id header)
+    # user-004/user-005: "sequential" | "hedged" | "race"; None → HEDGE_ENABLED default
+    routing: Optional[str] = None
+    race_width: Optional[int] = None  # user-005: K best candidates for "race"
+    use_cache: bool = False  # user-007: caller opted in to the response cache
 
 
 @dataclass
@@ -75,3 +79,18 @@ class PromptResponse:
     # F023: Per-request telemetry
     attempts: int = 1
     fallback_used: bool = False
+    cached: bool = False  # user-007: served from the response cache
+
+
+@dataclass
+class PromptStreamEvent:
+    """
+    Streaming prompt event DTO (user-006).
+
+    One Server-Sent Event of POST /api/v1/prompts/process/stream:
+    "start" (selected model), "token" (text chunk), "done" (telemetry) or
+    "error" (stream interrupted after the first token).
+    """
+
+    event: str
+    data: dict
@@ -5,11 +5,21 @@ Defines the contract for all AI provider integrations.
 
 F013: OpenAICompatibleProvider — базовый класс для OpenAI-совместимых провайдеров.
 Устраняет ~1100 строк дублирования через унификацию generate/health_check.
+
+user-001: каждый экземпляр провайдера держит долгоживущий httpx.AsyncClient
+(keep-alive пул, опционально HTTP/2). Клиенты принадлежат ProviderRegistry и
+закрываются на shutdown через ProviderRegistry.aclose_all().
+
+user-006: stream() отдаёт ответ по мере генерации. OpenAI-совместимые провайдеры
+получают ``stream: true`` и разбираются инкрементально из SSE ``data:`` чанков
+(iter_sse_data); провайдеры без стриминга отдают весь ответ одним чанком.
 """
 
+import importlib.util
+import json
 import os
 from abc import ABC, abstractmethod
-from typing import Any, ClassVar, Optional
+from typing import Any, AsyncIterator, ClassVar, Optional
 
 import httpx
 
@@ -19,6 +29,58 @@ from app.utils.security import sanitize_error_message
 
 logger = get_logger(__name__)
 
+# user-001: HTTP/2 включается глобально, но только если установлен пакет h2
+# (httpx[http2]); иначе клиент тихо остаётся на HTTP/1.1 с keep-alive.
+PROVIDER_HTTP2_ENABLED = os.getenv("PROVIDER_HTTP2_ENABLED", "false").lower() == "true"
+PROVIDER_KEEPALIVE_EXPIRY = float(os.getenv("PROVIDER_KEEPALIVE_EXPIRY", "60.0"))
+
+# Таймаут health check (GET /models) — короче, чем у генерации.
+HEALTH_CHECK_TIMEOUT = 10.0
+
+
+# user-006: Маркер конца SSE-стрима (OpenAI, Cloudflare Workers AI)
+SSE_DONE_MARKER = "[DONE]"
+
+
+async def iter_sse_data(response: httpx.Response) -> AsyncIterator[str]:
+    """
+    Разобрать Server-Sent Events поток и отдавать payload каждого события.
+
+    Многострочные ``data:`` одного события склеиваются через перевод строки,
+    комментарии (``:`` keep-alive) и прочие поля (event/id/retry) пропускаются.
+    Поток завершается на ``data: [DONE]`` или при закрытии соединения.
+
+    Args:
+        response: Открытый streaming-ответ httpx
+
+    Yields:
+        Строка payload события (обычно JSON)
+    """
+    data_lines: list[str] = []
+    async for line in response.aiter_lines():
+        if line:
+            if line.startswith("data:"):
+                value = line[5:]
+                data_lines.append(value[1:] if value.startswith(" ") else value)
+            continue
+        # Пустая строка — граница события
+        if not data_lines:
+            continue
+        payload = "\n".join(data_lines)
+        data_lines = []
+        if payload.strip() == SSE_DONE_MARKER:
+            return
+        yield payload
+    if data_lines:
+        payload = "\n".join(data_lines)
+        if payload.strip() != SSE_DONE_MARKER:
+            yield payload
+
+
+def _http2_available() -> bool:
+    """Проверить, установлен ли пакет h2, необходимый httpx для HTTP/2."""
+    return importlib.util.find_spec("h2") is not None
+
 
 class AIProviderBase(ABC):
     """
@@ -26,8 +88,49 @@ class AIProviderBase(ABC):
 
     All AI provider implementations must inherit from this class
     and implement the generate method.
+
+    user-001: the base class also owns a lazily created, pooled
+    ``httpx.AsyncClient`` per provider instance. Connection limits are
+    class-level and can be tuned per provider.
     """
 
+    # === Пул соединений (user-001, переопределяется в наследниках) ===
+    HTTP_MAX_CONNECTIONS: ClassVar[int] = 20
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: ClassVar[int] = 10
+    HTTP2: ClassVar[bool] = True
+
+    timeout: float = 30.0
+    _client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """
+        Получить pooled HTTP клиент провайдера (ленивое создание).
+
+        Клиент переиспользуется между вызовами generate/health_check, поэтому
+        DNS/TCP/TLS handshake оплачивается один раз на соединение, а не на промпт.
+        Закрытый клиент (после aclose) пересоздаётся при следующем обращении.
+
+        Returns:
+            Долгоживущий httpx.AsyncClient с keep-alive пулом
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=self.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=PROVIDER_KEEPALIVE_EXPIRY,
+                ),
+                http2=self.HTTP2 and PROVIDER_HTTP2_ENABLED and _http2_available(),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """Закрыть pooled HTTP клиент провайдера (вызывается ProviderRegistry)."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
     @abstractmethod
     async def generate(self, prompt: str, **kwargs) -> str:
         """
@@ -50,6 +153,25 @@ class AIProviderBase(ABC):
         """
         pass
 
+    async def stream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        """
+        Stream AI response for given prompt chunk by chunk (user-006).
+
+        Default implementation for providers without token streaming: the
+        full completion is yielded as a single chunk.
+
+        Args:
+            prompt: User's prompt text
+            **kwargs: Same as generate()
+
+        Yields:
+            Response text fragments in order
+
+        Raises:
+            Exception: If generation fails
+        """
+        yield await self.generate(prompt, **kwargs)
+
     @abstractmethod
     async def health_check(self) -> bool:
         """
@@ -222,35 +344,103 @@ class OpenAICompatibleProvider(AIProviderBase):
         """
         headers = self._build_headers()
         payload = self._build_payload(prompt, **kwargs)
+        client = self._get_client()
+
+        try:
+            response = await client.post(self.api_url, headers=headers, json=payload)
+            response.raise_for_status()
+            result = response.json()
+            return self._parse_response(result)
+
+        except httpx.HTTPStatusError as e:
+            # F022: Пробрасываем с HTTP-кодом для classify_error()
+            err_msg = sanitize_error_message(e)
+            logger.error("api_error", provider=self.PROVIDER_NAME, error=err_msg)
+            raise
+
+        except httpx.HTTPError as e:
+            err_msg = sanitize_error_message(e)
+            logger.error("api_error", provider=self.PROVIDER_NAME, error=err_msg)
+            raise self._transport_error(e) from e
+
+    async def stream(self, prompt: str, **kwargs: Any) -> AsyncIterator[str]:
+        """
+        Потоковая генерация через OpenAI-совместимый API (user-006).
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
-                response = await client.post(
-                    self.api_url, headers=headers, json=payload
-                )
-                response.raise_for_status()
-                result = response.json()
-                return self._parse_response(result)
-
-            except httpx.HTTPStatusError as e:
-                # F022: Пробрасываем с HTTP-кодом для classify_error()
-                err_msg = sanitize_error_message(e)
-                logger.error("api_error", provider=self.PROVIDER_NAME, error=err_msg)
-                raise
-
-            except httpx.HTTPError as e:
-                err_msg = sanitize_error_message(e)
-                logger.error("api_error", provider=self.PROVIDER_NAME, error=err_msg)
-                # ex9: build a guaranteed non-empty detail. Transport errors like
-                # RemoteProtocolError / empty ReadTimeout have an empty str(e), which
-                # previously produced a useless "{Provider} error: " in the journal.
-                detail = self._describe_error(e)
-                # ConnectError / ConnectTimeout = connection never established, cheap
-                # to retry → TimeoutError (retryable). Read/protocol failures are
-                # expensive ~30s hangs → ProviderError (non-retryable, fall back).
-                if isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout)):
-                    raise TimeoutError(f"{self.PROVIDER_NAME} error: {detail}") from e
-                raise ProviderError(f"{self.PROVIDER_NAME} error: {detail}") from e
+        Отправляет ``stream: true`` и разбирает SSE ``data:`` чанки по мере
+        поступления, отдавая ``choices[0].delta.content``.
+
+        Args:
+            prompt: Пользовательский промпт
+            **kwargs: system_prompt, response_format, max_tokens, temperature, top_p
+
+        Yields:
+            Фрагменты сгенерированного текста
+
+        Raises:
+            httpx.HTTPStatusError: HTTP-ошибка до начала стрима (для classify_error)
+            ProviderError: При транспортных ошибках или ошибке внутри стрима
+        """
+        headers = self._build_headers()
+        payload = self._build_payload(prompt, **kwargs)
+        payload["stream"] = True
+        client = self._get_client()
+
+        try:
+            async with client.stream(
+                "POST", self.api_url, headers=headers, json=payload
+            ) as response:
+                if response.is_error:
+                    await response.aread()
+                    response.raise_for_status()
+                async for data in iter_sse_data(response):
+                    delta = self._parse_stream_chunk(data)
+                    if delta:
+                        yield delta
+
+        except httpx.HTTPStatusError as e:
+            # F022: Пробрасываем с HTTP-кодом для classify_error()
+            err_msg = sanitize_error_message(e)
+            logger.error("api_error", provider=self.PROVIDER_NAME, error=err_msg)
+            raise
+
+        except httpx.HTTPError as e:
+            err_msg = sanitize_error_message(e)
+            logger.error("api_error", provider=self.PROVIDER_NAME, error=err_msg)
+            raise self._transport_error(e) from e
+
+    def _parse_stream_chunk(self, data: str) -> str:
+        """Извлечь текст из одного SSE-чанка OpenAI (choices[0].delta.content)."""
+        try:
+            chunk = json.loads(data)
+        except ValueError:
+            logger.debug("stream_chunk_not_json", provider=self.PROVIDER_NAME)
+            return ""
+        if "error" in chunk:
+            detail = sanitize_error_message(str(chunk["error"]))
+            raise ProviderError(f"{self.PROVIDER_NAME} stream error: {detail}")
+        choices = chunk.get("choices") or []
+        if not choices:
+            return ""
+        content = (choices[0].get("delta") or {}).get("content")
+        if isinstance(content, list):
+            content = "".join(str(item) for item in content)
+        return str(content) if content else ""
+
+    def _transport_error(self, exc: httpx.HTTPError) -> ProviderError:
+        """Map an httpx transport error to a classified ProviderError.
+
+        ex9: build a guaranteed non-empty detail. Transport errors like
+        RemoteProtocolError / empty ReadTimeout have an empty str(e), which
+        previously produced a useless "{Provider} error: " in the journal.
+        ConnectError / ConnectTimeout = connection never established, cheap
+        to retry → TimeoutError (retryable). Read/protocol failures are
+        expensive ~30s hangs → ProviderError (non-retryable, fall back).
+        """
+        detail = self._describe_error(exc)
+        if isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout)):
+            return TimeoutError(f"{self.PROVIDER_NAME} error: {detail}")
+        return ProviderError(f"{self.PROVIDER_NAME} error: {detail}")
 
     @staticmethod
     def _describe_error(exc: Exception) -> str:
@@ -271,16 +461,17 @@ class OpenAICompatibleProvider(AIProviderBase):
         """Проверка здоровья через GET /models."""
         headers = {"Authorization": f"Bearer {self.api_key}"}
 
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            try:
-                response = await client.get(self.MODELS_URL, headers=headers)
-                return self._is_health_check_success(response)
-            except Exception as e:
-                err_msg = sanitize_error_message(e)
-                logger.error(
-                    "health_check_failed", provider=self.PROVIDER_NAME, error=err_msg
-                )
-                return False
+        try:
+            response = await self._get_client().get(
+                self.MODELS_URL, headers=headers, timeout=HEALTH_CHECK_TIMEOUT
+            )
+            return self._is_health_check_success(response)
+        except Exception as e:
+            err_msg = sanitize_error_message(e)
+            logger.error(
+                "health_check_failed", provider=self.PROVIDER_NAME, error=err_msg
+            )
+            return False
 
     def get_provider_name(self) -> str:
         """Имя провайдера для логирования."""
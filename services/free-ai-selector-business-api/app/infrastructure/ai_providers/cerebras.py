@@ -33,3 +33,6 @@ class CerebrasProvider(OpenAICompatibleProvider):
     SUPPORTS_RESPONSE_FORMAT = True  # Supports {"type": "json_object"}
     TAGS: ClassVar[set[str]] = {"fast", "json", "reasoning", "russian"}
     MAX_OUTPUT_TOKENS: ClassVar[int] = 8192
+    # user-001: fast LPU/WSE provider — handshake is a visible share of p50, so keep
+    # more warm connections around for bursts.
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: ClassVar[int] = 20
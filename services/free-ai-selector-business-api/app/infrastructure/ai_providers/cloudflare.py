@@ -4,15 +4,23 @@ Cloudflare Workers AI Provider integration
 Integrates with Cloudflare Workers AI for serverless GPU-powered inference.
 Free tier: 10,000 Neurons/day, no credit card required.
 Supports multiple models for text, image, and speech tasks.
+
+user-006: stream() uses Workers AI SSE (``data: {"response": "..."}`` chunks,
+terminated by ``data: [DONE]``).
 """
 
+import json
 import os
-from typing import ClassVar, Optional
+from typing import Any, AsyncIterator, ClassVar, Optional
 
 import httpx
 from app.utils.security import sanitize_error_message
 
-from app.infrastructure.ai_providers.base import AIProviderBase
+from app.infrastructure.ai_providers.base import (
+    HEALTH_CHECK_TIMEOUT,
+    AIProviderBase,
+    iter_sse_data,
+)
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -69,6 +77,52 @@ class CloudflareProvider(AIProviderBase):
             httpx.HTTPError: If API request fails
             ValueError: If API token or account ID is missing
         """
+        endpoint, headers, payload = self._build_request(prompt, **kwargs)
+
+        client = self._get_client()
+        try:
+            response = await client.post(endpoint, headers=headers, json=payload)
+            response.raise_for_status()
+
+            result = response.json()
+
+            # Cloudflare response format
+            if "result" in result:
+                result_data = result["result"]
+
+                # Handle response field (text generation models)
+                if "response" in result_data:
+                    response = result_data["response"]
+                    # Handle both string and list responses
+                    if isinstance(response, list):
+                        response = " ".join(str(item) for item in response)
+                    return str(response).strip()
+
+                # Handle choices format (OpenAI-compatible)
+                if "choices" in result_data and len(result_data["choices"]) > 0:
+                    message = result_data["choices"][0].get("message", {})
+                    content = message.get("content", "")
+                    # Handle both string and list content
+                    if isinstance(content, list):
+                        content = " ".join(str(item) for item in content)
+                    return str(content).strip()
+
+            logger.error("unexpected_response", provider="Cloudflare", error=sanitize_error_message(str(result)))
+            raise ValueError("Invalid response format from Cloudflare Workers AI")
+
+        except httpx.HTTPError as e:
+            logger.error("api_error", provider="Cloudflare", error=sanitize_error_message(e))
+            raise
+
+    def _build_request(
+        self, prompt: str, **kwargs: Any
+    ) -> tuple[str, dict[str, str], dict[str, Any]]:
+        """
+        Build endpoint, headers and payload for Workers AI run API.
+
+        Raises:
+            ValueError: If API token or account ID is missing
+        """
         if not self.api_token:
             raise ValueError("Cloudflare API token is required")
         if not self.account_id:
@@ -107,40 +161,55 @@ class CloudflareProvider(AIProviderBase):
                     requested_format=response_format,
                 )
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
-                response = await client.post(endpoint, headers=headers, json=payload)
-                response.raise_for_status()
-
-                result = response.json()
-
-                # Cloudflare response format
-                if "result" in result:
-                    result_data = result["result"]
-
-                    # Handle response field (text generation models)
-                    if "response" in result_data:
-                        response = result_data["response"]
-                        # Handle both string and list responses
-                        if isinstance(response, list):
-                            response = " ".join(str(item) for item in response)
-                        return str(response).strip()
-
-                    # Handle choices format (OpenAI-compatible)
-                    if "choices" in result_data and len(result_data["choices"]) > 0:
-                        message = result_data["choices"][0].get("message", {})
-                        content = message.get("content", "")
-                        # Handle both string and list content
-                        if isinstance(content, list):
-                            content = " ".join(str(item) for item in content)
-                        return str(content).strip()
-
-                logger.error("unexpected_response", provider="Cloudflare", error=sanitize_error_message(str(result)))
-                raise ValueError("Invalid response format from Cloudflare Workers AI")
-
-            except httpx.HTTPError as e:
-                logger.error("api_error", provider="Cloudflare", error=sanitize_error_message(e))
-                raise
+        return endpoint, headers, payload
+
+    async def stream(self, prompt: str, **kwargs: Any) -> AsyncIterator[str]:
+        """
+        Stream AI response using Cloudflare Workers AI SSE (user-006).
+
+        Args:
+            prompt: User's prompt text
+            **kwargs: Same as generate()
+
+        Yields:
+            Response text fragments (``response`` field of each SSE chunk)
+
+        Raises:
+            httpx.HTTPError: If API request fails
+            ValueError: If API token or account ID is missing
+        """
+        endpoint, headers, payload = self._build_request(prompt, **kwargs)
+        payload["stream"] = True
+
+        try:
+            async with self._get_client().stream(
+                "POST", endpoint, headers=headers, json=payload
+            ) as response:
+                if response.is_error:
+                    await response.aread()
+                    response.raise_for_status()
+                async for data in iter_sse_data(response):
+                    delta = self._parse_stream_chunk(data)
+                    if delta:
+                        yield delta
+
+        except httpx.HTTPError as e:
+            logger.error("api_error", provider="Cloudflare", error=sanitize_error_message(e))
+            raise
+
+    @staticmethod
+    def _parse_stream_chunk(data: str) -> str:
+        """Extract text from one Workers AI SSE chunk (response or OpenAI delta)."""
+        try:
+            chunk = json.loads(data)
+        except ValueError:
+            return ""
+        if "response" in chunk:
+            return str(chunk["response"] or "")
+        choices = chunk.get("choices") or []
+        if choices:
+            return str((choices[0].get("delta") or {}).get("content") or "")
+        return ""
 
     async def health_check(self) -> bool:
         """
@@ -161,14 +230,15 @@ class CloudflareProvider(AIProviderBase):
         # Use account verification endpoint for health check
         endpoint = f"{self.base_url}/accounts/{self.account_id}"
 
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            try:
-                response = await client.get(endpoint, headers=headers)
-                return response.status_code == 200
+        try:
+            response = await self._get_client().get(
+                endpoint, headers=headers, timeout=HEALTH_CHECK_TIMEOUT
+            )
+            return response.status_code == 200
 
-            except Exception as e:
-                logger.error("health_check_failed", provider="Cloudflare", error=sanitize_error_message(e))
-                return False
+        except Exception as e:
+            logger.error("health_check_failed", provider="Cloudflare", error=sanitize_error_message(e))
+            return False
 
     def get_provider_name(self) -> str:
         """Get provider name."""
@@ -31,3 +31,6 @@ class GroqProvider(OpenAICompatibleProvider):
     # 8192 is a safe completion budget for Groq's free tier; 32768 triggered
     # HTTP 413 Payload Too Large on llama-3.3-70b-versatile (xqi).
     MAX_OUTPUT_TOKENS: ClassVar[int] = 8192
+    # user-001: fast LPU/WSE provider — handshake is a visible share of p50, so keep
+    # more warm connections around for bursts.
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: ClassVar[int] = 20
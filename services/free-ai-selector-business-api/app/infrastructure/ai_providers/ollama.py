@@ -25,6 +25,12 @@ class OllamaProvider(OpenAICompatibleProvider):
     API_KEY_ENV = "OLLAMA_API_KEY"
     SUPPORTS_RESPONSE_FORMAT = True
     TIMEOUT: ClassVar[float] = 120.0
+    # user-001: локальный сервер на одном GPU — держим пул маленьким, чтобы не
+    # копить параллельные запросы в очереди Ollama.
+    HTTP_MAX_CONNECTIONS: ClassVar[int] = 4
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: ClassVar[int] = 4
+    # Ollama отдаёт plain HTTP/1.1 без TLS — HTTP/2 не имеет смысла.
+    HTTP2: ClassVar[bool] = False
     # bmm: +json,+russian — SUPPORTS_RESPONSE_FORMAT is True; this 99.8%-healthy local
     # model must be eligible for the dominant json+russian traffic.
     TAGS: ClassVar[set[str]] = {"local", "json", "russian"}
@@ -44,8 +50,7 @@ class OllamaProvider(OpenAICompatibleProvider):
 
     async def health_check(self) -> bool:
         """Health check using dynamic MODELS_URL."""
-        import httpx
-
+        from app.infrastructure.ai_providers.base import HEALTH_CHECK_TIMEOUT
         from app.utils.logger import get_logger
         from app.utils.security import sanitize_error_message
 
@@ -53,16 +58,17 @@ class OllamaProvider(OpenAICompatibleProvider):
         headers = {"Authorization": f"Bearer {self.api_key}"}
         models_url = self._get_models_url()
 
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            try:
-                response = await client.get(models_url, headers=headers)
-                return self._is_health_check_success(response)
-            except Exception as e:
-                err_msg = sanitize_error_message(e)
-                logger.error(
-                    "health_check_failed", provider=self.PROVIDER_NAME, error=err_msg
-                )
-                return False
+        try:
+            response = await self._get_client().get(
+                models_url, headers=headers, timeout=HEALTH_CHECK_TIMEOUT
+            )
+            return self._is_health_check_success(response)
+        except Exception as e:
+            err_msg = sanitize_error_message(e)
+            logger.error(
+                "health_check_failed", provider=self.PROVIDER_NAME, error=err_msg
+            )
+            return False
 
 
 class OllamaGemma4E2B(OllamaProvider):
@@ -4,12 +4,16 @@ Provider Registry — Single source of class mapping for AI providers (F008 SSOT
 This module provides:
 - PROVIDER_CLASSES: Static mapping from provider name to class
 - ProviderRegistry: Singleton factory with lazy initialization
+- Ownership of per-provider pooled HTTP clients (user-001)
 
 Usage:
     provider = ProviderRegistry.get_provider("GoogleGemini")
     if provider:
         response = await provider.generate(prompt)
 
+    # FastAPI lifespan shutdown
+    await ProviderRegistry.aclose_all()
+
 Note:
     Provider metadata (api_format) is stored in the database (seed.py).
     This registry maps provider names to their implementation classes
@@ -34,6 +38,8 @@ from app.infrastructure.ai_providers.novita import NovitaProvider
 from app.infrastructure.ai_providers.openrouter import OpenRouterProvider
 from app.infrastructure.ai_providers.sambanova import SambanovaProvider
 from app.infrastructure.ai_providers.ollama import OLLAMA_PROVIDERS
+from app.utils.logger import get_logger
+from app.utils.security import sanitize_error_message
 
 
 # Единственное место с маппингом provider_name → ProviderClass
@@ -58,12 +64,16 @@ PROVIDER_CLASSES: dict[str, type[AIProviderBase]] = {
     **OLLAMA_PROVIDERS,
 }
 
+logger = get_logger(__name__)
+
 
 class ProviderRegistry:
     """
     Фабрика для получения AI провайдеров (Singleton с lazy initialization).
 
     Кэширует экземпляры провайдеров для повторного использования.
+    Владеет их pooled HTTP клиентами (user-001): клиенты живут столько же,
+    сколько экземпляры, и закрываются через aclose_all() на shutdown.
     """
 
     _instances: dict[str, AIProviderBase] = {}
@@ -127,6 +137,24 @@ class ProviderRegistry:
             return provider_class.TAGS
         return set()
 
+    @classmethod
+    async def aclose_all(cls) -> None:
+        """
+        Закрыть pooled HTTP клиенты всех созданных провайдеров (user-001).
+
+        Вызывается из FastAPI lifespan на shutdown. Ошибка закрытия одного
+        клиента не мешает закрыть остальные.
+        """
+        for name, provider in cls._instances.items():
+            try:
+                await provider.aclose()
+            except Exception as e:
+                logger.warning(
+                    "provider_client_close_failed",
+                    provider=name,
+                    error=sanitize_error_message(e),
+                )
+
     @classmethod
     def reset(cls) -> None:
         """Сбросить кэш instances (для тестов)."""
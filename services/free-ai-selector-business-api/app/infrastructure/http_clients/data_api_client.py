@@ -3,11 +3,28 @@ HTTP client for Data API communication
 
 Implements HTTP-only data access pattern (framework requirement).
 Business services must never access database directly.
+
+user-002: a single process-wide DataAPIClient with a pooled keep-alive
+httpx.AsyncClient is created in the FastAPI lifespan and shared by all
+requests. Tracing headers are read from ContextVars on every call, so each
+outgoing request still carries the current request's IDs.
+
+user-016: GET /models and /history/statistics/* are revalidated with
+If-None-Match. The client keeps the last parsed result per URL; a 304
+returns it without a body, JSON parsing or AIModelInfo rebuilding.
+
+user-024: get_models_latency() returns per-model latency quantiles
+(revalidated like the statistics endpoints).
+
+user-022: open_history_export() returns the Data API export response with
+the body still unread, so the proxy can stream it chunk by chunk.
 """
 
 import os
+from collections import OrderedDict
 from decimal import Decimal
-from typing import Any, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
 
 import httpx
 from app.utils.security import sanitize_error_message
@@ -21,12 +38,31 @@ logger = get_logger(__name__)
 DATA_API_URL = os.getenv("DATA_API_URL", "http://localhost:8001")
 REQUEST_TIMEOUT = 10.0  # seconds
 
+# user-002: Connection pool limits for the shared Data API client
+DATA_API_MAX_CONNECTIONS = int(os.getenv("DATA_API_MAX_CONNECTIONS", "50"))
+DATA_API_MAX_KEEPALIVE_CONNECTIONS = int(
+    os.getenv("DATA_API_MAX_KEEPALIVE_CONNECTIONS", "20")
+)
+DATA_API_KEEPALIVE_EXPIRY = float(os.getenv("DATA_API_KEEPALIVE_EXPIRY", "30.0"))
+
+# user-016: Сколько последних ответов (URL + параметры) держать для If-None-Match
+REVALIDATION_MAX_ENTRIES = 64
+
+# user-018: Заголовок Data API с курсором следующей страницы журнала
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# user-022: Ожидание очередного куска экспорта журнала (первый ждёт весь план запроса)
+HISTORY_EXPORT_READ_TIMEOUT = float(os.getenv("HISTORY_EXPORT_READ_TIMEOUT", "120.0"))
+
 
 class DataAPIClient:
     """
     HTTP client for Data API service.
 
     Provides methods to interact with AI models and prompt history data.
+    Safe to share between concurrent requests (user-002): the instance holds
+    no per-request state, tracing headers are built per call. The only shared
+    state is the ETag store for conditional GETs (user-016).
     """
 
     def __init__(self, base_url: str = DATA_API_URL, request_id: Optional[str] = None):
@@ -35,11 +71,21 @@ class DataAPIClient:
 
         Args:
             base_url: Base URL of Data API service
-            request_id: Optional request ID for tracing
+            request_id: Optional fallback request ID for tracing (used only when
+                no request ID is bound to the current tracing context)
         """
         self.base_url = base_url.rstrip("/")
         self.request_id = request_id
-        self.client = httpx.AsyncClient(timeout=REQUEST_TIMEOUT)
+        self.client = httpx.AsyncClient(
+            timeout=REQUEST_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=DATA_API_MAX_CONNECTIONS,
+                max_keepalive_connections=DATA_API_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=DATA_API_KEEPALIVE_EXPIRY,
+            ),
+        )
+        # user-016: "path?query" -> (ETag, разобранный результат)
+        self._revalidation: "OrderedDict[str, Tuple[str, Any]]" = OrderedDict()
 
     async def close(self) -> None:
         """Close HTTP client connection."""
@@ -60,6 +106,63 @@ class DataAPIClient:
             headers.setdefault(REQUEST_ID_HEADER, self.request_id)
         return headers
 
+    async def _get_revalidated(
+        self, path: str, params: dict[str, Any], parse: Callable[[Any], Any]
+    ) -> Any:
+        """
+        Conditional GET: send If-None-Match, reuse the parsed result on 304.
+
+        Args:
+            path: API path, e.g. "/api/v1/models"
+            params: Query parameters
+            parse: Converts response JSON into the cached result
+
+        Returns:
+            Parsed result (shared with the ETag store — callers must not mutate it)
+
+        Raises:
+            httpx.HTTPError: If request fails
+        """
+        key = f"{path}?{urlencode(sorted(params.items()))}"
+        cached = self._revalidation.get(key)
+        headers = self._get_headers()
+        if cached is not None:
+            headers["If-None-Match"] = cached[0]
+
+        response = await self.client.get(
+            f"{self.base_url}{path}", params=params, headers=headers
+        )
+        if response.status_code == 304 and cached is not None:
+            self._revalidation.move_to_end(key)
+            return cached[1]
+        response.raise_for_status()
+
+        result = parse(response.json())
+        etag = response.headers.get("etag")
+        if etag:
+            self._revalidation[key] = (etag, result)
+            self._revalidation.move_to_end(key)
+            while len(self._revalidation) > REVALIDATION_MAX_ENTRIES:
+                self._revalidation.popitem(last=False)
+        else:
+            self._revalidation.pop(key, None)
+        return result
+
+    async def health(self) -> int:
+        """
+        Check Data API liveness through the shared connection pool.
+
+        Returns:
+            HTTP status code of GET /health
+
+        Raises:
+            httpx.HTTPError: If request fails
+        """
+        response = await self.client.get(
+            f"{self.base_url}/health", headers=self._get_headers(), timeout=5.0
+        )
+        return response.status_code
+
     async def get_all_models(
         self,
         active_only: bool = True,
@@ -81,51 +184,53 @@ class DataAPIClient:
             httpx.HTTPError: If request fails
         """
         try:
-            response = await self.client.get(
-                f"{self.base_url}/api/v1/models",
-                params={
+            models = await self._get_revalidated(
+                "/api/v1/models",
+                {
                     "active_only": active_only,
                     "include_recent": include_recent,
                     "available_only": available_only,
                     "window_days": 7,
                 },
-                headers=self._get_headers(),
+                self._parse_models,
             )
-            response.raise_for_status()
-
-            models_data = response.json()
-            return [
-                AIModelInfo(
-                    id=model["id"],
-                    name=model["name"],
-                    provider=model["provider"],
-                    api_endpoint=model["api_endpoint"],
-                    reliability_score=model["reliability_score"],
-                    is_active=model["is_active"],
-                    api_format=model.get("api_format", "openai"),
-                    # F010: Use effective_score for selection, fallback to reliability_score
-                    # Fix A1: `or` маскирует легитимный 0.0, используем `is not None`
-                    effective_reliability_score=(
-                        model["effective_reliability_score"]
-                        if model.get("effective_reliability_score") is not None
-                        else model["reliability_score"]
-                    ),
-                    recent_request_count=model.get("recent_request_count") or 0,
-                    decision_reason=model.get("decision_reason") or "fallback",
-                    # Метрики для tiebreaker и stats
-                    success_rate=model.get("success_rate", 0.0),
-                    average_response_time=model.get("average_response_time", 0.0),
-                    request_count=model.get("request_count", 0),
-                    # F012: Rate Limit Handling
-                    available_at=model.get("available_at"),
-                )
-                for model in models_data
-            ]
+            return list(models)
 
         except httpx.HTTPError as e:
             logger.error("data_api_fetch_models_failed", error=sanitize_error_message(e))
             raise
 
+    @staticmethod
+    def _parse_models(models_data: List[dict]) -> List[AIModelInfo]:
+        """Build AIModelInfo DTOs from the Data API /models payload."""
+        return [
+            AIModelInfo(
+                id=model["id"],
+                name=model["name"],
+                provider=model["provider"],
+                api_endpoint=model["api_endpoint"],
+                reliability_score=model["reliability_score"],
+                is_active=model["is_active"],
+                api_format=model.get("api_format", "openai"),
+                # F010: Use effective_score for selection, fallback to reliability_score
+                # Fix A1: `or` маскирует легитимный 0.0, используем `is not None`
+                effective_reliability_score=(
+                    model["effective_reliability_score"]
+                    if model.get("effective_reliability_score") is not None
+                    else model["reliability_score"]
+                ),
+                recent_request_count=model.get("recent_request_count") or 0,
+                decision_reason=model.get("decision_reason") or "fallback",
+                # Метрики для tiebreaker и stats
+                success_rate=model.get("success_rate", 0.0),
+                average_response_time=model.get("average_response_time", 0.0),
+                request_count=model.get("request_count", 0),
+                # F012: Rate Limit Handling
+                available_at=model.get("available_at"),
+            )
+            for model in models_data
+        ]
+
     async def get_model_by_id(self, model_id: int) -> Optional[AIModelInfo]:
         """
         Get AI model by ID from Data API.
@@ -274,6 +379,7 @@ class DataAPIClient:
         caller: Optional[str] = None,
         http_status: Optional[int] = None,
         requested_model: Optional[str] = None,
+        cache_hit: bool = False,
     ) -> int:
         """
         Create a prompt history record.
@@ -289,6 +395,7 @@ class DataAPIClient:
             caller: External project identity (X-Client-Id)
             http_status: HTTP status returned to the caller (200/429/503/500)
             requested_model: Model name the caller requested (None = auto-select)
+            cache_hit: Answer was served from the response cache (user-007)
 
         Returns:
             Created history record ID
@@ -308,6 +415,7 @@ class DataAPIClient:
                 "caller": caller,
                 "http_status": http_status,
                 "requested_model": requested_model,
+                "cache_hit": cache_hit,
             }
 
             response = await self.client.post(
@@ -322,31 +430,193 @@ class DataAPIClient:
             logger.error("data_api_create_history_failed", error=sanitize_error_message(e))
             raise
 
-    async def get_caller_statistics(self, window_days: int = 7) -> List[dict]:
+    async def create_history_bulk(self, records: List[dict[str, Any]]) -> List[int]:
         """
-        Get per-project ("caller") aggregate statistics from Data API.
+        Create many prompt history records in one request (user-011).
 
         Args:
-            window_days: Look-back window in days (default: 7)
+            records: Dicts with create_history keyword arguments
 
         Returns:
-            List of per-caller aggregate dicts.
+            Created history record IDs, in input order
 
         Raises:
-            httpx.HTTPError: If request fails
+            httpx.HTTPError: If request fails (no record is created)
         """
         try:
-            response = await self.client.get(
-                f"{self.base_url}/api/v1/history/statistics/by-caller",
-                params={"window_days": window_days},
+            payload = [
+                {**record, "response_time": str(record["response_time"])}
+                for record in records
+            ]
+            response = await self.client.post(
+                f"{self.base_url}/api/v1/history/bulk",
+                json=payload,
                 headers=self._get_headers(),
             )
             response.raise_for_status()
+            return response.json()["ids"]
+
+        except httpx.HTTPError as e:
+            logger.error(
+                "data_api_create_history_bulk_failed",
+                records=len(records),
+                error=sanitize_error_message(e),
+            )
+            raise
+
+    async def record_outcome(
+        self,
+        model_id: Optional[int] = None,
+        result: Optional[str] = None,
+        response_time: float = 0.0,
+        cooldown: Optional[dict[str, Any]] = None,
+        history: Optional[dict[str, Any]] = None,
+    ) -> dict[str, Any]:
+        """
+        Record a prompt outcome in one Data API transaction (user-010).
+
+        Replaces separate increment-success|failure, availability and history
+        calls: the Data API applies all parts with a single commit.
+
+        Args:
+            model_id: AI model ID (required for result and cooldown)
+            result: "success" | "failure" | None (counters unchanged)
+            response_time: Response time in seconds for the counter update
+            cooldown: Optional dict with retry_after_seconds, reason,
+                error_type, source
+            history: Optional history record (same fields as create_history)
+
+        Returns:
+            Dict with model_id, history_id and available_at
+
+        Raises:
+            httpx.HTTPError: If request fails
+        """
+        try:
+            payload: dict[str, Any] = {
+                "model_id": model_id,
+                "result": result,
+                "response_time": str(response_time),
+                "cooldown": cooldown,
+                "history": None,
+            }
+            if history is not None:
+                payload["history"] = {
+                    **history,
+                    "response_time": str(history["response_time"]),
+                }
+
+            response = await self.client.post(
+                f"{self.base_url}/api/v1/outcomes", json=payload, headers=self._get_headers()
+            )
+            response.raise_for_status()
             return response.json()
+
+        except httpx.HTTPError as e:
+            logger.error(
+                "data_api_record_outcome_failed",
+                model_id=model_id,
+                error=sanitize_error_message(e),
+            )
+            raise
+
+    async def get_caller_statistics(self, window_days: float = 7) -> List[dict]:
+        """
+        Get per-project ("caller") aggregate statistics from Data API.
+
+        Args:
+            window_days: Look-back window in days, fractions allowed (default: 7)
+
+        Returns:
+            List of per-caller aggregate dicts.
+
+        Raises:
+            httpx.HTTPError: If request fails
+        """
+        try:
+            stats = await self._get_revalidated(
+                "/api/v1/history/statistics/by-caller",
+                {"window_days": window_days},
+                lambda data: data,
+            )
+            return list(stats)
         except httpx.HTTPError as e:
             logger.error("data_api_caller_statistics_failed", error=sanitize_error_message(e))
             raise
 
+    async def get_models_latency(
+        self, window: str = "24h", quantiles: str = "0.5,0.9,0.99"
+    ) -> Dict[int, Dict[str, Optional[float]]]:
+        """
+        Get latency quantiles of every model with calls in the window (user-024).
+
+        Args:
+            window: Look-back window, e.g. "90m", "24h", "7d" (default: 24h)
+            quantiles: Comma-separated quantiles in [0, 1]
+
+        Returns:
+            Dict model_id -> {quantile ("0.9"): latency in seconds}
+
+        Raises:
+            httpx.HTTPError: If request fails
+        """
+        try:
+            return await self._get_revalidated(
+                "/api/v1/models/latency",
+                {"window": window, "q": quantiles},
+                lambda data: {row["model_id"]: row["quantiles"] for row in data},
+            )
+        except httpx.HTTPError as e:
+            logger.error("data_api_models_latency_failed", error=sanitize_error_message(e))
+            raise
+
+    async def get_timeseries(
+        self,
+        granularity: str = "hour",
+        group_by: str = "model",
+        window: str = "24h",
+        quantiles: str = "0.5,0.9,0.99",
+        model_id: Optional[int] = None,
+        caller: Optional[str] = None,
+        limit: int = 10,
+    ) -> dict:
+        """
+        Get bucketed request / outcome / latency series (user-025).
+
+        Args:
+            granularity: "minute", "hour" or "day" (default: hour)
+            group_by: "model" or "caller" (default: model)
+            window: Look-back window, e.g. "90m", "24h", "7d" (default: 24h)
+            quantiles: Comma-separated latency quantiles in [0, 1]
+            model_id: Optional single model (group_by=model)
+            caller: Optional single project (group_by=caller)
+            limit: Number of busiest series (default: 10)
+
+        Returns:
+            Data API TimeseriesResponse dict: granularity, group_by, window, series
+
+        Raises:
+            httpx.HTTPError: If request fails (400 for out-of-range parameters)
+        """
+        params: dict[str, Any] = {
+            "granularity": granularity,
+            "group_by": group_by,
+            "window": window,
+            "q": quantiles,
+            "limit": limit,
+        }
+        if model_id is not None:
+            params["model_id"] = model_id
+        if caller is not None:
+            params["caller"] = caller
+        try:
+            return await self._get_revalidated(
+                "/api/v1/history/statistics/timeseries", params, lambda data: data
+            )
+        except httpx.HTTPError as e:
+            logger.error("data_api_timeseries_failed", error=sanitize_error_message(e))
+            raise
+
     async def get_history(
         self,
         caller: Optional[str] = None,
@@ -370,6 +640,50 @@ class DataAPIClient:
         Returns:
             List of prompt history record dicts.
 
+        Raises:
+            httpx.HTTPError: If request fails
+        """
+        records, _ = await self.get_history_page(
+            caller=caller,
+            success=success,
+            date_from=date_from,
+            date_to=date_to,
+            limit=limit,
+            offset=offset,
+        )
+        return records
+
+    async def get_history_page(
+        self,
+        caller: Optional[str] = None,
+        success: Optional[bool] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        view: Optional[str] = None,
+        preview_chars: Optional[int] = None,
+        q: Optional[str] = None,
+    ) -> Tuple[List[dict], Optional[str]]:
+        """
+        One journal page plus the cursor of the next one (user-018).
+
+        Args:
+            caller: Filter by external project (caller)
+            success: Filter by success flag
+            date_from: Inclusive lower bound on created_at (ISO 8601)
+            date_to: Inclusive upper bound on created_at (ISO 8601)
+            limit: Maximum number of records (default: 100)
+            offset: Number of records to skip (default: 0)
+            cursor: Opaque keyset cursor from the previous page
+            view: "full" (default) or "summary" — previews instead of texts (user-020)
+            preview_chars: Preview length for view="summary"
+            q: Substring search in prompt / error texts, 3+ chars (user-021)
+
+        Returns:
+            (record dicts, X-Next-Cursor of Data API or None on the last page)
+
         Raises:
             httpx.HTTPError: If request fails
         """
@@ -382,6 +696,14 @@ class DataAPIClient:
             params["date_from"] = date_from
         if date_to is not None:
             params["date_to"] = date_to
+        if cursor:
+            params["cursor"] = cursor
+        if view is not None:
+            params["view"] = view
+        if preview_chars is not None:
+            params["preview_chars"] = preview_chars
+        if q:
+            params["q"] = q
         try:
             response = await self.client.get(
                 f"{self.base_url}/api/v1/history",
@@ -389,11 +711,69 @@ class DataAPIClient:
                 headers=self._get_headers(),
             )
             response.raise_for_status()
-            return response.json()
+            return response.json(), response.headers.get(NEXT_CURSOR_HEADER)
         except httpx.HTTPError as e:
             logger.error("data_api_get_history_failed", error=sanitize_error_message(e))
             raise
 
+    async def open_history_export(
+        self,
+        export_format: str = "ndjson",
+        caller: Optional[str] = None,
+        success: Optional[bool] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        q: Optional[str] = None,
+    ) -> httpx.Response:
+        """
+        Start a streamed journal export from the Data API (user-022).
+
+        The response is returned with its body unread; the caller iterates
+        it (aiter_bytes) and must aclose() it. Error responses are closed
+        here and raised.
+
+        Args:
+            export_format: "ndjson" or "csv"
+            caller: Filter by external project (caller)
+            success: Filter by success flag
+            date_from: Inclusive lower bound on created_at (ISO 8601)
+            date_to: Inclusive upper bound on created_at (ISO 8601)
+            q: Substring search in prompt / error texts
+
+        Returns:
+            Open streaming httpx.Response with status 200
+
+        Raises:
+            httpx.HTTPError: If the request fails or the Data API answers with an error
+        """
+        params: dict[str, Any] = {"format": export_format}
+        if caller is not None:
+            params["caller"] = caller
+        if success is not None:
+            params["success"] = success
+        if date_from is not None:
+            params["date_from"] = date_from
+        if date_to is not None:
+            params["date_to"] = date_to
+        if q:
+            params["q"] = q
+        request = self.client.build_request(
+            "GET",
+            f"{self.base_url}/api/v1/history/export",
+            params=params,
+            headers=self._get_headers(),
+            timeout=httpx.Timeout(REQUEST_TIMEOUT, read=HISTORY_EXPORT_READ_TIMEOUT),
+        )
+        try:
+            response = await self.client.send(request, stream=True)
+            if response.is_error:
+                await response.aclose()
+                response.raise_for_status()
+            return response
+        except httpx.HTTPError as e:
+            logger.error("data_api_history_export_failed", error=sanitize_error_message(e))
+            raise
+
     async def get_history_by_id(self, history_id: int) -> Optional[dict]:
         """
         Get a single prompt history record by ID from Data API.
@@ -9,7 +9,6 @@ import os
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
-import httpx
 from fastapi import FastAPI, Request, Response, status
 
 from app.utils.logger import setup_logging, get_logger
@@ -34,8 +33,13 @@ from slowapi import Limiter
 from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
 
+from app.api.deps import get_data_api_client
 from app.api.v1 import analytics, models, prompts, providers
 from app.api.v1.schemas import HealthCheckResponse
+from app.application.services.bookkeeping_queue import BookkeepingQueue
+from app.application.services.model_catalog_cache import ModelCatalogCache
+from app.infrastructure.ai_providers.registry import ProviderRegistry
+from app.infrastructure.http_clients.data_api_client import DataAPIClient
 
 # =============================================================================
 # Configuration
@@ -88,9 +92,15 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
 
     Startup:
         - Log service initialization
+        - Create the process-wide pooled DataAPIClient (user-002)
         - Verify Data API connection
+        - Start the write-behind bookkeeping worker (user-009)
 
     Shutdown:
+        - Drain the bookkeeping queue before the client closes (user-009)
+        - Stop model catalog background refresh (user-003)
+        - Close the shared DataAPIClient pool (user-002)
+        - Close pooled AI provider HTTP clients (user-001)
         - Log service shutdown
     """
     # Startup
@@ -100,18 +110,21 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
         environment=ENVIRONMENT,
     )
 
+    # user-002: один долгоживущий клиент с keep-alive пулом на весь процесс
+    data_api_client = DataAPIClient(base_url=DATA_API_URL)
+    app.state.data_api_client = data_api_client
+
     # Verify Data API connection
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(f"{DATA_API_URL}/health")
-            if response.status_code == 200:
-                logger.info("data_api_connected", status="healthy")
-            else:
-                logger.warning(
-                    "data_api_connected",
-                    status="unhealthy",
-                    status_code=response.status_code,
-                )
+        status_code = await data_api_client.health()
+        if status_code == 200:
+            logger.info("data_api_connected", status="healthy")
+        else:
+            logger.warning(
+                "data_api_connected",
+                status="unhealthy",
+                status_code=status_code,
+            )
     except Exception as e:
         logger.error(
             "data_api_connection_failed",
@@ -119,10 +132,21 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
         )
         logger.warning("service_starting_with_errors")
 
+    # user-009: статистика и история пишутся в фоне
+    BookkeepingQueue.start()
+
     yield
 
     # Shutdown
     logger.info("service_stopping")
+    await BookkeepingQueue.shutdown()
+    await ModelCatalogCache.shutdown()
+    # Клиент мог быть пересоздан зависимостью get_data_api_client
+    shared_client = getattr(app.state, "data_api_client", None)
+    if shared_client is not None:
+        await shared_client.close()
+        app.state.data_api_client = None
+    await ProviderRegistry.aclose_all()
 
 
 # =============================================================================
@@ -209,6 +233,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # user-018: курсор следующей страницы журнала читается из заголовка
+    expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -309,13 +335,16 @@ async def error_handling_middleware(request: Request, call_next):
     tags=["Health"],
     summary="Health check endpoint",
 )
-async def health_check() -> HealthCheckResponse:
+async def health_check(request: Request) -> HealthCheckResponse:
     """
     Health check endpoint.
 
     Verifies:
     - Service is running
-    - Data API connection is healthy
+    - Data API connection is healthy (via the shared pooled client, user-002)
+
+    Args:
+        request: FastAPI request object (for app.state)
 
     Returns:
         HealthCheckResponse with service status
@@ -323,10 +352,9 @@ async def health_check() -> HealthCheckResponse:
     # Check Data API connection
     data_api_status = "healthy"
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(f"{DATA_API_URL}/health")
-            if response.status_code != 200:
-                data_api_status = f"unhealthy: status {response.status_code}"
+        status_code = await get_data_api_client(request).health()
+        if status_code != 200:
+            data_api_status = f"unhealthy: status {status_code}"
     except Exception as e:
         data_api_status = f"unhealthy: {sanitize_error_message(e)}"
         logger.error(
@@ -343,6 +371,23 @@ async def health_check() -> HealthCheckResponse:
     )
 
 
+@app.get(
+    "/metrics",
+    tags=["Health"],
+    summary="In-process service metrics",
+)
+async def service_metrics() -> dict:
+    """
+    In-process metrics of background machinery.
+
+    user-009: write-behind bookkeeping queue — depth, drops, flush latency.
+
+    Returns:
+        Dict with metrics grouped by component
+    """
+    return {"bookkeeping_queue": BookkeepingQueue.metrics()}
+
+
 # =============================================================================
 # API Routes
 # =============================================================================
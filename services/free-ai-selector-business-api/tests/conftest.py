@@ -15,6 +15,56 @@ def reset_circuit_breaker():
     CircuitBreakerManager.reset()
 
 
+@pytest.fixture(autouse=True)
+def reset_model_catalog_cache():
+    """user-003: Сброс кеша каталога моделей между тестами для изоляции."""
+    from app.application.services.model_catalog_cache import ModelCatalogCache
+
+    ModelCatalogCache.reset()
+    yield
+    ModelCatalogCache.reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_latency_tracker():
+    """user-004: Сброс окна латентностей между тестами для изоляции."""
+    from app.application.services.latency_tracker import LatencyTracker
+
+    LatencyTracker.reset()
+    yield
+    LatencyTracker.reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_response_cache():
+    """user-007: Очистка кеша ответов между тестами для изоляции."""
+    from app.application.services.response_cache import ResponseCache
+
+    ResponseCache.reset()
+    yield
+    ResponseCache.reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_request_coalescer():
+    """user-008: Сброс single-flight состояния между тестами для изоляции."""
+    from app.application.services.request_coalescer import RequestCoalescer
+
+    RequestCoalescer.reset()
+    yield
+    RequestCoalescer.reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_bookkeeping_queue():
+    """user-009: Остановка write-behind очереди между тестами для изоляции."""
+    from app.application.services.bookkeeping_queue import BookkeepingQueue
+
+    BookkeepingQueue.reset()
+    yield
+    BookkeepingQueue.reset()
+
+
 @pytest.fixture
 def mock_data_api_client(monkeypatch):
     """
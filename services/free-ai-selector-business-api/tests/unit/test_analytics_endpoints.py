@@ -1,8 +1,10 @@
 """Tests for the analytics & journal proxy endpoints (fm6)."""
+import httpx
 import pytest
 from unittest.mock import AsyncMock, patch
 from httpx import ASGITransport, AsyncClient
 
+from app.api.deps import get_data_api_client
 from app.main import app
 
 
@@ -15,6 +17,11 @@ async def async_client():
         yield client
 
 
+def _override_data_api_client(instance):
+    """user-002: подменить общий DataAPIClient через dependency_overrides."""
+    return patch.dict(app.dependency_overrides, {get_data_api_client: lambda: instance})
+
+
 def _mock_client():
     instance = AsyncMock()
     instance.close = AsyncMock()
@@ -35,39 +42,108 @@ class TestAnalyticsByProject:
                 "top_model_id": 3,
             }
         ]
-        with patch("app.api.v1.analytics.DataAPIClient") as MockClient:
-            instance = _mock_client()
-            instance.get_caller_statistics = AsyncMock(return_value=rows)
-            MockClient.return_value = instance
-
+        instance = _mock_client()
+        instance.get_caller_statistics = AsyncMock(return_value=rows)
+        with _override_data_api_client(instance):
             response = await async_client.get("/api/v1/analytics/by-project?window_days=14")
 
         assert response.status_code == 200
         assert response.json()[0]["caller"] == "sensedar"
         instance.get_caller_statistics.assert_awaited_once_with(window_days=14)
-        instance.close.assert_awaited_once()
+        instance.close.assert_not_awaited()
 
-    async def test_data_api_failure_returns_500(self, async_client):
-        with patch("app.api.v1.analytics.DataAPIClient") as MockClient:
-            instance = _mock_client()
-            instance.get_caller_statistics = AsyncMock(side_effect=Exception("boom"))
-            MockClient.return_value = instance
+    async def test_fractional_window_passed_through(self, async_client):
+        """user-023: окно может быть любым, в том числе короче дня."""
+        instance = _mock_client()
+        instance.get_caller_statistics = AsyncMock(return_value=[])
+        with _override_data_api_client(instance):
+            ok = await async_client.get("/api/v1/analytics/by-project?window_days=0.25")
+            empty = await async_client.get("/api/v1/analytics/by-project?window_days=0")
 
+        assert ok.status_code == 200
+        instance.get_caller_statistics.assert_awaited_once_with(window_days=0.25)
+        assert empty.status_code == 422
+
+    async def test_data_api_failure_returns_500(self, async_client):
+        instance = _mock_client()
+        instance.get_caller_statistics = AsyncMock(side_effect=Exception("boom"))
+        with _override_data_api_client(instance):
             response = await async_client.get("/api/v1/analytics/by-project")
 
         assert response.status_code == 500
-        instance.close.assert_awaited_once()
+        instance.close.assert_not_awaited()
+
+
+class TestAnalyticsTimeseries:
+    """GET /api/v1/analytics/timeseries (user-025)."""
+
+    async def test_passes_params_through(self, async_client):
+        body = {"granularity": "minute", "group_by": "caller", "window": "6h", "series": []}
+        instance = _mock_client()
+        instance.get_timeseries = AsyncMock(return_value=body)
+        with _override_data_api_client(instance):
+            response = await async_client.get(
+                "/api/v1/analytics/timeseries",
+                params={"granularity": "minute", "group_by": "caller", "window": "6h"},
+            )
+
+        assert response.status_code == 200
+        assert response.json() == body
+        instance.get_timeseries.assert_awaited_once_with(
+            granularity="minute",
+            group_by="caller",
+            window="6h",
+            quantiles="0.5,0.9,0.99",
+            model_id=None,
+            caller=None,
+            limit=10,
+        )
+
+    async def test_upstream_400_keeps_detail(self, async_client):
+        request = httpx.Request("GET", "http://data-api/api/v1/history/statistics/timeseries")
+        error = httpx.HTTPStatusError(
+            "too many points",
+            request=request,
+            response=httpx.Response(400, json={"detail": "too many buckets"}, request=request),
+        )
+        instance = _mock_client()
+        instance.get_timeseries = AsyncMock(side_effect=error)
+        with _override_data_api_client(instance):
+            response = await async_client.get(
+                "/api/v1/analytics/timeseries", params={"granularity": "minute", "window": "7d"}
+            )
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "too many buckets"
+
+    async def test_invalid_granularity_is_422(self, async_client):
+        instance = _mock_client()
+        with _override_data_api_client(instance):
+            response = await async_client.get(
+                "/api/v1/analytics/timeseries", params={"granularity": "week"}
+            )
+
+        assert response.status_code == 422
+        instance.get_timeseries.assert_not_awaited()
+
+    async def test_data_api_failure_returns_500(self, async_client):
+        instance = _mock_client()
+        instance.get_timeseries = AsyncMock(side_effect=Exception("boom"))
+        with _override_data_api_client(instance):
+            response = await async_client.get("/api/v1/analytics/timeseries")
+
+        assert response.status_code == 500
 
 
 class TestJournalList:
     """GET /api/v1/history (journal list)."""
 
     async def test_passes_filters_through(self, async_client):
-        with patch("app.api.v1.analytics.DataAPIClient") as MockClient:
-            instance = _mock_client()
-            instance.get_history = AsyncMock(return_value=[{"id": 1, "caller": "taro"}])
-            MockClient.return_value = instance
-
+        instance = _mock_client()
+        instance.get_history_page = AsyncMock(
+            return_value=([{"id": 1, "caller": "taro"}], None)
+        )
+        with _override_data_api_client(instance):
             response = await async_client.get(
                 "/api/v1/history",
                 params={"caller": "taro", "success": "false", "limit": 5, "offset": 10},
@@ -75,12 +151,128 @@ class TestJournalList:
 
         assert response.status_code == 200
         assert response.json()[0]["caller"] == "taro"
-        kwargs = instance.get_history.await_args.kwargs
+        assert "x-next-cursor" not in response.headers
+        kwargs = instance.get_history_page.await_args.kwargs
         assert kwargs["caller"] == "taro"
         assert kwargs["success"] is False
         assert kwargs["limit"] == 5
         assert kwargs["offset"] == 10
 
+    async def test_cursor_round_trip(self, async_client):
+        """user-018: cursor уходит в Data API, следующий курсор — в заголовок."""
+        instance = _mock_client()
+        instance.get_history_page = AsyncMock(return_value=([{"id": 9}], "next-abc"))
+        with _override_data_api_client(instance):
+            response = await async_client.get(
+                "/api/v1/history", params={"limit": 1, "cursor": "prev-xyz"}
+            )
+
+        assert response.status_code == 200
+        assert response.headers["x-next-cursor"] == "next-abc"
+        assert instance.get_history_page.await_args.kwargs["cursor"] == "prev-xyz"
+
+    async def test_summary_view_passed_through(self, async_client):
+        """user-020: view/preview_chars уходят в Data API без изменений."""
+        instance = _mock_client()
+        instance.get_history_page = AsyncMock(
+            return_value=([{"id": 1, "prompt_preview": "hi"}], None)
+        )
+        with _override_data_api_client(instance):
+            response = await async_client.get(
+                "/api/v1/history", params={"view": "summary", "preview_chars": 40}
+            )
+
+        assert response.status_code == 200
+        kwargs = instance.get_history_page.await_args.kwargs
+        assert kwargs["view"] == "summary"
+        assert kwargs["preview_chars"] == 40
+
+    async def test_search_query_passed_through(self, async_client):
+        """user-021: q уходит в Data API без изменений."""
+        instance = _mock_client()
+        instance.get_history_page = AsyncMock(return_value=([], None))
+        with _override_data_api_client(instance):
+            response = await async_client.get("/api/v1/history", params={"q": "timeout"})
+
+        assert response.status_code == 200
+        assert instance.get_history_page.await_args.kwargs["q"] == "timeout"
+
+    async def test_unknown_view_is_422(self, async_client):
+        instance = _mock_client()
+        with _override_data_api_client(instance):
+            response = await async_client.get("/api/v1/history", params={"view": "tiny"})
+
+        assert response.status_code == 422
+        instance.get_history_page.assert_not_awaited()
+
+    async def test_invalid_cursor_is_400(self, async_client):
+        request = httpx.Request("GET", "http://data-api/api/v1/history")
+        error = httpx.HTTPStatusError(
+            "bad cursor", request=request, response=httpx.Response(400, request=request)
+        )
+        instance = _mock_client()
+        instance.get_history_page = AsyncMock(side_effect=error)
+        with _override_data_api_client(instance):
+            response = await async_client.get("/api/v1/history", params={"cursor": "junk"})
+
+        assert response.status_code == 400
+
+
+class TestJournalExport:
+    """GET /api/v1/history/export — поток Data API проксируется без буферизации (user-022)."""
+
+    async def test_streams_upstream_body_and_headers(self, async_client):
+        async def chunks():
+            yield b'{"id": 2}\n'
+            yield b'{"id": 1}\n'
+
+        upstream = httpx.Response(
+            200,
+            headers={
+                "content-type": "application/x-ndjson",
+                "content-disposition": 'attachment; filename="prompt_history.ndjson"',
+            },
+            content=chunks(),
+        )
+        instance = _mock_client()
+        instance.open_history_export = AsyncMock(return_value=upstream)
+        with _override_data_api_client(instance):
+            response = await async_client.get(
+                "/api/v1/history/export", params={"caller": "sensedar", "q": "timeout"}
+            )
+
+        assert response.status_code == 200
+        assert response.text == '{"id": 2}\n{"id": 1}\n'
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert "prompt_history.ndjson" in response.headers["content-disposition"]
+        assert upstream.is_closed
+        kwargs = instance.open_history_export.await_args.kwargs
+        assert kwargs["export_format"] == "ndjson"
+        assert kwargs["caller"] == "sensedar"
+        assert kwargs["q"] == "timeout"
+
+    async def test_upstream_422_is_422(self, async_client):
+        request = httpx.Request("GET", "http://data-api/api/v1/history/export")
+        error = httpx.HTTPStatusError(
+            "bad q", request=request, response=httpx.Response(422, request=request)
+        )
+        instance = _mock_client()
+        instance.open_history_export = AsyncMock(side_effect=error)
+        with _override_data_api_client(instance):
+            response = await async_client.get("/api/v1/history/export", params={"q": "ab"})
+
+        assert response.status_code == 422
+
+    async def test_unknown_format_is_422(self, async_client):
+        instance = _mock_client()
+        with _override_data_api_client(instance):
+            response = await async_client.get(
+                "/api/v1/history/export", params={"format": "xml"}
+            )
+
+        assert response.status_code == 422
+        instance.open_history_export.assert_not_awaited()
+
 
 class TestJournalDetail:
     """GET /api/v1/history/{id} (drill-down)."""
@@ -94,23 +286,19 @@ class TestJournalDetail:
             "http_status": 200,
             "success": True,
         }
-        with patch("app.api.v1.analytics.DataAPIClient") as MockClient:
-            instance = _mock_client()
-            instance.get_history_by_id = AsyncMock(return_value=record)
-            MockClient.return_value = instance
-
+        instance = _mock_client()
+        instance.get_history_by_id = AsyncMock(return_value=record)
+        with _override_data_api_client(instance):
             response = await async_client.get("/api/v1/history/7")
 
         assert response.status_code == 200
         assert response.json()["http_status"] == 200
 
     async def test_missing_record_returns_404(self, async_client):
-        with patch("app.api.v1.analytics.DataAPIClient") as MockClient:
-            instance = _mock_client()
-            instance.get_history_by_id = AsyncMock(return_value=None)
-            MockClient.return_value = instance
-
+        instance = _mock_client()
+        instance.get_history_by_id = AsyncMock(return_value=None)
+        with _override_data_api_client(instance):
             response = await async_client.get("/api/v1/history/999")
 
         assert response.status_code == 404
-        instance.close.assert_awaited_once()
+        instance.close.assert_not_awaited()
@@ -3,6 +3,7 @@ import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 from httpx import ASGITransport, AsyncClient
 
+from app.api.deps import get_data_api_client
 from app.main import app
 from app.domain.models import AIModelInfo
 
@@ -17,6 +18,11 @@ async def async_client():
         yield client
 
 
+def _override_data_api_client(instance):
+    """user-002: подменить общий DataAPIClient через dependency_overrides."""
+    return patch.dict(app.dependency_overrides, {get_data_api_client: lambda: instance})
+
+
 @pytest.fixture
 def mock_models():
     """Тестовые модели для API тестов."""
@@ -43,14 +49,13 @@ class TestModelsStats:
 
     async def test_get_stats_success(self, async_client, mock_models):
         """Успешное получение статистики моделей."""
-        with patch(
-            "app.api.v1.models.DataAPIClient"
-        ) as MockClient:
-            instance = AsyncMock()
-            instance.get_all_models = AsyncMock(return_value=mock_models)
-            instance.close = AsyncMock()
-            MockClient.return_value = instance
-
+        instance = AsyncMock()
+        instance.get_all_models = AsyncMock(return_value=mock_models)
+        instance.get_models_latency = AsyncMock(
+            return_value={1: {"0.5": 0.8, "0.9": 2.1, "0.99": 4.5}}
+        )
+        instance.close = AsyncMock()
+        with _override_data_api_client(instance):
             response = await async_client.get("/api/v1/models/stats")
 
         assert response.status_code == 200
@@ -59,17 +64,31 @@ class TestModelsStats:
         assert data["total_models"] == 1
         assert data["models"][0]["name"] == "Test Model"
         assert data["models"][0]["reliability_score"] == 0.9
+        assert data["models"][0]["latency_p50"] == 0.8
+        assert data["models"][0]["latency_p99"] == 4.5
+        assert instance.get_models_latency.call_args.kwargs["window"] == "24h"
+
+    async def test_latency_failure_leaves_quantiles_empty(self, async_client, mock_models):
+        """user-024: сбой /models/latency не ломает статистику."""
+        instance = AsyncMock()
+        instance.get_all_models = AsyncMock(return_value=mock_models)
+        instance.get_models_latency = AsyncMock(side_effect=Exception("timeout"))
+        instance.close = AsyncMock()
+        with _override_data_api_client(instance):
+            response = await async_client.get("/api/v1/models/stats")
+
+        assert response.status_code == 200
+        model = response.json()["models"][0]
+        assert model["latency_p50"] is None
+        assert model["latency_p90"] is None
+        assert model["average_response_time"] == 1.0
 
     async def test_get_stats_empty(self, async_client):
         """Статистика при пустом списке моделей."""
-        with patch(
-            "app.api.v1.models.DataAPIClient"
-        ) as MockClient:
-            instance = AsyncMock()
-            instance.get_all_models = AsyncMock(return_value=[])
-            instance.close = AsyncMock()
-            MockClient.return_value = instance
-
+        instance = AsyncMock()
+        instance.get_all_models = AsyncMock(return_value=[])
+        instance.close = AsyncMock()
+        with _override_data_api_client(instance):
             response = await async_client.get("/api/v1/models/stats")
 
         assert response.status_code == 200
@@ -79,14 +98,10 @@ class TestModelsStats:
 
     async def test_get_stats_data_api_error(self, async_client):
         """Ошибка Data API возвращает 500."""
-        with patch(
-            "app.api.v1.models.DataAPIClient"
-        ) as MockClient:
-            instance = AsyncMock()
-            instance.get_all_models = AsyncMock(side_effect=Exception("API down"))
-            instance.close = AsyncMock()
-            MockClient.return_value = instance
-
+        instance = AsyncMock()
+        instance.get_all_models = AsyncMock(side_effect=Exception("API down"))
+        instance.close = AsyncMock()
+        with _override_data_api_client(instance):
             response = await async_client.get("/api/v1/models/stats")
 
         assert response.status_code == 500
@@ -97,13 +112,9 @@ class TestProvidersTest:
 
     async def test_test_providers_success(self, async_client):
         """Успешное тестирование провайдеров."""
-        with patch(
-            "app.api.v1.providers.DataAPIClient"
-        ) as MockClient:
-            instance = AsyncMock()
-            instance.close = AsyncMock()
-            MockClient.return_value = instance
-
+        instance = AsyncMock()
+        instance.close = AsyncMock()
+        with _override_data_api_client(instance):
             with patch(
                 "app.api.v1.providers.TestAllProvidersUseCase"
             ) as MockUC:
@@ -129,13 +140,9 @@ class TestProvidersTest:
 
     async def test_test_providers_mixed_results(self, async_client):
         """Тестирование с успешными и неуспешными провайдерами."""
-        with patch(
-            "app.api.v1.providers.DataAPIClient"
-        ) as MockClient:
-            instance = AsyncMock()
-            instance.close = AsyncMock()
-            MockClient.return_value = instance
-
+        instance = AsyncMock()
+        instance.close = AsyncMock()
+        with _override_data_api_client(instance):
             with patch(
                 "app.api.v1.providers.TestAllProvidersUseCase"
             ) as MockUC:
@@ -168,13 +175,9 @@ class TestProvidersTest:
 
     async def test_test_providers_error(self, async_client):
         """Катастрофическая ошибка при тестировании возвращает 500."""
-        with patch(
-            "app.api.v1.providers.DataAPIClient"
-        ) as MockClient:
-            instance = AsyncMock()
-            instance.close = AsyncMock()
-            MockClient.return_value = instance
-
+        instance = AsyncMock()
+        instance.close = AsyncMock()
+        with _override_data_api_client(instance):
             with patch(
                 "app.api.v1.providers.TestAllProvidersUseCase"
             ) as MockUC:
@@ -202,11 +205,9 @@ class TestProcessPrompt:
         mock_response.attempts = 1
         mock_response.fallback_used = False
 
-        with patch("app.api.v1.prompts.DataAPIClient") as MockClient:
-            instance = AsyncMock()
-            instance.close = AsyncMock()
-            MockClient.return_value = instance
-
+        instance = AsyncMock()
+        instance.close = AsyncMock()
+        with _override_data_api_client(instance):
             with patch("app.api.v1.prompts.ProcessPromptUseCase") as MockUC:
                 uc_instance = AsyncMock()
                 uc_instance.execute = AsyncMock(return_value=mock_response)
@@ -238,11 +239,9 @@ class TestProcessPrompt:
         mock_response.attempts = 1
         mock_response.fallback_used = False
 
-        with patch("app.api.v1.prompts.DataAPIClient") as MockClient:
-            instance = AsyncMock()
-            instance.close = AsyncMock()
-            MockClient.return_value = instance
-
+        instance = AsyncMock()
+        instance.close = AsyncMock()
+        with _override_data_api_client(instance):
             with patch("app.api.v1.prompts.ProcessPromptUseCase") as MockUC:
                 uc_instance = AsyncMock()
                 uc_instance.execute = AsyncMock(return_value=mock_response)
@@ -259,11 +258,9 @@ class TestProcessPrompt:
         """Все провайдеры rate-limited возвращает 429."""
         from app.domain.exceptions import AllProvidersRateLimited
 
-        with patch("app.api.v1.prompts.DataAPIClient") as MockClient:
-            instance = AsyncMock()
-            instance.close = AsyncMock()
-            MockClient.return_value = instance
-
+        instance = AsyncMock()
+        instance.close = AsyncMock()
+        with _override_data_api_client(instance):
             with patch("app.api.v1.prompts.ProcessPromptUseCase") as MockUC:
                 uc_instance = AsyncMock()
                 uc_instance.execute = AsyncMock(
@@ -289,11 +286,9 @@ class TestProcessPrompt:
         """Сервис недоступен возвращает 503."""
         from app.domain.exceptions import ServiceUnavailable
 
-        with patch("app.api.v1.prompts.DataAPIClient") as MockClient:
-            instance = AsyncMock()
-            instance.close = AsyncMock()
-            MockClient.return_value = instance
-
+        instance = AsyncMock()
+        instance.close = AsyncMock()
+        with _override_data_api_client(instance):
             with patch("app.api.v1.prompts.ProcessPromptUseCase") as MockUC:
                 uc_instance = AsyncMock()
                 uc_instance.execute = AsyncMock(
@@ -313,11 +308,9 @@ class TestProcessPrompt:
 
     async def test_process_internal_error(self, async_client):
         """Внутренняя ошибка возвращает 500."""
-        with patch("app.api.v1.prompts.DataAPIClient") as MockClient:
-            instance = AsyncMock()
-            instance.close = AsyncMock()
-            MockClient.return_value = instance
-
+        instance = AsyncMock()
+        instance.close = AsyncMock()
+        with _override_data_api_client(instance):
             with patch("app.api.v1.prompts.ProcessPromptUseCase") as MockUC:
                 uc_instance = AsyncMock()
                 uc_instance.execute = AsyncMock(side_effect=RuntimeError("boom"))
@@ -43,7 +43,7 @@ class TestProviderErrorSurfacing:
     async def test_empty_protocol_error_surfaces_nonempty_message(self):
         provider = _provider()
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.post = AsyncMock(
+            mock_client.return_value.post = AsyncMock(
                 side_effect=httpx.RemoteProtocolError("")
             )
             with pytest.raises(ProviderError) as exc_info:
@@ -60,7 +60,7 @@ class TestProviderErrorSurfacing:
     async def test_read_timeout_is_nonretryable_provider_error(self):
         provider = _provider()
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.post = AsyncMock(
+            mock_client.return_value.post = AsyncMock(
                 side_effect=httpx.ReadTimeout("")
             )
             with pytest.raises(ProviderError) as exc_info:
@@ -74,7 +74,7 @@ class TestProviderErrorSurfacing:
     async def test_connect_error_is_retryable_timeout(self):
         provider = _provider()
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.post = AsyncMock(
+            mock_client.return_value.post = AsyncMock(
                 side_effect=httpx.ConnectError("")
             )
             with pytest.raises(TimeoutError) as exc_info:
@@ -0,0 +1,257 @@
+"""Tests for user-009: Write-behind bookkeeping queue."""
+
+import asyncio
+import os
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.application.services import bookkeeping_queue as queue_module
+from app.application.services.bookkeeping_queue import BookkeepingQueue
+from app.application.use_cases.process_prompt import ProcessPromptUseCase
+from app.domain.models import AIModelInfo, PromptRequest
+from app.main import app
+
+
+def _blocking_client(release: asyncio.Event) -> AsyncMock:
+    """Клиент, чьи записи завершаются только после release.set()."""
+    client = AsyncMock()
+
+    async def slow_write(**kwargs):
+        await release.wait()
+
+    client.create_history.side_effect = slow_write
+    client.increment_success.side_effect = slow_write
+    return client
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+def fast_flush():
+    with patch.object(queue_module, "BOOKKEEPING_FLUSH_INTERVAL", 0.0):
+        yield
+
+
+@pytest.mark.unit
+class TestBookkeepingQueue:
+    """user-009: очередь, пачки, отбрасывание, дренирование."""
+
+    async def test_without_worker_writes_inline_and_raises(self):
+        client = AsyncMock()
+        client.increment_failure.side_effect = RuntimeError("data api down")
+
+        await BookkeepingQueue.submit(client, "create_history", user_id="u")
+        client.create_history.assert_awaited_once_with(user_id="u")
+
+        with pytest.raises(RuntimeError):
+            await BookkeepingQueue.submit(client, "increment_failure", model_id=1)
+
+    async def test_submit_returns_before_write_completes(self, fast_flush):
+        release = asyncio.Event()
+        client = _blocking_client(release)
+        BookkeepingQueue.start()
+
+        await asyncio.wait_for(
+            BookkeepingQueue.submit(client, "create_history", user_id="u"), timeout=1
+        )
+        await _settle()
+        assert BookkeepingQueue.metrics()["flushed"] == 0
+
+        release.set()
+        await _settle()
+        assert BookkeepingQueue.metrics()["flushed"] == 1
+        client.create_history.assert_awaited_once_with(user_id="u")
+        await BookkeepingQueue.shutdown()
+
+    async def test_events_flushed_in_one_batch(self):
+        client = AsyncMock()
+        BookkeepingQueue.start()
+
+        for i in range(5):
+            await BookkeepingQueue.submit(client, "increment_success", model_id=i)
+        await BookkeepingQueue.shutdown()
+
+        assert client.increment_success.await_count == 5
+        metrics = BookkeepingQueue.metrics()
+        assert metrics["flushed"] == 5
+        assert metrics["flushes"] == 1
+        assert metrics["running"] is False
+
+    async def test_full_queue_drops_events(self, fast_flush):
+        release = asyncio.Event()
+        client = _blocking_client(release)
+        with patch.object(queue_module, "BOOKKEEPING_QUEUE_MAX_SIZE", 1):
+            BookkeepingQueue.start()
+            await BookkeepingQueue.submit(client, "create_history", n=1)
+            await _settle()  # worker забрал первое событие и висит на записи
+            await BookkeepingQueue.submit(client, "create_history", n=2)
+            await BookkeepingQueue.submit(client, "create_history", n=3)
+
+            metrics = BookkeepingQueue.metrics()
+            assert metrics["depth"] == 1
+            assert metrics["dropped"] == 1
+            release.set()
+            await BookkeepingQueue.shutdown()
+
+        assert client.create_history.await_count == 2
+
+    async def test_urgent_write_bypasses_blocked_queue(self, fast_flush):
+        release = asyncio.Event()
+        client = _blocking_client(release)
+        BookkeepingQueue.start()
+        await BookkeepingQueue.submit(client, "create_history", n=1)
+        await _settle()
+
+        await BookkeepingQueue.submit(
+            client, "set_availability", urgent=True, model_id=7, retry_after_seconds=60
+        )
+        await _settle()
+
+        client.set_availability.assert_awaited_once_with(
+            model_id=7, retry_after_seconds=60
+        )
+        release.set()
+        await BookkeepingQueue.shutdown()
+
+    async def test_failed_write_counted_and_batch_continues(self):
+        client = AsyncMock()
+        client.increment_failure.side_effect = RuntimeError("boom")
+        BookkeepingQueue.start()
+
+        await BookkeepingQueue.submit(client, "increment_failure", model_id=1)
+        await BookkeepingQueue.submit(client, "increment_success", model_id=2)
+        await BookkeepingQueue.shutdown()
+
+        metrics = BookkeepingQueue.metrics()
+        assert metrics["failed"] == 1
+        assert metrics["flushed"] == 1
+
+    async def test_shutdown_drains_pending_and_urgent(self):
+        client = AsyncMock()
+        with patch.object(queue_module, "BOOKKEEPING_FLUSH_INTERVAL", 10.0):
+            BookkeepingQueue.start()
+            for i in range(3):
+                await BookkeepingQueue.submit(client, "create_history", n=i)
+            await BookkeepingQueue.submit(client, "set_availability", urgent=True, model_id=1)
+
+            await BookkeepingQueue.shutdown()
+
+        client.create_history_bulk.assert_awaited_once_with([{"n": 0}, {"n": 1}, {"n": 2}])
+        client.set_availability.assert_awaited_once()
+
+    async def test_shutdown_finishes_held_batch_and_inflight_flush(self):
+        release = asyncio.Event()
+        client = _blocking_client(release)
+        with patch.object(queue_module, "BOOKKEEPING_FLUSH_INTERVAL", 10.0):
+            BookkeepingQueue.start()
+            await BookkeepingQueue.submit(client, "create_history", n=1)
+            await _settle()  # worker держит пачку и ждёт добора
+
+            shutdown = asyncio.create_task(BookkeepingQueue.shutdown())
+            await _settle()
+            assert not shutdown.done()  # пачка ушла в сброс и ждёт записи
+
+            release.set()
+            await asyncio.wait_for(shutdown, timeout=1)
+
+        client.create_history.assert_awaited_once_with(n=1)
+        assert BookkeepingQueue.metrics()["flushed"] == 1
+
+    async def test_history_events_grouped_into_bulk_per_client(self):
+        first, second = AsyncMock(), AsyncMock()
+        BookkeepingQueue.start()
+
+        await BookkeepingQueue.submit(first, "create_history", n=1)
+        await BookkeepingQueue.submit(first, "increment_failure", model_id=1)
+        await BookkeepingQueue.submit(first, "create_history", n=2)
+        await BookkeepingQueue.submit(second, "create_history", n=3)
+        await BookkeepingQueue.shutdown()
+
+        first.create_history_bulk.assert_awaited_once_with([{"n": 1}, {"n": 2}])
+        first.create_history.assert_not_called()
+        first.increment_failure.assert_awaited_once_with(model_id=1)
+        second.create_history.assert_awaited_once_with(n=3)
+        second.create_history_bulk.assert_not_called()
+        assert BookkeepingQueue.metrics()["flushed"] == 4
+
+    async def test_failed_bulk_counts_every_event(self):
+        client = AsyncMock()
+        client.create_history_bulk.side_effect = RuntimeError("data api down")
+        BookkeepingQueue.start()
+
+        for i in range(3):
+            await BookkeepingQueue.submit(client, "create_history", n=i)
+        await BookkeepingQueue.shutdown()
+
+        metrics = BookkeepingQueue.metrics()
+        assert metrics["failed"] == 3
+        assert metrics["flushed"] == 0
+
+    async def test_submit_after_shutdown_is_inline(self):
+        client = AsyncMock()
+        BookkeepingQueue.start()
+        await BookkeepingQueue.shutdown()
+
+        await BookkeepingQueue.submit(client, "create_history", n=1)
+
+        client.create_history.assert_awaited_once_with(n=1)
+
+
+@pytest.mark.unit
+class TestProcessPromptWriteBehind:
+    """user-009: ответ не ждёт статистику и историю."""
+
+    @patch.dict(os.environ, {"HUGGINGFACE_API_KEY": "test_key"})
+    @patch("app.application.use_cases.process_prompt.ProviderRegistry")
+    async def test_response_returned_before_bookkeeping(
+        self, mock_registry, mock_data_api_client, fast_flush
+    ):
+        provider = AsyncMock()
+        provider.generate.return_value = "answer"
+        mock_registry.get_provider.return_value = provider
+        mock_registry.get_api_key_env.return_value = "HUGGINGFACE_API_KEY"
+        mock_data_api_client.get_all_models.return_value = [
+            AIModelInfo(
+                id=1,
+                name="HF",
+                provider="HuggingFace",
+                api_endpoint="https://api.test.com",
+                reliability_score=0.9,
+                is_active=True,
+                effective_reliability_score=0.9,
+            )
+        ]
+        release = asyncio.Event()
+
+        async def slow_write(**kwargs):
+            await release.wait()
+
+        mock_data_api_client.record_outcome.side_effect = slow_write
+        BookkeepingQueue.start()
+
+        response = await asyncio.wait_for(
+            ProcessPromptUseCase(mock_data_api_client).execute(
+                PromptRequest(user_id="u", prompt_text="hi")
+            ),
+            timeout=1,
+        )
+
+        assert response.response_text == "answer"
+        release.set()
+        await BookkeepingQueue.shutdown()
+        mock_data_api_client.record_outcome.assert_awaited_once()
+
+
+@pytest.mark.unit
+async def test_metrics_endpoint_exposes_queue():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    body = response.json()["bookkeeping_queue"]
+    assert {"depth", "dropped", "last_flush_ms", "avg_flush_ms"} <= set(body)
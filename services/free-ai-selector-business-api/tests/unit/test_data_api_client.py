@@ -4,6 +4,8 @@ import pytest
 from unittest.mock import AsyncMock, MagicMock
 from decimal import Decimal
 
+import httpx
+
 from app.infrastructure.http_clients.data_api_client import DataAPIClient
 
 
@@ -211,6 +213,65 @@ class TestDataAPIClient:
         assert payload["error_message"] == "Provider timeout"
         assert payload["success"] is False
 
+    async def test_create_history_bulk_returns_ids(self, client):
+        """user-011: пачка истории — один POST /history/bulk."""
+        mock_response = MagicMock()
+        mock_response.raise_for_status = MagicMock()
+        mock_response.json.return_value = {"ids": [7, 8], "count": 2}
+
+        client.client.post = AsyncMock(return_value=mock_response)
+        record = {
+            "user_id": "u1",
+            "prompt_text": "hello",
+            "selected_model_id": 1,
+            "response_text": None,
+            "response_time": Decimal("0.5"),
+            "success": False,
+        }
+        ids = await client.create_history_bulk([record, record])
+
+        assert ids == [7, 8]
+        call_kwargs = client.client.post.call_args
+        assert call_kwargs.args[0].endswith("/api/v1/history/bulk")
+        assert [r["response_time"] for r in call_kwargs.kwargs["json"]] == ["0.5", "0.5"]
+
+    async def test_record_outcome_posts_one_request(self, client):
+        """user-010: счётчик и история — один POST /outcomes."""
+        mock_response = MagicMock()
+        mock_response.raise_for_status = MagicMock()
+        mock_response.json.return_value = {"model_id": 1, "history_id": 44, "available_at": None}
+
+        client.client.post = AsyncMock(return_value=mock_response)
+        result = await client.record_outcome(
+            model_id=1,
+            result="success",
+            response_time=1.5,
+            history={
+                "user_id": "u1",
+                "prompt_text": "hello",
+                "selected_model_id": 1,
+                "response_text": "hi",
+                "response_time": Decimal("1.5"),
+                "success": True,
+            },
+        )
+
+        assert result["history_id"] == 44
+        client.client.post.assert_awaited_once()
+        call_kwargs = client.client.post.call_args
+        assert call_kwargs.args[0].endswith("/api/v1/outcomes")
+        payload = call_kwargs.kwargs["json"]
+        assert payload["result"] == "success"
+        assert payload["history"]["response_time"] == "1.5"
+        assert payload["cooldown"] is None
+
+    async def test_record_outcome_error_propagates(self, client):
+        """user-010: ошибка HTTP пробрасывается (BookkeepingQueue её логирует)."""
+        client.client.post = AsyncMock(side_effect=httpx.ConnectError("down"))
+
+        with pytest.raises(httpx.HTTPError):
+            await client.record_outcome(model_id=1, result="failure")
+
     async def test_close(self, client):
         """close() вызывает aclose() на внутреннем клиенте."""
         client.client.aclose = AsyncMock()
@@ -322,6 +383,7 @@ class TestDataAPIClientCallerAnalytics:
         assert payload["caller"] == "sensedar"
         assert payload["http_status"] == 503
         assert payload["requested_model"] == "gpt-x"
+        assert payload["cache_hit"] is False
 
     async def test_get_caller_statistics(self, client):
         mock_response = MagicMock()
@@ -348,6 +410,26 @@ class TestDataAPIClientCallerAnalytics:
         assert params["limit"] == 5
         assert params["offset"] == 2
 
+    async def test_get_history_page_passes_cursor_and_returns_next(self, client):
+        """user-018: курсор следующей страницы берётся из X-Next-Cursor."""
+        mock_response = MagicMock()
+        mock_response.raise_for_status = MagicMock()
+        mock_response.json.return_value = [{"id": 3}]
+        mock_response.headers = {"X-Next-Cursor": "c2"}
+        client.client.get = AsyncMock(return_value=mock_response)
+
+        records, next_cursor = await client.get_history_page(
+            limit=1, cursor="c1", view="summary", preview_chars=80, q="timeout"
+        )
+
+        assert records == [{"id": 3}]
+        assert next_cursor == "c2"
+        params = client.client.get.call_args.kwargs["params"]
+        assert params["cursor"] == "c1"
+        assert params["view"] == "summary"
+        assert params["preview_chars"] == 80
+        assert params["q"] == "timeout"
+
     async def test_get_history_by_id_found(self, client):
         mock_response = MagicMock()
         mock_response.status_code = 200
@@ -365,3 +447,177 @@ class TestDataAPIClientCallerAnalytics:
 
         result = await client.get_history_by_id(999)
         assert result is None
+
+
+class TestHistoryExport:
+    """user-022: экспорт журнала открывается потоком, тело не читается заранее."""
+
+    @staticmethod
+    def _client(handler):
+        client = DataAPIClient(base_url="http://test-data:8001")
+        client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return client
+
+    async def test_returns_open_stream_with_filters(self):
+        seen = {}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen["url"] = request.url
+            return httpx.Response(200, content=b'{"id": 1}\n')
+
+        client = self._client(handler)
+        response = await client.open_history_export(
+            export_format="csv", caller="sensedar", success=False, q="timeout"
+        )
+        body = b"".join([chunk async for chunk in response.aiter_bytes()])
+        await response.aclose()
+
+        assert body == b'{"id": 1}\n'
+        assert seen["url"].path == "/api/v1/history/export"
+        assert seen["url"].params["format"] == "csv"
+        assert seen["url"].params["caller"] == "sensedar"
+        assert seen["url"].params["success"] == "false"
+        assert seen["url"].params["q"] == "timeout"
+
+    async def test_error_status_is_raised(self):
+        client = self._client(lambda request: httpx.Response(422, json={"detail": []}))
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.open_history_export(q="ab")
+
+
+class TestConditionalRevalidation:
+    """user-016: If-None-Match для /models и /history/statistics/*."""
+
+    @staticmethod
+    def _response(status_code: int, payload=None, etag=None):
+        response = MagicMock()
+        response.status_code = status_code
+        response.raise_for_status = MagicMock()
+        response.json.return_value = payload
+        response.headers = {"etag": etag} if etag else {}
+        return response
+
+    _MODEL = {
+        "id": 1,
+        "name": "M",
+        "provider": "P",
+        "api_endpoint": "https://p",
+        "reliability_score": 0.9,
+        "is_active": True,
+    }
+
+    async def test_models_304_reuses_parsed_list(self, client):
+        first = self._response(200, [self._MODEL], etag='"b-models-1-1"')
+        not_modified = self._response(304)
+        client.client.get = AsyncMock(side_effect=[first, not_modified])
+
+        models = await client.get_all_models()
+        again = await client.get_all_models()
+
+        assert again == models
+        assert again is not models  # копия списка, DTO те же
+        assert again[0] is models[0]
+        not_modified.json.assert_not_called()
+        headers = client.client.get.call_args_list[1].kwargs["headers"]
+        assert headers["If-None-Match"] == '"b-models-1-1"'
+
+    async def test_changed_catalog_replaces_cached_etag(self, client):
+        client.client.get = AsyncMock(
+            side_effect=[
+                self._response(200, [self._MODEL], etag='"e1"'),
+                self._response(200, [{**self._MODEL, "name": "N"}], etag='"e2"'),
+                self._response(304),
+            ]
+        )
+
+        await client.get_all_models()
+        await client.get_all_models()
+        models = await client.get_all_models()
+
+        assert models[0].name == "N"
+        assert client.client.get.call_args_list[2].kwargs["headers"]["If-None-Match"] == '"e2"'
+
+    async def test_params_are_cached_separately(self, client):
+        client.client.get = AsyncMock(
+            side_effect=[
+                self._response(200, [self._MODEL], etag='"e1"'),
+                self._response(200, [], etag='"e2"'),
+            ]
+        )
+
+        await client.get_all_models(available_only=False)
+        await client.get_all_models(available_only=True)
+
+        assert "If-None-Match" not in client.client.get.call_args_list[1].kwargs["headers"]
+
+    async def test_no_etag_no_conditional_request(self, client):
+        client.client.get = AsyncMock(
+            side_effect=[self._response(200, []), self._response(200, [])]
+        )
+
+        await client.get_all_models()
+        await client.get_all_models()
+
+        assert "If-None-Match" not in client.client.get.call_args_list[1].kwargs["headers"]
+
+    async def test_caller_statistics_revalidated(self, client):
+        client.client.get = AsyncMock(
+            side_effect=[
+                self._response(200, [{"caller": "taro"}], etag='"s1"'),
+                self._response(304),
+            ]
+        )
+
+        await client.get_caller_statistics(window_days=7)
+        result = await client.get_caller_statistics(window_days=7)
+
+        assert result == [{"caller": "taro"}]
+        assert client.client.get.call_args_list[1].kwargs["headers"]["If-None-Match"] == '"s1"'
+
+    async def test_models_latency_keyed_by_model_and_revalidated(self, client):
+        rows = [{"model_id": 3, "window": "7d", "sample_count": 2, "quantiles": {"0.5": 1.5}}]
+        client.client.get = AsyncMock(
+            side_effect=[self._response(200, rows, etag='"l1"'), self._response(304)]
+        )
+
+        first = await client.get_models_latency(window="7d", quantiles="0.5")
+        second = await client.get_models_latency(window="7d", quantiles="0.5")
+
+        assert first == second == {3: {"0.5": 1.5}}
+        assert client.client.get.call_args.kwargs["params"] == {"window": "7d", "q": "0.5"}
+        assert client.client.get.call_args_list[1].kwargs["headers"]["If-None-Match"] == '"l1"'
+
+    async def test_timeseries_omits_unset_filters_and_revalidates(self, client):
+        """user-025: None-фильтры не уходят в query string, повтор — условный GET."""
+        body = {"granularity": "hour", "group_by": "model", "window": "24h", "series": []}
+        client.client.get = AsyncMock(
+            side_effect=[self._response(200, body, etag='"t1"'), self._response(304)]
+        )
+
+        first = await client.get_timeseries(model_id=3)
+        second = await client.get_timeseries(model_id=3)
+
+        assert first == second == body
+        assert client.client.get.call_args.kwargs["params"] == {
+            "granularity": "hour",
+            "group_by": "model",
+            "window": "24h",
+            "q": "0.5,0.9,0.99",
+            "limit": 10,
+            "model_id": 3,
+        }
+        assert client.client.get.call_args_list[1].kwargs["headers"]["If-None-Match"] == '"t1"'
+
+    async def test_store_is_bounded(self, client, monkeypatch):
+        from app.infrastructure.http_clients import data_api_client as module
+
+        monkeypatch.setattr(module, "REVALIDATION_MAX_ENTRIES", 2)
+        client.client.get = AsyncMock(
+            side_effect=[self._response(200, [], etag=f'"e{i}"') for i in range(3)]
+        )
+
+        for window_days in (1, 2, 3):
+            await client.get_caller_statistics(window_days=window_days)
+
+        assert len(client._revalidation) == 2
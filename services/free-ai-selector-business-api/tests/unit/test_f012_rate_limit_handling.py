@@ -137,8 +137,9 @@ class TestF012RateLimitHandling:
 
             response = await use_case.execute(request)
 
-        # Verify: increment_failure called for failed model
-        mock_data_api_client.increment_failure.assert_called()
+        # Verify: failure outcome recorded for failed model (user-010)
+        results = [c.kwargs["result"] for c in mock_data_api_client.record_outcome.call_args_list]
+        assert "failure" in results
 
         # Verify: Success from fallback
         assert response.success is True
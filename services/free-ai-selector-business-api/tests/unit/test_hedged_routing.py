@@ -0,0 +1,196 @@
+"""Tests for user-004: hedged requests across the fallback chain."""
+
+import asyncio
+import os
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from pydantic import ValidationError as PydanticValidationError
+
+from app.api.v1.schemas import ProcessPromptRequest
+from app.application.services.circuit_breaker import CircuitBreakerManager
+from app.application.services.latency_tracker import LatencyTracker
+from app.application.use_cases import process_prompt as process_prompt_module
+from app.application.use_cases.process_prompt import ProcessPromptUseCase
+from app.domain.exceptions import ServerError
+from app.domain.models import AIModelInfo, PromptRequest
+
+
+def _model(model_id: int, provider: str, score: float) -> AIModelInfo:
+    return AIModelInfo(
+        id=model_id,
+        name=f"{provider} Model",
+        provider=provider,
+        api_endpoint="https://api.test.com",
+        reliability_score=score,
+        is_active=True,
+        effective_reliability_score=score,
+        recent_request_count=0,
+        decision_reason="fallback",
+    )
+
+
+def _provider(delay: float = 0.0, text: str = "ok", error: Exception = None):
+    async def generate(*args, **kwargs):
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return text
+
+    provider = AsyncMock()
+    provider.generate = AsyncMock(side_effect=generate)
+    return provider
+
+
+@pytest.fixture
+def setup_providers(mock_data_api_client):
+    """Два кандидата: Slow (лучший score) и Fast; провайдеры задаёт тест."""
+    mock_data_api_client.get_all_models.return_value = [
+        _model(1, "Slow", 0.9),
+        _model(2, "Fast", 0.8),
+    ]
+    providers = {}
+    with patch.dict(os.environ, {"TEST_API_KEY": "key"}), patch(
+        "app.application.use_cases.process_prompt.ProviderRegistry"
+    ) as mock_registry, patch.object(
+        process_prompt_module, "HEDGE_DELAY_SECONDS", 0.05
+    ), patch.object(process_prompt_module, "HEDGE_MIN_SAMPLES", 3):
+        mock_registry.get_api_key_env.return_value = "TEST_API_KEY"
+        mock_registry.get_provider.side_effect = lambda name: providers[name]
+        yield providers
+
+
+def _hedged_request() -> PromptRequest:
+    return PromptRequest(user_id="u", prompt_text="hi", routing="hedged")
+
+
+@pytest.mark.unit
+class TestHedgedRouting:
+    """user-004: запасной вызов при медленном кандидате."""
+
+    async def test_slow_candidate_is_hedged_and_loser_is_neutral(
+        self, setup_providers, mock_data_api_client
+    ):
+        setup_providers["Slow"] = _provider(delay=5.0, text="slow")
+        setup_providers["Fast"] = _provider(delay=0.0, text="fast")
+        use_case = ProcessPromptUseCase(mock_data_api_client)
+
+        response = await asyncio.wait_for(use_case.execute(_hedged_request()), 2.0)
+
+        assert response.response_text == "fast"
+        assert response.selected_model_name == "Fast Model"
+        assert response.attempts == 2
+        assert response.fallback_used is True
+        # Победитель — в статистике и истории, отменённый — нейтрален
+        mock_data_api_client.record_outcome.assert_awaited_once()
+        outcome = mock_data_api_client.record_outcome.call_args.kwargs
+        assert outcome["model_id"] == 2
+        mock_data_api_client.increment_failure.assert_not_called()
+        assert "Slow" not in CircuitBreakerManager.get_all_statuses()
+        history = outcome["history"]
+        assert history["selected_model_id"] == 2
+        assert history["success"] is True
+
+    async def test_fast_first_candidate_is_not_hedged(
+        self, setup_providers, mock_data_api_client
+    ):
+        setup_providers["Slow"] = _provider(delay=0.0, text="first")
+        setup_providers["Fast"] = _provider(text="second")
+        use_case = ProcessPromptUseCase(mock_data_api_client)
+
+        response = await use_case.execute(_hedged_request())
+
+        assert response.response_text == "first"
+        assert response.attempts == 1
+        setup_providers["Fast"].generate.assert_not_called()
+
+    async def test_failure_falls_through_to_next_candidate(
+        self, setup_providers, mock_data_api_client
+    ):
+        setup_providers["Slow"] = _provider(error=ValueError("bad request"))
+        setup_providers["Fast"] = _provider(text="second")
+        use_case = ProcessPromptUseCase(mock_data_api_client)
+
+        response = await use_case.execute(_hedged_request())
+
+        assert response.response_text == "second"
+        outcomes = mock_data_api_client.record_outcome.await_args_list
+        assert [c.kwargs["result"] for c in outcomes] == ["failure", "success"]
+
+    async def test_cancelled_call_is_not_a_provider_failure(
+        self, setup_providers, mock_data_api_client
+    ):
+        setup_providers["Slow"] = _provider(error=asyncio.CancelledError())
+        setup_providers["Fast"] = _provider(delay=5.0, text="second")
+        use_case = ProcessPromptUseCase(mock_data_api_client)
+
+        with pytest.raises(asyncio.CancelledError):
+            await use_case.execute(_hedged_request())
+
+        mock_data_api_client.increment_failure.assert_not_called()
+        assert "Slow" not in CircuitBreakerManager.get_all_statuses()
+
+    async def test_sequential_routing_waits_for_slow_candidate(
+        self, setup_providers, mock_data_api_client
+    ):
+        setup_providers["Slow"] = _provider(delay=0.2, text="slow")
+        setup_providers["Fast"] = _provider(text="fast")
+        use_case = ProcessPromptUseCase(mock_data_api_client)
+
+        response = await use_case.execute(PromptRequest(user_id="u", prompt_text="hi"))
+
+        assert response.response_text == "slow"
+        setup_providers["Fast"].generate.assert_not_called()
+
+    async def test_hedge_delay_uses_observed_p90(self, mock_data_api_client):
+        use_case = ProcessPromptUseCase(mock_data_api_client)
+        model = _model(1, "Slow", 0.9)
+        with patch.object(process_prompt_module, "HEDGE_MIN_SAMPLES", 3):
+            assert use_case._hedge_delay(model) == process_prompt_module.HEDGE_DELAY_SECONDS
+            for seconds in (0.1, 0.2, 0.3, 0.4, 1.0):
+                LatencyTracker.record(1, seconds)
+            assert use_case._hedge_delay(model) == 1.0
+            with patch.object(process_prompt_module, "HEDGE_DELAY_STRATEGY", "fixed"):
+                assert (
+                    use_case._hedge_delay(model)
+                    == process_prompt_module.HEDGE_DELAY_SECONDS
+                )
+
+    async def test_all_hedged_candidates_fail(self, setup_providers, mock_data_api_client):
+        setup_providers["Slow"] = _provider(delay=0.1, error=ServerError("502"))
+        setup_providers["Fast"] = _provider(error=ServerError("503"))
+        use_case = ProcessPromptUseCase(mock_data_api_client)
+
+        with patch(
+            "app.application.use_cases.process_prompt.retry_with_exponential_backoff",
+            new=lambda func, **kwargs: func(),
+        ):
+            with pytest.raises(Exception, match="All AI providers failed"):
+                await use_case.execute(_hedged_request())
+
+        outcomes = mock_data_api_client.record_outcome.await_args_list
+        assert [c.kwargs["result"] for c in outcomes] == ["failure", "failure"]
+        assert mock_data_api_client.create_history.call_args.kwargs["success"] is False
+
+    def test_discarded_duplicate_feeds_latency_not_stats(self, mock_data_api_client):
+        use_case = ProcessPromptUseCase(mock_data_api_client)
+        call = process_prompt_module._InFlightCall(
+            model=_model(2, "Fast", 0.8), attempt=2, started=0.0
+        )
+
+        use_case._record_discarded_call(call)
+
+        assert LatencyTracker.quantile(2, 0.5) is not None
+        mock_data_api_client.increment_success.assert_not_called()
+
+
+@pytest.mark.unit
+class TestRoutingSchema:
+    """user-004: поле routing в ProcessPromptRequest."""
+
+    def test_accepts_hedged(self):
+        assert ProcessPromptRequest(prompt="hi", routing="hedged").routing == "hedged"
+
+    def test_rejects_unknown_mode(self):
+        with pytest.raises(PydanticValidationError):
+            ProcessPromptRequest(prompt="hi", routing="broadcast")
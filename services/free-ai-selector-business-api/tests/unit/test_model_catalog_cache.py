@@ -0,0 +1,200 @@
+"""Tests for user-003: Model Catalog Cache."""
+
+import asyncio
+import os
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.application.services import model_catalog_cache as cache_module
+from app.application.services.model_catalog_cache import ModelCatalogCache
+from app.application.use_cases.process_prompt import ProcessPromptUseCase
+from app.domain.exceptions import AuthenticationError, RateLimitError
+from app.domain.models import AIModelInfo, PromptRequest
+
+
+def _model(model_id: int, name: str) -> AIModelInfo:
+    return AIModelInfo(
+        id=model_id,
+        name=name,
+        provider="HuggingFace",
+        api_endpoint="https://api.test.com",
+        reliability_score=0.9,
+        is_active=True,
+        effective_reliability_score=0.9 - model_id * 0.01,
+        recent_request_count=0,
+        decision_reason="fallback",
+    )
+
+
+def _client(models):
+    client = AsyncMock()
+    client.get_all_models = AsyncMock(return_value=models)
+    return client
+
+
+def _age_snapshot(seconds: float) -> None:
+    ModelCatalogCache._fetched_at -= seconds
+
+
+@pytest.mark.unit
+class TestModelCatalogCache:
+    """user-003: staleness, stale-while-revalidate и локальные cooldown."""
+
+    async def test_first_call_fetches_from_data_api(self):
+        client = _client([_model(1, "A")])
+
+        models = await ModelCatalogCache.get_models(client)
+
+        assert [m.id for m in models] == [1]
+        client.get_all_models.assert_awaited_once_with(
+            active_only=True, available_only=True, include_recent=True
+        )
+
+    async def test_fresh_snapshot_served_without_data_api_call(self):
+        client = _client([_model(1, "A")])
+        await ModelCatalogCache.get_models(client)
+
+        await ModelCatalogCache.get_models(client)
+        await ModelCatalogCache.get_models(client)
+
+        assert client.get_all_models.await_count == 1
+
+    async def test_stale_snapshot_served_and_refreshed_in_background(self):
+        client = _client([_model(1, "A")])
+        await ModelCatalogCache.get_models(client)
+        client.get_all_models.return_value = [_model(1, "A"), _model(2, "B")]
+        _age_snapshot(cache_module.MODEL_CATALOG_REFRESH_AFTER + 0.1)
+
+        models = await ModelCatalogCache.get_models(client)
+
+        # Старый снимок отдан сразу, обновление идёт в фоне
+        assert [m.id for m in models] == [1]
+        await ModelCatalogCache._refresh_task
+        assert [m.id for m in await ModelCatalogCache.get_models(client)] == [1, 2]
+        assert client.get_all_models.await_count == 2
+
+    async def test_background_refresh_failure_keeps_snapshot(self):
+        client = _client([_model(1, "A")])
+        await ModelCatalogCache.get_models(client)
+        client.get_all_models.side_effect = Exception("data api down")
+        _age_snapshot(cache_module.MODEL_CATALOG_REFRESH_AFTER + 0.1)
+
+        await ModelCatalogCache.get_models(client)
+        await ModelCatalogCache._refresh_task
+
+        assert [m.id for m in await ModelCatalogCache.get_models(client)] == [1]
+
+    async def test_snapshot_older_than_max_staleness_fetched_synchronously(self):
+        client = _client([_model(1, "A")])
+        await ModelCatalogCache.get_models(client)
+        client.get_all_models.return_value = [_model(2, "B")]
+        _age_snapshot(cache_module.MODEL_CATALOG_MAX_STALENESS + 0.1)
+
+        models = await ModelCatalogCache.get_models(client)
+
+        assert [m.id for m in models] == [2]
+
+    async def test_concurrent_cold_callers_share_one_fetch(self):
+        client = _client([_model(1, "A")])
+
+        async def slow_fetch(**kwargs):
+            await asyncio.sleep(0.01)
+            return [_model(1, "A")]
+
+        client.get_all_models.side_effect = slow_fetch
+
+        results = await asyncio.gather(
+            *(ModelCatalogCache.get_models(client) for _ in range(5))
+        )
+
+        assert all([m.id for m in r] == [1] for r in results)
+        assert client.get_all_models.await_count == 1
+
+    async def test_mark_unavailable_hides_model_immediately(self):
+        client = _client([_model(1, "A"), _model(2, "B")])
+        await ModelCatalogCache.get_models(client)
+
+        ModelCatalogCache.mark_unavailable(1, 3600)
+
+        assert [m.id for m in await ModelCatalogCache.get_models(client)] == [2]
+        assert client.get_all_models.await_count == 1
+
+    async def test_local_cooldown_survives_refresh_and_expires(self):
+        client = _client([_model(1, "A"), _model(2, "B")])
+        ModelCatalogCache.mark_unavailable(1, 3600)
+
+        # Data API ещё не увидел cooldown — модель всё равно скрыта
+        assert [m.id for m in await ModelCatalogCache.get_models(client)] == [2]
+
+        ModelCatalogCache._cooldowns[1] = 0.0
+        assert [m.id for m in await ModelCatalogCache.get_models(client)] == [1, 2]
+
+    async def test_disabled_when_max_staleness_zero(self):
+        client = _client([_model(1, "A")])
+
+        with patch.object(cache_module, "MODEL_CATALOG_MAX_STALENESS", 0):
+            await ModelCatalogCache.get_models(client)
+            await ModelCatalogCache.get_models(client)
+
+        assert client.get_all_models.await_count == 2
+
+    async def test_shutdown_cancels_background_refresh(self):
+        client = _client([_model(1, "A")])
+        await ModelCatalogCache.get_models(client)
+
+        async def hang(**kwargs):
+            await asyncio.sleep(10)
+
+        client.get_all_models.side_effect = hang
+        _age_snapshot(cache_module.MODEL_CATALOG_REFRESH_AFTER + 0.1)
+        await ModelCatalogCache.get_models(client)
+        task = ModelCatalogCache._refresh_task
+
+        await ModelCatalogCache.shutdown()
+
+        assert task.cancelled()
+
+
+@pytest.mark.unit
+class TestProcessPromptCatalogWriteThrough:
+    """user-003: cooldown из ProcessPromptUseCase сразу применяется к кешу."""
+
+    @patch.dict(os.environ, {"HUGGINGFACE_API_KEY": "test_key"})
+    @patch("app.application.use_cases.process_prompt.ProviderRegistry")
+    async def test_rate_limited_model_dropped_for_next_prompt(
+        self, mock_registry, mock_data_api_client
+    ):
+        mock_registry.get_api_key_env.return_value = "HUGGINGFACE_API_KEY"
+        mock_registry.supports_response_format.return_value = True
+        limited = AsyncMock()
+        limited.generate.side_effect = RateLimitError("429", retry_after_seconds=600)
+        healthy = AsyncMock()
+        healthy.generate.return_value = "ok"
+        mock_registry.get_provider.side_effect = [limited, healthy, healthy]
+        mock_data_api_client.get_all_models.return_value = [
+            _model(1, "Limited"),
+            _model(2, "Healthy"),
+        ]
+        use_case = ProcessPromptUseCase(mock_data_api_client)
+
+        first = await use_case.execute(PromptRequest(user_id="u", prompt_text="hi"))
+        second = await use_case.execute(PromptRequest(user_id="u", prompt_text="hi"))
+
+        assert first.fallback_used is True
+        assert second.selected_model_name == "Healthy"
+        assert second.attempts == 1
+        assert second.fallback_used is False
+        mock_data_api_client.get_all_models.assert_awaited_once()
+
+    async def test_permanent_error_cooldown_written_through(self, mock_data_api_client):
+        use_case = ProcessPromptUseCase(mock_data_api_client)
+
+        await use_case._handle_transient_error(
+            _model(7, "Broken"), AuthenticationError("Invalid API key"), time.time()
+        )
+
+        assert 7 in ModelCatalogCache._cooldowns
+        outcome = mock_data_api_client.record_outcome.await_args.kwargs
+        assert outcome["cooldown"]["retry_after_seconds"] == 86400
@@ -81,7 +81,7 @@ class TestOllamaGemma4E2B:
         mock_response.raise_for_status = MagicMock()
 
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.post = AsyncMock(
+            mock_client.return_value.post = AsyncMock(
                 return_value=mock_response
             )
             result = await provider.generate("Test prompt")
@@ -99,7 +99,7 @@ class TestOllamaGemma4E2B:
         mock_response.status_code = 200
 
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
             result = await provider.health_check()
@@ -114,7 +114,7 @@ class TestOllamaGemma4E2B:
         provider = OllamaGemma4E2B(api_key="ollama")
 
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 side_effect=httpx.ConnectError("Connection refused")
             )
             result = await provider.health_check()
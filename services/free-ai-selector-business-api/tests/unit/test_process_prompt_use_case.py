@@ -127,7 +127,8 @@ class TestProcessPromptUseCase:
         assert response.success is True
         assert response.response_text == "Generated response"
         assert response.selected_model_name == "HuggingFace Test Model"
-        mock_data_api_client.increment_success.assert_called_once()
+        mock_data_api_client.record_outcome.assert_called_once()
+        assert mock_data_api_client.record_outcome.call_args.kwargs["result"] == "success"
         # F008: Verify provider was fetched from registry
         mock_registry.get_provider.assert_called_with("HuggingFace")
 
@@ -707,10 +708,10 @@ class TestF014ErrorHandlingConsolidation:
         # Verify set_availability was called (even though it failed)
         mock_data_api_client.set_availability.assert_called_once()
 
-    async def test_handle_transient_error_calls_increment_failure(
+    async def test_handle_transient_error_records_failure_outcome(
         self, mock_data_api_client
     ):
-        """Test that _handle_transient_error calls increment_failure (F014)."""
+        """Test that _handle_transient_error records a failure outcome (F014, user-010)."""
         import time
 
         from app.domain.exceptions import ServerError
@@ -729,22 +730,25 @@ class TestF014ErrorHandlingConsolidation:
 
         await use_case._handle_transient_error(model, error, start_time)
 
-        # Verify increment_failure was called
-        mock_data_api_client.increment_failure.assert_called_once()
-        call_args = mock_data_api_client.increment_failure.call_args
+        # Verify one failure outcome, without cooldown
+        mock_data_api_client.record_outcome.assert_called_once()
+        call_args = mock_data_api_client.record_outcome.call_args
         assert call_args[1]["model_id"] == 1
+        assert call_args[1]["result"] == "failure"
+        assert call_args[1]["cooldown"] is None
+        mock_data_api_client.increment_failure.assert_not_called()
         # response_time should be approximately 1.5 seconds
         assert 1.4 < call_args[1]["response_time"] < 2.0
 
-    async def test_handle_transient_error_handles_increment_failure_error(
+    async def test_handle_transient_error_handles_record_outcome_error(
         self, mock_data_api_client, caplog
     ):
-        """Test that _handle_transient_error gracefully handles increment_failure errors (F014)."""
+        """Test that _handle_transient_error gracefully handles record_outcome errors (F014)."""
         import time
 
         from app.domain.exceptions import TimeoutError
 
-        mock_data_api_client.increment_failure.side_effect = Exception("API Error")
+        mock_data_api_client.record_outcome.side_effect = Exception("API Error")
 
         use_case = ProcessPromptUseCase(mock_data_api_client)
         model = AIModelInfo(
@@ -761,8 +765,8 @@ class TestF014ErrorHandlingConsolidation:
         # Should not raise, error is logged
         await use_case._handle_transient_error(model, error, start_time)
 
-        # Verify increment_failure was called (even though it failed)
-        mock_data_api_client.increment_failure.assert_called_once()
+        # Verify record_outcome was called (even though it failed)
+        mock_data_api_client.record_outcome.assert_called_once()
 
     async def test_handle_transient_error_works_with_various_exception_types(
         self, mock_data_api_client
@@ -797,14 +801,14 @@ class TestF014ErrorHandlingConsolidation:
         ]
 
         for error in error_types:
-            mock_data_api_client.increment_failure.reset_mock()
-            mock_data_api_client.set_availability.reset_mock()
+            mock_data_api_client.record_outcome.reset_mock()
             start_time = time.time()
 
             await use_case._handle_transient_error(model, error, start_time)
 
-            # Each error type should trigger increment_failure
-            mock_data_api_client.increment_failure.assert_called_once()
+            # Each error type should record one failure outcome
+            mock_data_api_client.record_outcome.assert_called_once()
+            assert mock_data_api_client.record_outcome.call_args[1]["result"] == "failure"
 
 
 @pytest.mark.unit
@@ -812,7 +816,7 @@ class TestF023Cooldown:
     """Test F023: Cooldown для AuthenticationError и ValidationError."""
 
     async def test_authentication_error_triggers_cooldown(self, mock_data_api_client):
-        """TRQ-001: AuthenticationError -> set_availability(86400)."""
+        """TRQ-001: AuthenticationError -> failure outcome with cooldown 86400."""
         import time
 
         from app.domain.exceptions import AuthenticationError
@@ -831,17 +835,22 @@ class TestF023Cooldown:
 
         await use_case._handle_transient_error(model, error, start_time)
 
-        mock_data_api_client.set_availability.assert_called_once_with(
+        mock_data_api_client.record_outcome.assert_called_once_with(
             model_id=1,
-            retry_after_seconds=86400,
-            reason="permanent_error",
-            error_type="AuthenticationError",
-            source="process_prompt",
+            result="failure",
+            response_time=pytest.approx(0.0, abs=0.5),
+            cooldown={
+                "retry_after_seconds": 86400,
+                "reason": "permanent_error",
+                "error_type": "AuthenticationError",
+                "source": "process_prompt",
+            },
         )
-        mock_data_api_client.increment_failure.assert_called_once()
+        mock_data_api_client.set_availability.assert_not_called()
+        mock_data_api_client.increment_failure.assert_not_called()
 
     async def test_validation_error_triggers_cooldown(self, mock_data_api_client):
-        """TRQ-002: ValidationError -> set_availability(86400)."""
+        """TRQ-002: ValidationError -> failure outcome with cooldown 86400."""
         import time
 
         from app.domain.exceptions import ValidationError
@@ -860,14 +869,17 @@ class TestF023Cooldown:
 
         await use_case._handle_transient_error(model, error, start_time)
 
-        mock_data_api_client.set_availability.assert_called_once_with(
+        mock_data_api_client.record_outcome.assert_called_once_with(
             model_id=2,
-            retry_after_seconds=86400,
-            reason="permanent_error",
-            error_type="ValidationError",
-            source="process_prompt",
+            result="failure",
+            response_time=pytest.approx(0.0, abs=0.5),
+            cooldown={
+                "retry_after_seconds": 86400,
+                "reason": "permanent_error",
+                "error_type": "ValidationError",
+                "source": "process_prompt",
+            },
         )
-        mock_data_api_client.increment_failure.assert_called_once()
 
     async def test_server_error_does_not_trigger_cooldown(self, mock_data_api_client):
         """ServerError НЕ должен вызывать cooldown."""
@@ -890,15 +902,16 @@ class TestF023Cooldown:
         await use_case._handle_transient_error(model, error, start_time)
 
         mock_data_api_client.set_availability.assert_not_called()
-        mock_data_api_client.increment_failure.assert_called_once()
+        mock_data_api_client.record_outcome.assert_called_once()
+        assert mock_data_api_client.record_outcome.call_args[1]["cooldown"] is None
 
     async def test_cooldown_failure_does_not_break_flow(self, mock_data_api_client):
-        """TRQ-008: set_availability ошибка не ломает запрос."""
+        """TRQ-008: ошибка записи cooldown не ломает запрос."""
         import time
 
         from app.domain.exceptions import AuthenticationError
 
-        mock_data_api_client.set_availability.side_effect = Exception("Data API down")
+        mock_data_api_client.record_outcome.side_effect = Exception("Data API down")
 
         use_case = ProcessPromptUseCase(mock_data_api_client)
         model = AIModelInfo(
@@ -915,8 +928,7 @@ class TestF023Cooldown:
         # Не должен бросить исключение
         await use_case._handle_transient_error(model, error, start_time)
 
-        mock_data_api_client.set_availability.assert_called_once()
-        mock_data_api_client.increment_failure.assert_called_once()
+        mock_data_api_client.record_outcome.assert_called_once()
 
 
 @pytest.mark.unit
@@ -1523,7 +1535,7 @@ class TestCallerTelemetryRecording:
         response = await use_case.execute(request)
 
         assert response.success is True
-        kwargs = mock_data_api_client.create_history.await_args.kwargs
+        kwargs = mock_data_api_client.record_outcome.await_args.kwargs["history"]
         assert kwargs["caller"] == "sensedar"
         assert kwargs["http_status"] == 200
         assert kwargs["requested_model"] == "HuggingFace Test Model"
@@ -0,0 +1,284 @@
+"""Tests for user-006: SSE streaming (providers, use case, endpoint)."""
+
+import json
+import os
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.api.deps import get_data_api_client
+from app.application.use_cases.process_prompt import ProcessPromptUseCase
+from app.domain.exceptions import AllProvidersRateLimited, ProviderError
+from app.domain.models import AIModelInfo, PromptRequest, PromptStreamEvent
+from app.infrastructure.ai_providers.base import AIProviderBase, iter_sse_data
+from app.infrastructure.ai_providers.cloudflare import CloudflareProvider
+from app.infrastructure.ai_providers.groq import GroqProvider
+from app.main import app
+
+
+def _sse_client(body: bytes, status_code: int = 200, seen: list = None):
+    def handler(request: httpx.Request) -> httpx.Response:
+        if seen is not None:
+            seen.append(json.loads(request.content))
+        return httpx.Response(
+            status_code, content=body, headers={"content-type": "text/event-stream"}
+        )
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+async def _collect(stream) -> list:
+    return [item async for item in stream]
+
+
+def _openai_chunk(text: str) -> str:
+    return "data: " + json.dumps({"choices": [{"delta": {"content": text}}]}) + "\n\n"
+
+
+@pytest.mark.unit
+class TestIterSseData:
+    """user-006: разбор text/event-stream."""
+
+    async def test_events_comments_and_done(self):
+        body = b": keep-alive\n\ndata: one\n\nevent: x\ndata: two\ndata: lines\n\ndata: [DONE]\n\ndata: after\n\n"
+        async with _sse_client(body) as client:
+            async with client.stream("GET", "http://test") as response:
+                payloads = await _collect(iter_sse_data(response))
+
+        assert payloads == ["one", "two\nlines"]
+
+    async def test_last_event_without_blank_line(self):
+        async with _sse_client(b"data: tail") as client:
+            async with client.stream("GET", "http://test") as response:
+                assert await _collect(iter_sse_data(response)) == ["tail"]
+
+
+@pytest.mark.unit
+class TestProviderStreaming:
+    """user-006: stream() у OpenAI-совместимых провайдеров и Cloudflare."""
+
+    async def test_openai_compatible_stream_sends_stream_true(self):
+        seen: list = []
+        body = (_openai_chunk("Hel") + _openai_chunk("lo") + "data: [DONE]\n\n").encode()
+        provider = GroqProvider(api_key="key")
+        provider._client = _sse_client(body, seen=seen)
+
+        chunks = await _collect(provider.stream("hi", system_prompt="be brief"))
+
+        assert chunks == ["Hel", "lo"]
+        assert seen[0]["stream"] is True
+        assert seen[0]["messages"][0]["role"] == "system"
+
+    async def test_openai_compatible_stream_http_error_is_raised(self):
+        provider = GroqProvider(api_key="key")
+        provider._client = _sse_client(b'{"error": "rate"}', status_code=429)
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await _collect(provider.stream("hi"))
+
+    async def test_openai_compatible_stream_error_chunk(self):
+        body = b'data: {"error": {"message": "overloaded"}}\n\n'
+        provider = GroqProvider(api_key="key")
+        provider._client = _sse_client(body)
+
+        with pytest.raises(ProviderError, match="stream error"):
+            await _collect(provider.stream("hi"))
+
+    async def test_cloudflare_stream_parses_response_chunks(self):
+        seen: list = []
+        body = b'data: {"response":"Pri"}\n\ndata: {"response":"vet"}\n\ndata: [DONE]\n\n'
+        provider = CloudflareProvider(api_token="tok", account_id="acc")
+        provider._client = _sse_client(body, seen=seen)
+
+        assert await _collect(provider.stream("hi")) == ["Pri", "vet"]
+        assert seen[0]["stream"] is True
+
+    async def test_default_stream_yields_full_answer(self):
+        class WholeAnswerProvider(AIProviderBase):
+            async def generate(self, prompt: str, **kwargs) -> str:
+                return "whole"
+
+            async def health_check(self) -> bool:
+                return True
+
+            def get_provider_name(self) -> str:
+                return "Whole"
+
+        assert await _collect(WholeAnswerProvider().stream("hi")) == ["whole"]
+
+
+def _model(model_id: int, provider: str, score: float) -> AIModelInfo:
+    return AIModelInfo(
+        id=model_id,
+        name=f"{provider} Model",
+        provider=provider,
+        api_endpoint="https://api.test.com",
+        reliability_score=score,
+        is_active=True,
+        effective_reliability_score=score,
+        recent_request_count=0,
+        decision_reason="fallback",
+    )
+
+
+def _streaming_provider(chunks=(), error_at=None, error=None):
+    async def stream(*args, **kwargs):
+        for index, chunk in enumerate(chunks):
+            if error_at == index:
+                raise error
+            yield chunk
+        if error is not None and error_at is None:
+            raise error
+
+    provider = AsyncMock()
+    provider.stream = stream
+    return provider
+
+
+@pytest.fixture
+def stream_providers(mock_data_api_client):
+    mock_data_api_client.get_all_models.return_value = [
+        _model(1, "First", 0.9),
+        _model(2, "Second", 0.8),
+    ]
+    providers = {}
+    with patch.dict(os.environ, {"TEST_API_KEY": "key"}), patch(
+        "app.application.use_cases.process_prompt.ProviderRegistry"
+    ) as mock_registry:
+        mock_registry.get_api_key_env.return_value = "TEST_API_KEY"
+        mock_registry.get_provider.side_effect = lambda name: providers[name]
+        yield providers
+
+
+@pytest.mark.unit
+class TestExecuteStream:
+    """user-006: fallback до первого токена, фиксация после."""
+
+    async def test_falls_back_before_first_token(
+        self, stream_providers, mock_data_api_client
+    ):
+        stream_providers["First"] = _streaming_provider(
+            error=httpx.HTTPStatusError(
+                "429",
+                request=httpx.Request("POST", "http://x"),
+                response=httpx.Response(429),
+            )
+        )
+        stream_providers["Second"] = _streaming_provider(chunks=["Hel", "lo"])
+        use_case = ProcessPromptUseCase(mock_data_api_client)
+
+        events = await _collect(
+            use_case.execute_stream(PromptRequest(user_id="u", prompt_text="hi"))
+        )
+
+        assert [e.event for e in events] == ["start", "token", "token", "done"]
+        assert "".join(e.data["text"] for e in events if e.event == "token") == "Hello"
+        assert events[0].data["selected_model"] == "Second Model"
+        assert events[-1].data["fallback_used"] is True
+        assert events[-1].data["attempts"] == 2
+        mock_data_api_client.set_availability.assert_awaited_once()
+        outcome = mock_data_api_client.record_outcome.call_args.kwargs
+        assert outcome["history"]["response_text"] == "Hello"
+        assert outcome["history"]["success"] is True
+        assert outcome["model_id"] == 2
+
+    async def test_empty_stream_falls_back(self, stream_providers, mock_data_api_client):
+        stream_providers["First"] = _streaming_provider(chunks=[])
+        stream_providers["Second"] = _streaming_provider(chunks=["ok"])
+        use_case = ProcessPromptUseCase(mock_data_api_client)
+
+        events = await _collect(
+            use_case.execute_stream(PromptRequest(user_id="u", prompt_text="hi"))
+        )
+
+        assert events[0].data["provider"] == "Second"
+        outcomes = mock_data_api_client.record_outcome.await_args_list
+        assert [c.kwargs["result"] for c in outcomes] == ["failure", "success"]
+
+    async def test_mid_stream_failure_emits_error_event(
+        self, stream_providers, mock_data_api_client
+    ):
+        stream_providers["First"] = _streaming_provider(
+            chunks=["par", "tial"], error_at=1, error=ProviderError("connection reset")
+        )
+        stream_providers["Second"] = _streaming_provider(chunks=["unused"])
+        use_case = ProcessPromptUseCase(mock_data_api_client)
+
+        events = await _collect(
+            use_case.execute_stream(PromptRequest(user_id="u", prompt_text="hi"))
+        )
+
+        assert [e.event for e in events] == ["start", "token", "error"]
+        assert events[-1].data["error"] == "stream_interrupted"
+        history = mock_data_api_client.create_history.call_args.kwargs
+        assert history["success"] is False
+        assert history["response_text"] == "par"
+        mock_data_api_client.record_outcome.assert_awaited_once()
+        assert mock_data_api_client.record_outcome.await_args.kwargs["result"] == "failure"
+
+    async def test_all_fail_before_first_token_raises(
+        self, stream_providers, mock_data_api_client
+    ):
+        stream_providers["First"] = _streaming_provider(chunks=[])
+        stream_providers["Second"] = _streaming_provider(chunks=[])
+        use_case = ProcessPromptUseCase(mock_data_api_client)
+
+        with pytest.raises(Exception, match="All AI providers failed"):
+            await _collect(
+                use_case.execute_stream(PromptRequest(user_id="u", prompt_text="hi"))
+            )
+
+
+@pytest.mark.unit
+class TestStreamEndpoint:
+    """user-006: POST /api/v1/prompts/process/stream."""
+
+    async def _post(self, fake_stream):
+        use_case = AsyncMock()
+        use_case.execute_stream = fake_stream
+        with patch.dict(
+            app.dependency_overrides, {get_data_api_client: lambda: AsyncMock()}
+        ), patch("app.api.v1.prompts.ProcessPromptUseCase", return_value=use_case):
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                return await client.post(
+                    "/api/v1/prompts/process/stream", json={"prompt": "hi"}
+                )
+
+    async def test_streams_sse_events(self):
+        async def fake_stream(prompt_request):
+            yield PromptStreamEvent(event="start", data={"selected_model": "M"})
+            yield PromptStreamEvent(event="token", data={"text": "Привет"})
+            yield PromptStreamEvent(event="done", data={"attempts": 1})
+
+        response = await self._post(fake_stream)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert "event: token\ndata: {\"text\": \"Привет\"}\n\n" in response.text
+        assert response.text.index("event: start") < response.text.index("event: done")
+
+    async def test_rate_limited_before_first_token_returns_429(self):
+        async def fake_stream(prompt_request):
+            raise AllProvidersRateLimited(
+                retry_after_seconds=30, attempts=2, providers_tried=2
+            )
+            yield  # pragma: no cover
+
+        response = await self._post(fake_stream)
+
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "30"
+        assert response.json()["error"] == "all_rate_limited"
+
+    async def test_failure_before_first_token_returns_500(self):
+        async def fake_stream(prompt_request):
+            raise Exception("All AI providers failed. Last error: boom")
+            yield  # pragma: no cover
+
+        response = await self._post(fake_stream)
+
+        assert response.status_code == 500
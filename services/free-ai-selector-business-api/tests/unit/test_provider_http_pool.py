@@ -0,0 +1,109 @@
+"""
+Unit tests for pooled provider HTTP clients (user-001).
+
+Each provider instance must reuse one long-lived httpx.AsyncClient across
+generate/health_check calls, and ProviderRegistry must close them on shutdown.
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from app.infrastructure.ai_providers.cloudflare import CloudflareProvider
+from app.infrastructure.ai_providers.deepseek import DeepSeekProvider
+from app.infrastructure.ai_providers.groq import GroqProvider
+from app.infrastructure.ai_providers.ollama import OllamaGemma4E2B
+from app.infrastructure.ai_providers.registry import ProviderRegistry
+
+
+def _ok_response(payload: dict) -> MagicMock:
+    response = MagicMock()
+    response.status_code = 200
+    response.raise_for_status = MagicMock()
+    response.json.return_value = payload
+    return response
+
+
+@pytest.mark.unit
+class TestProviderClientPool:
+    """Provider instances hold one pooled client."""
+
+    async def test_client_reused_across_generate_calls(self):
+        provider = DeepSeekProvider(api_key="test-key")
+        response = _ok_response({"choices": [{"message": {"content": "ok"}}]})
+
+        with patch("httpx.AsyncClient") as mock_client:
+            mock_client.return_value.is_closed = False
+            mock_client.return_value.post = AsyncMock(return_value=response)
+            await provider.generate("one")
+            await provider.generate("two")
+            await provider.health_check()
+
+        assert mock_client.call_count == 1
+        assert mock_client.return_value.post.await_count == 2
+
+    async def test_client_configured_with_limits_and_timeout(self):
+        provider = GroqProvider(api_key="test-key")
+        client = provider._get_client()
+
+        pool = client._transport._pool
+        assert pool._max_connections == GroqProvider.HTTP_MAX_CONNECTIONS
+        assert pool._max_keepalive_connections == 20
+        assert client.timeout.read == GroqProvider.TIMEOUT
+        await provider.aclose()
+
+    def test_ollama_uses_small_pool_without_http2(self):
+        provider = OllamaGemma4E2B(api_key="ollama")
+        assert provider.HTTP_MAX_CONNECTIONS == 4
+        assert provider.HTTP2 is False
+
+    def test_http2_disabled_without_env_flag(self):
+        provider = DeepSeekProvider(api_key="test-key")
+        with patch("httpx.AsyncClient") as mock_client:
+            provider._get_client()
+        assert mock_client.call_args.kwargs["http2"] is False
+
+    async def test_aclose_recreates_client_on_next_use(self):
+        provider = DeepSeekProvider(api_key="test-key")
+        first = provider._get_client()
+
+        await provider.aclose()
+
+        assert first.is_closed
+        second = provider._get_client()
+        assert second is not first
+        await provider.aclose()
+
+    async def test_cloudflare_health_check_uses_pooled_client(self):
+        provider = CloudflareProvider(api_token="tok", account_id="acc")
+        response = MagicMock()
+        response.status_code = 200
+
+        with patch("httpx.AsyncClient") as mock_client:
+            mock_client.return_value.get = AsyncMock(return_value=response)
+            assert await provider.health_check() is True
+
+        kwargs = mock_client.return_value.get.call_args.kwargs
+        assert kwargs["timeout"] == 10.0
+
+
+@pytest.mark.unit
+class TestRegistryClientOwnership:
+    """ProviderRegistry closes provider clients on shutdown."""
+
+    async def test_aclose_all_closes_every_instance(self):
+        ProviderRegistry.reset()
+        first = MagicMock()
+        first.aclose = AsyncMock(side_effect=httpx.HTTPError("boom"))
+        second = MagicMock()
+        second.aclose = AsyncMock()
+        ProviderRegistry._instances.update({"A": first, "B": second})
+
+        try:
+            await ProviderRegistry.aclose_all()
+        finally:
+            ProviderRegistry.reset()
+
+        first.aclose.assert_awaited_once()
+        second.aclose.assert_awaited_once()
@@ -0,0 +1,176 @@
+"""Tests for user-005: race routing (fan out to the top-K candidates)."""
+
+import asyncio
+import os
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from pydantic import ValidationError as PydanticValidationError
+
+from app.api.deps import get_data_api_client
+from app.api.v1.schemas import ProcessPromptRequest
+from app.application.services.circuit_breaker import CircuitBreakerManager
+from app.application.use_cases import process_prompt as process_prompt_module
+from app.application.use_cases.process_prompt import ProcessPromptUseCase
+from app.domain.models import AIModelInfo, PromptRequest
+from app.main import app
+
+
+def _model(model_id: int, provider: str, score: float) -> AIModelInfo:
+    return AIModelInfo(
+        id=model_id,
+        name=f"{provider} Model",
+        provider=provider,
+        api_endpoint="https://api.test.com",
+        reliability_score=score,
+        is_active=True,
+        effective_reliability_score=score,
+        recent_request_count=0,
+        decision_reason="fallback",
+    )
+
+
+def _provider(delay: float = 0.0, text: str = "ok"):
+    async def generate(*args, **kwargs):
+        await asyncio.sleep(delay)
+        return text
+
+    provider = AsyncMock()
+    provider.generate = AsyncMock(side_effect=generate)
+    return provider
+
+
+@pytest.fixture
+def providers(mock_data_api_client):
+    """Четыре кандидата по убыванию score: A, B, C, D."""
+    mock_data_api_client.get_all_models.return_value = [
+        _model(1, "A", 0.9),
+        _model(2, "B", 0.8),
+        _model(3, "C", 0.7),
+        _model(4, "D", 0.6),
+    ]
+    registry_providers = {}
+    with patch.dict(os.environ, {"TEST_API_KEY": "key"}), patch(
+        "app.application.use_cases.process_prompt.ProviderRegistry"
+    ) as mock_registry:
+        mock_registry.get_api_key_env.return_value = "TEST_API_KEY"
+        mock_registry.supports_response_format.return_value = True
+        mock_registry.get_provider.side_effect = lambda name: registry_providers[name]
+        yield registry_providers
+
+
+def _race_request(**kwargs) -> PromptRequest:
+    return PromptRequest(user_id="u", prompt_text="hi", routing="race", **kwargs)
+
+
+@pytest.mark.unit
+class TestRaceRouting:
+    """user-005: первый валидный ответ из top-K."""
+
+    async def test_fastest_of_top_k_wins_and_losers_are_neutral(
+        self, providers, mock_data_api_client
+    ):
+        providers["A"] = _provider(delay=5.0, text="a")
+        providers["B"] = _provider(delay=5.0, text="b")
+        providers["C"] = _provider(delay=0.0, text="c")
+        providers["D"] = _provider(text="d")
+        use_case = ProcessPromptUseCase(mock_data_api_client)
+
+        response = await asyncio.wait_for(
+            use_case.execute(_race_request(race_width=3)), 2.0
+        )
+
+        assert response.response_text == "c"
+        assert response.attempts == 3
+        assert response.fallback_used is True
+        providers["D"].generate.assert_not_called()
+        mock_data_api_client.record_outcome.assert_awaited_once()
+        assert mock_data_api_client.record_outcome.call_args.kwargs["model_id"] == 3
+        mock_data_api_client.increment_failure.assert_not_called()
+        assert CircuitBreakerManager.get_all_statuses() == {}
+        mock_data_api_client.create_history.assert_not_called()
+
+    async def test_invalid_json_does_not_win(self, providers, mock_data_api_client):
+        providers["A"] = _provider(delay=0.0, text="not json at all")
+        providers["B"] = _provider(delay=0.05, text='{"ok": true}')
+        providers["C"] = _provider(delay=5.0, text="{}")
+        use_case = ProcessPromptUseCase(mock_data_api_client)
+
+        response = await asyncio.wait_for(
+            use_case.execute(
+                _race_request(race_width=3, response_format={"type": "json_object"})
+            ),
+            2.0,
+        )
+
+        assert response.selected_model_name == "B Model"
+        assert '"ok"' in response.response_text
+
+    async def test_failed_slot_is_refilled_from_remaining_candidates(
+        self, providers, mock_data_api_client
+    ):
+        providers["A"] = _provider(delay=0.0, text="   ")
+        providers["B"] = _provider(delay=5.0, text="b")
+        providers["C"] = _provider(delay=0.05, text="c")
+        use_case = ProcessPromptUseCase(mock_data_api_client)
+
+        response = await asyncio.wait_for(
+            use_case.execute(_race_request(race_width=2)), 2.0
+        )
+
+        assert response.response_text == "c"
+        assert response.attempts == 3
+
+    def test_race_width_is_clamped(self, mock_data_api_client):
+        use_case = ProcessPromptUseCase(mock_data_api_client)
+
+        assert use_case._routing_parallelism("race", None) == (
+            process_prompt_module.RACE_DEFAULT_WIDTH,
+            process_prompt_module.RACE_DEFAULT_WIDTH,
+        )
+        with patch.object(process_prompt_module, "RACE_MAX_WIDTH", 2):
+            assert use_case._routing_parallelism("race", 5) == (2, 2)
+        with patch.object(process_prompt_module, "RACE_MAX_WIDTH", 8):
+            assert use_case._routing_parallelism("race", 7) == (7, 7)
+        assert use_case._routing_parallelism("sequential", 5) == (1, 1)
+
+
+@pytest.mark.unit
+class TestRaceRoutingApi:
+    """user-005: routing/race_width в POST /api/v1/prompts/process."""
+
+    def test_race_width_bounds(self):
+        assert ProcessPromptRequest(prompt="hi", routing="race", race_width=3).race_width == 3
+        # Верхняя граница — RACE_MAX_WIDTH сервера, её применяет use case (clamp)
+        assert ProcessPromptRequest(prompt="hi", routing="race", race_width=8).race_width == 8
+        with pytest.raises(PydanticValidationError):
+            ProcessPromptRequest(prompt="hi", routing="race", race_width=0)
+
+    async def test_endpoint_passes_routing_to_use_case(self):
+        mock_response = MagicMock(
+            prompt_text="hi",
+            response_text="ok",
+            selected_model_name="M",
+            selected_model_provider="P",
+            response_time=1,
+            success=True,
+            attempts=3,
+            fallback_used=True,
+        )
+        with patch.dict(
+            app.dependency_overrides, {get_data_api_client: lambda: AsyncMock()}
+        ), patch("app.api.v1.prompts.ProcessPromptUseCase") as MockUC:
+            MockUC.return_value.execute = AsyncMock(return_value=mock_response)
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                response = await client.post(
+                    "/api/v1/prompts/process",
+                    json={"prompt": "hi", "routing": "race", "race_width": 3},
+                )
+
+        assert response.status_code == 200
+        prompt_request = MockUC.return_value.execute.call_args.args[0]
+        assert prompt_request.routing == "race"
+        assert prompt_request.race_width == 3
@@ -0,0 +1,206 @@
+"""Tests for user-008: Request coalescing (single-flight)."""
+
+import asyncio
+import os
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.application.services.request_coalescer import RequestCoalescer
+from app.application.use_cases import process_prompt as process_prompt_module
+from app.application.use_cases.process_prompt import ProcessPromptUseCase
+from app.domain.models import AIModelInfo, PromptRequest
+
+
+@pytest.mark.unit
+class TestRequestCoalescer:
+    """user-008: лидер выполняет работу, дубликаты ждут результат."""
+
+    async def test_concurrent_duplicates_share_one_call(self):
+        calls = 0
+        release = asyncio.Event()
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return "answer"
+
+        tasks = [asyncio.create_task(RequestCoalescer.run("k", work)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert calls == 1
+        assert [r[0] for r in results] == ["answer"] * 3
+        assert sorted(r[1] for r in results) == [False, True, True]
+        assert RequestCoalescer.in_flight() == 0
+
+    async def test_leader_exception_propagates_to_followers(self):
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            raise ValueError("boom")
+
+        tasks = [asyncio.create_task(RequestCoalescer.run("k", work)) for _ in range(2)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        assert all(isinstance(r, ValueError) for r in results)
+
+    async def test_cancelled_leader_hands_over_to_follower(self):
+        started = asyncio.Event()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                started.set()
+                await asyncio.sleep(10)
+            return "second try"
+
+        leader = asyncio.create_task(RequestCoalescer.run("k", work))
+        await started.wait()
+        follower = asyncio.create_task(RequestCoalescer.run("k", work))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await follower == ("second try", False)
+        assert calls == 2
+
+    async def test_sequential_calls_are_not_coalesced(self):
+        work = AsyncMock(return_value="x")
+
+        await RequestCoalescer.run("k", work)
+        await RequestCoalescer.run("k", work)
+
+        assert work.await_count == 2
+
+
+def _model() -> AIModelInfo:
+    return AIModelInfo(
+        id=1,
+        name="HuggingFace Test Model",
+        provider="HuggingFace",
+        api_endpoint="https://api.test.com",
+        reliability_score=0.9,
+        is_active=True,
+        effective_reliability_score=0.9,
+        recent_request_count=0,
+        decision_reason="fallback",
+    )
+
+
+@pytest.fixture
+def slow_provider(mock_data_api_client):
+    """Провайдер, отвечающий только после release.set()."""
+    mock_data_api_client.get_all_models.return_value = [_model()]
+    release = asyncio.Event()
+    provider = AsyncMock()
+
+    async def generate(*args, **kwargs):
+        await release.wait()
+        return "shared answer"
+
+    provider.generate.side_effect = generate
+    with patch.dict(os.environ, {"HUGGINGFACE_API_KEY": "test_key"}), patch(
+        "app.application.use_cases.process_prompt.ProviderRegistry"
+    ) as mock_registry:
+        mock_registry.get_provider.return_value = provider
+        mock_registry.get_api_key_env.return_value = "HUGGINGFACE_API_KEY"
+        yield provider, release
+
+
+async def _burst(use_case, release, requests):
+    tasks = [asyncio.create_task(use_case.execute(r)) for r in requests]
+    for _ in range(5):
+        await asyncio.sleep(0)
+    release.set()
+    return await asyncio.gather(*tasks, return_exceptions=True)
+
+
+@pytest.mark.unit
+class TestProcessPromptCoalescing:
+    """user-008: один вызов провайдера, история на каждый запрос."""
+
+    async def test_burst_makes_one_provider_call(self, slow_provider, mock_data_api_client):
+        provider, release = slow_provider
+        use_case = ProcessPromptUseCase(mock_data_api_client)
+        callers = ["sensedar", "taro", "sensedar"]
+
+        responses = await _burst(
+            use_case,
+            release,
+            [PromptRequest(user_id="u", prompt_text="hi", caller=c) for c in callers],
+        )
+
+        assert [r.response_text for r in responses] == ["shared answer"] * 3
+        assert provider.generate.await_count == 1
+        mock_data_api_client.record_outcome.assert_awaited_once()
+        history_callers = [
+            call.kwargs["caller"]
+            for call in mock_data_api_client.create_history.await_args_list
+        ] + [mock_data_api_client.record_outcome.await_args.kwargs["history"]["caller"]]
+        assert sorted(history_callers) == sorted(callers)
+
+    async def test_different_prompts_not_coalesced(
+        self, slow_provider, mock_data_api_client
+    ):
+        provider, release = slow_provider
+        use_case = ProcessPromptUseCase(mock_data_api_client)
+
+        await _burst(
+            use_case,
+            release,
+            [
+                PromptRequest(user_id="u", prompt_text="first"),
+                PromptRequest(user_id="u", prompt_text="second"),
+            ],
+        )
+
+        assert provider.generate.await_count == 2
+
+    async def test_failed_leader_fails_every_duplicate_with_own_history(
+        self, slow_provider, mock_data_api_client
+    ):
+        provider, release = slow_provider
+
+        async def failing(*args, **kwargs):
+            await release.wait()
+            raise Exception("provider down")
+
+        provider.generate.side_effect = failing
+        use_case = ProcessPromptUseCase(mock_data_api_client)
+
+        results = await _burst(
+            use_case,
+            release,
+            [PromptRequest(user_id="u", prompt_text="hi", caller=c) for c in ("a", "b")],
+        )
+
+        assert all(isinstance(r, Exception) for r in results)
+        assert provider.generate.await_count == 1
+        mock_data_api_client.record_outcome.assert_awaited_once()
+        assert mock_data_api_client.record_outcome.await_args.kwargs["result"] == "failure"
+        failed = [
+            call.kwargs
+            for call in mock_data_api_client.create_history.await_args_list
+        ]
+        assert sorted(h["caller"] for h in failed) == ["a", "b"]
+        assert all(h["success"] is False for h in failed)
+
+    async def test_disabled_by_config(self, slow_provider, mock_data_api_client):
+        provider, release = slow_provider
+        use_case = ProcessPromptUseCase(mock_data_api_client)
+
+        with patch.object(process_prompt_module, "REQUEST_COALESCING_ENABLED", False):
+            await _burst(
+                use_case,
+                release,
+                [PromptRequest(user_id="u", prompt_text="hi") for _ in range(2)],
+            )
+
+        assert provider.generate.await_count == 2
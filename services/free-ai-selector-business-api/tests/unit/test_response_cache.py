@@ -0,0 +1,224 @@
+"""Tests for user-007: Exact-match Response Cache."""
+
+import os
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.api.deps import get_data_api_client
+from app.application.services import response_cache as cache_module
+from app.application.services.response_cache import ResponseCache
+from app.application.use_cases.process_prompt import ProcessPromptUseCase
+from app.domain.models import AIModelInfo, PromptRequest, PromptResponse
+from app.main import app
+
+
+def _request(**overrides) -> PromptRequest:
+    fields = {
+        "user_id": "api_user",
+        "prompt_text": "Classify: great product",
+        "system_prompt": "Answer with JSON",
+        "response_format": {"type": "json_object"},
+        "tags": ["json", "fast"],
+        "caller": "sensedar",
+        "use_cache": True,
+    }
+    fields.update(overrides)
+    return PromptRequest(**fields)
+
+
+def _put(key: str, text: str = "ok") -> None:
+    ResponseCache.put(
+        key, response_text=text, model_id=1, model_name="M", model_provider="P"
+    )
+
+
+@pytest.mark.unit
+class TestResponseCache:
+    """user-007: ключ, LRU по памяти и TTL."""
+
+    def test_key_ignores_tag_order_and_routing_fields(self):
+        base = ResponseCache.build_key(_request())
+
+        assert ResponseCache.build_key(_request(tags=["fast", "json"])) == base
+        assert ResponseCache.build_key(_request(caller="taro", routing="race")) == base
+
+    @pytest.mark.parametrize(
+        "override",
+        [
+            {"prompt_text": "Classify: bad product"},
+            {"system_prompt": None},
+            {"response_format": None},
+            {"tags": ["json"]},
+            {"model_name": "Groq Llama"},
+        ],
+    )
+    def test_key_depends_on_every_prompt_field(self, override):
+        assert ResponseCache.build_key(_request(**override)) != ResponseCache.build_key(
+            _request()
+        )
+
+    def test_get_returns_stored_entry(self):
+        _put("k", "answer")
+
+        entry = ResponseCache.get("k")
+
+        assert entry is not None
+        assert entry.response_text == "answer"
+        assert ResponseCache.get("missing") is None
+
+    def test_expired_entry_is_dropped(self):
+        _put("k")
+        ResponseCache._entries["k"].expires_at = 0.0
+
+        assert ResponseCache.get("k") is None
+        assert ResponseCache.stats() == {"entries": 0, "total_bytes": 0}
+
+    def test_least_recently_used_evicted_over_memory_budget(self):
+        entry_size = len("x" * 100) + len("M") + len("P") + cache_module._ENTRY_OVERHEAD_BYTES
+
+        with patch.object(cache_module, "RESPONSE_CACHE_MAX_BYTES", entry_size * 2):
+            _put("a", "x" * 100)
+            _put("b", "x" * 100)
+            ResponseCache.get("a")  # "b" становится LRU
+            _put("c", "x" * 100)
+
+        assert ResponseCache.get("a") is not None
+        assert ResponseCache.get("b") is None
+        assert ResponseCache.get("c") is not None
+        assert ResponseCache.stats()["total_bytes"] == entry_size * 2
+
+    def test_oversized_response_not_cached(self):
+        with patch.object(cache_module, "RESPONSE_CACHE_MAX_BYTES", 300):
+            _put("k", "x" * 1000)
+
+        assert ResponseCache.get("k") is None
+
+    def test_disabled_when_max_bytes_zero(self):
+        with patch.object(cache_module, "RESPONSE_CACHE_MAX_BYTES", 0):
+            _put("k")
+            assert ResponseCache.is_enabled() is False
+
+        assert ResponseCache.get("k") is None
+
+
+@pytest.fixture
+def cached_use_case(mock_data_api_client):
+    """Use case с одной моделью и провайдером-моком."""
+    mock_data_api_client.get_all_models.return_value = [
+        AIModelInfo(
+            id=1,
+            name="HuggingFace Test Model",
+            provider="HuggingFace",
+            api_endpoint="https://api.test.com",
+            reliability_score=0.9,
+            is_active=True,
+            effective_reliability_score=0.9,
+            recent_request_count=0,
+            decision_reason="fallback",
+        )
+    ]
+    provider = AsyncMock()
+    provider.generate.return_value = '{"label": "positive"}'
+    with patch.dict(os.environ, {"HUGGINGFACE_API_KEY": "test_key"}), patch(
+        "app.application.use_cases.process_prompt.ProviderRegistry"
+    ) as mock_registry:
+        mock_registry.get_provider.return_value = provider
+        mock_registry.get_api_key_env.return_value = "HUGGINGFACE_API_KEY"
+        mock_registry.supports_response_format.return_value = True
+        yield ProcessPromptUseCase(mock_data_api_client), provider
+
+
+@pytest.mark.unit
+class TestProcessPromptResponseCache:
+    """user-007: попадание в кеш пропускает провайдера и статистику."""
+
+    async def test_hit_skips_provider_and_stats(
+        self, cached_use_case, mock_data_api_client
+    ):
+        use_case, provider = cached_use_case
+
+        first = await use_case.execute(_request(tags=None))
+        second = await use_case.execute(_request(caller="taro", tags=None))
+
+        assert first.cached is False
+        assert second.cached is True
+        assert second.attempts == 0
+        assert second.response_text == '{"label": "positive"}'
+        assert second.selected_model_name == "HuggingFace Test Model"
+        assert provider.generate.await_count == 1
+        mock_data_api_client.record_outcome.assert_awaited_once()
+
+        history = mock_data_api_client.create_history.await_args.kwargs
+        assert history["cache_hit"] is True
+        assert history["caller"] == "taro"
+        assert history["selected_model_id"] == 1
+        assert history["success"] is True
+
+    async def test_without_opt_in_cache_is_not_used(self, cached_use_case):
+        use_case, provider = cached_use_case
+
+        await use_case.execute(_request(use_cache=False, tags=None))
+        response = await use_case.execute(_request(tags=None))
+
+        assert response.cached is False
+        assert provider.generate.await_count == 2
+
+    async def test_failed_prompt_not_cached(self, cached_use_case):
+        use_case, provider = cached_use_case
+        provider.generate.side_effect = Exception("boom")
+
+        with pytest.raises(Exception):
+            await use_case.execute(_request(tags=None))
+
+        assert ResponseCache.stats()["entries"] == 0
+
+
+@pytest.mark.unit
+class TestResponseCacheEndpoint:
+    """user-007: opt-in через заголовок или поле, cached в ответе."""
+
+    async def _post(self, json_body: dict, headers: dict) -> tuple:
+        use_case = AsyncMock()
+        use_case.execute.return_value = PromptResponse(
+            prompt_text="hi",
+            response_text="ok",
+            selected_model_name="M",
+            selected_model_provider="P",
+            response_time=0,
+            success=True,
+            attempts=0,
+            cached=True,
+        )
+        with patch.dict(
+            app.dependency_overrides, {get_data_api_client: lambda: AsyncMock()}
+        ), patch("app.api.v1.prompts.ProcessPromptUseCase", return_value=use_case):
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                response = await client.post(
+                    "/api/v1/prompts/process", json=json_body, headers=headers
+                )
+        return response, use_case.execute.await_args.args[0]
+
+    async def test_header_opts_in(self):
+        response, prompt_request = await self._post(
+            {"prompt": "hi"}, {"X-Response-Cache": "true"}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["cached"] is True
+        assert prompt_request.use_cache is True
+
+    async def test_body_field_overrides_header(self):
+        _, prompt_request = await self._post(
+            {"prompt": "hi", "cache": False}, {"X-Response-Cache": "1"}
+        )
+
+        assert prompt_request.use_cache is False
+
+    async def test_default_is_off(self):
+        _, prompt_request = await self._post({"prompt": "hi"}, {})
+
+        assert prompt_request.use_cache is False
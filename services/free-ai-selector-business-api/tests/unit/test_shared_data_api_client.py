@@ -0,0 +1,108 @@
+"""user-002: Тесты process-wide DataAPIClient (пул соединений, трейсинг, lifespan)."""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.api.deps import get_data_api_client
+from app.infrastructure.http_clients import data_api_client as data_api_module
+from app.infrastructure.http_clients.data_api_client import DataAPIClient
+from app.main import app, lifespan
+from app.utils.request_id import clear_tracing_context, setup_tracing_context
+
+
+class TestPooledDataAPIClient:
+    """Пул keep-alive соединений и per-call заголовки трейсинга."""
+
+    def test_client_uses_configured_pool_limits(self):
+        """httpx.AsyncClient создаётся с лимитами пула из конфигурации."""
+        with patch("httpx.AsyncClient") as mock_cls:
+            DataAPIClient(base_url="http://test")
+
+        limits = mock_cls.call_args.kwargs["limits"]
+        assert limits.max_connections == data_api_module.DATA_API_MAX_CONNECTIONS
+        assert (
+            limits.max_keepalive_connections
+            == data_api_module.DATA_API_MAX_KEEPALIVE_CONNECTIONS
+        )
+        assert limits.keepalive_expiry == data_api_module.DATA_API_KEEPALIVE_EXPIRY
+
+    def test_tracing_headers_follow_current_request(self):
+        """Общий клиент берёт request_id из текущего контекста, а не из конструктора."""
+        client = DataAPIClient(base_url="http://test")
+        try:
+            setup_tracing_context(request_id="req-a", correlation_id="corr-a")
+            first = client._get_headers()
+            setup_tracing_context(request_id="req-b", correlation_id="corr-b")
+            second = client._get_headers()
+        finally:
+            clear_tracing_context()
+
+        assert first["X-Request-ID"] == "req-a"
+        assert second["X-Request-ID"] == "req-b"
+        assert second["X-Correlation-ID"] == "corr-b"
+
+    async def test_health_returns_status_code(self):
+        """health() отдаёт status_code GET /health через общий пул."""
+        client = DataAPIClient(base_url="http://test")
+        client.client.get = AsyncMock(return_value=MagicMock(status_code=200))
+
+        assert await client.health() == 200
+        assert client.client.get.call_args.args[0] == "http://test/health"
+
+
+class TestGetDataAPIClientDependency:
+    """Зависимость get_data_api_client."""
+
+    def test_returns_client_from_app_state(self):
+        """Возвращает клиент, созданный в lifespan."""
+        shared = MagicMock()
+        request = SimpleNamespace(
+            app=SimpleNamespace(state=SimpleNamespace(data_api_client=shared))
+        )
+
+        assert get_data_api_client(request) is shared
+
+    def test_creates_client_lazily_once(self):
+        """Без lifespan клиент создаётся при первом обращении и переиспользуется."""
+        request = SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace()))
+
+        first = get_data_api_client(request)
+        second = get_data_api_client(request)
+
+        assert isinstance(first, DataAPIClient)
+        assert first is second
+
+
+class TestLifespanSharedClient:
+    """Lifespan создаёт и закрывает общий клиент."""
+
+    async def test_lifespan_creates_and_closes_shared_client(self):
+        """Клиент живёт в app.state между startup и shutdown."""
+        shared = MagicMock()
+        shared.health = AsyncMock(return_value=200)
+        shared.close = AsyncMock()
+
+        with patch("app.main.DataAPIClient", return_value=shared), patch(
+            "app.main.ProviderRegistry.aclose_all", new=AsyncMock()
+        ):
+            async with lifespan(app):
+                assert app.state.data_api_client is shared
+                shared.close.assert_not_awaited()
+
+        shared.health.assert_awaited_once()
+        shared.close.assert_awaited_once()
+        assert app.state.data_api_client is None
+
+    async def test_lifespan_survives_unreachable_data_api(self):
+        """Недоступный Data API не мешает старту сервиса."""
+        shared = MagicMock()
+        shared.health = AsyncMock(side_effect=Exception("connection refused"))
+        shared.close = AsyncMock()
+
+        with patch("app.main.DataAPIClient", return_value=shared), patch(
+            "app.main.ProviderRegistry.aclose_all", new=AsyncMock()
+        ):
+            async with lifespan(app):
+                pass
+
+        shared.close.assert_awaited_once()
@@ -80,3 +80,32 @@ async def test_index_has_analytics_and_journal_tabs(client: AsyncClient):
     # The journal/analytics tabs consume the business-api proxy endpoints.
     assert "/api/v1/analytics/by-project" in html
     assert "/api/v1/history" in html
+
+
+@pytest.mark.asyncio
+async def test_journal_uses_keyset_cursor(client: AsyncClient):
+    """user-018: журнал листается по X-Next-Cursor, а не по offset."""
+    response = await client.get("/static/index.html")
+
+    html = response.text
+    assert "X-Next-Cursor" in html
+    assert "params.set('cursor', cursor)" in html
+    assert "offset:" not in html
+
+
+@pytest.mark.asyncio
+async def test_journal_requests_summary_view(client: AsyncClient):
+    """user-020: таблица журнала не тянет полные тексты."""
+    response = await client.get("/static/index.html")
+
+    assert "view: 'summary'" in response.text
+    assert "r.prompt_preview" in response.text
+
+
+@pytest.mark.asyncio
+async def test_journal_has_text_search(client: AsyncClient):
+    """user-021: поле поиска журнала уходит в q только от 3 символов."""
+    response = await client.get("/static/index.html")
+
+    assert 'id="journal-q"' in response.text
+    assert "params.set('q', q)" in response.text
@@ -0,0 +1,42 @@
+"""Add cache_hit column to prompt_history
+
+user-007: Ответы из exact-match кеша business-api пишутся в историю с
+cache_hit = true. Такие строки видны в журнале и per-project аналитике, но не
+участвуют в статистике моделей (модель не выполняла запрос).
+
+NOT NULL with server default false so existing rows backfill cleanly.
+
+Revision ID: 0006_add_cache_hit
+Revises: 0005_add_caller_columns
+Create Date: 2026-10-17
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# Revision identifiers
+revision: str = "0006_add_cache_hit"
+down_revision: Union[str, None] = "0005_add_caller_columns"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Add cache_hit column to prompt_history.
+    """
+    op.add_column(
+        "prompt_history",
+        sa.Column(
+            "cache_hit", sa.Boolean(), nullable=False, server_default=sa.false()
+        ),
+    )
+
+
+def downgrade() -> None:
+    """
+    Remove cache_hit column from prompt_history.
+    """
+    op.drop_column("prompt_history", "cache_hit")
@@ -0,0 +1,139 @@
+"""Convert prompt_history to daily range partitions on created_at
+
+user-013: Все аналитические запросы к prompt_history — range scan по
+created_at. Нативное RANGE-партиционирование по дням даёт partition pruning
+для оконных запросов, а retention удаляет целые партиции (DROP TABLE)
+вместо построчного DELETE.
+
+- Партиции: prompt_history_pYYYYMMDD, границы в UTC; создаются от дня самой
+  старой записи до сегодня + 7 дней. Дальше их создаёт фоновая задача
+  HistoryRetention (app/infrastructure/database/partitions.py)
+- prompt_history_default ловит строки без дневной партиции
+- PRIMARY KEY (id, created_at): ключ партиционирования обязан входить в
+  уникальные ограничения. id по-прежнему берётся из prompt_history_id_seq
+- Индексы создаются на родителе и наследуются партициями
+
+Данные копируются INSERT ... SELECT в одной транзакции миграции.
+
+Revision ID: 0007_partition_prompt_history
+Revises: 0006_add_cache_hit
+Create Date: 2026-10-17
+"""
+
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# Revision identifiers
+revision: str = "0007_partition_prompt_history"
+down_revision: Union[str, None] = "0006_add_cache_hit"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PREMAKE_DAYS = 7
+
+COLUMNS = (
+    "id, user_id, prompt_text, selected_model_id, response_text, response_time, "
+    "success, error_message, created_at, caller, http_status, requested_model, cache_hit"
+)
+
+INDEXES = (
+    ("ix_prompt_history_user_id", "user_id"),
+    ("ix_prompt_history_selected_model_id", "selected_model_id"),
+    ("ix_prompt_history_success", "success"),
+    ("ix_prompt_history_created_at", "created_at"),
+    ("ix_prompt_history_caller", "caller"),
+)
+
+TABLE_COLUMNS_SQL = """
+    id integer NOT NULL DEFAULT nextval('prompt_history_id_seq'::regclass),
+    user_id varchar(255) NOT NULL,
+    prompt_text text NOT NULL,
+    selected_model_id integer NOT NULL,
+    response_text text,
+    response_time numeric(10, 3) NOT NULL,
+    success boolean NOT NULL,
+    error_message text,
+    created_at timestamptz NOT NULL DEFAULT now(),
+    caller varchar(255),
+    http_status integer,
+    requested_model varchar(255),
+    cache_hit boolean NOT NULL DEFAULT false
+"""
+
+
+def _day_start(day: date) -> str:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc).isoformat()
+
+
+def _rename_old_table(old_name: str) -> None:
+    """Освободить имена таблицы, PK и индексов для новой prompt_history."""
+    op.execute(f"ALTER TABLE prompt_history RENAME TO {old_name}")
+    op.execute(f"ALTER TABLE {old_name} RENAME CONSTRAINT prompt_history_pkey TO {old_name}_pkey")
+    for index_name, _ in INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {index_name}")
+    op.execute("ALTER SEQUENCE prompt_history_id_seq OWNED BY NONE")
+
+
+def _create_indexes() -> None:
+    for index_name, column in INDEXES:
+        op.execute(f"CREATE INDEX {index_name} ON prompt_history ({column})")
+
+
+def upgrade() -> None:
+    """
+    Replace prompt_history with a daily range-partitioned table.
+    """
+    _rename_old_table("prompt_history_unpartitioned")
+
+    op.execute(
+        f"CREATE TABLE prompt_history ({TABLE_COLUMNS_SQL}, "
+        "CONSTRAINT prompt_history_pkey PRIMARY KEY (id, created_at)"
+        ") PARTITION BY RANGE (created_at)"
+    )
+    _create_indexes()
+    op.execute("CREATE TABLE prompt_history_default PARTITION OF prompt_history DEFAULT")
+
+    bind = op.get_bind()
+    oldest = bind.execute(
+        sa.text("SELECT min(created_at) FROM prompt_history_unpartitioned")
+    ).scalar()
+    today = datetime.now(timezone.utc).date()
+    first_day = oldest.astimezone(timezone.utc).date() if oldest is not None else today
+    day = first_day
+    while day <= today + timedelta(days=PREMAKE_DAYS):
+        op.execute(
+            f"CREATE TABLE prompt_history_p{day:%Y%m%d} PARTITION OF prompt_history "
+            f"FOR VALUES FROM ('{_day_start(day)}') "
+            f"TO ('{_day_start(day + timedelta(days=1))}')"
+        )
+        day += timedelta(days=1)
+
+    op.execute(
+        f"INSERT INTO prompt_history ({COLUMNS}) "
+        f"SELECT {COLUMNS} FROM prompt_history_unpartitioned"
+    )
+    op.execute("DROP TABLE prompt_history_unpartitioned")
+    op.execute("ALTER SEQUENCE prompt_history_id_seq OWNED BY prompt_history.id")
+
+
+def downgrade() -> None:
+    """
+    Convert prompt_history back to a plain table (all partitions merged).
+    """
+    _rename_old_table("prompt_history_partitioned")
+
+    op.execute(
+        f"CREATE TABLE prompt_history ({TABLE_COLUMNS_SQL}, "
+        "CONSTRAINT prompt_history_pkey PRIMARY KEY (id))"
+    )
+    _create_indexes()
+    op.execute(
+        f"INSERT INTO prompt_history ({COLUMNS}) "
+        f"SELECT {COLUMNS} FROM prompt_history_partitioned"
+    )
+    # Партиции удаляются вместе с родителем
+    op.execute("DROP TABLE prompt_history_partitioned")
+    op.execute("ALTER SEQUENCE prompt_history_id_seq OWNED BY prompt_history.id")
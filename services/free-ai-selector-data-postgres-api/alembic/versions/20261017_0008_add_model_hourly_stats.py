@@ -0,0 +1,118 @@
+"""Add model_hourly_stats rollup table
+
+user-014: GET /models?include_recent=true считал decay-взвешенную статистику
+и медиану латентности по всем строкам prompt_history за 7 дней. Rollup
+хранит на каждую (модель, час) счётчики success / hard fail / 429,
+степенные моменты смещения записи внутри часа (для точного decay-веса) и
+точную гистограмму латентности в миллисекундах.
+
+Таблица заполняется из существующей истории (без cache hits); дальше её
+обновляет PromptHistoryRepository в транзакции каждого INSERT.
+
+Revision ID: 0008_add_model_hourly_stats
+Revises: 0007_partition_prompt_history
+Create Date: 2026-10-17
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# Revision identifiers
+revision: str = "0008_add_model_hourly_stats"
+down_revision: Union[str, None] = "0007_partition_prompt_history"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Σ u^0 .. Σ u^6 (совпадает с ROLLUP_MOMENTS в model_hourly_stats_repository)
+MOMENTS = 7
+
+
+def _moments_sql(condition: str, value: str = "1.0") -> str:
+    terms = ", ".join(
+        f"coalesce(sum({value} * power(u, {j})) FILTER (WHERE {condition}), 0)"
+        for j in range(MOMENTS)
+    )
+    return f"ARRAY[{terms}]::float8[]"
+
+
+def upgrade() -> None:
+    """
+    Create model_hourly_stats and backfill it from prompt_history.
+    """
+    op.create_table(
+        "model_hourly_stats",
+        sa.Column("model_id", sa.Integer(), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("request_count", sa.Integer(), nullable=False),
+        sa.Column("success_count", sa.Integer(), nullable=False),
+        sa.Column("hard_fail_count", sa.Integer(), nullable=False),
+        sa.Column("rate_limited_count", sa.Integer(), nullable=False),
+        sa.Column("success_moments", postgresql.ARRAY(sa.Float()), nullable=False),
+        sa.Column("hard_fail_moments", postgresql.ARRAY(sa.Float()), nullable=False),
+        sa.Column("weight_moments", postgresql.ARRAY(sa.Float()), nullable=False),
+        sa.Column("time_moments", postgresql.ARRAY(sa.Float()), nullable=False),
+        sa.Column("latency_ms", postgresql.ARRAY(sa.Integer()), nullable=False),
+        sa.Column("latency_counts", postgresql.ARRAY(sa.Integer()), nullable=False),
+        sa.PrimaryKeyConstraint("model_id", "bucket_start"),
+    )
+
+    op.execute(
+        f"""
+        WITH fresh AS (
+            SELECT
+                selected_model_id AS model_id,
+                date_trunc('hour', created_at) AS bucket_start,
+                extract(epoch FROM created_at - date_trunc('hour', created_at))::float8
+                    / 3600.0 AS u,
+                response_time,
+                success,
+                NOT success AND (http_status IS NULL OR http_status <> 429) AS hard_fail,
+                NOT success AND http_status = 429 AS rate_limited
+            FROM prompt_history
+            WHERE NOT cache_hit
+        ),
+        latency AS (
+            SELECT
+                model_id,
+                bucket_start,
+                array_agg(ms ORDER BY ms) AS latency_ms,
+                array_agg(n ORDER BY ms) AS latency_counts
+            FROM (
+                SELECT model_id, bucket_start, (response_time * 1000)::int AS ms,
+                       count(*)::int AS n
+                FROM fresh
+                GROUP BY model_id, bucket_start, ms
+            ) per_value
+            GROUP BY model_id, bucket_start
+        )
+        INSERT INTO model_hourly_stats
+        SELECT
+            agg.*, latency.latency_ms, latency.latency_counts
+        FROM (
+            SELECT
+                model_id,
+                bucket_start,
+                count(*),
+                count(*) FILTER (WHERE success),
+                count(*) FILTER (WHERE hard_fail),
+                count(*) FILTER (WHERE rate_limited),
+                {_moments_sql("success")},
+                {_moments_sql("hard_fail")},
+                {_moments_sql("TRUE")},
+                {_moments_sql("TRUE", "response_time::float8")}
+            FROM fresh
+            GROUP BY model_id, bucket_start
+        ) agg
+        JOIN latency USING (model_id, bucket_start)
+        """
+    )
+
+
+def downgrade() -> None:
+    """
+    Drop model_hourly_stats.
+    """
+    op.drop_table("model_hourly_stats")
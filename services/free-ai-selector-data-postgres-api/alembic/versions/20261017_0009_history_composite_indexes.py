@@ -0,0 +1,85 @@
+"""Replace single-column prompt_history indexes with composite/covering ones
+
+user-019: Запросы к prompt_history фильтруют по одной колонке и сортируют
+по (created_at, id) (журнал, user-018) либо агрегируют окно по created_at
+с GROUP BY модели. Одноколоночные индексы давали Index Scan + Sort или
+heap-выборку каждой строки окна. Новые индексы подобраны под запросы
+PromptHistoryRepository:
+
+- ix_prompt_history_created_at_id: (created_at, id) INCLUDE (selected_model_id,
+  success, http_status, response_time, cache_hit, caller, requested_model) —
+  журнал без фильтров, граница retention и оконные агрегаты по моделям и
+  проектам (index-only scan)
+- ix_prompt_history_model_created_at: (selected_model_id, created_at, id)
+  INCLUDE (success, http_status, response_time) — журнал модели и
+  статистика периода по модели
+- ix_prompt_history_caller_created_at: (caller, created_at DESC, id DESC) —
+  журнал с фильтром по проекту
+- ix_prompt_history_user_created_at: (user_id, created_at DESC, id DESC) —
+  история пользователя
+- ix_prompt_history_failed_created_at: (created_at DESC, id DESC)
+  WHERE NOT success — журнал ошибок (success=false), доля строк мала
+
+Старые индексы с тем же ведущим столбцом удаляются: число индексов на
+INSERT не растёт. ix_prompt_history_success (boolean) планировщиком не
+использовался. Индексы создаются на партиционированном родителе и
+наследуются всеми партициями (user-013).
+
+Revision ID: 0009_history_composite_indexes
+Revises: 0008_add_model_hourly_stats
+Create Date: 2026-10-17
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# Revision identifiers
+revision: str = "0009_history_composite_indexes"
+down_revision: Union[str, None] = "0008_add_model_hourly_stats"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NEW_INDEXES = (
+    (
+        "ix_prompt_history_created_at_id",
+        "(created_at, id) INCLUDE (selected_model_id, success, http_status, "
+        "response_time, cache_hit, caller, requested_model)",
+    ),
+    (
+        "ix_prompt_history_model_created_at",
+        "(selected_model_id, created_at, id) INCLUDE (success, http_status, response_time)",
+    ),
+    ("ix_prompt_history_caller_created_at", "(caller, created_at DESC, id DESC)"),
+    ("ix_prompt_history_user_created_at", "(user_id, created_at DESC, id DESC)"),
+    ("ix_prompt_history_failed_created_at", "(created_at DESC, id DESC) WHERE NOT success"),
+)
+
+# Индексы 0001/0005 (пересозданные в 0007), которые заменяются новыми
+OLD_INDEXES = (
+    ("ix_prompt_history_user_id", "user_id"),
+    ("ix_prompt_history_selected_model_id", "selected_model_id"),
+    ("ix_prompt_history_success", "success"),
+    ("ix_prompt_history_created_at", "created_at"),
+    ("ix_prompt_history_caller", "caller"),
+)
+
+
+def upgrade() -> None:
+    """
+    Create the composite indexes, then drop the single-column ones.
+    """
+    for index_name, definition in NEW_INDEXES:
+        op.execute(f"CREATE INDEX {index_name} ON prompt_history {definition}")
+    for index_name, _ in OLD_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {index_name}")
+
+
+def downgrade() -> None:
+    """
+    Restore the single-column indexes.
+    """
+    for index_name, column in OLD_INDEXES:
+        op.execute(f"CREATE INDEX {index_name} ON prompt_history ({column})")
+    for index_name, _ in NEW_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {index_name}")
@@ -0,0 +1,53 @@
+"""Trigram GIN indexes for journal search on prompt_text / error_message
+
+user-021: GET /history?q=... ищет подстроку (ILIKE '%q%') в prompt_text и
+error_message. B-tree такие шаблоны не обслуживает — без индекса это
+последовательный проход по всем партициям. GIN-индексы pg_trgm отвечают на
+ILIKE с произвольными подстрокам от трёх символов; запрос по двум колонкам
+планировщик собирает через BitmapOr.
+
+pg_trgm — доверенное расширение (PostgreSQL 13+): CREATE EXTENSION не
+требует суперпользователя, достаточно права CREATE на базу. Индексы
+создаются на партиционированном родителе и наследуются партициями (user-013).
+
+ORM эти индексы не объявляет: create_all (тесты, init_db) не должен
+зависеть от наличия расширения.
+
+Revision ID: 0010_history_trgm_search
+Revises: 0009_history_composite_indexes
+Create Date: 2026-10-17
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# Revision identifiers
+revision: str = "0010_history_trgm_search"
+down_revision: Union[str, None] = "0009_history_composite_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRGM_INDEXES = (
+    ("ix_prompt_history_prompt_text_trgm", "prompt_text"),
+    ("ix_prompt_history_error_message_trgm", "error_message"),
+)
+
+
+def upgrade() -> None:
+    """
+    Enable pg_trgm and index prompt_text / error_message for substring search.
+    """
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for index_name, column in TRGM_INDEXES:
+        op.execute(
+            f"CREATE INDEX {index_name} ON prompt_history USING gin ({column} gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    """
+    Drop the trigram indexes (the extension is left installed).
+    """
+    for index_name, _ in TRGM_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {index_name}")
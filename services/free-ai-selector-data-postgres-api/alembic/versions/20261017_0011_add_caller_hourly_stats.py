@@ -0,0 +1,85 @@
+"""Add caller_hourly_stats rollup table
+
+user-023: GET /history/statistics/by-caller (дашборд /analytics/by-project)
+делал два GROUP BY по всем строкам окна. Rollup хранит на каждую
+(caller, модель, час) счётчики запросов / успехов / auto / pinned и точную
+сумму response_time; статистика окна собирается из бакетов.
+
+caller бывает NULL, поэтому уникальность бакета — UNIQUE NULLS NOT DISTINCT
+(PostgreSQL 15+), суррогатный id — первичный ключ.
+
+Таблица заполняется из существующей истории (все записи, включая cache
+hits); дальше её обновляет PromptHistoryRepository в транзакции каждого INSERT.
+
+Revision ID: 0011_add_caller_hourly_stats
+Revises: 0010_history_trgm_search
+Create Date: 2026-10-17
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# Revision identifiers
+revision: str = "0011_add_caller_hourly_stats"
+down_revision: Union[str, None] = "0010_history_trgm_search"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Create caller_hourly_stats and backfill it from prompt_history.
+    """
+    op.create_table(
+        "caller_hourly_stats",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("caller", sa.String(length=255), nullable=True),
+        sa.Column("model_id", sa.Integer(), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("request_count", sa.Integer(), nullable=False),
+        sa.Column("success_count", sa.Integer(), nullable=False),
+        sa.Column("auto_count", sa.Integer(), nullable=False),
+        sa.Column("pinned_count", sa.Integer(), nullable=False),
+        sa.Column("response_time_sum", sa.Numeric(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "caller",
+            "model_id",
+            "bucket_start",
+            name="uq_caller_hourly_stats_bucket",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+    op.create_index(
+        "ix_caller_hourly_stats_bucket_start", "caller_hourly_stats", ["bucket_start"]
+    )
+
+    op.execute(
+        """
+        INSERT INTO caller_hourly_stats (
+            caller, model_id, bucket_start, request_count, success_count,
+            auto_count, pinned_count, response_time_sum
+        )
+        SELECT
+            caller,
+            selected_model_id,
+            date_trunc('hour', created_at),
+            count(*),
+            count(*) FILTER (WHERE success),
+            count(*) FILTER (WHERE requested_model IS NULL),
+            count(*) FILTER (WHERE requested_model IS NOT NULL),
+            sum(response_time)
+        FROM prompt_history
+        GROUP BY caller, selected_model_id, date_trunc('hour', created_at)
+        """
+    )
+
+
+def downgrade() -> None:
+    """
+    Drop caller_hourly_stats.
+    """
+    op.drop_index("ix_caller_hourly_stats_bucket_start", table_name="caller_hourly_stats")
+    op.drop_table("caller_hourly_stats")
@@ -0,0 +1,68 @@
+"""Add model_latency_sketches table
+
+user-024: хвосты латентности (p50/p90/p99) по модели за любое окно. Таблица
+хранит на каждую (модель, UTC-сутки) логарифмический скетч латентности в
+духе DDSketch: ключ бина ceil(ln(ms) / ln γ), γ = 1.01 / 0.99 (точность 1%),
+и количество вызовов в бине. Ключ должен совпадать с SKETCH_KEY_SQL в
+model_latency_sketch_repository.
+
+Таблица заполняется из существующей истории (без cache hits); дальше её
+обновляет PromptHistoryRepository в транзакции каждого INSERT.
+
+Revision ID: 0012_add_model_latency_sketches
+Revises: 0011_add_caller_hourly_stats
+Create Date: 2026-10-17
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# Revision identifiers
+revision: str = "0012_add_model_latency_sketches"
+down_revision: Union[str, None] = "0011_add_caller_hourly_stats"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Create model_latency_sketches and backfill it from prompt_history.
+    """
+    op.create_table(
+        "model_latency_sketches",
+        sa.Column("model_id", sa.Integer(), nullable=False),
+        sa.Column("day_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("sketch_keys", postgresql.ARRAY(sa.Integer()), nullable=False),
+        sa.Column("sketch_counts", postgresql.ARRAY(sa.Integer()), nullable=False),
+        sa.PrimaryKeyConstraint("model_id", "day_start"),
+    )
+
+    op.execute(
+        """
+        INSERT INTO model_latency_sketches (model_id, day_start, sketch_keys, sketch_counts)
+        SELECT model_id, day_start, array_agg(key ORDER BY key), array_agg(n ORDER BY key)
+        FROM (
+            SELECT
+                selected_model_id AS model_id,
+                date_trunc('day', created_at, 'UTC') AS day_start,
+                ceil(
+                    ln(greatest(response_time::float8 * 1000.0, 1.0)) / 0.020000666706669435
+                )::int AS key,
+                count(*)::int AS n
+            FROM prompt_history
+            WHERE NOT cache_hit
+            GROUP BY model_id, day_start, key
+        ) per_bin
+        GROUP BY model_id, day_start
+        """
+    )
+
+
+def downgrade() -> None:
+    """
+    Drop model_latency_sketches.
+    """
+    op.drop_table("model_latency_sketches")
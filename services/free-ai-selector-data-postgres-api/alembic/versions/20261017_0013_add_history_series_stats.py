@@ -0,0 +1,109 @@
+"""Add history_series_stats time-series rollup table
+
+user-025: GET /history/statistics/timeseries (графики /analytics/timeseries).
+Таблица хранит на каждую (гранулярность minute / hour / day, модель или
+проект, UTC-бакет) счётчики запросов / успехов / hard fail / 429 и скетч
+латентности — те же бины, что в model_latency_sketches (SKETCH_KEY_SQL).
+
+group_key (id модели строкой или caller) бывает NULL, поэтому уникальность
+бакета — UNIQUE NULLS NOT DISTINCT; её индекс обслуживает и чтение окна.
+
+Таблица заполняется из существующей истории; дальше её обновляет
+PromptHistoryRepository в транзакции каждого INSERT. Минутные бакеты старше
+TIMESERIES_MINUTE_RETENTION_HOURS удаляет retention-задача.
+
+Revision ID: 0013_add_history_series_stats
+Revises: 0012_add_model_latency_sketches
+Create Date: 2026-10-17
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# Revision identifiers
+revision: str = "0013_add_history_series_stats"
+down_revision: Union[str, None] = "0012_add_model_latency_sketches"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Create history_series_stats and backfill it from prompt_history.
+    """
+    op.create_table(
+        "history_series_stats",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("granularity", sa.String(length=8), nullable=False),
+        sa.Column("group_by", sa.String(length=8), nullable=False),
+        sa.Column("group_key", sa.String(length=255), nullable=True),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("request_count", sa.Integer(), nullable=False),
+        sa.Column("success_count", sa.Integer(), nullable=False),
+        sa.Column("hard_fail_count", sa.Integer(), nullable=False),
+        sa.Column("rate_limited_count", sa.Integer(), nullable=False),
+        sa.Column("sketch_keys", postgresql.ARRAY(sa.Integer()), nullable=False),
+        sa.Column("sketch_counts", postgresql.ARRAY(sa.Integer()), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "granularity",
+            "group_by",
+            "bucket_start",
+            "group_key",
+            name="uq_history_series_stats_bucket",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+    op.execute(
+        """
+        INSERT INTO history_series_stats (
+            granularity, group_by, group_key, bucket_start, request_count, success_count,
+            hard_fail_count, rate_limited_count, sketch_keys, sketch_counts
+        )
+        SELECT
+            granularity, group_by, group_key, bucket_start,
+            sum(n), sum(successes), sum(hard_fails), sum(rate_limited),
+            coalesce(array_agg(key ORDER BY key) FILTER (WHERE key IS NOT NULL), '{}'),
+            coalesce(array_agg(n ORDER BY key) FILTER (WHERE key IS NOT NULL), '{}')
+        FROM (
+            SELECT
+                g.granularity,
+                d.group_by,
+                CASE d.group_by
+                    WHEN 'model' THEN h.selected_model_id::text ELSE h.caller
+                END AS group_key,
+                date_trunc(g.granularity, h.created_at, 'UTC') AS bucket_start,
+                CASE WHEN NOT h.cache_hit THEN
+                    ceil(
+                        ln(greatest(h.response_time::float8 * 1000.0, 1.0))
+                        / 0.020000666706669435
+                    )::int
+                END AS key,
+                count(*)::int AS n,
+                count(*) FILTER (WHERE h.success)::int AS successes,
+                count(*) FILTER (
+                    WHERE NOT h.success AND (h.http_status IS NULL OR h.http_status <> 429)
+                )::int AS hard_fails,
+                count(*) FILTER (
+                    WHERE NOT h.success AND h.http_status = 429
+                )::int AS rate_limited
+            FROM prompt_history AS h
+            CROSS JOIN (VALUES ('minute'), ('hour'), ('day')) AS g(granularity)
+            CROSS JOIN (VALUES ('model'), ('caller')) AS d(group_by)
+            WHERE g.granularity <> 'minute' OR h.created_at >= now() - interval '48 hours'
+            GROUP BY 1, 2, 3, 4, 5
+        ) per_key
+        GROUP BY granularity, group_by, group_key, bucket_start
+        """
+    )
+
+
+def downgrade() -> None:
+    """
+    Drop history_series_stats.
+    """
+    op.drop_table("history_series_stats")
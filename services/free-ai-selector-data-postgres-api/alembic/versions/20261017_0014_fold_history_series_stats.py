@@ -0,0 +1,110 @@
+"""Keep only minute and folded hour buckets in history_series_stats
+
+user-025: INSERT в историю теперь обновляет только минутные бакеты, а
+retention-прогон сворачивает минутные бакеты старше
+TIMESERIES_MINUTE_RETENTION_HOURS в часовые; точки hour / day складываются
+при чтении из минутных и часовых строк. Поэтому у каждого часа данные
+должны лежать ровно в одном месте — либо минутами, либо часовой строкой.
+
+upgrade():
+    - суточные строки удаляются (сутки считаются при чтении)
+    - минутные строки самого раннего часа удаляются: retention обрезал их
+      не по границе часа, а полная часовая строка за этот час есть
+    - часовые строки удаляются там, где за тот же час есть минутные
+
+downgrade() заполняет таблицу заново из prompt_history, как миграция 0013.
+
+Revision ID: 0014_fold_history_series_stats
+Revises: 0013_add_history_series_stats
+Create Date: 2026-10-17
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# Revision identifiers
+revision: str = "0014_fold_history_series_stats"
+down_revision: Union[str, None] = "0013_add_history_series_stats"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Drop day buckets and make minute and hour buckets disjoint.
+    """
+    op.execute("DELETE FROM history_series_stats WHERE granularity = 'day'")
+    op.execute(
+        """
+        DELETE FROM history_series_stats
+        WHERE granularity = 'minute' AND bucket_start < (
+            SELECT date_trunc('hour', min(bucket_start), 'UTC') + interval '1 hour'
+            FROM history_series_stats
+            WHERE granularity = 'minute'
+        )
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM history_series_stats AS h
+        WHERE h.granularity = 'hour' AND EXISTS (
+            SELECT 1
+            FROM history_series_stats AS m
+            WHERE m.granularity = 'minute'
+                AND m.group_by = h.group_by
+                AND m.group_key IS NOT DISTINCT FROM h.group_key
+                AND m.bucket_start >= h.bucket_start
+                AND m.bucket_start < h.bucket_start + interval '1 hour'
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    """
+    Rebuild minute / hour / day buckets from prompt_history.
+    """
+    op.execute("DELETE FROM history_series_stats")
+    op.execute(
+        """
+        INSERT INTO history_series_stats (
+            granularity, group_by, group_key, bucket_start, request_count, success_count,
+            hard_fail_count, rate_limited_count, sketch_keys, sketch_counts
+        )
+        SELECT
+            granularity, group_by, group_key, bucket_start,
+            sum(n), sum(successes), sum(hard_fails), sum(rate_limited),
+            coalesce(array_agg(key ORDER BY key) FILTER (WHERE key IS NOT NULL), '{}'),
+            coalesce(array_agg(n ORDER BY key) FILTER (WHERE key IS NOT NULL), '{}')
+        FROM (
+            SELECT
+                g.granularity,
+                d.group_by,
+                CASE d.group_by
+                    WHEN 'model' THEN h.selected_model_id::text ELSE h.caller
+                END AS group_key,
+                date_trunc(g.granularity, h.created_at, 'UTC') AS bucket_start,
+                CASE WHEN NOT h.cache_hit THEN
+                    ceil(
+                        ln(greatest(h.response_time::float8 * 1000.0, 1.0))
+                        / 0.020000666706669435
+                    )::int
+                END AS key,
+                count(*)::int AS n,
+                count(*) FILTER (WHERE h.success)::int AS successes,
+                count(*) FILTER (
+                    WHERE NOT h.success AND (h.http_status IS NULL OR h.http_status <> 429)
+                )::int AS hard_fails,
+                count(*) FILTER (
+                    WHERE NOT h.success AND h.http_status = 429
+                )::int AS rate_limited
+            FROM prompt_history AS h
+            CROSS JOIN (VALUES ('minute'), ('hour'), ('day')) AS g(granularity)
+            CROSS JOIN (VALUES ('model'), ('caller')) AS d(group_by)
+            WHERE g.granularity <> 'minute' OR h.created_at >= now() - interval '48 hours'
+            GROUP BY 1, 2, 3, 4, 5
+        ) per_key
+        GROUP BY granularity, group_by, group_key, bucket_start
+        """
+    )
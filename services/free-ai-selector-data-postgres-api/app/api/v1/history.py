@@ -2,37 +2,121 @@
 Prompt History API routes for AI Manager Platform - Data API Service
 
 Provides operations for managing prompt history records.
+
+user-011: POST /history/bulk ingests a JSON array or NDJSON batch with one
+multi-row INSERT per chunk and returns only the generated IDs.
+
+user-016: /statistics/* answer If-None-Match with 304 before running the
+aggregate query when nothing was written since the caller's copy.
+
+user-018: journal listings accept an opaque ``cursor`` (keyset on
+created_at, id) and return the cursor of the next page in the X-Next-Cursor
+header; bodies stay plain lists. ``offset`` is kept for compatibility.
+
+user-020: ``view=summary`` on list endpoints returns PromptHistorySummaryResponse
+rows with ``preview_chars``-long previews cut in SQL; full texts are served
+only by GET /history/{id}. The default ``view=full`` is unchanged.
+
+user-021: GET /history?q=... finds records whose prompt or error message
+contains q (case-insensitive), via pg_trgm GIN indexes.
+
+user-022: GET /history/export streams the filtered journal as NDJSON or CSV
+from a server-side cursor, in constant memory regardless of the row count.
+
+user-025: GET /history/statistics/timeseries returns per-model or per-caller
+series of minute / hour / day buckets summed from the minute and hour rows of
+the history_series_stats rollup.
 """
 
-from datetime import datetime
-from typing import List, Optional
+import csv
+import io
+import os
+from datetime import datetime, timedelta
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    cast,
+)
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.params import Header as _HeaderParam
 from fastapi.params import Query as _QueryParam
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.api.v1.schemas import (
     CallerStatisticsResponse,
     ModelStatisticsResponse,
+    PromptHistoryBulkResponse,
     PromptHistoryCreate,
     PromptHistoryResponse,
+    PromptHistorySummaryResponse,
+    TimeseriesPointResponse,
+    TimeseriesResponse,
+    TimeseriesSeriesResponse,
+)
+from app.domain.models import PromptHistory, PromptHistorySummary
+from app.infrastructure.database.connection import get_db, get_session_factory
+from app.infrastructure.models_cache import ModelsCache
+from app.infrastructure.repositories.history_series_stats_repository import (
+    TIMESERIES_MINUTE_RETENTION_HOURS,
 )
-from app.domain.models import PromptHistory
-from app.infrastructure.database.connection import get_db
 from app.infrastructure.repositories.prompt_history_repository import PromptHistoryRepository
+from app.utils.cursor import HistoryCursor, decode_cursor, encode_cursor
+from app.utils.etag import etag_matches, not_modified, statistics_etag
+from app.utils.window import parse_quantiles, parse_window
 
 router = APIRouter(prefix="/history", tags=["Prompt History"])
 
+# user-011: Максимум записей в одном bulk-запросе
+HISTORY_BULK_MAX_RECORDS = int(os.getenv("HISTORY_BULK_MAX_RECORDS", "10000"))
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+# user-018: Курсор следующей страницы журнала
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+# user-020: Длина превью prompt/response в view=summary по умолчанию, символов
+HISTORY_PREVIEW_CHARS = int(os.getenv("HISTORY_PREVIEW_CHARS", "200"))
+# user-021: Короче трёх символов pg_trgm не извлекает триграмм — индекс бесполезен
+HISTORY_SEARCH_MIN_CHARS = 3
+# user-022: Строк на один FETCH серверного курсора при экспорте (= кусок ответа)
+HISTORY_EXPORT_BATCH_SIZE = int(os.getenv("HISTORY_EXPORT_BATCH_SIZE", "1000"))
+# user-025: Точек в одной серии (window / размер бакета) — 25 ч по минутам
+MAX_TIMESERIES_POINTS = 1500
+TIMESERIES_BUCKETS = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+DEFAULT_TIMESERIES_QUANTILES = "0.5,0.9,0.99"
+
+HistoryView = Literal["full", "summary"]
+TimeseriesGranularity = Literal["minute", "hour", "day"]
+TimeseriesGroupBy = Literal["model", "caller"]
+ExportFormat = Literal["ndjson", "csv"]
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+EXPORT_CSV_COLUMNS = tuple(PromptHistoryResponse.model_fields)
+JournalResponse = Union[List[PromptHistoryResponse], List[PromptHistorySummaryResponse]]
+
+_bulk_adapter = TypeAdapter(List[PromptHistoryCreate])
+
 
 def _unwrap_query(value, fallback=None):
-    """Resolve a FastAPI ``Query(...)`` default to its scalar value.
+    """Resolve a FastAPI ``Query(...)`` / ``Header(...)`` default to its scalar value.
 
     Route handlers in this service are unit-tested by direct invocation, where
     FastAPI does not resolve ``Query(...)`` defaults — un-passed params keep
     their ``fastapi.params.Query`` object. Over HTTP the values are already
     scalars, so this is a no-op there.
     """
-    if isinstance(value, _QueryParam):
+    if isinstance(value, (_QueryParam, _HeaderParam)):
         default = value.default
         return fallback if default is ... else default
     return value
@@ -59,27 +143,179 @@ async def create_history(
     """
     repository = PromptHistoryRepository(db)
 
-    new_history = PromptHistory(
-        id=None,
-        user_id=history_data.user_id,
-        prompt_text=history_data.prompt_text,
-        selected_model_id=history_data.selected_model_id,
-        response_text=history_data.response_text,
-        response_time=history_data.response_time,
-        success=history_data.success,
-        error_message=history_data.error_message,
-        created_at=datetime.utcnow(),
-        caller=history_data.caller,
-        http_status=history_data.http_status,
-        requested_model=history_data.requested_model,
-    )
-
-    created_history = await repository.create(new_history)
+    created_history = await repository.create(history_from_create(history_data))
     await db.commit()
+    ModelsCache.invalidate()
 
     return _history_to_response(created_history)
 
 
+@router.post(
+    "/bulk",
+    response_model=PromptHistoryBulkResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Create many prompt history records (JSON array or NDJSON)",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {
+                        "type": "array",
+                        "items": {"$ref": "#/components/schemas/PromptHistoryCreate"},
+                    }
+                },
+                "application/x-ndjson": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def create_history_bulk(
+    request: Request, db: AsyncSession = Depends(get_db)
+) -> PromptHistoryBulkResponse:
+    """
+    Create many prompt history records in one transaction (user-011).
+
+    The body is either a JSON array of PromptHistoryCreate objects or, with
+    Content-Type application/x-ndjson, one object per line.
+
+    Args:
+        request: Raw request (body parsed by Content-Type)
+        db: Database session dependency
+
+    Returns:
+        Generated IDs in input order
+
+    Raises:
+        HTTPException: 422 on invalid records, 413 above HISTORY_BULK_MAX_RECORDS
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+
+    try:
+        if content_type in NDJSON_MEDIA_TYPES:
+            records = _parse_ndjson(body)
+        else:
+            records = _bulk_adapter.validate_json(body)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=_validation_detail(e),
+        ) from e
+
+    if len(records) > HISTORY_BULK_MAX_RECORDS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Too many records: {len(records)} > {HISTORY_BULK_MAX_RECORDS}",
+        )
+
+    repository = PromptHistoryRepository(db)
+    ids = await repository.create_many([history_from_create(record) for record in records])
+    await db.commit()
+    ModelsCache.invalidate()
+
+    return PromptHistoryBulkResponse(ids=ids, count=len(ids))
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    summary="Stream the filtered journal as NDJSON or CSV",
+)
+async def export_history(
+    format: ExportFormat = Query("ndjson", description="ndjson (one JSON object per line) or csv"),
+    caller: Optional[str] = Query(None, description="Filter by external project (caller)"),
+    success: Optional[bool] = Query(None, description="Filter by success flag"),
+    date_from: Optional[datetime] = Query(
+        None, description="Inclusive lower bound on created_at"
+    ),
+    date_to: Optional[datetime] = Query(None, description="Inclusive upper bound on created_at"),
+    q: Optional[str] = Query(
+        None,
+        min_length=HISTORY_SEARCH_MIN_CHARS,
+        max_length=200,
+        description="Case-insensitive substring of the prompt or error message",
+    ),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+) -> StreamingResponse:
+    """
+    Export every matching journal record as a stream (user-022).
+
+    Same filters as GET /history, ordered by created_at DESC, id DESC,
+    without limit. Records are read over a server-side cursor
+    HISTORY_EXPORT_BATCH_SIZE rows at a time and written out batch by
+    batch, so neither the Data API nor the database materializes the whole
+    result. The body generator owns its session: get_db() sessions are
+    closed before a streaming body runs.
+
+    Args:
+        format: ndjson (default) or csv with a header row
+        caller: Optional filter by external project (caller)
+        success: Optional filter by success flag
+        date_from: Optional inclusive lower bound on created_at
+        date_to: Optional inclusive upper bound on created_at
+        q: Optional substring search in prompt / error message
+        session_factory: Factory for the export's own session
+
+    Returns:
+        StreamingResponse with full PromptHistoryResponse records
+    """
+    export_format = _unwrap_query(format, "ndjson")
+    filters: Dict[str, Any] = {
+        "caller": _unwrap_query(caller, None),
+        "success": _unwrap_query(success, None),
+        "date_from": _unwrap_query(date_from, None),
+        "date_to": _unwrap_query(date_to, None),
+        "q": _unwrap_query(q, None),
+    }
+    return StreamingResponse(
+        _export_chunks(session_factory, export_format, filters),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="prompt_history.{export_format}"'
+        },
+    )
+
+
+async def _export_chunks(
+    session_factory: async_sessionmaker[AsyncSession],
+    export_format: str,
+    filters: Dict[str, Any],
+) -> AsyncIterator[str]:
+    """
+    Body of GET /history/export: one chunk per cursor batch (user-022).
+
+    Args:
+        session_factory: Factory for the export's own session
+        export_format: ndjson or csv
+        filters: Keyword filters for PromptHistoryRepository.stream_filtered
+
+    Yields:
+        Serialized records of one batch (CSV: header row first)
+    """
+    if export_format == "csv":
+        yield _csv_rows([EXPORT_CSV_COLUMNS])
+
+    async with session_factory() as session:
+        repository = PromptHistoryRepository(session)
+        async for batch in repository.stream_filtered(
+            **filters, batch_size=HISTORY_EXPORT_BATCH_SIZE
+        ):
+            records = [_history_to_response(history) for history in batch]
+            if export_format == "csv":
+                dumped = (record.model_dump(mode="json") for record in records)
+                yield _csv_rows([row[column] for column in EXPORT_CSV_COLUMNS] for row in dumped)
+            else:
+                yield "".join(record.model_dump_json() + "\n" for record in records)
+
+
+def _csv_rows(rows: Any) -> str:
+    """Format rows as CSV text (RFC 4180 quoting, CRLF line endings)."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+
 @router.get("/{history_id}", response_model=PromptHistoryResponse, summary="Get history record by ID")
 async def get_history_by_id(
     history_id: int, db: AsyncSession = Depends(get_db)
@@ -109,64 +345,117 @@ async def get_history_by_id(
     return _history_to_response(history)
 
 
-@router.get("/user/{user_id}", response_model=List[PromptHistoryResponse], summary="Get user history")
+@router.get("/user/{user_id}", response_model=JournalResponse, summary="Get user history")
 async def get_user_history(
     user_id: str,
+    response: Response,
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records"),
     offset: int = Query(0, ge=0, description="Number of records to skip"),
+    cursor: Optional[str] = Query(
+        None, description="Opaque cursor from the X-Next-Cursor header of the previous page"
+    ),
+    view: HistoryView = Query(
+        "full", description="full = complete records, summary = metadata and text previews"
+    ),
+    preview_chars: int = Query(
+        HISTORY_PREVIEW_CHARS, ge=0, le=10000, description="Preview length for view=summary"
+    ),
     db: AsyncSession = Depends(get_db),
-) -> List[PromptHistoryResponse]:
+) -> JournalResponse:
     """
     Get prompt history for a specific user.
 
     Args:
         user_id: User ID (Telegram user ID or API user ID)
+        response: Outgoing response (X-Next-Cursor header)
         limit: Maximum number of records to return (1-1000, default: 100)
         offset: Number of records to skip (default: 0)
+        cursor: Opaque keyset cursor (user-018)
+        view: full records or slim summaries (user-020)
+        preview_chars: Preview length for view=summary
         db: Database session dependency
 
     Returns:
         List of prompt history records, ordered by created_at DESC
     """
     repository = PromptHistoryRepository(db)
-    histories = await repository.get_by_user(user_id=user_id, limit=limit, offset=offset)
+    keyset = _parse_cursor(_unwrap_query(cursor))
+    if _unwrap_query(view, "full") == "summary":
+        summaries = await repository.get_summaries(
+            _unwrap_query(preview_chars, HISTORY_PREVIEW_CHARS),
+            user_id=user_id,
+            limit=limit + 1,
+            offset=offset,
+            cursor=keyset,
+        )
+        return _journal_page(summaries, limit, response, _summary_to_response)
 
-    return [_history_to_response(history) for history in histories]
+    histories = await repository.get_by_user(
+        user_id=user_id, limit=limit + 1, offset=offset, cursor=keyset
+    )
+    return _journal_page(histories, limit, response, _history_to_response)
 
 
 @router.get(
-    "/model/{model_id}", response_model=List[PromptHistoryResponse], summary="Get model history"
+    "/model/{model_id}", response_model=JournalResponse, summary="Get model history"
 )
 async def get_model_history(
     model_id: int,
+    response: Response,
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records"),
     offset: int = Query(0, ge=0, description="Number of records to skip"),
+    cursor: Optional[str] = Query(
+        None, description="Opaque cursor from the X-Next-Cursor header of the previous page"
+    ),
+    view: HistoryView = Query(
+        "full", description="full = complete records, summary = metadata and text previews"
+    ),
+    preview_chars: int = Query(
+        HISTORY_PREVIEW_CHARS, ge=0, le=10000, description="Preview length for view=summary"
+    ),
     db: AsyncSession = Depends(get_db),
-) -> List[PromptHistoryResponse]:
+) -> JournalResponse:
     """
     Get prompt history for a specific AI model.
 
     Args:
         model_id: AI model ID
+        response: Outgoing response (X-Next-Cursor header)
         limit: Maximum number of records to return (1-1000, default: 100)
         offset: Number of records to skip (default: 0)
+        cursor: Opaque keyset cursor (user-018)
+        view: full records or slim summaries (user-020)
+        preview_chars: Preview length for view=summary
         db: Database session dependency
 
     Returns:
         List of prompt history records, ordered by created_at DESC
     """
     repository = PromptHistoryRepository(db)
-    histories = await repository.get_by_model(model_id=model_id, limit=limit, offset=offset)
+    keyset = _parse_cursor(_unwrap_query(cursor))
+    if _unwrap_query(view, "full") == "summary":
+        summaries = await repository.get_summaries(
+            _unwrap_query(preview_chars, HISTORY_PREVIEW_CHARS),
+            model_id=model_id,
+            limit=limit + 1,
+            offset=offset,
+            cursor=keyset,
+        )
+        return _journal_page(summaries, limit, response, _summary_to_response)
 
-    return [_history_to_response(history) for history in histories]
+    histories = await repository.get_by_model(
+        model_id=model_id, limit=limit + 1, offset=offset, cursor=keyset
+    )
+    return _journal_page(histories, limit, response, _history_to_response)
 
 
 @router.get(
     "",
-    response_model=List[PromptHistoryResponse],
+    response_model=JournalResponse,
     summary="Get recent history (journal, with optional filters)",
 )
 async def get_recent_history(
+    response: Response,
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records"),
     offset: int = Query(0, ge=0, description="Number of records to skip"),
     success_only: bool = Query(False, description="Return only successful requests"),
@@ -178,17 +467,33 @@ async def get_recent_history(
         None, description="Inclusive lower bound on created_at"
     ),
     date_to: Optional[datetime] = Query(None, description="Inclusive upper bound on created_at"),
+    q: Optional[str] = Query(
+        None,
+        min_length=HISTORY_SEARCH_MIN_CHARS,
+        max_length=200,
+        description="Case-insensitive substring of the prompt or error message",
+    ),
+    cursor: Optional[str] = Query(
+        None, description="Opaque cursor from the X-Next-Cursor header of the previous page"
+    ),
+    view: HistoryView = Query(
+        "full", description="full = complete records, summary = metadata and text previews"
+    ),
+    preview_chars: int = Query(
+        HISTORY_PREVIEW_CHARS, ge=0, le=10000, description="Preview length for view=summary"
+    ),
     db: AsyncSession = Depends(get_db),
-) -> List[PromptHistoryResponse]:
+) -> JournalResponse:
     """
     Get recent prompt history records (journal view).
 
     Backward compatible: with no new query params it behaves like before
     (recent records, optional success_only). When any journal filter is
-    provided (caller / success / date_from / date_to / offset), the filtered
+    provided (caller / success / date_from / date_to / q / offset), the filtered
     listing is used instead.
 
     Args:
+        response: Outgoing response (X-Next-Cursor header)
         limit: Maximum number of records to return (1-1000, default: 100)
         offset: Number of records to skip (default: 0)
         success_only: Legacy flag — return only successful requests (default: False)
@@ -196,6 +501,11 @@ async def get_recent_history(
         success: Optional explicit success filter (takes precedence over success_only)
         date_from: Optional inclusive lower bound on created_at
         date_to: Optional inclusive upper bound on created_at
+        q: Optional substring search in prompt / error message (user-021)
+        cursor: Opaque keyset cursor (user-018); pages after it cost the
+            same as the first one, unlike offset
+        view: full records or slim summaries (user-020)
+        preview_chars: Preview length for view=summary
         db: Database session dependency
 
     Returns:
@@ -209,6 +519,8 @@ async def get_recent_history(
     success = _unwrap_query(success, None)
     date_from = _unwrap_query(date_from, None)
     date_to = _unwrap_query(date_to, None)
+    q = _unwrap_query(q, None)
+    keyset = _parse_cursor(_unwrap_query(cursor, None))
 
     repository = PromptHistoryRepository(db)
 
@@ -217,11 +529,26 @@ async def get_recent_history(
     if success_filter is None and success_only:
         success_filter = True
 
+    if _unwrap_query(view, "full") == "summary":
+        summaries = await repository.get_summaries(
+            _unwrap_query(preview_chars, HISTORY_PREVIEW_CHARS),
+            caller=caller,
+            success=success_filter,
+            date_from=date_from,
+            date_to=date_to,
+            limit=limit + 1,
+            offset=offset,
+            cursor=keyset,
+            q=q,
+        )
+        return _journal_page(summaries, limit, response, _summary_to_response)
+
     use_filtered = (
         caller is not None
         or success_filter is not None
         or date_from is not None
         or date_to is not None
+        or q is not None
         or offset > 0
     )
 
@@ -231,13 +558,17 @@ async def get_recent_history(
             success=success_filter,
             date_from=date_from,
             date_to=date_to,
-            limit=limit,
+            limit=limit + 1,
             offset=offset,
+            cursor=keyset,
+            q=q,
         )
     else:
-        histories = await repository.get_recent(limit=limit, success_only=success_only)
+        histories = await repository.get_recent(
+            limit=limit + 1, success_only=success_only, cursor=keyset
+        )
 
-    return [_history_to_response(history) for history in histories]
+    return _journal_page(histories, limit, response, _history_to_response)
 
 
 @router.get(
@@ -246,58 +577,345 @@ async def get_recent_history(
     summary="Get per-project (caller) aggregate statistics",
 )
 async def get_caller_statistics(
-    window_days: int = Query(7, ge=1, le=365, description="Look-back window in days"),
+    response: Response,
+    window_days: float = Query(
+        7, gt=0, le=365, description="Look-back window in days (fractions allowed, 1/24 = 1h)"
+    ),
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
-) -> List[CallerStatisticsResponse]:
+) -> Union[List[CallerStatisticsResponse], Response]:
     """
     Get per-project ("caller") aggregate statistics within a time window.
 
+    user-023: served from the caller_hourly_stats rollup — the cost does
+    not depend on the traffic in the window, so any window length works.
+
     Args:
-        window_days: Number of days to look back (1-365, default: 7)
+        response: Outgoing response (ETag header)
+        window_days: Number of days to look back (0-365, default: 7)
+        if_none_match: ETag of the caller's copy (user-016)
         db: Database session dependency
 
     Returns:
-        List of per-caller aggregate objects, ordered by request_count DESC
+        List of per-caller aggregate objects, ordered by request_count DESC;
+        304 if the caller's copy is current
     """
     window_days = _unwrap_query(window_days, 7)
 
+    etag = statistics_etag(ModelsCache.version(), {"by": "caller", "window_days": window_days})
+    if etag_matches(_unwrap_query(if_none_match), etag):
+        return not_modified(etag)
+
     repository = PromptHistoryRepository(db)
     stats = await repository.get_stats_grouped_by_caller(window_days=window_days)
 
+    response.headers["ETag"] = etag
     return [CallerStatisticsResponse(**row) for row in stats]
 
 
+@router.get(
+    "/statistics/timeseries",
+    response_model=TimeseriesResponse,
+    summary="Get bucketed request / outcome / latency series",
+)
+async def get_timeseries_statistics(
+    response: Response,
+    granularity: TimeseriesGranularity = Query("hour", description="Bucket size"),
+    group_by: TimeseriesGroupBy = Query("model", description="One series per model or caller"),
+    window: str = Query("24h", description="Look-back window: 90m, 24h, 7d"),
+    q: str = Query(
+        DEFAULT_TIMESERIES_QUANTILES, description="Comma-separated latency quantiles in [0, 1]"
+    ),
+    model_id: Optional[int] = Query(None, description="Single model (group_by=model)"),
+    caller: Optional[str] = Query(None, description="Single project (group_by=caller)"),
+    limit: int = Query(10, ge=1, le=100, description="Busiest series to return"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+) -> Union[TimeseriesResponse, Response]:
+    """
+    Per-model or per-caller series of UTC buckets for charts (user-025).
+
+    Every point sums the history_series_stats rows of its bucket (minute
+    rows, plus hour rows folded by retention): requests, successes, hard
+    failures, 429s (cache hits included) and latency quantiles within 1% of
+    percentile_disc over the bucket (cache hits excluded). Buckets without
+    requests are omitted; the first bucket is the one containing
+    now() - window.
+
+    Args:
+        response: Outgoing response (ETag header)
+        granularity: minute, hour or day (default: hour)
+        group_by: model or caller (default: model)
+        window: Look-back window (default: 24h)
+        q: Latency quantiles, e.g. "0.5,0.9,0.99"
+        model_id: Optional single model, only with group_by=model
+        caller: Optional single project, only with group_by=caller
+        limit: Number of busiest series (1-100, default: 10)
+        if_none_match: ETag of the caller's copy (user-016)
+        db: Database session dependency
+
+    Returns:
+        Series ordered by request_count DESC; 304 if the caller's copy is current
+
+    Raises:
+        HTTPException: 400 if window or q is malformed, the window holds more
+            than MAX_TIMESERIES_POINTS buckets, minute buckets are asked for
+            beyond their retention, or the filter does not match group_by
+    """
+    granularity = _unwrap_query(granularity, "hour")
+    group_by = _unwrap_query(group_by, "model")
+    window = _unwrap_query(window, "24h")
+    q = _unwrap_query(q, DEFAULT_TIMESERIES_QUANTILES)
+    model_id = _unwrap_query(model_id)
+    caller = _unwrap_query(caller)
+    limit = _unwrap_query(limit, 10)
+
+    span, quantiles = _parse_timeseries_params(granularity, group_by, window, q, model_id, caller)
+    group_key = str(model_id) if model_id is not None else caller
+
+    etag = statistics_etag(
+        ModelsCache.version(),
+        {
+            "by": "timeseries",
+            "granularity": granularity,
+            "group_by": group_by,
+            "window": window,
+            "q": q,
+            "key": group_key,
+            "limit": limit,
+        },
+    )
+    if etag_matches(_unwrap_query(if_none_match), etag):
+        return not_modified(etag)
+
+    repository = PromptHistoryRepository(db)
+    series = await repository.get_timeseries(granularity, group_by, span, quantiles, group_key)
+
+    response.headers["ETag"] = etag
+    labels = [f"{value:g}" for value in quantiles]
+    return TimeseriesResponse(
+        granularity=granularity,
+        group_by=group_by,
+        window=window,
+        series=[
+            TimeseriesSeriesResponse(
+                model_id=int(entry["group_key"]) if group_by == "model" else None,
+                caller=entry["group_key"] if group_by == "caller" else None,
+                request_count=entry["request_count"],
+                points=[_point_to_response(point, labels) for point in entry["points"]],
+            )
+            for entry in series[:limit]
+        ],
+    )
+
+
 @router.get(
     "/statistics/period",
     response_model=ModelStatisticsResponse,
     summary="Get statistics for period",
 )
 async def get_period_statistics(
+    response: Response,
     start_date: datetime = Query(..., description="Start of period"),
     end_date: datetime = Query(..., description="End of period"),
     model_id: Optional[int] = Query(None, description="Optional filter by model ID"),
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
-) -> ModelStatisticsResponse:
+) -> Union[ModelStatisticsResponse, Response]:
     """
     Get statistics for a specific time period.
 
     Args:
+        response: Outgoing response (ETag header)
         start_date: Start of period
         end_date: End of period
         model_id: Optional filter by model ID
+        if_none_match: ETag of the caller's copy (user-016)
         db: Database session dependency
 
     Returns:
-        Statistics for the period
+        Statistics for the period; 304 if the caller's copy is current
     """
+    model_id = _unwrap_query(model_id)
+    etag = statistics_etag(
+        ModelsCache.version(),
+        {
+            "by": "period",
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "model_id": model_id,
+        },
+    )
+    if etag_matches(_unwrap_query(if_none_match), etag):
+        return not_modified(etag)
+
     repository = PromptHistoryRepository(db)
     stats = await repository.get_statistics_for_period(
         start_date=start_date, end_date=end_date, model_id=model_id
     )
 
+    response.headers["ETag"] = etag
     return ModelStatisticsResponse(**stats)
 
 
+def _parse_timeseries_params(
+    granularity: str,
+    group_by: str,
+    window: str,
+    q: str,
+    model_id: Optional[int],
+    caller: Optional[str],
+) -> Tuple[timedelta, List[float]]:
+    """
+    Validate the parameters of GET /statistics/timeseries (user-025).
+
+    Raises:
+        HTTPException: 400 with the reason
+    """
+    try:
+        span, quantiles = parse_window(window), parse_quantiles(q)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if span / TIMESERIES_BUCKETS[granularity] > MAX_TIMESERIES_POINTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"window {window} holds more than {MAX_TIMESERIES_POINTS} {granularity} buckets",
+        )
+    if granularity == "minute" and span > timedelta(hours=TIMESERIES_MINUTE_RETENTION_HOURS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                f"minute buckets are kept for {TIMESERIES_MINUTE_RETENTION_HOURS:g}h; "
+                "use a shorter window or granularity=hour"
+            ),
+        )
+    if (model_id is not None and group_by != "model") or (
+        caller is not None and group_by != "caller"
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="model_id requires group_by=model, caller requires group_by=caller",
+        )
+    return span, quantiles
+
+
+def _point_to_response(point: Dict[str, Any], labels: Sequence[str]) -> TimeseriesPointResponse:
+    """Build TimeseriesPointResponse; latency keys are the quantiles as "0.5", "0.99"."""
+    values = point["latency_quantiles"] or [None] * len(labels)
+    return TimeseriesPointResponse(
+        bucket_start=point["bucket_start"],
+        request_count=point["request_count"],
+        success_count=point["success_count"],
+        hard_fail_count=point["hard_fail_count"],
+        rate_limited_count=point["rate_limited_count"],
+        latency_quantiles=dict(zip(labels, values)),
+    )
+
+
+def _parse_cursor(cursor: Optional[str]) -> Optional[HistoryCursor]:
+    """
+    Decode the ``cursor`` query parameter.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+
+
+def _journal_page(
+    rows: Sequence[Union[PromptHistory, PromptHistorySummary]],
+    limit: int,
+    response: Response,
+    convert: Callable,
+) -> list:
+    """
+    Trim a limit+1 fetch to one page and announce the next cursor (user-018).
+
+    Args:
+        rows: Up to limit + 1 records (full or summary) in journal order
+        limit: Page size requested by the client
+        response: Outgoing response; X-Next-Cursor is set if more records exist
+        convert: Domain entity -> response schema
+
+    Returns:
+        At most limit response objects
+    """
+    page = rows[:limit]
+    if len(rows) > limit:
+        last = page[-1]
+        # Строки из БД всегда с id; Optional — только у ещё не вставленных сущностей
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, cast(int, last.id))
+    return [convert(row) for row in page]
+
+
+def _validation_detail(error: ValidationError, *loc_prefix: int) -> list[dict]:
+    """JSON-safe 422 detail: raw input (may be bytes) is dropped."""
+    return [
+        {"type": e["type"], "loc": [*loc_prefix, *e["loc"]], "msg": e["msg"]}
+        for e in error.errors(include_url=False, include_context=False)
+    ]
+
+
+def _parse_ndjson(body: bytes) -> List[PromptHistoryCreate]:
+    """
+    Parse NDJSON body into creation schemas; blank lines are skipped.
+
+    Raises:
+        HTTPException: 422 for the first invalid line; error loc starts with
+            the 1-based line number
+    """
+    records: List[PromptHistoryCreate] = []
+    for line_number, line in enumerate(body.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            records.append(PromptHistoryCreate.model_validate_json(line))
+        except ValidationError as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=_validation_detail(e, line_number),
+            ) from e
+    return records
+
+
+def history_from_create(history_data: PromptHistoryCreate) -> PromptHistory:
+    """
+    Convert a creation schema to a new domain entity (shared with /outcomes).
+
+    Args:
+        history_data: Prompt history creation data
+
+    Returns:
+        PromptHistory domain entity without ID
+    """
+    return PromptHistory(
+        id=None,
+        user_id=history_data.user_id,
+        prompt_text=history_data.prompt_text,
+        selected_model_id=history_data.selected_model_id,
+        response_text=history_data.response_text,
+        response_time=history_data.response_time,
+        success=history_data.success,
+        error_message=history_data.error_message,
+        created_at=datetime.utcnow(),
+        caller=history_data.caller,
+        http_status=history_data.http_status,
+        requested_model=history_data.requested_model,
+        cache_hit=history_data.cache_hit,
+    )
+
+
+def _summary_to_response(summary: PromptHistorySummary) -> PromptHistorySummaryResponse:
+    """Convert a journal summary to its API schema (user-020)."""
+    return PromptHistorySummaryResponse.model_validate(summary)
+
+
 def _history_to_response(history: PromptHistory) -> PromptHistoryResponse:
     """
     Convert domain model to API response.
@@ -321,4 +939,5 @@ def _history_to_response(history: PromptHistory) -> PromptHistoryResponse:
         caller=history.caller,
         http_status=history.http_status,
         requested_model=history.requested_model,
+        cache_hit=history.cache_hit,
     )
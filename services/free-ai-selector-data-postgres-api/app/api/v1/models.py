@@ -2,27 +2,49 @@
 AI Models API routes for AI Manager Platform - Data API Service
 
 Provides CRUD operations for AI models and statistics management.
+
+user-015: GET /models is served from ModelsCache between writes; every
+write endpoint invalidates it after commit.
+user-016: the listing carries a strong ETag derived from ModelsCache.version();
+If-None-Match on an unchanged catalog gets 304 without a query or a body.
+user-024: /models/latency and /models/{id}/latency return latency quantiles
+merged from the daily latency sketches, for any window.
 """
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union, cast
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_model_or_404
-from app.api.v1.schemas import AIModelCreate, AIModelResponse, AIModelStatsUpdate
+from app.api.v1.schemas import (
+    AIModelCreate,
+    AIModelResponse,
+    AIModelStatsUpdate,
+    ModelLatencyResponse,
+)
 from app.domain.models import AIModel
 from app.infrastructure.database.connection import get_db
+from app.infrastructure.models_cache import ModelsCache
 from app.infrastructure.repositories.ai_model_repository import AIModelRepository
 from app.infrastructure.repositories.prompt_history_repository import (
     PromptHistoryRepository,
 )
 from app.utils.audit import audit_event
+from app.utils.etag import etag_matches, models_etag, not_modified, statistics_etag
+from app.utils.window import parse_quantiles, parse_window
 
 router = APIRouter(prefix="/models", tags=["AI Models"])
 
+# user-016: сериализация списка один раз на запись кеша (байт-в-байт как FastAPI)
+_MODELS_LIST_ADAPTER = TypeAdapter(List[AIModelResponse])
+
+# user-024: Квантили латентности по умолчанию
+DEFAULT_LATENCY_QUANTILES = "0.5,0.9,0.99"
+
 
 @router.get("", response_model=List[AIModelResponse], summary="Get all AI models")
 async def get_all_models(
@@ -37,8 +59,9 @@ async def get_all_models(
     window_days: int = Query(
         7, ge=1, le=30, description="Window size in days for recent metrics"
     ),
+    if_none_match: str | None = Header(None),
     db: AsyncSession = Depends(get_db),
-) -> List[AIModelResponse]:
+) -> Response:
     """
     Get all AI models.
 
@@ -47,26 +70,111 @@ async def get_all_models(
         available_only: If True, exclude models with available_at > now() (default: False)
         include_recent: If True, include recent metrics from prompt_history (F010)
         window_days: Window size in days for recent metrics (1-30, default: 7)
+        if_none_match: ETag of the caller's copy (user-016)
         db: Database session dependency
 
     Returns:
-        List of AI models with statistics (and optional recent metrics)
+        List of AI models with statistics (and optional recent metrics);
+        304 if the caller's copy is current. The ETag is models_etag: any
+        write changes it; time-driven changes (decay weights, a cooldown
+        ending on a model that is not cached) may be confirmed by a 304 for
+        up to STATISTICS_ETAG_WINDOW_SECONDS
     """
+    # user-015: готовый ответ из памяти, пока не было записей
+    cache_key = (active_only, available_only, include_recent, window_days)
+    cached = ModelsCache.get(cache_key)
+    if cached is not None:
+        if etag_matches(if_none_match, cached.etag):
+            return not_modified(cached.etag)
+        return _json_response(cached.body, cached.etag)
+    version = ModelsCache.version()
+    etag = models_etag(
+        version,
+        {
+            "active_only": active_only,
+            "available_only": available_only,
+            "include_recent": include_recent,
+            "window_days": window_days,
+        },
+    )
+    if etag_matches(if_none_match, etag):
+        # user-016: версия не менялась — без запроса в БД и сериализации
+        return not_modified(etag)
+
     repository = AIModelRepository(db)
     models = await repository.get_all(
         active_only=active_only, available_only=available_only
     )
 
     if not include_recent:
-        return [_model_to_response(model) for model in models]
+        responses = [_model_to_response(model) for model in models]
+    else:
+        # Fix C+D2: Decay-взвешенная статистика вместо плоского подсчёта
+        history_repository = PromptHistoryRepository(db)
+        recent_stats = await history_repository.get_recent_weighted_stats_for_all_models(
+            window_days
+        )
+        responses = [_model_to_response(model, recent_stats) for model in models]
+
+    body = _MODELS_LIST_ADAPTER.dump_json(responses)
+    if ModelsCache.is_enabled():
+        ModelsCache.put(
+            cache_key,
+            body,
+            etag,
+            version=version,
+            next_available_at=await repository.get_next_available_at(),
+        )
+    return _json_response(body, etag)
 
-    # Fix C+D2: Decay-взвешенная статистика вместо плоского подсчёта
-    history_repository = PromptHistoryRepository(db)
-    recent_stats = await history_repository.get_recent_weighted_stats_for_all_models(
-        window_days
-    )
 
-    return [_model_to_response(model, recent_stats) for model in models]
+@router.get(
+    "/latency",
+    response_model=List[ModelLatencyResponse],
+    summary="Latency quantiles of all models",
+)
+async def get_models_latency(
+    response: Response,
+    window: str = Query("24h", description="Look-back window: 90m, 24h, 7d"),
+    q: str = Query(DEFAULT_LATENCY_QUANTILES, description="Comma-separated quantiles in [0, 1]"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+) -> Union[List[ModelLatencyResponse], Response]:
+    """
+    Latency quantiles of every model with calls in the window (user-024).
+
+    The ETag is the statistics ETag (statistics_etag): any history write
+    changes it at once, but without writes it stays the same for up to
+    STATISTICS_ETAG_WINDOW_SECONDS (60s). Calls that leave the sliding
+    window within that time can therefore still be answered with a 304.
+
+    Args:
+        response: Outgoing response (ETag header)
+        window: Look-back window (default: 24h)
+        q: Quantiles, e.g. "0.5,0.9,0.99"
+        if_none_match: ETag of the caller's copy (user-016)
+        db: Database session dependency
+
+    Returns:
+        One entry per model, ordered by model ID; 304 if the caller's copy is current
+
+    Raises:
+        HTTPException: 400 if window or q is malformed
+    """
+    span, quantiles = _parse_latency_params(window, q)
+
+    etag = statistics_etag(ModelsCache.version(), {"by": "latency", "window": window, "q": q})
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    repository = PromptHistoryRepository(db)
+    latency = await repository.get_latency_quantiles(span, quantiles)
+
+    response.headers["ETag"] = etag
+    return [
+        _latency_to_response(model_id, window, quantiles, latency[model_id])
+        for model_id in sorted(latency)
+    ]
 
 
 @router.get("/{model_id}", response_model=AIModelResponse, summary="Get AI model by ID")
@@ -88,6 +196,46 @@ async def get_model_by_id(
     return _model_to_response(model)
 
 
+@router.get(
+    "/{model_id}/latency",
+    response_model=ModelLatencyResponse,
+    summary="Latency quantiles of a model",
+)
+async def get_model_latency(
+    model: AIModel = Depends(get_model_or_404),
+    window: str = Query("24h", description="Look-back window: 90m, 24h, 7d"),
+    q: str = Query(DEFAULT_LATENCY_QUANTILES, description="Comma-separated quantiles in [0, 1]"),
+    db: AsyncSession = Depends(get_db),
+) -> ModelLatencyResponse:
+    """
+    Latency quantiles of one model over a window (user-024).
+
+    Each quantile is within 1% of percentile_disc over the model's calls in
+    the window (failures included, response-cache hits excluded), but is
+    computed from the daily latency sketches, not from raw rows.
+
+    Args:
+        model: AIModel from get_model_or_404 dependency (F015)
+        window: Look-back window (default: 24h)
+        q: Quantiles, e.g. "0.5,0.9,0.99"
+        db: Database session dependency
+
+    Returns:
+        Quantiles in seconds (null when the model had no calls in the window)
+
+    Raises:
+        HTTPException: 404 if model not found, 400 if window or q is malformed
+    """
+    # Модель из БД (get_model_or_404): id всегда задан
+    model_id = cast(int, model.id)
+    span, quantiles = _parse_latency_params(window, q)
+
+    repository = PromptHistoryRepository(db)
+    latency = await repository.get_latency_quantiles(span, quantiles, model_id=model_id)
+
+    return _latency_to_response(model_id, window, quantiles, latency.get(model_id))
+
+
 @router.post(
     "",
     response_model=AIModelResponse,
@@ -138,6 +286,7 @@ async def create_model(
 
     created_model = await repository.create(new_model)
     await db.commit()
+    ModelsCache.invalidate()
 
     return _model_to_response(created_model)
 
@@ -181,6 +330,7 @@ async def update_model_stats(
         )
 
     await db.commit()
+    ModelsCache.invalidate()
 
     return _model_to_response(updated_model)
 
@@ -222,6 +372,7 @@ async def increment_success(
         )
 
     await db.commit()
+    ModelsCache.invalidate()
 
     return _model_to_response(updated_model)
 
@@ -263,6 +414,7 @@ async def increment_failure(
         )
 
     await db.commit()
+    ModelsCache.invalidate()
 
     return _model_to_response(updated_model)
 
@@ -300,6 +452,7 @@ async def set_model_active(
         )
 
     await db.commit()
+    ModelsCache.invalidate()
 
     return _model_to_response(updated_model)
 
@@ -349,40 +502,34 @@ async def set_model_availability(
         HTTPException: 404 if model not found
     """
     repository = AIModelRepository(db)
-    current_model = await repository.get_by_id(model_id)
-
-    if current_model is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"AI model with ID {model_id} not found",
-        )
 
-    updated_model = await repository.set_availability(
+    # user-017: одно UPDATE ... RETURNING, прежний available_at — для аудита
+    changed = await repository.set_availability_returning_previous(
         model_id=model_id, retry_after_seconds=retry_after_seconds
     )
 
-    if updated_model is None:
+    if changed is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"AI model with ID {model_id} not found",
         )
+    updated_model, previous_available_at = changed
 
     await db.commit()
+    ModelsCache.invalidate()
 
     audit_event(
         "availability_changed",
         {
             "model_id": model_id,
-            "model": current_model.name,
-            "provider": current_model.provider,
+            "model": updated_model.name,
+            "provider": updated_model.provider,
             "retry_after_seconds": retry_after_seconds,
             "reason": reason,
             "error_type": error_type,
             "source": source,
             "available_at_before": (
-                current_model.available_at.isoformat()
-                if current_model.available_at
-                else None
+                previous_available_at.isoformat() if previous_available_at else None
             ),
             "available_at_after": (
                 updated_model.available_at.isoformat()
@@ -395,6 +542,42 @@ async def set_model_availability(
     return _model_to_response(updated_model)
 
 
+def _parse_latency_params(window: str, q: str) -> Tuple[timedelta, List[float]]:
+    """
+    Parse ?window= and ?q= of the latency endpoints (user-024).
+
+    Raises:
+        HTTPException: 400 with the parse error
+    """
+    try:
+        return parse_window(window), parse_quantiles(q)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+def _latency_to_response(
+    model_id: int,
+    window: str,
+    quantiles: Sequence[float],
+    entry: Optional[Dict[str, Any]],
+) -> ModelLatencyResponse:
+    """Build ModelLatencyResponse; keys are the quantiles as "0.5", "0.99"."""
+    values: Sequence[Optional[float]] = (
+        entry["quantiles"] if entry is not None else [None] * len(quantiles)
+    )
+    return ModelLatencyResponse(
+        model_id=model_id,
+        window=window,
+        sample_count=entry["sample_count"] if entry is not None else 0,
+        quantiles={f"{q:g}": value for q, value in zip(quantiles, values)},
+    )
+
+
+def _json_response(body: bytes, etag: str) -> Response:
+    """Pre-serialized JSON body with its ETag (user-016)."""
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
 def _model_to_response(
     model: AIModel,
     recent_stats: Dict[int, Dict[str, Any]] | None = None,
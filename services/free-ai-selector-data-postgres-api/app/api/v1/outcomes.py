@@ -0,0 +1,93 @@
+"""
+Prompt Outcome API routes for AI Manager Platform - Data API Service
+
+user-010: One transactional write per prompt instead of separate
+increment-success|failure, availability and history calls. The counter
+update and cooldown are a single UPDATE ... RETURNING, the history row is
+inserted in the same session, and everything is committed once.
+"""
+
+from decimal import Decimal
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.history import history_from_create
+from app.api.v1.schemas import OutcomeCreate, OutcomeResponse
+from app.infrastructure.database.connection import get_db
+from app.infrastructure.models_cache import ModelsCache
+from app.infrastructure.repositories.ai_model_repository import AIModelRepository
+from app.infrastructure.repositories.prompt_history_repository import PromptHistoryRepository
+from app.utils.audit import audit_event
+
+router = APIRouter(prefix="/outcomes", tags=["Outcomes"])
+
+
+@router.post(
+    "",
+    response_model=OutcomeResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Record prompt outcome (counters + cooldown + history)",
+)
+async def record_outcome(
+    outcome: OutcomeCreate, db: AsyncSession = Depends(get_db)
+) -> OutcomeResponse:
+    """
+    Record a prompt outcome in one transaction.
+
+    Args:
+        outcome: Counter update, optional cooldown and optional history record
+        db: Database session dependency
+
+    Returns:
+        IDs of the touched rows and the model's available_at
+
+    Raises:
+        HTTPException: 404 if model not found (nothing is written)
+    """
+    response = OutcomeResponse(model_id=None, history_id=None, available_at=None)
+
+    if outcome.model_id is not None and (
+        outcome.result is not None or outcome.cooldown is not None
+    ):
+        updated_model = await AIModelRepository(db).apply_outcome(
+            model_id=outcome.model_id,
+            success=None if outcome.result is None else outcome.result == "success",
+            response_time=Decimal(str(outcome.response_time)),
+            retry_after_seconds=(
+                outcome.cooldown.retry_after_seconds if outcome.cooldown else None
+            ),
+        )
+        if updated_model is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"AI model with ID {outcome.model_id} not found",
+            )
+        response.model_id = updated_model.id
+        response.available_at = updated_model.available_at
+
+    if outcome.history is not None:
+        created_history = await PromptHistoryRepository(db).create(
+            history_from_create(outcome.history)
+        )
+        response.history_id = created_history.id
+
+    await db.commit()
+    ModelsCache.invalidate()
+
+    if outcome.cooldown is not None:
+        audit_event(
+            "availability_changed",
+            {
+                "model_id": outcome.model_id,
+                "retry_after_seconds": outcome.cooldown.retry_after_seconds,
+                "reason": outcome.cooldown.reason,
+                "error_type": outcome.cooldown.error_type,
+                "source": outcome.cooldown.source,
+                "available_at_after": (
+                    response.available_at.isoformat() if response.available_at else None
+                ),
+            },
+        )
+
+    return response
@@ -7,9 +7,9 @@ Uses Pydantic 2.0 for validation and serialization.
 
 from datetime import datetime
 from decimal import Decimal
-from typing import Optional
+from typing import Dict, List, Literal, Optional
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 
 # =============================================================================
@@ -127,6 +127,8 @@ class PromptHistoryCreate(BaseModel):
     requested_model: Optional[str] = Field(
         None, max_length=255, description="Model name caller requested (null = auto-select)"
     )
+    # user-007: answer served from the business-api response cache
+    cache_hit: bool = Field(False, description="Whether the answer came from the response cache")
 
 
 class PromptHistoryResponse(BaseModel):
@@ -149,10 +151,107 @@ class PromptHistoryResponse(BaseModel):
     requested_model: Optional[str] = Field(
         None, description="Model name caller requested (null = auto-select)"
     )
+    cache_hit: bool = Field(False, description="Whether the answer came from the response cache")
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class PromptHistorySummaryResponse(BaseModel):
+    """Slim journal row: metadata and text previews, no full texts (user-020)."""
+
+    id: int = Field(..., description="History record ID")
+    user_id: str = Field(..., description="User ID")
+    selected_model_id: int = Field(..., description="Selected AI model ID")
+    response_time: Decimal = Field(..., description="Response time in seconds")
+    success: bool = Field(..., description="Whether request was successful")
+    created_at: datetime = Field(..., description="Creation timestamp")
+    prompt_preview: str = Field(..., description="First preview_chars characters of the prompt")
+    response_preview: Optional[str] = Field(
+        None, description="First preview_chars characters of the response"
+    )
+    caller: Optional[str] = Field(None, description="External project that called the API")
+    http_status: Optional[int] = Field(
+        None, description="HTTP status returned to the caller (200/429/503/500)"
+    )
+    requested_model: Optional[str] = Field(
+        None, description="Model name caller requested (null = auto-select)"
+    )
+    cache_hit: bool = Field(False, description="Whether the answer came from the response cache")
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PromptHistoryBulkResponse(BaseModel):
+    """Schema for bulk history ingestion result (user-011)."""
+
+    ids: list[int] = Field(..., description="Created history record IDs, in input order")
+    count: int = Field(..., description="Number of inserted records")
+
+
+# =============================================================================
+# Outcome Schemas (user-010)
+# =============================================================================
+
+
+class OutcomeCooldown(BaseModel):
+    """Availability cooldown applied together with an outcome."""
+
+    retry_after_seconds: int = Field(
+        ..., ge=0, description="Seconds until model becomes available (0 = clear cooldown)"
+    )
+    reason: Optional[str] = Field(
+        None, max_length=64, description="Machine-readable reason for availability change"
+    )
+    error_type: Optional[str] = Field(
+        None, max_length=64, description="Error type that triggered cooldown"
+    )
+    source: Optional[str] = Field(
+        None, max_length=64, description="Source component that requested availability update"
+    )
+
+
+class OutcomeCreate(BaseModel):
+    """
+    Schema for recording a prompt outcome in one transaction (user-010).
+
+    Any combination of counter update, cooldown and history row is allowed;
+    counters and cooldown require model_id.
+    """
+
+    model_config = ConfigDict(protected_namespaces=())
+
+    model_id: Optional[int] = Field(None, gt=0, description="Model whose stats/cooldown change")
+    result: Optional[Literal["success", "failure"]] = Field(
+        None, description="Counter to increment (null = counters unchanged)"
+    )
+    response_time: Decimal = Field(
+        Decimal("0"), ge=0, description="Response time in seconds for the counter update"
+    )
+    cooldown: Optional[OutcomeCooldown] = Field(None, description="Optional availability cooldown")
+    history: Optional[PromptHistoryCreate] = Field(None, description="Optional history record")
+
+    @model_validator(mode="after")
+    def validate_parts(self) -> "OutcomeCreate":
+        """Хотя бы одна часть; счётчики и cooldown требуют model_id."""
+        if self.result is None and self.cooldown is None and self.history is None:
+            raise ValueError("outcome must contain result, cooldown or history")
+        if (self.result is not None or self.cooldown is not None) and self.model_id is None:
+            raise ValueError("model_id is required for result and cooldown")
+        return self
+
+
+class OutcomeResponse(BaseModel):
+    """Schema for recorded outcome: only what the caller needs."""
+
+    model_config = ConfigDict(protected_namespaces=())
+
+    model_id: Optional[int] = Field(None, description="Updated model ID")
+    history_id: Optional[int] = Field(None, description="Created history record ID")
+    available_at: Optional[datetime] = Field(
+        None, description="Model available_at after the update"
+    )
+
+
 # =============================================================================
 # Statistics Schemas
 # =============================================================================
@@ -188,6 +287,61 @@ class CallerStatisticsResponse(BaseModel):
     )
 
 
+class ModelLatencyResponse(BaseModel):
+    """Latency quantiles of a model over a look-back window (user-024)."""
+
+    model_config = ConfigDict(protected_namespaces=())
+
+    model_id: int = Field(..., description="Model ID")
+    window: str = Field(..., description="Look-back window, e.g. 24h")
+    sample_count: int = Field(
+        ..., ge=0, description="Calls in the window (response-cache hits excluded)"
+    )
+    quantiles: Dict[str, Optional[float]] = Field(
+        ..., description='Quantile ("0.9") -> latency in seconds; null without calls'
+    )
+
+
+class TimeseriesPointResponse(BaseModel):
+    """One UTC bucket of a time series (user-025)."""
+
+    bucket_start: datetime = Field(..., description="Bucket start (UTC)")
+    request_count: int = Field(..., ge=0, description="Requests in the bucket")
+    success_count: int = Field(..., ge=0, description="Successful requests")
+    hard_fail_count: int = Field(..., ge=0, description="Failures other than HTTP 429")
+    rate_limited_count: int = Field(..., ge=0, description="Failures with HTTP 429")
+    latency_quantiles: Dict[str, Optional[float]] = Field(
+        ...,
+        description='Quantile ("0.9") -> latency in seconds; null if only cache hits',
+    )
+
+
+class TimeseriesSeriesResponse(BaseModel):
+    """Series of one model or one caller (user-025)."""
+
+    model_config = ConfigDict(protected_namespaces=())
+
+    model_id: Optional[int] = Field(None, description="Model ID (group_by=model)")
+    caller: Optional[str] = Field(
+        None, description="Project name (group_by=caller; null = unattributed requests)"
+    )
+    request_count: int = Field(..., ge=0, description="Requests over the whole window")
+    points: List[TimeseriesPointResponse] = Field(
+        ..., description="Non-empty buckets in ascending time order"
+    )
+
+
+class TimeseriesResponse(BaseModel):
+    """Bucketed request / outcome / latency series (user-025)."""
+
+    granularity: Literal["minute", "hour", "day"] = Field(..., description="Bucket size")
+    group_by: Literal["model", "caller"] = Field(..., description="Series dimension")
+    window: str = Field(..., description="Look-back window, e.g. 24h")
+    series: List[TimeseriesSeriesResponse] = Field(
+        ..., description="Series ordered by request_count DESC"
+    )
+
+
 # =============================================================================
 # Health Check Schema
 # =============================================================================
@@ -103,3 +103,27 @@ class PromptHistory:
     caller: Optional[str] = None  # External project that called the API
     http_status: Optional[int] = None  # HTTP status returned to caller (200/429/503/500)
     requested_model: Optional[str] = None  # Model name caller requested (None = auto-select)
+    cache_hit: bool = False  # user-007: served from the business-api response cache
+
+
+@dataclass
+class PromptHistorySummary:
+    """
+    Journal row without full texts (user-020).
+
+    prompt_preview / response_preview are the first N characters computed
+    in SQL; full texts are only read by GET /history/{id}.
+    """
+
+    id: int
+    user_id: str
+    selected_model_id: int
+    response_time: Decimal
+    success: bool
+    created_at: datetime
+    prompt_preview: str
+    response_preview: Optional[str]
+    caller: Optional[str] = None
+    http_status: Optional[int] = None
+    requested_model: Optional[str] = None
+    cache_hit: bool = False
@@ -55,6 +55,17 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """
+    Dependency returning the session factory itself (user-022).
+
+    get_db() sessions are closed when the route returns — before a
+    StreamingResponse body runs. Streaming routes open their own session
+    from this factory inside the body generator instead.
+    """
+    return AsyncSessionLocal
+
+
 async def init_db() -> None:
     """
     Initialize database tables.
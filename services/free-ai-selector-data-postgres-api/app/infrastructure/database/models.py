@@ -7,9 +7,23 @@ Uses SQLAlchemy 2.0 async patterns.
 
 from datetime import datetime
 from decimal import Decimal
-from typing import Optional
+from typing import List, Optional
 
-from sqlalchemy import Boolean, DateTime, Integer, Numeric, String, Text, func
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    DateTime,
+    Float,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    Text,
+    UniqueConstraint,
+    false,
+    func,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -76,29 +90,44 @@ class PromptHistoryORM(Base):
 
     Maps to the prompt_history table in PostgreSQL.
     Records all prompt processing requests with metrics.
+
+    user-013: в БД после миграции 0007 таблица партиционирована по дням
+    (RANGE по created_at, PRIMARY KEY (id, created_at)). ORM об этом не знает:
+    id по-прежнему уникален (общая последовательность), а create_all в тестах
+    создаёт обычную таблицу.
+
+    user-019: индексы — составные под запросы репозитория (миграция 0009),
+    объявлены после класса.
+
+    user-021: GIN-индексы pg_trgm по prompt_text / error_message для поиска
+    в журнале есть только в миграции 0010 — create_all не требует расширения.
     """
 
     __tablename__ = "prompt_history"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    user_id: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
+    user_id: Mapped[str] = mapped_column(String(255), nullable=False)
     prompt_text: Mapped[str] = mapped_column(Text, nullable=False)
-    selected_model_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    selected_model_id: Mapped[int] = mapped_column(Integer, nullable=False)
 
     # Response data
     response_text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     response_time: Mapped[Decimal] = mapped_column(Numeric(10, 3), nullable=False)
-    success: Mapped[bool] = mapped_column(Boolean, nullable=False, index=True)
+    success: Mapped[bool] = mapped_column(Boolean, nullable=False)
     error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 
     # Per-project ("caller") dimension + precise status (oxl)
-    caller: Mapped[Optional[str]] = mapped_column(String(255), nullable=True, index=True)
+    caller: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     http_status: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     requested_model: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    # user-007: answer served from the business-api response cache
+    cache_hit: Mapped[bool] = mapped_column(
+        Boolean, nullable=False, default=False, server_default=false()
+    )
 
     # Timestamp
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), nullable=False, server_default=func.now(), index=True
+        DateTime(timezone=True), nullable=False, server_default=func.now()
     )
 
     def __repr__(self) -> str:
@@ -106,3 +135,213 @@ class PromptHistoryORM(Base):
             f"<PromptHistoryORM(id={self.id}, user_id='{self.user_id}', "
             f"model_id={self.selected_model_id}, success={self.success})>"
         )
+
+
+# user-019: (фильтр, created_at, id) под журнал с keyset-пагинацией и
+# covering-индексы под оконные агрегаты (index-only scan)
+Index(
+    "ix_prompt_history_created_at_id",
+    PromptHistoryORM.created_at,
+    PromptHistoryORM.id,
+    postgresql_include=[
+        "selected_model_id",
+        "success",
+        "http_status",
+        "response_time",
+        "cache_hit",
+        "caller",
+        "requested_model",
+    ],
+)
+Index(
+    "ix_prompt_history_model_created_at",
+    PromptHistoryORM.selected_model_id,
+    PromptHistoryORM.created_at,
+    PromptHistoryORM.id,
+    postgresql_include=["success", "http_status", "response_time"],
+)
+Index(
+    "ix_prompt_history_caller_created_at",
+    PromptHistoryORM.caller,
+    PromptHistoryORM.created_at.desc(),
+    PromptHistoryORM.id.desc(),
+)
+Index(
+    "ix_prompt_history_user_created_at",
+    PromptHistoryORM.user_id,
+    PromptHistoryORM.created_at.desc(),
+    PromptHistoryORM.id.desc(),
+)
+Index(
+    "ix_prompt_history_failed_created_at",
+    PromptHistoryORM.created_at.desc(),
+    PromptHistoryORM.id.desc(),
+    postgresql_where=~PromptHistoryORM.success,
+)
+
+
+class ModelHourlyStatsORM(Base):
+    """
+    Per-model hourly rollup of prompt_history (user-014).
+
+    Maps to the model_hourly_stats table in PostgreSQL. One row per
+    (model, UTC hour); обновляется в той же транзакции, что и INSERT в
+    prompt_history (cache hits не учитываются).
+
+    *_moments — степенные суммы Σ u^j (j = 0..6), где u — смещение записи
+    от начала часа в часах. Из них decay-вес бакета восстанавливается для
+    любого decay_per_hour без сканирования сырых строк.
+    latency_ms / latency_counts — точная гистограмма латентности
+    (мс → количество, по возрастанию мс): медиана по объединению бакетов
+    совпадает с percentile_cont(0.5).
+    """
+
+    __tablename__ = "model_hourly_stats"
+
+    model_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+
+    request_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    success_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    hard_fail_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rate_limited_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    success_moments: Mapped[List[float]] = mapped_column(ARRAY(Float), nullable=False)
+    hard_fail_moments: Mapped[List[float]] = mapped_column(ARRAY(Float), nullable=False)
+    weight_moments: Mapped[List[float]] = mapped_column(ARRAY(Float), nullable=False)
+    time_moments: Mapped[List[float]] = mapped_column(ARRAY(Float), nullable=False)
+    latency_ms: Mapped[List[int]] = mapped_column(ARRAY(Integer), nullable=False)
+    latency_counts: Mapped[List[int]] = mapped_column(ARRAY(Integer), nullable=False)
+
+    def __repr__(self) -> str:
+        return (
+            f"<ModelHourlyStatsORM(model_id={self.model_id}, "
+            f"bucket_start={self.bucket_start}, requests={self.request_count})>"
+        )
+
+
+class CallerHourlyStatsORM(Base):
+    """
+    Per-caller, per-model hourly rollup of prompt_history (user-023).
+
+    Maps to the caller_hourly_stats table in PostgreSQL. One row per
+    (caller, model, UTC hour); обновляется в той же транзакции, что и INSERT
+    в prompt_history. В отличие от model_hourly_stats учитывает все записи,
+    включая cache hits — как и сырой GET /history/statistics/by-caller.
+
+    caller может быть NULL (запросы без проекта), поэтому ключ — суррогатный
+    id, а уникальность (caller, model_id, bucket_start) держит UNIQUE NULLS
+    NOT DISTINCT (PostgreSQL 15+) — цель ON CONFLICT.
+    response_time_sum — точная NUMERIC-сумма: среднее окна совпадает с avg().
+    """
+
+    __tablename__ = "caller_hourly_stats"
+    __table_args__ = (
+        UniqueConstraint(
+            "caller",
+            "model_id",
+            "bucket_start",
+            name="uq_caller_hourly_stats_bucket",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    caller: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    model_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    request_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    success_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    auto_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    pinned_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    response_time_sum: Mapped[Decimal] = mapped_column(Numeric, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return (
+            f"<CallerHourlyStatsORM(caller={self.caller!r}, model_id={self.model_id}, "
+            f"bucket_start={self.bucket_start}, requests={self.request_count})>"
+        )
+
+
+# Окно читается по bucket_start для всех проектов сразу
+Index("ix_caller_hourly_stats_bucket_start", CallerHourlyStatsORM.bucket_start)
+
+
+class ModelLatencySketchORM(Base):
+    """
+    Per-model daily latency sketch (user-024).
+
+    Maps to the model_latency_sketches table in PostgreSQL. One row per
+    (model, UTC day); обновляется в той же транзакции, что и INSERT в
+    prompt_history (cache hits не учитываются).
+
+    sketch_keys / sketch_counts — логарифмические бины латентности в духе
+    DDSketch (ключ бина -> количество, по возрастанию ключа), см.
+    model_latency_sketch_repository. Строк — модели x сутки, отдельный
+    индекс по day_start не нужен.
+    """
+
+    __tablename__ = "model_latency_sketches"
+
+    model_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    day_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+
+    sketch_keys: Mapped[List[int]] = mapped_column(ARRAY(Integer), nullable=False)
+    sketch_counts: Mapped[List[int]] = mapped_column(ARRAY(Integer), nullable=False)
+
+    def __repr__(self) -> str:
+        return (
+            f"<ModelLatencySketchORM(model_id={self.model_id}, "
+            f"day_start={self.day_start}, bins={len(self.sketch_keys)})>"
+        )
+
+
+class HistorySeriesStatsORM(Base):
+    """
+    Time-series rollup of prompt_history for charts (user-025).
+
+    Maps to the history_series_stats table in PostgreSQL. One row per
+    (granularity, group_by, group_key, UTC bucket): granularity — minute
+    (обновляется в той же транзакции, что и INSERT в prompt_history) или
+    hour (минутные бакеты, свёрнутые retention-прогоном); суточные точки
+    складываются при чтении. group_by — "model" (group_key = id модели
+    строкой) или "caller" (group_key = проект, NULL — запросы без проекта).
+
+    Счётчики учитывают все записи, включая cache hits (как статистика по
+    проектам); скетч латентности sketch_keys / sketch_counts — те же
+    логарифмические бины, что в model_latency_sketches, без cache hits.
+    Уникальность — UNIQUE NULLS NOT DISTINCT; её индекс
+    (granularity, group_by, bucket_start, ...) обслуживает и чтение окна.
+    """
+
+    __tablename__ = "history_series_stats"
+    __table_args__ = (
+        UniqueConstraint(
+            "granularity",
+            "group_by",
+            "bucket_start",
+            "group_key",
+            name="uq_history_series_stats_bucket",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    granularity: Mapped[str] = mapped_column(String(8), nullable=False)
+    group_by: Mapped[str] = mapped_column(String(8), nullable=False)
+    group_key: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    request_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    success_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    hard_fail_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rate_limited_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    sketch_keys: Mapped[List[int]] = mapped_column(ARRAY(Integer), nullable=False)
+    sketch_counts: Mapped[List[int]] = mapped_column(ARRAY(Integer), nullable=False)
+
+    def __repr__(self) -> str:
+        return (
+            f"<HistorySeriesStatsORM({self.granularity} {self.group_by}={self.group_key!r}, "
+            f"bucket_start={self.bucket_start}, requests={self.request_count})>"
+        )
@@ -0,0 +1,215 @@
+"""
+Range partition maintenance for prompt_history
+
+user-013: prompt_history партиционирована по дням (RANGE по created_at,
+миграция 0007). Этот модуль создаёт партиции наперёд и удаляет целые
+партиции вне окна хранения — DETACH + DROP TABLE вместо построчного DELETE.
+
+Соглашения (совпадают с миграцией 0007):
+    - Имя дневной партиции: prompt_history_pYYYYMMDD, границы в UTC
+    - prompt_history_default ловит строки без партиции (например, если
+      фоновая задача не успела создать партицию на новый день)
+
+На непартиционированной таблице (тесты с create_all, старые БД) функции
+ничего не делают: is_partitioned() возвращает False.
+"""
+
+import re
+from datetime import date, datetime, time, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+HISTORY_TABLE = "prompt_history"
+# Ожидание блокировки на DETACH / DROP партиции (мс)
+PARTITION_LOCK_TIMEOUT_MS = 2000
+# SQLSTATE lock_not_available (истёк lock_timeout)
+LOCK_NOT_AVAILABLE = "55P03"
+
+
+def partition_name(day: date, table: str = HISTORY_TABLE) -> str:
+    """Имя дневной партиции."""
+    return f"{table}_p{day:%Y%m%d}"
+
+
+def default_partition_name(table: str = HISTORY_TABLE) -> str:
+    """Имя DEFAULT-партиции."""
+    return f"{table}_default"
+
+
+def day_start(day: date) -> datetime:
+    """Нижняя граница партиции дня (UTC)."""
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+async def is_partitioned(session: AsyncSession, table: str = HISTORY_TABLE) -> bool:
+    """Таблица существует и партиционирована."""
+    result = await session.execute(
+        text(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+            "WHERE partrelid = to_regclass(:table))"
+        ),
+        {"table": table},
+    )
+    return bool(result.scalar())
+
+
+async def list_partitions(
+    session: AsyncSession, table: str = HISTORY_TABLE
+) -> List[Tuple[str, date]]:
+    """
+    Дневные партиции таблицы (без DEFAULT), по возрастанию дня.
+
+    Returns:
+        List of (partition name, day)
+    """
+    result = await session.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:table)"
+        ),
+        {"table": table},
+    )
+    pattern = re.compile(rf"^{re.escape(table)}_p(\d{{8}})$")
+    partitions = []
+    for (name,) in result.all():
+        match = pattern.match(name)
+        if match:
+            partitions.append((name, datetime.strptime(match.group(1), "%Y%m%d").date()))
+    return sorted(partitions, key=lambda item: item[1])
+
+
+async def ensure_partitions(
+    session: AsyncSession,
+    first_day: date,
+    days: int,
+    table: str = HISTORY_TABLE,
+) -> List[str]:
+    """
+    Создать недостающие дневные партиции [first_day, first_day + days).
+
+    Партиция создаётся отдельной таблицей и подключается через ATTACH
+    PARTITION (SHARE UPDATE EXCLUSIVE на родителе — вставки не блокируются).
+    Строки этого дня, уже попавшие в DEFAULT-партицию, переносятся в новую.
+
+    Args:
+        session: Сессия БД (commit — на вызывающем)
+        first_day: Первый день
+        days: Количество дней
+        table: Партиционированная таблица
+
+    Returns:
+        Имена созданных партиций
+    """
+    existing = {name for name, _ in await list_partitions(session, table)}
+    default = default_partition_name(table)
+    has_default = (
+        await session.execute(text("SELECT to_regclass(:name)"), {"name": default})
+    ).scalar() is not None
+
+    created = []
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        name = partition_name(day, table)
+        if name in existing:
+            continue
+        lower = day_start(day).isoformat()
+        upper = day_start(day + timedelta(days=1)).isoformat()
+        await session.execute(
+            text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+        )
+        if has_default:
+            await session.execute(
+                text(
+                    f"WITH moved AS (DELETE FROM {default} "
+                    f"WHERE created_at >= '{lower}' AND created_at < '{upper}' RETURNING *) "
+                    f"INSERT INTO {name} SELECT * FROM moved"
+                )
+            )
+        await session.execute(
+            text(
+                f"ALTER TABLE {table} ATTACH PARTITION {name} "
+                f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+            )
+        )
+        created.append(name)
+    return created
+
+
+async def drop_partitions_before(
+    session: AsyncSession,
+    cutoff: datetime,
+    table: str = HISTORY_TABLE,
+    lock_timeout_ms: int = PARTITION_LOCK_TIMEOUT_MS,
+) -> Tuple[List[str], int]:
+    """
+    Удалить партиции, целиком лежащие раньше cutoff.
+
+    Каждая партиция — свои короткие транзакции: DETACH PARTITION под
+    SET LOCAL lock_timeout (ACCESS EXCLUSIVE на родителе — только на время
+    detach), затем DROP TABLE уже отсоединённой таблицы (блокирует только её).
+    Если блокировка не взята за lock_timeout (её держит, например, долгий
+    GET /history/export), удаление останавливается — вставки не копятся в
+    очереди за ожидающим DDL, остальные партиции удалит следующий прогон.
+
+    DETACH ... CONCURRENTLY не подходит: PostgreSQL запрещает его, пока у
+    таблицы есть DEFAULT-партиция (prompt_history_default, миграция 0007).
+
+    Args:
+        session: Сессия БД (commit после каждой партиции)
+        cutoff: Партиция удаляется, если её верхняя граница <= cutoff
+        table: Партиционированная таблица
+        lock_timeout_ms: Сколько ждать блокировку на DETACH / DROP
+
+    Returns:
+        Tuple (имена удалённых партиций, оценка числа удалённых строк по
+        pg_class.reltuples — без count(*) по партиции)
+    """
+    if cutoff.tzinfo is None:
+        cutoff = cutoff.replace(tzinfo=timezone.utc)
+
+    dropped: List[str] = []
+    rows = 0
+    for name, day in await list_partitions(session, table):
+        if day_start(day + timedelta(days=1)) > cutoff:
+            break
+        estimate = (
+            await session.execute(
+                text(
+                    "SELECT greatest(reltuples, 0)::bigint FROM pg_class "
+                    "WHERE oid = to_regclass(:name)"
+                ),
+                {"name": name},
+            )
+        ).scalar_one()
+        try:
+            for statement in (f"ALTER TABLE {table} DETACH PARTITION {name}", f"DROP TABLE {name}"):
+                await session.execute(text(f"SET LOCAL lock_timeout = {int(lock_timeout_ms)}"))
+                await session.execute(text(statement))
+                await session.commit()
+        except DBAPIError as e:
+            if getattr(e.orig, "sqlstate", None) != LOCK_NOT_AVAILABLE:
+                raise
+            await session.rollback()
+            logger.warning("history_partition_drop_lock_timeout", partition=name)
+            break
+        rows += estimate
+        dropped.append(name)
+    return dropped, rows
+
+
+def latest_cutoff(*cutoffs: Optional[datetime]) -> Optional[datetime]:
+    """Самая поздняя из заданных границ (naive трактуется как UTC)."""
+    aware = [
+        c if c.tzinfo is not None else c.replace(tzinfo=timezone.utc)
+        for c in cutoffs
+        if c is not None
+    ]
+    return max(aware) if aware else None
@@ -0,0 +1,165 @@
+"""
+In-process cache of the GET /models response - Data API Service
+
+user-015: GET /api/v1/models (особенно include_recent=true) читает ai_models,
+считает decay-статистику и пересобирает AIModelResponse на каждый вызов, хотя
+между записями результат не меняется. Готовый список кешируется в памяти.
+
+Поведение:
+    - Ключ: (active_only, available_only, include_recent, window_days)
+    - Любая запись, влияющая на список (счётчики, availability, is_active,
+      создание модели, INSERT истории, очистка retention), вызывает
+      invalidate() после commit и сбрасывает все ключи
+    - Запись истекает, когда наступает ближайший будущий available_at
+      (available_only перестаёт исключать модель) или по TTL — decay-веса
+      recent-статистики зависят от now()
+    - version() растёт на каждой инвалидации. put() отбрасывает результат,
+      посчитанный до инвалидации, случившейся во время чтения из БД
+    - user-016: хранится уже сериализованное тело и его ETag (models_etag
+      от version()). Запись, истёкшая по available_at, поднимает version():
+      список available_only изменился без записи, и старый ETag не должен
+      подтверждаться ответом 304
+
+Один кеш на процесс (class-level state, как ResponseCache в Business API);
+data-api запускается одним uvicorn-воркером. Безопасен в asyncio
+(single-threaded event loop).
+
+Configuration:
+    MODELS_CACHE_TTL_SECONDS: Максимальное время жизни записи, сек
+        (default: 60, 0 = кеш выключен)
+"""
+
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, ClassVar, Dict, Optional, Tuple
+
+MODELS_CACHE_TTL_SECONDS = float(os.getenv("MODELS_CACHE_TTL_SECONDS", "60"))
+
+# (active_only, available_only, include_recent, window_days)
+ModelsCacheKey = Tuple[bool, bool, bool, int]
+
+
+@dataclass
+class CachedModels:
+    """Готовый ответ GET /models и момент его истечения."""
+
+    body: bytes  # JSON-массив AIModelResponse
+    etag: str
+    expires_at: float  # time.monotonic() deadline
+    expires_at_available_at: bool = False  # срок задан available_at, а не TTL
+
+
+class ModelsCache:
+    """Кеш списка моделей с инвалидацией по записи и по available_at."""
+
+    _entries: ClassVar[Dict[ModelsCacheKey, CachedModels]] = {}
+    _version: ClassVar[int] = 0
+    _hits: ClassVar[int] = 0
+    _misses: ClassVar[int] = 0
+    _invalidations: ClassVar[int] = 0
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        """Кеш включён, если задан ненулевой TTL."""
+        return MODELS_CACHE_TTL_SECONDS > 0
+
+    @classmethod
+    def version(cls) -> int:
+        """Номер поколения: меняется при каждой инвалидации."""
+        return cls._version
+
+    @classmethod
+    def get(cls, key: ModelsCacheKey) -> Optional[CachedModels]:
+        """
+        Найти неистёкший ответ.
+
+        Args:
+            key: (active_only, available_only, include_recent, window_days)
+
+        Returns:
+            CachedModels или None (промах, запись истекла или кеш выключен)
+        """
+        entry = cls._entries.get(key)
+        if entry is None or entry.expires_at <= time.monotonic():
+            cls._entries.pop(key, None)
+            if entry is not None and entry.expires_at_available_at:
+                cls._version += 1
+            cls._misses += 1
+            return None
+        cls._hits += 1
+        return entry
+
+    @classmethod
+    def put(
+        cls,
+        key: ModelsCacheKey,
+        body: bytes,
+        etag: str,
+        version: int,
+        next_available_at: Optional[datetime] = None,
+    ) -> bool:
+        """
+        Сохранить ответ, если с начала его вычисления не было инвалидаций.
+
+        Args:
+            key: (active_only, available_only, include_recent, window_days)
+            body: Сериализованный список AIModelResponse
+            etag: ETag ответа (models_etag от version)
+            version: version() на момент начала чтения из БД
+            next_available_at: Ближайший будущий available_at среди моделей
+                (timezone-aware); запись истекает не позже него
+
+        Returns:
+            True, если ответ закеширован
+        """
+        if not cls.is_enabled() or version != cls._version:
+            return False
+
+        now = time.monotonic()
+        expires_at = now + MODELS_CACHE_TTL_SECONDS
+        by_available_at = False
+        if next_available_at is not None:
+            remaining = next_available_at - datetime.now(next_available_at.tzinfo)
+            by_available_at = now + remaining.total_seconds() < expires_at
+            expires_at = min(expires_at, now + remaining.total_seconds())
+        if expires_at <= now:
+            return False
+
+        cls._entries[key] = CachedModels(
+            body=body,
+            etag=etag,
+            expires_at=expires_at,
+            expires_at_available_at=by_available_at,
+        )
+        return True
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """Сбросить все записи (вызывается после commit любой влияющей записи)."""
+        cls._entries = {}
+        cls._version += 1
+        cls._invalidations += 1
+
+    @classmethod
+    def metrics(cls) -> Dict[str, Any]:
+        """Метрики кеша для GET /metrics."""
+        return {
+            "enabled": cls.is_enabled(),
+            "ttl_seconds": MODELS_CACHE_TTL_SECONDS,
+            "entries": len(cls._entries),
+            "version": cls._version,
+            "hits": cls._hits,
+            "misses": cls._misses,
+            "invalidations": cls._invalidations,
+        }
+
+    @classmethod
+    def reset(cls) -> None:
+        """Очистить кеш и метрики (для тестов)."""
+        cls._entries = {}
+        cls._version = 0
+        cls._hits = 0
+        cls._misses = 0
+        cls._invalidations = 0
@@ -3,13 +3,16 @@ AI Model Repository - Data access layer for AI models
 
 Implements repository pattern for AI model CRUD operations.
 Uses SQLAlchemy 2.0 async patterns.
+
+user-017: every write is a single UPDATE ... RETURNING round trip instead
+of UPDATE + flush + SELECT by ID.
 """
 
 from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import List, Optional
+from typing import Any, List, Optional, Tuple
 
-from sqlalchemy import select, update
+from sqlalchemy import func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.domain.models import AIModel
@@ -58,6 +61,21 @@ class AIModelRepository:
 
         return [self._to_domain(orm_model) for orm_model in orm_models]
 
+    async def get_next_available_at(self) -> Optional[datetime]:
+        """
+        Nearest future available_at across all models (user-015).
+
+        Until then get_all(available_only=True) returns the same set of models.
+
+        Returns:
+            Earliest available_at > now(), or None if no model is cooling down
+        """
+        query = select(func.min(AIModelORM.available_at)).where(
+            AIModelORM.available_at > datetime.utcnow()
+        )
+        result = await self.session.execute(query)
+        return result.scalar_one_or_none()
+
     async def get_by_id(self, model_id: int) -> Optional[AIModel]:
         """
         Get AI model by ID.
@@ -169,13 +187,7 @@ class AIModelRepository:
         # Add updated_at timestamp
         update_values["updated_at"] = datetime.utcnow()
 
-        # Execute update
-        stmt = update(AIModelORM).where(AIModelORM.id == model_id).values(**update_values)
-        await self.session.execute(stmt)
-        await self.session.flush()
-
-        # Fetch and return updated model
-        return await self.get_by_id(model_id)
+        return await self._update_returning(model_id, update_values)
 
     async def increment_success(self, model_id: int, response_time: Decimal) -> Optional[AIModel]:
         """
@@ -191,22 +203,16 @@ class AIModelRepository:
         response_time = max(response_time, Decimal("0"))
         now = datetime.utcnow()
 
-        stmt = (
-            update(AIModelORM)
-            .where(AIModelORM.id == model_id)
-            .values(
-                success_count=AIModelORM.success_count + 1,
-                request_count=AIModelORM.request_count + 1,
-                total_response_time=AIModelORM.total_response_time + response_time,
-                last_checked=now,
-                updated_at=now,
-            )
+        return await self._update_returning(
+            model_id,
+            {
+                "success_count": AIModelORM.success_count + 1,
+                "request_count": AIModelORM.request_count + 1,
+                "total_response_time": AIModelORM.total_response_time + response_time,
+                "last_checked": now,
+                "updated_at": now,
+            },
         )
-        result = await self.session.execute(stmt)
-        if result.rowcount == 0:
-            return None
-        await self.session.flush()
-        return await self.get_by_id(model_id)
 
     async def increment_failure(self, model_id: int, response_time: Decimal) -> Optional[AIModel]:
         """
@@ -222,22 +228,16 @@ class AIModelRepository:
         response_time = max(response_time, Decimal("0"))
         now = datetime.utcnow()
 
-        stmt = (
-            update(AIModelORM)
-            .where(AIModelORM.id == model_id)
-            .values(
-                failure_count=AIModelORM.failure_count + 1,
-                request_count=AIModelORM.request_count + 1,
-                total_response_time=AIModelORM.total_response_time + response_time,
-                last_checked=now,
-                updated_at=now,
-            )
+        return await self._update_returning(
+            model_id,
+            {
+                "failure_count": AIModelORM.failure_count + 1,
+                "request_count": AIModelORM.request_count + 1,
+                "total_response_time": AIModelORM.total_response_time + response_time,
+                "last_checked": now,
+                "updated_at": now,
+            },
         )
-        result = await self.session.execute(stmt)
-        if result.rowcount == 0:
-            return None
-        await self.session.flush()
-        return await self.get_by_id(model_id)
 
     async def set_active(self, model_id: int, is_active: bool) -> Optional[AIModel]:
         """
@@ -250,15 +250,9 @@ class AIModelRepository:
         Returns:
             Updated AIModel if found, None otherwise
         """
-        stmt = (
-            update(AIModelORM)
-            .where(AIModelORM.id == model_id)
-            .values(is_active=is_active, updated_at=datetime.utcnow())
+        return await self._update_returning(
+            model_id, {"is_active": is_active, "updated_at": datetime.utcnow()}
         )
-        await self.session.execute(stmt)
-        await self.session.flush()
-
-        return await self.get_by_id(model_id)
 
     async def set_availability(
         self, model_id: int, retry_after_seconds: int
@@ -276,22 +270,122 @@ class AIModelRepository:
         Returns:
             Updated AIModel if found, None otherwise
         """
-        available_at = datetime.utcnow()
+        changed = await self.set_availability_returning_previous(model_id, retry_after_seconds)
+        return changed[0] if changed is not None else None
+
+    async def set_availability_returning_previous(
+        self, model_id: int, retry_after_seconds: int
+    ) -> Optional[Tuple[AIModel, Optional[datetime]]]:
+        """
+        set_availability() that also returns the previous available_at (user-017).
+
+        One UPDATE ... FROM (SELECT ... FOR UPDATE) ... RETURNING: the old
+        value comes from the locked pre-update row, so the audit payload needs
+        no separate SELECT.
+
+        Args:
+            model_id: AI model ID
+            retry_after_seconds: Seconds until the model becomes available again
+                (0 clears the cooldown)
+
+        Returns:
+            (updated AIModel, available_at before the update), or None if not found
+        """
+        now = datetime.utcnow()
         if retry_after_seconds > 0:
-            available_at = datetime.utcnow() + timedelta(seconds=retry_after_seconds)
+            available_at: Optional[datetime] = now + timedelta(seconds=retry_after_seconds)
         else:
             # retry_after_seconds = 0 means clear the cooldown
             available_at = None
 
+        previous = (
+            select(AIModelORM.id, AIModelORM.available_at)
+            .where(AIModelORM.id == model_id)
+            .with_for_update()
+            .subquery("previous")
+        )
         stmt = (
             update(AIModelORM)
-            .where(AIModelORM.id == model_id)
-            .values(available_at=available_at, updated_at=datetime.utcnow())
+            .where(AIModelORM.id == previous.c.id)
+            .values(available_at=available_at, updated_at=now)
+            .returning(AIModelORM, previous.c.available_at)
         )
-        await self.session.execute(stmt)
-        await self.session.flush()
+        row = (await self.session.execute(stmt)).one_or_none()
+        if row is None:
+            return None
+        return self._to_domain(row[0]), row[1]
+
+    async def apply_outcome(
+        self,
+        model_id: int,
+        success: Optional[bool],
+        response_time: Decimal,
+        retry_after_seconds: Optional[int] = None,
+    ) -> Optional[AIModel]:
+        """
+        Apply a prompt outcome to a model in one UPDATE ... RETURNING (user-010).
+
+        Combines increment_success/increment_failure and set_availability
+        without re-SELECTing the row afterwards.
 
-        return await self.get_by_id(model_id)
+        Args:
+            model_id: AI model ID
+            success: True/False increments the success/failure counter,
+                None leaves counters untouched
+            response_time: Response time in seconds (counted with the counter)
+            retry_after_seconds: Optional cooldown (0 clears it, None = unchanged)
+
+        Returns:
+            Updated AIModel if found, None otherwise
+        """
+        now = datetime.utcnow()
+        values: dict = {"updated_at": now}
+
+        if success is not None:
+            counter = AIModelORM.success_count if success else AIModelORM.failure_count
+            values.update(
+                {
+                    counter.key: counter + 1,
+                    "request_count": AIModelORM.request_count + 1,
+                    "total_response_time": AIModelORM.total_response_time
+                    + max(response_time, Decimal("0")),
+                    "last_checked": now,
+                }
+            )
+
+        if retry_after_seconds is not None:
+            values["available_at"] = (
+                now + timedelta(seconds=retry_after_seconds)
+                if retry_after_seconds > 0
+                else None
+            )
+
+        return await self._update_returning(model_id, values)
+
+    async def _update_returning(
+        self, model_id: int, values: dict[str, Any]
+    ) -> Optional[AIModel]:
+        """
+        UPDATE ai_models SET ... WHERE id = :model_id RETURNING * (user-017).
+
+        Args:
+            model_id: AI model ID
+            values: Column values / SQL expressions to set
+
+        Returns:
+            Updated AIModel if found, None otherwise
+        """
+        stmt = (
+            update(AIModelORM)
+            .where(AIModelORM.id == model_id)
+            .values(**values)
+            .returning(AIModelORM)
+        )
+        result = await self.session.execute(stmt)
+        orm_model = result.scalar_one_or_none()
+        if orm_model is None:
+            return None
+        return self._to_domain(orm_model)
 
     def _to_domain(self, orm_model: AIModelORM) -> AIModel:
         """
@@ -0,0 +1,139 @@
+"""
+Caller Hourly Stats Repository - per-project hourly rollup of prompt_history (user-023)
+
+GET /history/statistics/by-caller (дашборд /analytics/by-project) делал два
+GROUP BY по всем строкам окна: агрегаты по проекту и топ-модель проекта.
+Rollup хранит на каждую (caller, модель, час) счётчики и точную NUMERIC-сумму
+латентности; окно собирается одним запросом из бакетов полных часов плюс
+сырых строк неполного первого часа — стоимость не зависит от трафика.
+
+Точность: все величины аддитивны (count, sum), поэтому результат совпадает
+с сырым запросом _get_stats_grouped_by_caller_raw() для любого окна, включая
+окна короче часа.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List
+
+from sqlalchemy import text
+
+from app.infrastructure.database.models import CallerHourlyStatsORM
+from app.infrastructure.repositories.history_rollup_repository import HistoryRollupRepository
+
+_APPLY_HISTORY_SQL = """
+INSERT INTO caller_hourly_stats AS s (
+    caller, model_id, bucket_start, request_count, success_count,
+    auto_count, pinned_count, response_time_sum
+)
+SELECT
+    caller,
+    selected_model_id,
+    date_trunc('hour', created_at),
+    count(*),
+    count(*) FILTER (WHERE success),
+    count(*) FILTER (WHERE requested_model IS NULL),
+    count(*) FILTER (WHERE requested_model IS NOT NULL),
+    sum(response_time)
+FROM prompt_history
+WHERE id = ANY(:ids) AND created_at BETWEEN :created_from AND :created_to
+GROUP BY caller, selected_model_id, date_trunc('hour', created_at)
+ORDER BY caller, selected_model_id, date_trunc('hour', created_at)
+ON CONFLICT ON CONSTRAINT uq_caller_hourly_stats_bucket DO UPDATE SET
+    request_count = s.request_count + EXCLUDED.request_count,
+    success_count = s.success_count + EXCLUDED.success_count,
+    auto_count = s.auto_count + EXCLUDED.auto_count,
+    pinned_count = s.pinned_count + EXCLUDED.pinned_count,
+    response_time_sum = s.response_time_sum + EXCLUDED.response_time_sum
+"""
+
+# Бакеты полных часов [split, ...) + сырые строки (cutoff, split); затем
+# (caller, модель) -> проект. Топ-модель: больше запросов, при равенстве меньший id
+_GROUPED_STATS_SQL = """
+WITH parts AS (
+    SELECT
+        caller, model_id, request_count, success_count,
+        auto_count, pinned_count, response_time_sum
+    FROM caller_hourly_stats
+    WHERE bucket_start >= :split
+    UNION ALL
+    SELECT
+        caller,
+        selected_model_id,
+        count(*),
+        count(*) FILTER (WHERE success),
+        count(*) FILTER (WHERE requested_model IS NULL),
+        count(*) FILTER (WHERE requested_model IS NOT NULL),
+        sum(response_time)
+    FROM prompt_history
+    WHERE created_at > :cutoff AND created_at < :split
+    GROUP BY caller, selected_model_id
+),
+per_model AS (
+    SELECT
+        caller,
+        model_id,
+        sum(request_count) AS request_count,
+        sum(success_count) AS success_count,
+        sum(auto_count) AS auto_count,
+        sum(pinned_count) AS pinned_count,
+        sum(response_time_sum) AS response_time_sum
+    FROM parts
+    GROUP BY caller, model_id
+)
+SELECT
+    caller,
+    sum(request_count)::bigint AS request_count,
+    sum(success_count)::bigint AS success_count,
+    sum(response_time_sum) / sum(request_count) AS avg_response_time,
+    sum(auto_count)::bigint AS auto_count,
+    sum(pinned_count)::bigint AS pinned_count,
+    (array_agg(model_id ORDER BY request_count DESC, model_id))[1] AS top_model_id
+FROM per_model
+GROUP BY caller
+HAVING sum(request_count) > 0
+ORDER BY request_count DESC, caller NULLS LAST
+"""
+
+
+class CallerHourlyStatsRepository(HistoryRollupRepository):
+    """Repository for the per-caller hourly rollup (user-023)."""
+
+    _apply_history_sql = _APPLY_HISTORY_SQL
+    _table = CallerHourlyStatsORM
+    _bucket_start = CallerHourlyStatsORM.bucket_start
+
+
+    async def get_grouped_stats(self, cutoff: datetime, split: datetime) -> List[Dict[str, Any]]:
+        """
+        Per-caller aggregates of the window created_at > cutoff.
+
+        Buckets with bucket_start >= split come from the rollup, rows in
+        (cutoff, split) from prompt_history; split is the start of the first
+        hour fully inside the window (see get_stats_grouped_by_caller).
+
+        Args:
+            cutoff: Start of the window (exclusive)
+            split: First rollup bucket to read
+
+        Returns:
+            Per-caller dicts, ordered by request_count DESC (see
+            PromptHistoryRepository.get_stats_grouped_by_caller)
+        """
+        result = await self.session.execute(
+            text(_GROUPED_STATS_SQL), {"cutoff": cutoff, "split": split}
+        )
+        stats: List[Dict[str, Any]] = []
+        for row in result.all():
+            stats.append(
+                {
+                    "caller": row.caller,
+                    "request_count": row.request_count,
+                    "success_count": row.success_count,
+                    "success_rate": row.success_count / row.request_count,
+                    "avg_response_time": float(row.avg_response_time or 0.0),
+                    "top_model_id": row.top_model_id,
+                    "auto_count": row.auto_count,
+                    "pinned_count": row.pinned_count,
+                }
+            )
+        return stats
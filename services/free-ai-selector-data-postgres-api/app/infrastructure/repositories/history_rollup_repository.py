@@ -0,0 +1,105 @@
+"""
+History Rollup Repository - common base of the prompt_history rollups
+
+Rollup'ы model_hourly_stats (user-014), caller_hourly_stats (user-023),
+model_latency_sketches (user-024) и history_series_stats (user-025)
+устроены одинаково: INSERT ... ON CONFLICT DO UPDATE по id новых строк
+истории в транзакции их INSERT'а и удаление бакетов, чей период retention
+уже целиком удалил из prompt_history. Здесь — общая часть; SQL вставки и
+период хранения задают наследники.
+"""
+
+from datetime import datetime
+from typing import Any, ClassVar, List
+
+from sqlalchemy import ColumnElement, delete, func, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.infrastructure.database.models import PromptHistoryORM
+
+# Слияние скетча латентности строки (s) с новым (EXCLUDED) в ON CONFLICT DO UPDATE:
+# сумма счётчиков по ключу бина, ключи по возрастанию
+SKETCH_MERGE_SQL = """
+    (sketch_keys, sketch_counts) = (
+        SELECT
+            coalesce(array_agg(key ORDER BY key), '{}'),
+            coalesce(array_agg(n ORDER BY key), '{}')
+        FROM (
+            SELECT key, sum(n)::int AS n
+            FROM (
+                SELECT * FROM unnest(s.sketch_keys, s.sketch_counts)
+                UNION ALL
+                SELECT * FROM unnest(EXCLUDED.sketch_keys, EXCLUDED.sketch_counts)
+            ) AS pairs(key, n)
+            GROUP BY key
+        ) merged
+    )
+"""
+
+
+class HistoryRollupRepository:
+    """Base for rollups of prompt_history maintained in the INSERT transaction."""
+
+    # INSERT ... SELECT ... FROM prompt_history WHERE id = ANY(:ids)
+    # AND created_at BETWEEN :created_from AND :created_to ... ON CONFLICT
+    _apply_history_sql: ClassVar[str]
+    # ORM-таблица rollup'а и колонка начала бакета
+    _table: ClassVar[Any]
+    _bucket_start: ClassVar[Any]
+
+    def __init__(self, session: AsyncSession):
+        """
+        Initialize repository with database session.
+
+        Args:
+            session: AsyncSession instance for database operations
+        """
+        self.session = session
+
+    async def apply_history(
+        self, history_ids: List[int], created_from: datetime, created_to: datetime
+    ) -> None:
+        """
+        Fold freshly inserted prompt_history rows into their buckets.
+
+        One INSERT ... ON CONFLICT DO UPDATE in key order; must run in the
+        same transaction as the history INSERT so the rollup never drifts.
+        The created_at bounds let PostgreSQL prune the day partitions of
+        prompt_history (user-013): by id alone every partition is probed.
+
+        Args:
+            history_ids: IDs of the inserted prompt_history rows
+            created_from: Smallest created_at of those rows
+            created_to: Largest created_at of those rows
+        """
+        if not history_ids:
+            return
+        await self.session.execute(
+            text(self._apply_history_sql),
+            {"ids": list(history_ids), "created_from": created_from, "created_to": created_to},
+        )
+
+    @classmethod
+    def _oldest_period(cls, oldest: ColumnElement[Any]) -> ColumnElement[Any]:
+        """Начало периода, который ещё может содержать историю (по умолчанию — час)."""
+        return func.date_trunc("hour", oldest)
+
+    async def prune_expired(self) -> int:
+        """
+        Delete buckets of periods that retention has fully purged from prompt_history.
+
+        A bucket is kept while its period may still hold history rows:
+        bucket start >= _oldest_period(min(created_at)).
+
+        Returns:
+            Number of deleted buckets
+        """
+        # Колонку берём с класса: через self InstrumentedAttribute ищет состояние экземпляра
+        rollup = type(self)
+        oldest = select(
+            rollup._oldest_period(func.min(PromptHistoryORM.created_at))
+        ).scalar_subquery()
+        result = await self.session.execute(
+            delete(rollup._table).where(or_(oldest.is_(None), rollup._bucket_start < oldest))
+        )
+        return result.rowcount or 0
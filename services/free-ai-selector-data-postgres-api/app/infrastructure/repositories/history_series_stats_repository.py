@@ -0,0 +1,304 @@
+"""
+History Series Stats Repository - time-series rollup of prompt_history (user-025)
+
+Графики "запросы / успехи / сбои / 429 / латентность во времени" раньше
+строились только выгрузкой журнала. Rollup хранит на каждую (модель или
+проект, UTC-бакет) счётчики и скетч латентности; квантили точки считаются
+из скетча.
+
+INSERT истории обновляет только минутные бакеты (model / caller — две
+строки, в порядке ключа, чтобы конкурентные create_many не ловили
+deadlock). Часовые и суточные строки на каждый INSERT были горячими
+строками: все вставки модели или проекта ждали одну блокировку. Теперь
+retention-прогон сворачивает минутные бакеты старше
+TIMESERIES_MINUTE_RETENTION_HOURS в часовые, а точки hour / day
+складываются при чтении из минутных и часовых строк. Строки живут, пока
+есть история за их сутки (как user-014/023).
+
+Классы исходов — как в model_hourly_stats: hard fail — неуспех без 429
+(включая неизвестный статус), rate limited — неуспех с http_status = 429.
+Скетч — бины model_latency_sketches (точность SKETCH_RELATIVE_ACCURACY),
+cache hits в нём не учитываются, в счётчиках — учитываются.
+"""
+
+import os
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import ColumnElement, func, literal, text
+
+from app.infrastructure.database.models import HistorySeriesStatsORM
+from app.infrastructure.repositories.history_rollup_repository import (
+    SKETCH_MERGE_SQL,
+    HistoryRollupRepository,
+)
+from app.infrastructure.repositories.model_latency_sketch_repository import (
+    SKETCH_KEY_SQL,
+    sketch_quantiles,
+)
+
+# Минутные бакеты нужны только для коротких окон, дальше — часовые
+TIMESERIES_MINUTE_RETENTION_HOURS = float(os.getenv("TIMESERIES_MINUTE_RETENTION_HOURS", "48"))
+
+GRANULARITIES = ("minute", "hour", "day")
+GROUP_BYS = ("model", "caller")
+
+# Какие хранимые гранулярности складываются в точку запрошенной
+_STORED_GRANULARITIES = {
+    "minute": ["minute"],
+    "hour": ["minute", "hour"],
+    "day": ["minute", "hour"],
+}
+
+_MERGE_ON_CONFLICT = f"""
+ON CONFLICT ON CONSTRAINT uq_history_series_stats_bucket DO UPDATE SET
+    request_count = s.request_count + EXCLUDED.request_count,
+    success_count = s.success_count + EXCLUDED.success_count,
+    hard_fail_count = s.hard_fail_count + EXCLUDED.hard_fail_count,
+    rate_limited_count = s.rate_limited_count + EXCLUDED.rate_limited_count,
+{SKETCH_MERGE_SQL}
+"""
+
+# Один проход группировки: сначала (бакет, бин), затем бакет; бин NULL — cache hit
+_APPLY_HISTORY_SQL = f"""
+WITH fresh AS (
+    SELECT
+        d.group_by,
+        CASE d.group_by WHEN 'model' THEN h.selected_model_id::text ELSE h.caller END
+            AS group_key,
+        date_trunc('minute', h.created_at, 'UTC') AS bucket_start,
+        h.success,
+        NOT h.success AND (h.http_status IS NULL OR h.http_status <> 429) AS hard_fail,
+        NOT h.success AND h.http_status = 429 AS rate_limited,
+        CASE WHEN NOT h.cache_hit THEN {SKETCH_KEY_SQL} END AS key
+    FROM prompt_history AS h
+    CROSS JOIN (VALUES ('model'), ('caller')) AS d(group_by)
+    WHERE h.id = ANY(:ids)
+        AND h.created_at BETWEEN :created_from AND :created_to
+),
+per_key AS (
+    SELECT
+        group_by, group_key, bucket_start, key,
+        count(*)::int AS n,
+        count(*) FILTER (WHERE success)::int AS successes,
+        count(*) FILTER (WHERE hard_fail)::int AS hard_fails,
+        count(*) FILTER (WHERE rate_limited)::int AS rate_limited
+    FROM fresh
+    GROUP BY group_by, group_key, bucket_start, key
+)
+INSERT INTO history_series_stats AS s (
+    granularity, group_by, group_key, bucket_start, request_count, success_count,
+    hard_fail_count, rate_limited_count, sketch_keys, sketch_counts
+)
+SELECT
+    'minute', group_by, group_key, bucket_start,
+    sum(n), sum(successes), sum(hard_fails), sum(rate_limited),
+    coalesce(array_agg(key ORDER BY key) FILTER (WHERE key IS NOT NULL), '{{}}'),
+    coalesce(array_agg(n ORDER BY key) FILTER (WHERE key IS NOT NULL), '{{}}')
+FROM per_key
+GROUP BY group_by, group_key, bucket_start
+ORDER BY group_by, bucket_start, group_key
+{_MERGE_ON_CONFLICT}
+"""
+
+# Свёртка минутных бакетов до границы часа в часовые; счётчики и бины
+# складываются отдельно (unnest размножил бы счётчики)
+_FOLD_MINUTES_SQL = f"""
+WITH folded AS (
+    DELETE FROM history_series_stats
+    WHERE granularity = 'minute'
+        AND bucket_start < date_trunc('hour', now() - CAST(:horizon AS interval), 'UTC')
+    RETURNING *
+),
+counts AS (
+    SELECT
+        group_by, group_key, date_trunc('hour', bucket_start, 'UTC') AS bucket_start,
+        sum(request_count)::int AS request_count,
+        sum(success_count)::int AS success_count,
+        sum(hard_fail_count)::int AS hard_fail_count,
+        sum(rate_limited_count)::int AS rate_limited_count
+    FROM folded
+    GROUP BY 1, 2, 3
+),
+bins AS (
+    SELECT
+        f.group_by, f.group_key, date_trunc('hour', f.bucket_start, 'UTC') AS bucket_start,
+        b.key, sum(b.n)::int AS n
+    FROM folded AS f, unnest(f.sketch_keys, f.sketch_counts) AS b(key, n)
+    GROUP BY 1, 2, 3, 4
+),
+sketches AS (
+    SELECT
+        group_by, group_key, bucket_start,
+        array_agg(key ORDER BY key) AS sketch_keys,
+        array_agg(n ORDER BY key) AS sketch_counts
+    FROM bins
+    GROUP BY 1, 2, 3
+),
+merged AS (
+    INSERT INTO history_series_stats AS s (
+        granularity, group_by, group_key, bucket_start, request_count, success_count,
+        hard_fail_count, rate_limited_count, sketch_keys, sketch_counts
+    )
+    SELECT
+        'hour', c.group_by, c.group_key, c.bucket_start,
+        c.request_count, c.success_count, c.hard_fail_count, c.rate_limited_count,
+        coalesce(k.sketch_keys, '{{}}'), coalesce(k.sketch_counts, '{{}}')
+    FROM counts AS c
+    LEFT JOIN sketches AS k
+        ON k.group_by = c.group_by
+        AND k.group_key IS NOT DISTINCT FROM c.group_key
+        AND k.bucket_start = c.bucket_start
+    ORDER BY c.group_by, c.bucket_start, c.group_key
+    {_MERGE_ON_CONFLICT}
+)
+SELECT count(*) FROM folded
+"""
+
+def _series_sql(single_key: bool) -> str:
+    # Точка — сумма хранимых строк её бакета: счётчики и бины по отдельности
+    key_filter = "AND group_key = :group_key" if single_key else ""
+    return f"""
+WITH rows AS (
+    SELECT
+        group_key,
+        date_trunc(:granularity, bucket_start, 'UTC') AS bucket_start,
+        request_count, success_count, hard_fail_count, rate_limited_count,
+        sketch_keys, sketch_counts
+    FROM history_series_stats
+    WHERE granularity = ANY(:stored)
+        AND group_by = :group_by
+        AND bucket_start >= date_trunc(:granularity, now() - CAST(:window AS interval), 'UTC')
+        {key_filter}
+),
+bins AS (
+    SELECT r.group_key, r.bucket_start, b.key, sum(b.n)::bigint AS n
+    FROM rows AS r, unnest(r.sketch_keys, r.sketch_counts) AS b(key, n)
+    GROUP BY 1, 2, 3
+),
+sketches AS (
+    SELECT
+        group_key, bucket_start,
+        array_agg(key ORDER BY key) AS sketch_keys,
+        array_agg(n ORDER BY key) AS sketch_counts
+    FROM bins
+    GROUP BY 1, 2
+)
+SELECT c.*, k.sketch_keys, k.sketch_counts
+FROM (
+    SELECT
+        group_key, bucket_start,
+        sum(request_count)::bigint AS request_count,
+        sum(success_count)::bigint AS success_count,
+        sum(hard_fail_count)::bigint AS hard_fail_count,
+        sum(rate_limited_count)::bigint AS rate_limited_count
+    FROM rows
+    GROUP BY 1, 2
+) AS c
+LEFT JOIN sketches AS k
+    ON k.group_key IS NOT DISTINCT FROM c.group_key AND k.bucket_start = c.bucket_start
+ORDER BY c.bucket_start
+"""
+
+
+class HistorySeriesStatsRepository(HistoryRollupRepository):
+    """Repository for the time-series rollup (user-025)."""
+
+    _apply_history_sql = _APPLY_HISTORY_SQL
+    _table = HistorySeriesStatsORM
+    _bucket_start = HistorySeriesStatsORM.bucket_start
+
+    @classmethod
+    def _oldest_period(cls, oldest: ColumnElement[Any]) -> ColumnElement[Any]:
+        """Бакеты живут, пока их UTC-сутки могут содержать историю."""
+        return func.date_trunc("day", oldest, literal("UTC"))
+
+    async def get_series(
+        self,
+        granularity: str,
+        group_by: str,
+        window: timedelta,
+        quantiles: Sequence[float],
+        group_key: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Bucketed series per model or caller over a window.
+
+        Buckets overlapping the window are returned whole: the first one
+        starts at date_trunc(granularity, now() - window, 'UTC'). Hour and
+        day points are summed from the stored minute and hour buckets.
+        Buckets without requests are omitted.
+
+        Args:
+            granularity: "minute", "hour" or "day"
+            group_by: "model" or "caller"
+            window: Look-back window
+            quantiles: Latency quantiles in [0, 1]
+            group_key: Optional single series (model id as string or caller)
+
+        Returns:
+            List of {"group_key", "request_count", "points": [{bucket_start,
+            request_count, success_count, hard_fail_count, rate_limited_count,
+            latency_quantiles: [seconds] or None}]}, busiest series first
+        """
+        params = {
+            "granularity": granularity,
+            "stored": _STORED_GRANULARITIES[granularity],
+            "group_by": group_by,
+            "window": window,
+            "group_key": group_key,
+        }
+        result = await self.session.execute(text(_series_sql(group_key is not None)), params)
+        series: Dict[Optional[str], List[Dict[str, Any]]] = {}
+        for bucket in result.all():
+            series.setdefault(bucket.group_key, []).append(
+                {
+                    "bucket_start": bucket.bucket_start,
+                    "request_count": bucket.request_count,
+                    "success_count": bucket.success_count,
+                    "hard_fail_count": bucket.hard_fail_count,
+                    "rate_limited_count": bucket.rate_limited_count,
+                    "latency_quantiles": (
+                        [
+                            ms / 1000.0
+                            for ms in sketch_quantiles(
+                                bucket.sketch_keys, bucket.sketch_counts, quantiles
+                            )
+                        ]
+                        if bucket.sketch_keys
+                        else None
+                    ),
+                }
+            )
+
+        rows = [
+            {
+                "group_key": key,
+                "request_count": sum(point["request_count"] for point in points),
+                "points": points,
+            }
+            for key, points in series.items()
+        ]
+        # Самые нагруженные серии первыми, при равенстве — по ключу (NULL последним)
+        rows.sort(
+            key=lambda row: (-row["request_count"], row["group_key"] is None, row["group_key"] or "")
+        )
+        return rows
+
+    async def prune_expired(self) -> int:
+        """
+        Delete buckets that retention has fully purged and fold old minute buckets.
+
+        Rows are kept while their UTC day may still hold history rows.
+        Minute buckets older than TIMESERIES_MINUTE_RETENTION_HOURS (down to
+        the hour boundary) are merged into hour buckets and deleted.
+
+        Returns:
+            Number of deleted buckets, folded minute buckets included
+        """
+        purged = await super().prune_expired()
+        folded = await self.session.execute(
+            text(_FOLD_MINUTES_SQL),
+            {"horizon": timedelta(hours=TIMESERIES_MINUTE_RETENTION_HOURS)},
+        )
+        return purged + folded.scalar_one()
@@ -0,0 +1,278 @@
+"""
+Model Hourly Stats Repository - hourly rollup of prompt_history (user-014)
+
+GET /models?include_recent=true стоит на пути каждого промпта. Вместо
+POW(decay, hours_ago) по всем строкам окна decay-взвешенные суммы
+собираются из ~168 часовых бакетов на модель.
+
+Точность (выход совпадает с сырым запросом до округления):
+    - Вес записи d^hours_ago = d^((now - bucket_start)/3600) * e^(k*u),
+      где k = -ln(d), u ∈ [0, 1) — смещение записи внутри часа в часах.
+      e^(k*u) раскладывается в ряд Тейлора по хранимым моментам Σ u^j
+      (j < ROLLUP_MOMENTS); при k ≈ 0.02 (half-life 34ч) остаток ряда
+      ~1e-16. Для слишком быстрого затухания ряд не сходится достаточно
+      быстро — decay_rate_supported() = False, и вызывающий идёт в сырой запрос
+    - Латентность хранится точной гистограммой: параллельные массивы
+      latency_ms / latency_counts, отсортированные по latency_ms
+      (response_time — NUMERIC(10,3), т.е. ровно мс). Гистограммы бакетов
+      складываются без потерь. Медиана окна — percentile_cont(0.5) по
+      слитой гистограмме: два средних ранга и та же интерполяция
+      lo + 0.5 * (hi - lo), что и у PostgreSQL, т.е. совпадает бит в бит
+"""
+
+import math
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from sqlalchemy import Float, bindparam, text
+
+from app.infrastructure.database.models import ModelHourlyStatsORM
+from app.infrastructure.repositories.history_rollup_repository import HistoryRollupRepository
+
+# Моменты Σ u^0 .. Σ u^6
+ROLLUP_MOMENTS = 7
+# Допустимая относительная ошибка усечённого ряда e^(k*u)
+ROLLUP_MAX_RELATIVE_ERROR = 1e-12
+
+
+def _moments_sql(condition: str, value: str = "1.0") -> str:
+    terms = ", ".join(
+        f"coalesce(sum({value} * power(u, {j})) FILTER (WHERE {condition}), 0)"
+        for j in range(ROLLUP_MOMENTS)
+    )
+    return f"ARRAY[{terms}]::float8[]"
+
+
+def _merge_array_sql(column: str) -> str:
+    return (
+        f"(SELECT array_agg(a + b ORDER BY i) FROM unnest(s.{column}, EXCLUDED.{column}) "
+        f"WITH ORDINALITY AS t(a, b, i))"
+    )
+
+
+_APPLY_HISTORY_SQL = f"""
+WITH fresh AS (
+    SELECT
+        selected_model_id AS model_id,
+        date_trunc('hour', created_at) AS bucket_start,
+        extract(epoch FROM created_at - date_trunc('hour', created_at))::float8 / 3600.0 AS u,
+        response_time,
+        success,
+        NOT success AND (http_status IS NULL OR http_status <> 429) AS hard_fail,
+        NOT success AND http_status = 429 AS rate_limited
+    FROM prompt_history
+    WHERE id = ANY(:ids) AND NOT cache_hit
+        AND created_at BETWEEN :created_from AND :created_to
+),
+latency AS (
+    SELECT
+        model_id,
+        bucket_start,
+        array_agg(ms ORDER BY ms) AS latency_ms,
+        array_agg(n ORDER BY ms) AS latency_counts
+    FROM (
+        SELECT model_id, bucket_start, (response_time * 1000)::int AS ms, count(*)::int AS n
+        FROM fresh
+        GROUP BY model_id, bucket_start, ms
+    ) per_value
+    GROUP BY model_id, bucket_start
+),
+agg AS (
+    SELECT
+        model_id,
+        bucket_start,
+        count(*) AS request_count,
+        count(*) FILTER (WHERE success) AS success_count,
+        count(*) FILTER (WHERE hard_fail) AS hard_fail_count,
+        count(*) FILTER (WHERE rate_limited) AS rate_limited_count,
+        {_moments_sql("success")} AS success_moments,
+        {_moments_sql("hard_fail")} AS hard_fail_moments,
+        {_moments_sql("TRUE")} AS weight_moments,
+        {_moments_sql("TRUE", "response_time::float8")} AS time_moments
+    FROM fresh
+    GROUP BY model_id, bucket_start
+)
+INSERT INTO model_hourly_stats AS s (
+    model_id, bucket_start, request_count, success_count, hard_fail_count,
+    rate_limited_count, success_moments, hard_fail_moments, weight_moments,
+    time_moments, latency_ms, latency_counts
+)
+SELECT
+    agg.model_id, agg.bucket_start, agg.request_count, agg.success_count,
+    agg.hard_fail_count, agg.rate_limited_count, agg.success_moments,
+    agg.hard_fail_moments, agg.weight_moments, agg.time_moments,
+    latency.latency_ms, latency.latency_counts
+FROM agg JOIN latency USING (model_id, bucket_start)
+ORDER BY agg.model_id, agg.bucket_start
+ON CONFLICT (model_id, bucket_start) DO UPDATE SET
+    request_count = s.request_count + EXCLUDED.request_count,
+    success_count = s.success_count + EXCLUDED.success_count,
+    hard_fail_count = s.hard_fail_count + EXCLUDED.hard_fail_count,
+    rate_limited_count = s.rate_limited_count + EXCLUDED.rate_limited_count,
+    success_moments = {_merge_array_sql("success_moments")},
+    hard_fail_moments = {_merge_array_sql("hard_fail_moments")},
+    weight_moments = {_merge_array_sql("weight_moments")},
+    time_moments = {_merge_array_sql("time_moments")},
+    (latency_ms, latency_counts) = (
+        SELECT array_agg(ms ORDER BY ms), array_agg(n ORDER BY ms)
+        FROM (
+            SELECT ms, sum(n)::int AS n
+            FROM (
+                SELECT * FROM unnest(s.latency_ms, s.latency_counts)
+                UNION ALL
+                SELECT * FROM unnest(EXCLUDED.latency_ms, EXCLUDED.latency_counts)
+            ) AS pairs(ms, n)
+            GROUP BY ms
+        ) merged
+    )
+"""
+
+
+# Средние ранги (с 0) — floor((N - 1) / 2) и floor(N / 2): значение ранга r —
+# наименьшее ms, у которого накопленный счётчик больше r
+_LATENCY_MEDIANS_SQL = """
+WITH pairs AS (
+    SELECT model_id, ms, sum(n)::bigint AS n
+    FROM (
+        SELECT b.model_id, h.ms, h.n
+        FROM model_hourly_stats AS b, unnest(b.latency_ms, b.latency_counts) AS h(ms, n)
+        WHERE b.bucket_start >= :since
+        UNION ALL
+        SELECT selected_model_id, (response_time * 1000)::int, 1
+        FROM prompt_history
+        WHERE created_at > now() - CAST(:window AS interval) AND created_at < :since AND NOT cache_hit
+    ) AS window_pairs(model_id, ms, n)
+    GROUP BY model_id, ms
+),
+ranked AS (
+    SELECT
+        model_id,
+        ms,
+        sum(n) OVER (PARTITION BY model_id ORDER BY ms)::bigint AS upto,
+        sum(n) OVER (PARTITION BY model_id)::bigint AS total
+    FROM pairs
+)
+SELECT
+    model_id,
+    min(ms) FILTER (WHERE upto > (total - 1) / 2) AS lower_ms,
+    min(ms) FILTER (WHERE upto > total / 2) AS upper_ms
+FROM ranked
+GROUP BY model_id
+"""
+
+
+def _weighted_sum_sql(column: str) -> str:
+    # Σ по бакетам: d^hours_ago(bucket_start) * Σ_j k^j/j! * M_j
+    series = " + ".join(f"{column}[{j + 1}] * :c{j}" for j in range(ROLLUP_MOMENTS))
+    return f"sum(scale * ({series}))"
+
+
+_WEIGHTED_SUMS_SQL = f"""
+SELECT
+    model_id,
+    sum(request_count) AS request_count,
+    {_weighted_sum_sql("success_moments")} AS weighted_successes,
+    {_weighted_sum_sql("hard_fail_moments")} AS weighted_hard_failures,
+    {_weighted_sum_sql("weight_moments")} AS total_weight,
+    {_weighted_sum_sql("time_moments")} AS weighted_time_sum
+FROM (
+    SELECT
+        *,
+        pow(:decay, extract(epoch FROM now() - bucket_start)::float8 / 3600.0) AS scale
+    FROM model_hourly_stats
+    WHERE bucket_start >= :since
+    OFFSET 0  -- не разворачивать подзапрос: scale считается один раз на бакет
+) buckets
+GROUP BY model_id
+"""
+
+
+def decay_rate(decay_per_hour: float) -> float:
+    """k = -ln(decay_per_hour): вес e^(-k * hours_ago)."""
+    return -math.log(decay_per_hour)
+
+
+def decay_rate_supported(decay_per_hour: float) -> bool:
+    """Остаток ряда Тейлора e^(k*u) для u < 1 укладывается в допуск."""
+    if not 0.0 < decay_per_hour <= 1.0:
+        return False
+    k = decay_rate(decay_per_hour)
+    remainder = k**ROLLUP_MOMENTS / math.factorial(ROLLUP_MOMENTS) * math.exp(k)
+    return remainder <= ROLLUP_MAX_RELATIVE_ERROR
+
+
+def series_coefficients(decay_per_hour: float) -> List[float]:
+    """Коэффициенты k^j / j! ряда e^(k*u)."""
+    k = decay_rate(decay_per_hour)
+    return [k**j / math.factorial(j) for j in range(ROLLUP_MOMENTS)]
+
+
+class ModelHourlyStatsRepository(HistoryRollupRepository):
+    """Repository for the per-model hourly rollup (user-014)."""
+
+    _apply_history_sql = _APPLY_HISTORY_SQL
+    _table = ModelHourlyStatsORM
+    _bucket_start = ModelHourlyStatsORM.bucket_start
+
+    async def get_weighted_sums(
+        self, since: datetime, decay_per_hour: float
+    ) -> Dict[int, Dict[str, float]]:
+        """
+        Decay-weighted sums per model over buckets starting at or after since.
+
+        Weights are taken at the database now() of the current transaction,
+        like the raw query.
+
+        Args:
+            since: Lower bound on bucket_start (inclusive)
+            decay_per_hour: Коэффициент затухания за 1 час
+
+        Returns:
+            Dict {model_id: {request_count, weighted_successes,
+            weighted_hard_failures, total_weight, weighted_time_sum}}
+        """
+        params: Dict[str, Any] = {"since": since, "decay": decay_per_hour}
+        params.update(
+            {f"c{j}": c for j, c in enumerate(series_coefficients(decay_per_hour))}
+        )
+        statement = text(_WEIGHTED_SUMS_SQL).bindparams(
+            bindparam("decay", type_=Float),
+            *(bindparam(f"c{j}", type_=Float) for j in range(ROLLUP_MOMENTS)),
+        )
+        result = await self.session.execute(statement, params)
+        return {
+            row.model_id: {
+                "request_count": int(row.request_count),
+                "weighted_successes": float(row.weighted_successes or 0.0),
+                "weighted_hard_failures": float(row.weighted_hard_failures or 0.0),
+                "total_weight": float(row.total_weight or 0.0),
+                "weighted_time_sum": float(row.weighted_time_sum or 0.0),
+            }
+            for row in result.all()
+        }
+
+    async def get_latency_medians(self, since: datetime, window: timedelta) -> Dict[int, float]:
+        """
+        Exact window median of response_time per model, in seconds.
+
+        Merges the latency histograms of buckets starting at or after since
+        with the raw rows between now() - window and since; equals
+        percentile_cont(0.5) over the non-cache rows of the window.
+
+        Args:
+            since: Lower bound on bucket_start (inclusive), upper bound on raw rows
+            window: Window length back from the database now()
+
+        Returns:
+            Dict {model_id: median_response_time}
+        """
+        result = await self.session.execute(
+            text(_LATENCY_MEDIANS_SQL), {"since": since, "window": window}
+        )
+        medians = {}
+        for row in result.all():
+            lower = row.lower_ms / 1000
+            upper = row.upper_ms / 1000
+            # float8_lerp из percentile_cont
+            medians[row.model_id] = lower if lower == upper else lower + 0.5 * (upper - lower)
+        return medians
@@ -0,0 +1,157 @@
+"""
+Model Latency Sketch Repository - daily latency sketches per model (user-024)
+
+Хвосты латентности (p90/p99) нельзя получить из счётчиков моделей, а
+percentile_cont по строкам окна растёт с трафиком. Мс-точные гистограммы
+model_hourly_stats не помогают: при десятках запросов на модель в час они
+не меньше самих строк.
+
+Скетч в духе DDSketch: латентность в мс попадает в логарифмический бин
+key = ceil(log_γ(ms)), γ = (1 + α) / (1 - α); значение бина
+2γ^key / (γ + 1) отличается от любой латентности бина не больше чем на α
+(SKETCH_RELATIVE_ACCURACY). Бинов на модель — сотни при любом трафике;
+скетчи складываются без потерь (сумма счётчиков по ключу).
+
+Окно собирается из суточных скетчей полных UTC-суток плюс сырых строк
+неполных первых суток (до 24 ч строк), как часовые rollup'ы user-014/023.
+Квантиль — значение бина элемента с рангом percentile_disc, поэтому
+ответ в пределах α от percentile_disc по сырым строкам. Латентность
+меньше 1 мс попадает в бин 1 мс.
+"""
+
+import bisect
+import itertools
+import math
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import ColumnElement, func, literal, text
+
+from app.infrastructure.database.models import ModelLatencySketchORM
+from app.infrastructure.repositories.history_rollup_repository import (
+    SKETCH_MERGE_SQL,
+    HistoryRollupRepository,
+)
+
+# Относительная точность квантилей: 1% — ~660 бинов на диапазон 1 мс .. 10 мин
+SKETCH_RELATIVE_ACCURACY = 0.01
+SKETCH_GAMMA = (1 + SKETCH_RELATIVE_ACCURACY) / (1 - SKETCH_RELATIVE_ACCURACY)
+
+# Бин строки prompt_history: ceil(ln(ms) / ln γ), ms < 1 -> бин 0
+SKETCH_KEY_SQL = (
+    "ceil(ln(greatest(response_time::float8 * 1000.0, 1.0)) / "
+    f"{math.log(SKETCH_GAMMA)!r})::int"
+)
+
+_APPLY_HISTORY_SQL = f"""
+WITH fresh AS (
+    SELECT
+        selected_model_id AS model_id,
+        date_trunc('day', created_at, 'UTC') AS day_start,
+        {SKETCH_KEY_SQL} AS key,
+        count(*)::int AS n
+    FROM prompt_history
+    WHERE id = ANY(:ids) AND NOT cache_hit
+        AND created_at BETWEEN :created_from AND :created_to
+    GROUP BY model_id, day_start, key
+)
+INSERT INTO model_latency_sketches AS s (model_id, day_start, sketch_keys, sketch_counts)
+SELECT model_id, day_start, array_agg(key ORDER BY key), array_agg(n ORDER BY key)
+FROM fresh
+GROUP BY model_id, day_start
+ORDER BY model_id, day_start
+ON CONFLICT (model_id, day_start) DO UPDATE SET
+{SKETCH_MERGE_SQL}
+"""
+
+
+def _merged_sketches_sql(single_model: bool) -> str:
+    # Скетчи полных суток [split, ...) + сырые строки (cutoff, split), по бинам
+    sketch_filter = "AND s.model_id = :model_id" if single_model else ""
+    row_filter = "AND selected_model_id = :model_id" if single_model else ""
+    return f"""
+SELECT model_id, key, sum(n)::bigint AS n
+FROM (
+    SELECT s.model_id, b.key, b.n
+    FROM model_latency_sketches AS s, unnest(s.sketch_keys, s.sketch_counts) AS b(key, n)
+    WHERE s.day_start >= :split {sketch_filter}
+    UNION ALL
+    SELECT selected_model_id, {SKETCH_KEY_SQL}, 1
+    FROM prompt_history
+    WHERE created_at > :cutoff AND created_at < :split AND NOT cache_hit {row_filter}
+) merged
+GROUP BY model_id, key
+ORDER BY model_id, key
+"""
+
+
+def sketch_value(key: int) -> float:
+    """Representative latency of a bin in ms: 2γ^key / (γ + 1)."""
+    return 2.0 * SKETCH_GAMMA**key / (SKETCH_GAMMA + 1.0)
+
+
+def sketch_quantiles(
+    keys: Sequence[int], counts: Sequence[int], quantiles: Sequence[float]
+) -> List[float]:
+    """
+    Quantiles of a merged sketch, in ms.
+
+    Rank as in percentile_disc: the ceil(q * N)-th smallest sample
+    (the smallest for q = 0).
+
+    Args:
+        keys: Bin keys in ascending order
+        counts: Samples in each bin (> 0)
+        quantiles: Quantiles in [0, 1]
+
+    Returns:
+        One value per quantile, in input order
+    """
+    cumulative = list(itertools.accumulate(counts))
+    total = cumulative[-1]
+    return [
+        sketch_value(keys[bisect.bisect_right(cumulative, max(math.ceil(q * total) - 1, 0))])
+        for q in quantiles
+    ]
+
+
+class ModelLatencySketchRepository(HistoryRollupRepository):
+    """Repository for the per-model daily latency sketches (user-024)."""
+
+    _apply_history_sql = _APPLY_HISTORY_SQL
+    _table = ModelLatencySketchORM
+    _bucket_start = ModelLatencySketchORM.day_start
+
+    @classmethod
+    def _oldest_period(cls, oldest: ColumnElement[Any]) -> ColumnElement[Any]:
+        """Скетч живёт, пока его UTC-сутки могут содержать историю."""
+        return func.date_trunc("day", oldest, literal("UTC"))
+
+    async def get_merged_sketches(
+        self, cutoff: datetime, split: datetime, model_id: Optional[int] = None
+    ) -> Dict[int, Tuple[List[int], List[int]]]:
+        """
+        Merged latency sketch per model over a window.
+
+        Sketches of days starting at or after split come from the table,
+        rows in (cutoff, split) from prompt_history (cache hits excluded,
+        as in the sketches).
+
+        Args:
+            cutoff: Window start (created_at > cutoff)
+            split: First whole UTC day of the window
+            model_id: Optional single model
+
+        Returns:
+            Dict {model_id: (keys ascending, counts)}
+        """
+        params = {"cutoff": cutoff, "split": split, "model_id": model_id}
+        result = await self.session.execute(
+            text(_merged_sketches_sql(model_id is not None)), params
+        )
+        sketches: Dict[int, Tuple[List[int], List[int]]] = {}
+        for row in result.all():
+            keys, counts = sketches.setdefault(row.model_id, ([], []))
+            keys.append(row.key)
+            counts.append(row.n)
+        return sketches
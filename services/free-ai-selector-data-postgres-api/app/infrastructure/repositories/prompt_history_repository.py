@@ -3,16 +3,70 @@ Prompt History Repository - Data access layer for prompt history
 
 Implements repository pattern for prompt history CRUD operations.
 Uses SQLAlchemy 2.0 async patterns.
+
+user-018: journal listings are keyset-paginated on (created_at DESC, id DESC);
+an optional cursor seeks past the last record of the previous page.
+
+user-020: get_summaries() is the slim journal projection — metadata plus
+left(text, N) previews, without reading full prompt/response texts.
+
+user-021: journal listings take ``q`` — case-insensitive substring search in
+prompt_text / error_message, served by pg_trgm GIN indexes (migration 0010).
+
+user-022: stream_filtered() walks the same filtered journal over a
+server-side cursor in fixed-size batches, for exports of any size.
+
+user-023: per-caller statistics read the caller_hourly_stats rollup, which
+create() / create_many() maintain in the INSERT transaction.
+
+user-024: get_latency_quantiles() merges the daily latency sketches
+(model_latency_sketches) into per-model quantiles for any window.
+
+user-025: get_timeseries() reads bucketed per-model / per-caller series from
+the history_series_stats rollup, maintained in the INSERT transaction too.
 """
 
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
-
-from sqlalchemy import case, desc, func, literal, select
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import (
+    Float,
+    case,
+    delete,
+    desc,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    text,
+    tuple_,
+    type_coerce,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.domain.models import PromptHistory
+from app.domain.models import PromptHistory, PromptHistorySummary
 from app.infrastructure.database.models import PromptHistoryORM
+from app.infrastructure.repositories.caller_hourly_stats_repository import (
+    CallerHourlyStatsRepository,
+)
+from app.infrastructure.repositories.history_series_stats_repository import (
+    HistorySeriesStatsRepository,
+)
+from app.infrastructure.repositories.model_hourly_stats_repository import (
+    ModelHourlyStatsRepository,
+    decay_rate_supported,
+)
+from app.infrastructure.repositories.model_latency_sketch_repository import (
+    ModelLatencySketchRepository,
+    sketch_quantiles,
+)
+from app.utils.cursor import HistoryCursor
+
+# user-011: строк в одном INSERT — 11 колонок на строку держат запрос
+# ниже лимита asyncpg в 32767 bind-параметров
+BULK_INSERT_CHUNK_SIZE = 1000
 
 
 class PromptHistoryRepository:
@@ -26,6 +80,10 @@ class PromptHistoryRepository:
             session: AsyncSession instance for database operations
         """
         self.session = session
+        self.rollup = ModelHourlyStatsRepository(session)
+        self.caller_rollup = CallerHourlyStatsRepository(session)
+        self.latency_sketches = ModelLatencySketchRepository(session)
+        self.series = HistorySeriesStatsRepository(session)
 
     async def create(self, history: PromptHistory) -> PromptHistory:
         """
@@ -48,18 +106,96 @@ class PromptHistoryRepository:
             caller=history.caller,
             http_status=history.http_status,
             requested_model=history.requested_model,
+            cache_hit=history.cache_hit,
         )
 
         self.session.add(orm_history)
         await self.session.flush()
         await self.session.refresh(orm_history)
+        await self.apply_rollups([orm_history.id], orm_history.created_at, orm_history.created_at)
 
-        # Автоматически удаляем старые записи, оставляем только 5000 последних
-        # (увеличено с 1000 для учёта записей health worker)
-        await self._cleanup_old_records(keep_count=5000)
-
+        # user-012: старые записи удаляет фоновый HistoryRetention, не INSERT
         return self._to_domain(orm_history)
 
+    async def create_many(self, histories: List[PromptHistory]) -> List[int]:
+        """
+        Insert many prompt history records with multi-row INSERT (user-011).
+
+        One INSERT ... VALUES (...), (...) per chunk of
+        BULK_INSERT_CHUNK_SIZE rows, without per-row flush/refresh. IDs are
+        reserved from the id sequence first and inserted explicitly: the
+        i-th ID belongs to the i-th record by construction, PostgreSQL does
+        not guarantee the row order of RETURNING.
+
+        Args:
+            histories: PromptHistory domain entities (without ID)
+
+        Returns:
+            Generated IDs in input order
+        """
+        if not histories:
+            return []
+
+        ids: List[int] = []
+        created: List[datetime] = []
+        for start in range(0, len(histories), BULK_INSERT_CHUNK_SIZE):
+            chunk = histories[start : start + BULK_INSERT_CHUNK_SIZE]
+            reserved = list(
+                (
+                    await self.session.execute(
+                        select(
+                            func.nextval(
+                                func.pg_get_serial_sequence(PromptHistoryORM.__tablename__, "id")
+                            )
+                        ).select_from(func.generate_series(1, len(chunk)))
+                    )
+                )
+                .scalars()
+                .all()
+            )
+            rows = [
+                {
+                    "id": history_id,
+                    "user_id": history.user_id,
+                    "prompt_text": history.prompt_text,
+                    "selected_model_id": history.selected_model_id,
+                    "response_text": history.response_text,
+                    "response_time": history.response_time,
+                    "success": history.success,
+                    "error_message": history.error_message,
+                    "caller": history.caller,
+                    "http_status": history.http_status,
+                    "requested_model": history.requested_model,
+                    "cache_hit": history.cache_hit,
+                }
+                for history_id, history in zip(reserved, chunk)
+            ]
+            result = await self.session.execute(
+                insert(PromptHistoryORM).values(rows).returning(PromptHistoryORM.created_at)
+            )
+            ids.extend(reserved)
+            created.extend(result.scalars().all())
+
+        await self.apply_rollups(ids, min(created), max(created))
+        return ids
+
+    async def apply_rollups(
+        self, history_ids: List[int], created_from: datetime, created_to: datetime
+    ) -> None:
+        """
+        Fold freshly inserted rows into every rollup, in the INSERT transaction.
+
+        user-014 / user-023 / user-024 / user-025: почасовые rollup'ы моделей
+        и проектов, скетчи латентности и бакеты графиков.
+
+        Args:
+            history_ids: IDs of the inserted prompt_history rows
+            created_from: Smallest created_at of those rows (partition pruning)
+            created_to: Largest created_at of those rows
+        """
+        for rollup in (self.rollup, self.caller_rollup, self.latency_sketches, self.series):
+            await rollup.apply_history(history_ids, created_from, created_to)
+
     async def get_by_id(self, history_id: int) -> Optional[PromptHistory]:
         """
         Get prompt history by ID.
@@ -80,7 +216,11 @@ class PromptHistoryRepository:
         return self._to_domain(orm_history)
 
     async def get_by_user(
-        self, user_id: str, limit: int = 100, offset: int = 0
+        self,
+        user_id: str,
+        limit: int = 100,
+        offset: int = 0,
+        cursor: Optional[HistoryCursor] = None,
     ) -> List[PromptHistory]:
         """
         Get prompt history for a specific user.
@@ -89,17 +229,18 @@ class PromptHistoryRepository:
             user_id: User ID (Telegram user ID or API user ID)
             limit: Maximum number of records to return (default: 100)
             offset: Number of records to skip (default: 0)
+            cursor: (created_at, id) of the last record of the previous page
 
         Returns:
-            List of PromptHistory domain entities, ordered by created_at DESC
+            List of PromptHistory domain entities, ordered by created_at DESC, id DESC
         """
         query = (
             select(PromptHistoryORM)
             .where(PromptHistoryORM.user_id == user_id)
-            .order_by(desc(PromptHistoryORM.created_at))
             .limit(limit)
             .offset(offset)
         )
+        query = self._journal_page(query, cursor)
 
         result = await self.session.execute(query)
         orm_histories = result.scalars().all()
@@ -107,7 +248,11 @@ class PromptHistoryRepository:
         return [self._to_domain(orm_history) for orm_history in orm_histories]
 
     async def get_by_model(
-        self, model_id: int, limit: int = 100, offset: int = 0
+        self,
+        model_id: int,
+        limit: int = 100,
+        offset: int = 0,
+        cursor: Optional[HistoryCursor] = None,
     ) -> List[PromptHistory]:
         """
         Get prompt history for a specific model.
@@ -116,17 +261,18 @@ class PromptHistoryRepository:
             model_id: AI model ID
             limit: Maximum number of records to return (default: 100)
             offset: Number of records to skip (default: 0)
+            cursor: (created_at, id) of the last record of the previous page
 
         Returns:
-            List of PromptHistory domain entities, ordered by created_at DESC
+            List of PromptHistory domain entities, ordered by created_at DESC, id DESC
         """
         query = (
             select(PromptHistoryORM)
             .where(PromptHistoryORM.selected_model_id == model_id)
-            .order_by(desc(PromptHistoryORM.created_at))
             .limit(limit)
             .offset(offset)
         )
+        query = self._journal_page(query, cursor)
 
         result = await self.session.execute(query)
         orm_histories = result.scalars().all()
@@ -134,7 +280,10 @@ class PromptHistoryRepository:
         return [self._to_domain(orm_history) for orm_history in orm_histories]
 
     async def get_recent(
-        self, limit: int = 100, success_only: bool = False
+        self,
+        limit: int = 100,
+        success_only: bool = False,
+        cursor: Optional[HistoryCursor] = None,
     ) -> List[PromptHistory]:
         """
         Get recent prompt history records.
@@ -142,15 +291,12 @@ class PromptHistoryRepository:
         Args:
             limit: Maximum number of records to return (default: 100)
             success_only: If True, return only successful requests (default: False)
+            cursor: (created_at, id) of the last record of the previous page
 
         Returns:
-            List of PromptHistory domain entities, ordered by created_at DESC
+            List of PromptHistory domain entities, ordered by created_at DESC, id DESC
         """
-        query = (
-            select(PromptHistoryORM)
-            .order_by(desc(PromptHistoryORM.created_at))
-            .limit(limit)
-        )
+        query = self._journal_page(select(PromptHistoryORM).limit(limit), cursor)
 
         if success_only:
             query = query.where(PromptHistoryORM.success)
@@ -167,7 +313,8 @@ class PromptHistoryRepository:
         Get aggregated statistics for all models within a time window.
 
         Uses SQL GROUP BY for efficient aggregation instead of loading all records.
-        Leverages existing index ix_prompt_history_created_at.
+        Index-only scan over ix_prompt_history_created_at_id (user-019).
+        Response-cache hits (user-007) are excluded: the model did no work.
 
         Args:
             window_days: Number of days to look back (default: 7)
@@ -193,7 +340,11 @@ class PromptHistoryRepository:
                 ).label("success_count"),
                 func.avg(PromptHistoryORM.response_time).label("avg_response_time"),
             )
-            .where(PromptHistoryORM.created_at > cutoff_date)
+            .where(
+                PromptHistoryORM.created_at > cutoff_date,
+                # user-007: cache hits did not exercise the model
+                PromptHistoryORM.cache_hit.is_(False),
+            )
             .group_by(PromptHistoryORM.selected_model_id)
         )
 
@@ -221,6 +372,14 @@ class PromptHistoryRepository:
         Возвращает decay-взвешенные суммы успехов и ЖЁСТКИХ сбоев
         (success=false AND http_status != 429; NULL http_status трактуется как hard),
         чтобы 429-rate-limit не топили quality. Плюс медиану латентности.
+        Попадания в кеш ответов (user-007, cache_hit) не учитываются.
+
+        user-014: взвешенные суммы полных часов окна читаются из rollup
+        model_hourly_stats; POW по сырым строкам — только для неполного
+        первого часа. Медиана — percentile_cont(0.5), собранный из точных
+        мс-гистограмм тех же бакетов и строк первого часа. Результат совпадает
+        с _get_recent_weighted_stats_raw(); при слишком быстром затухании
+        (decay_rate_supported() = False) используется сырой запрос.
 
         Args:
             window_days: Размер окна в днях (default: 7)
@@ -234,9 +393,111 @@ class PromptHistoryRepository:
 
         if decay_per_hour is None:
             decay_per_hour = rating_params.decay_per_hour()
+        if not decay_rate_supported(decay_per_hour):
+            return await self._get_recent_weighted_stats_raw(window_days, decay_per_hour)
 
-        cutoff_date = datetime.utcnow() - timedelta(days=window_days)
+        cutoff_date = self._weighted_stats_cutoff(window_days)
+
+        # Граница rollup: начало часа после max(cutoff, самая старая запись).
+        # Бакеты до неё неполны (край окна или строки, удалённые retention)
+        bounds = await self.session.execute(
+            select(
+                (
+                    func.date_trunc(
+                        "hour",
+                        func.greatest(cutoff_date, func.min(PromptHistoryORM.created_at)),
+                    )
+                    + text("interval '1 hour'")
+                ).label("split"),
+            )
+        )
+        split = bounds.scalar_one()
+
+        # Полные часы — rollup (веса считаются в БД по моментам бакетов)
+        rollup_sums = await self.rollup.get_weighted_sums(split, decay_per_hour)
+
+        # Неполный первый час окна — сырые строки (POW только для них)
+        query = self._weighted_stats_query(decay_per_hour, cutoff_date, weighted_before=split)
+        totals: Dict[int, Dict[str, Any]] = {
+            row.selected_model_id: {
+                "request_count": row.request_count,
+                "weighted_successes": float(row.weighted_successes or 0.0),
+                "weighted_hard_failures": float(row.weighted_hard_failures or 0.0),
+                "total_weight": float(row.total_weight or 0.0),
+                "weighted_time_sum": float(row.weighted_time_sum or 0.0),
+            }
+            for row in (await self.session.execute(query)).all()
+        }
+        for model_id, sums in rollup_sums.items():
+            entry = totals.setdefault(model_id, dict.fromkeys(sums, 0))
+            for name, value in sums.items():
+                entry[name] += value
 
+        # Медиана окна — из гистограмм бакетов и строк первого часа
+        medians = await self.rollup.get_latency_medians(split, timedelta(days=window_days))
+        return {
+            model_id: self._weighted_stats_entry(
+                **sums, median_response_time=medians.get(model_id, 0.0)
+            )
+            for model_id, sums in totals.items()
+        }
+
+    async def _get_recent_weighted_stats_raw(
+        self, window_days: int, decay_per_hour: float
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        get_recent_weighted_stats_for_all_models по сырым строкам окна.
+
+        POW(decay, hours_ago) на каждую строку и percentile_cont(0.5).
+        Fallback для неподдерживаемого decay и эталон для тестов (user-014).
+
+        Args:
+            window_days: Размер окна в днях
+            decay_per_hour: Коэффициент затухания за 1 час
+
+        Returns:
+            См. get_recent_weighted_stats_for_all_models
+        """
+        cutoff_date = self._weighted_stats_cutoff(window_days)
+        query = self._weighted_stats_query(decay_per_hour, cutoff_date)
+        result = await self.session.execute(query)
+
+        return {
+            row.selected_model_id: self._weighted_stats_entry(
+                request_count=row.request_count,
+                weighted_successes=float(row.weighted_successes or 0.0),
+                weighted_hard_failures=float(row.weighted_hard_failures or 0.0),
+                total_weight=float(row.total_weight or 0.0),
+                weighted_time_sum=float(row.weighted_time_sum or 0.0),
+                median_response_time=float(row.median_response_time or 0.0),
+            )
+            for row in result.all()
+        }
+
+    @staticmethod
+    def _weighted_stats_cutoff(window_days: float) -> Any:
+        """
+        Начало окна: now() БД минус window_days.
+
+        Тот же момент, от которого считаются веса: в пределах транзакции
+        rollup-путь и сырой запрос видят одно и то же окно.
+        """
+        return func.now() - literal(timedelta(days=window_days))
+
+    @staticmethod
+    def _weighted_stats_query(
+        decay_per_hour: float, cutoff_date: Any, weighted_before: Any = None
+    ) -> Any:
+        """
+        SELECT decay-взвешенных сумм и медианы по сырым строкам окна, GROUP BY модели.
+
+        Args:
+            decay_per_hour: Коэффициент затухания за 1 час
+            cutoff_date: Начало окна (created_at > cutoff_date)
+            weighted_before: Если задано — только строки created_at <
+                weighted_before и без медианы: остальное берётся из rollup
+                (user-014)
+        """
         # hours_ago = EXTRACT(EPOCH FROM (NOW() - created_at)) / 3600
         hours_ago = func.extract(
             "epoch", func.now() - PromptHistoryORM.created_at
@@ -252,58 +513,78 @@ class PromptHistoryRepository:
             | (PromptHistoryORM.http_status != literal(429))
         )
 
+        columns = [
+            PromptHistoryORM.selected_model_id,
+            func.count().label("request_count"),
+            # weighted success rate
+            func.sum(
+                case((PromptHistoryORM.success == True, weight), else_=literal(0.0))  # noqa: E712
+            ).label("weighted_successes"),
+            # bmm: weighted HARD failures only (429 excluded) for Laplace quality
+            func.sum(case((hard_fail, weight), else_=literal(0.0))).label(
+                "weighted_hard_failures"
+            ),
+            func.sum(weight).label("total_weight"),
+            # weighted average response time
+            type_coerce(func.sum(PromptHistoryORM.response_time * weight), Float).label(
+                "weighted_time_sum"
+            ),
+        ]
+        if weighted_before is None:
+            # bmm: median latency (robust vs mean for speed scoring)
+            columns.append(
+                type_coerce(
+                    func.percentile_cont(0.5).within_group(
+                        PromptHistoryORM.response_time.asc()
+                    ),
+                    Float,
+                ).label("median_response_time")
+            )
+
         query = (
-            select(
-                PromptHistoryORM.selected_model_id,
-                func.count().label("request_count"),
-                # weighted success rate
-                func.sum(
-                    case((PromptHistoryORM.success == True, weight), else_=literal(0.0))  # noqa: E712
-                ).label("weighted_successes"),
-                # bmm: weighted HARD failures only (429 excluded) for Laplace quality
-                func.sum(case((hard_fail, weight), else_=literal(0.0))).label(
-                    "weighted_hard_failures"
-                ),
-                func.sum(weight).label("total_weight"),
-                # weighted average response time
-                func.sum(PromptHistoryORM.response_time * weight).label(
-                    "weighted_time_sum"
-                ),
-                # bmm: median latency (robust vs mean for speed scoring)
-                func.percentile_cont(0.5)
-                .within_group(PromptHistoryORM.response_time.asc())
-                .label("median_response_time"),
+            select(*columns)
+            .where(
+                PromptHistoryORM.created_at > cutoff_date,
+                # user-007: cache hits did not exercise the model
+                PromptHistoryORM.cache_hit.is_(False),
             )
-            .where(PromptHistoryORM.created_at > cutoff_date)
             .group_by(PromptHistoryORM.selected_model_id)
         )
+        if weighted_before is not None:
+            query = query.where(PromptHistoryORM.created_at < weighted_before)
+        return query
+
+    @staticmethod
+    def _weighted_stats_entry(
+        request_count: int,
+        weighted_successes: float,
+        weighted_hard_failures: float,
+        total_weight: float,
+        weighted_time_sum: float,
+        median_response_time: float,
+    ) -> Dict[str, Any]:
+        """Итоговый dict модели для rating_v2 (одинаковое округление для обоих путей)."""
+        # Сумма времени и медиана исторически приходили через тип колонки
+        # NUMERIC(10,3) и квантовались до 3 знаков — сохраняем это явно
+        weighted_time_sum = float("%.3f" % weighted_time_sum)
+        median_response_time = float("%.3f" % median_response_time)
+
+        if total_weight > 0:
+            w_success_rate = weighted_successes / total_weight
+            w_avg_time = weighted_time_sum / total_weight
+        else:
+            w_success_rate = 0.0
+            w_avg_time = 0.0
 
-        result = await self.session.execute(query)
-        rows = result.all()
-
-        stats: Dict[int, Dict[str, Any]] = {}
-        for row in rows:
-            total_w = float(row.total_weight or 0.0)
-            if total_w > 0:
-                w_success_rate = float(row.weighted_successes or 0.0) / total_w
-                w_avg_time = float(row.weighted_time_sum or 0.0) / total_w
-            else:
-                w_success_rate = 0.0
-                w_avg_time = 0.0
-
-            stats[row.selected_model_id] = {
-                "request_count": row.request_count,
-                "weighted_success_rate": round(w_success_rate, 4),
-                "weighted_avg_response_time": round(w_avg_time, 4),
-                # bmm v2 (ADR-0003) fields
-                "w_success": round(float(row.weighted_successes or 0.0), 6),
-                "w_fail_hard": round(float(row.weighted_hard_failures or 0.0), 6),
-                "median_response_time": round(
-                    float(row.median_response_time or 0.0), 4
-                ),
-            }
-
-        return stats
+        return {
+            "request_count": request_count,
+            "weighted_success_rate": round(w_success_rate, 4),
+            "weighted_avg_response_time": round(w_avg_time, 4),
+            # bmm v2 (ADR-0003) fields
+            "w_success": round(weighted_successes, 6),
+            "w_fail_hard": round(weighted_hard_failures, 6),
+            "median_response_time": round(median_response_time, 4),
+        }
 
     async def get_statistics_for_period(
         self, start_date: datetime, end_date: datetime, model_id: Optional[int] = None
@@ -354,15 +635,190 @@ class PromptHistoryRepository:
             "success_rate": success_rate,
         }
 
+    async def get_latency_quantiles(
+        self,
+        window: timedelta,
+        quantiles: Sequence[float],
+        model_id: Optional[int] = None,
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Latency quantiles per model over a window (user-024).
+
+        Merges the daily sketches of whole UTC days with the raw rows of the
+        partial first day, so the cost depends on the number of days, not on
+        traffic. Each quantile is within SKETCH_RELATIVE_ACCURACY of
+        percentile_disc over the raw rows (_get_latency_quantiles_raw).
+        Cache hits are excluded.
+
+        Args:
+            window: Look-back window (created_at > now() - window)
+            quantiles: Quantiles in [0, 1]
+            model_id: Optional single model
+
+        Returns:
+            Dict {model_id: {"sample_count": int, "quantiles": [seconds, ...]}}
+            for models with calls in the window; quantiles in input order
+        """
+        cutoff, split = await self._rollup_bounds(func.now() - literal(window), bucket="day")
+        sketches = await self.latency_sketches.get_merged_sketches(cutoff, split, model_id)
+
+        return {
+            sketch_model_id: {
+                "sample_count": sum(counts),
+                "quantiles": [ms / 1000.0 for ms in sketch_quantiles(keys, counts, quantiles)],
+            }
+            for sketch_model_id, (keys, counts) in sketches.items()
+        }
+
+    async def _get_latency_quantiles_raw(
+        self,
+        window: timedelta,
+        quantiles: Sequence[float],
+        model_id: Optional[int] = None,
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        get_latency_quantiles по сырым строкам окна: percentile_disc(ARRAY[...]).
+
+        Reference for the sketch path in tests (user-024).
+
+        Args:
+            window: Look-back window
+            quantiles: Quantiles in [0, 1]
+            model_id: Optional single model
+
+        Returns:
+            См. get_latency_quantiles
+        """
+        query = (
+            select(
+                PromptHistoryORM.selected_model_id,
+                func.count().label("sample_count"),
+                type_coerce(
+                    func.percentile_disc(literal(list(quantiles), ARRAY(Float))).within_group(
+                        type_coerce(PromptHistoryORM.response_time, Float)
+                    ),
+                    ARRAY(Float),
+                ).label("quantiles"),
+            )
+            .where(PromptHistoryORM.created_at > func.now() - literal(window))
+            .where(~PromptHistoryORM.cache_hit)
+            .group_by(PromptHistoryORM.selected_model_id)
+        )
+        if model_id is not None:
+            query = query.where(PromptHistoryORM.selected_model_id == model_id)
+
+        result = await self.session.execute(query)
+        return {
+            row.selected_model_id: {
+                "sample_count": row.sample_count,
+                "quantiles": [float(value) for value in row.quantiles],
+            }
+            for row in result.all()
+        }
+
+    async def get_timeseries(
+        self,
+        granularity: str,
+        group_by: str,
+        window: timedelta,
+        quantiles: Sequence[float],
+        group_key: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Bucketed request / outcome / latency series per model or caller (user-025).
+
+        Points are summed from history_series_stats minute and hour rows, so
+        the cost depends on the number of buckets, not on traffic. Counts include cache hits;
+        latency quantiles exclude them and are within SKETCH_RELATIVE_ACCURACY
+        of percentile_disc over the bucket's rows (_get_timeseries_raw).
+
+        Args:
+            granularity: "minute", "hour" or "day"
+            group_by: "model" or "caller"
+            window: Look-back window; the first bucket is the one containing
+                now() - window
+            quantiles: Latency quantiles in [0, 1]
+            group_key: Optional single series (model id as string or caller)
+
+        Returns:
+            См. HistorySeriesStatsRepository.get_series
+        """
+        return await self.series.get_series(granularity, group_by, window, quantiles, group_key)
+
+    async def _get_timeseries_raw(
+        self,
+        granularity: str,
+        group_by: str,
+        window: timedelta,
+        quantiles: Sequence[float],
+    ) -> Dict[Tuple[Optional[str], datetime], Dict[str, Any]]:
+        """
+        get_timeseries по сырым строкам окна, percentile_disc на бакет.
+
+        Reference for the rollup path in tests (user-025).
+
+        Args:
+            granularity: "minute", "hour" or "day"
+            group_by: "model" or "caller"
+            window: Look-back window
+            quantiles: Quantiles in [0, 1]
+
+        Returns:
+            Dict {(group_key, bucket_start): point} с полями точки get_timeseries
+        """
+        group_sql = "selected_model_id::text" if group_by == "model" else "caller"
+        result = await self.session.execute(
+            text(
+                f"""
+                SELECT
+                    {group_sql} AS group_key,
+                    date_trunc(:granularity, created_at, 'UTC') AS bucket_start,
+                    count(*) AS request_count,
+                    count(*) FILTER (WHERE success) AS success_count,
+                    count(*) FILTER (
+                        WHERE NOT success AND (http_status IS NULL OR http_status <> 429)
+                    ) AS hard_fail_count,
+                    count(*) FILTER (WHERE NOT success AND http_status = 429)
+                        AS rate_limited_count,
+                    percentile_disc(CAST(:quantiles AS float8[]))
+                        WITHIN GROUP (ORDER BY response_time::float8)
+                        FILTER (WHERE NOT cache_hit) AS latency_quantiles
+                FROM prompt_history
+                WHERE created_at >= date_trunc(
+                    :granularity, now() - CAST(:window AS interval), 'UTC'
+                )
+                GROUP BY 1, 2
+                """
+            ),
+            {"granularity": granularity, "window": window, "quantiles": list(quantiles)},
+        )
+        return {
+            (row.group_key, row.bucket_start): {
+                "bucket_start": row.bucket_start,
+                "request_count": row.request_count,
+                "success_count": row.success_count,
+                "hard_fail_count": row.hard_fail_count,
+                "rate_limited_count": row.rate_limited_count,
+                "latency_quantiles": (
+                    [float(value) for value in row.latency_quantiles]
+                    if row.latency_quantiles is not None
+                    else None
+                ),
+            }
+            for row in result.all()
+        }
+
     async def get_stats_grouped_by_caller(
-        self, window_days: int = 7
+        self, window_days: float = 7
     ) -> List[Dict[str, Any]]:
         """
         Get per-caller (per-project) aggregate statistics within a time window (oxl).
 
-        Mirrors the GROUP BY aggregation style of get_recent_stats_for_all_models,
-        but groups by `caller`. For each caller it also resolves the most-frequently
-        selected model via a second grouped query.
+        user-023: full hours of the window come from the caller_hourly_stats
+        rollup, only the partial first hour is read from prompt_history, so
+        the cost does not grow with traffic. The result equals
+        _get_stats_grouped_by_caller_raw(); the window may be any length,
+        including fractions of a day.
 
         Args:
             window_days: Number of days to look back (default: 7)
@@ -376,9 +832,61 @@ class PromptHistoryRepository:
                 "success_rate": float,
                 "avg_response_time": float,
                 "top_model_id": Optional[int],
+                "auto_count": int,
+                "pinned_count": int,
             }
         """
-        cutoff_date = datetime.utcnow() - timedelta(days=window_days)
+        cutoff, split = await self._rollup_bounds(self._weighted_stats_cutoff(window_days))
+
+        return await self.caller_rollup.get_grouped_stats(cutoff, split)
+
+    async def _rollup_bounds(
+        self, cutoff_date: Any, bucket: str = "hour"
+    ) -> Tuple[datetime, datetime]:
+        """
+        Window start and the first rollup bucket fully inside the window.
+
+        Как в user-014: первый бакет rollup — час (user-024: UTC-сутки) после
+        max(cutoff, самая старая запись); более ранние бакеты неполны (край
+        окна или retention), их строки читаются из prompt_history.
+
+        Args:
+            cutoff_date: SQL expression of the window start (created_at > cutoff)
+            bucket: "hour" (hourly rollups) or "day" (latency sketches)
+
+        Returns:
+            (cutoff, split) evaluated by the database
+        """
+        oldest = func.greatest(cutoff_date, func.min(PromptHistoryORM.created_at))
+        if bucket == "day":
+            split_expr = func.date_trunc("day", oldest, literal("UTC")) + text("interval '1 day'")
+        else:
+            split_expr = func.date_trunc("hour", oldest) + text("interval '1 hour'")
+        bounds = await self.session.execute(
+            select(cutoff_date.label("cutoff"), split_expr.label("split"))
+        )
+        cutoff: datetime
+        split: datetime
+        cutoff, split = bounds.one()
+        return cutoff, split
+
+    async def _get_stats_grouped_by_caller_raw(
+        self, window_days: float = 7
+    ) -> List[Dict[str, Any]]:
+        """
+        get_stats_grouped_by_caller по сырым строкам окна.
+
+        Two GROUP BY scans over the window: aggregates per caller and the
+        most-frequently selected model per caller (ties -> lower model id).
+        Reference for the rollup path in tests (user-023).
+
+        Args:
+            window_days: Number of days to look back (default: 7)
+
+        Returns:
+            См. get_stats_grouped_by_caller
+        """
+        cutoff_date = self._weighted_stats_cutoff(window_days)
 
         # Primary aggregation: counts + success + avg response time grouped by caller.
         agg_query = (
@@ -398,7 +906,7 @@ class PromptHistoryRepository:
             )
             .where(PromptHistoryORM.created_at > cutoff_date)
             .group_by(PromptHistoryORM.caller)
-            .order_by(desc(func.count()))
+            .order_by(desc(func.count()), PromptHistoryORM.caller.asc().nulls_last())
         )
 
         agg_result = await self.session.execute(agg_query)
@@ -413,7 +921,9 @@ class PromptHistoryRepository:
             )
             .where(PromptHistoryORM.created_at > cutoff_date)
             .group_by(PromptHistoryORM.caller, PromptHistoryORM.selected_model_id)
-            .order_by(PromptHistoryORM.caller, desc(func.count()))
+            .order_by(
+                PromptHistoryORM.caller, desc(func.count()), PromptHistoryORM.selected_model_id
+            )
         )
 
         model_result = await self.session.execute(model_query)
@@ -452,6 +962,8 @@ class PromptHistoryRepository:
         date_to: Optional[datetime] = None,
         limit: int = 100,
         offset: int = 0,
+        cursor: Optional[HistoryCursor] = None,
+        q: Optional[str] = None,
     ) -> List[PromptHistory]:
         """
         Filtered journal listing of prompt history records (oxl).
@@ -466,55 +978,269 @@ class PromptHistoryRepository:
             date_to: Optional inclusive upper bound on created_at
             limit: Maximum number of records to return (default: 100)
             offset: Number of records to skip (default: 0)
+            cursor: (created_at, id) of the last record of the previous page
+            q: Optional substring to find in prompt_text or error_message
+
+        Returns:
+            List of PromptHistory domain entities, ordered by created_at DESC, id DESC
+        """
+        query = self._journal_filters(
+            select(PromptHistoryORM), caller, success, date_from, date_to, q
+        )
+        query = self._journal_page(query.limit(limit).offset(offset), cursor)
+
+        result = await self.session.execute(query)
+        orm_histories = result.scalars().all()
+
+        return [self._to_domain(orm_history) for orm_history in orm_histories]
+
+    async def get_summaries(
+        self,
+        preview_chars: int,
+        user_id: Optional[str] = None,
+        model_id: Optional[int] = None,
+        caller: Optional[str] = None,
+        success: Optional[bool] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        limit: int = 100,
+        offset: int = 0,
+        cursor: Optional[HistoryCursor] = None,
+        q: Optional[str] = None,
+    ) -> List[PromptHistorySummary]:
+        """
+        Slim journal listing: metadata and text previews only (user-020).
+
+        Same filters and order as get_by_user / get_by_model / get_filtered,
+        but prompt_text / response_text are cut to preview_chars in SQL, so
+        multi-KB texts are neither transferred nor serialized. error_message
+        is not selected — it is part of the detail view.
+
+        Args:
+            preview_chars: Preview length in characters (0 = empty previews)
+            user_id: Optional filter by user
+            model_id: Optional filter by selected model
+            caller: Optional filter by external project name
+            success: Optional filter by success flag
+            date_from: Optional inclusive lower bound on created_at
+            date_to: Optional inclusive upper bound on created_at
+            limit: Maximum number of records to return (default: 100)
+            offset: Number of records to skip (default: 0)
+            cursor: (created_at, id) of the last record of the previous page
+            q: Optional substring to find in prompt_text or error_message
 
         Returns:
-            List of PromptHistory domain entities, ordered by created_at DESC
+            List of PromptHistorySummary, ordered by created_at DESC, id DESC
+        """
+        query = select(
+            PromptHistoryORM.id,
+            PromptHistoryORM.user_id,
+            PromptHistoryORM.selected_model_id,
+            PromptHistoryORM.response_time,
+            PromptHistoryORM.success,
+            PromptHistoryORM.created_at,
+            func.left(PromptHistoryORM.prompt_text, preview_chars).label("prompt_preview"),
+            func.left(PromptHistoryORM.response_text, preview_chars).label("response_preview"),
+            PromptHistoryORM.caller,
+            PromptHistoryORM.http_status,
+            PromptHistoryORM.requested_model,
+            PromptHistoryORM.cache_hit,
+        )
+
+        if user_id is not None:
+            query = query.where(PromptHistoryORM.user_id == user_id)
+        if model_id is not None:
+            query = query.where(PromptHistoryORM.selected_model_id == model_id)
+        query = self._journal_filters(query, caller, success, date_from, date_to, q)
+        query = self._journal_page(query.limit(limit).offset(offset), cursor)
+
+        result = await self.session.execute(query)
+        return [PromptHistorySummary(**row._mapping) for row in result.all()]
+
+    async def stream_filtered(
+        self,
+        caller: Optional[str] = None,
+        success: Optional[bool] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        q: Optional[str] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[List[PromptHistory]]:
         """
-        query = select(PromptHistoryORM)
+        Stream the filtered journal in batches over a server-side cursor (user-022).
 
+        Same filters and order as get_filtered, without limit/offset. Rows are
+        fetched batch_size at a time (yield_per), so memory stays bounded by
+        one batch however many rows match. The session must stay open (and in
+        its transaction) until the iterator is exhausted or closed.
+
+        Args:
+            caller: Optional filter by external project name
+            success: Optional filter by success flag
+            date_from: Optional inclusive lower bound on created_at
+            date_to: Optional inclusive upper bound on created_at
+            q: Optional substring to find in prompt_text or error_message
+            batch_size: Rows fetched per round trip (default: 1000)
+
+        Yields:
+            Lists of up to batch_size PromptHistory, ordered by created_at DESC, id DESC
+        """
+        query = self._journal_filters(
+            select(PromptHistoryORM), caller, success, date_from, date_to, q
+        )
+        query = self._journal_page(query, None).execution_options(yield_per=batch_size)
+
+        result = await self.session.stream_scalars(query)
+        try:
+            # identity map хранит слабые ссылки: выданные пачки освобождаются
+            async for partition in result.partitions():
+                yield [self._to_domain(orm_history) for orm_history in partition]
+        finally:
+            await result.close()
+
+    @classmethod
+    def _journal_filters(
+        cls,
+        query: Any,
+        caller: Optional[str],
+        success: Optional[bool],
+        date_from: Optional[datetime],
+        date_to: Optional[datetime],
+        q: Optional[str],
+    ) -> Any:
+        """
+        WHERE clauses shared by the journal listings and the export.
+
+        Args:
+            query: SELECT over PromptHistoryORM columns
+            caller: Optional filter by external project name
+            success: Optional filter by success flag
+            date_from: Optional inclusive lower bound on created_at
+            date_to: Optional inclusive upper bound on created_at
+            q: Optional substring to find in prompt_text or error_message
+
+        Returns:
+            Query with the given filters combined by AND
+        """
         if caller is not None:
             query = query.where(PromptHistoryORM.caller == caller)
         if success is not None:
-            query = query.where(PromptHistoryORM.success == success)
+            # user-019: NOT success литералом — совпадает с предикатом частичного
+            # индекса ix_prompt_history_failed_created_at и в generic-плане
+            query = query.where(PromptHistoryORM.success if success else ~PromptHistoryORM.success)
         if date_from is not None:
             query = query.where(PromptHistoryORM.created_at >= date_from)
         if date_to is not None:
             query = query.where(PromptHistoryORM.created_at <= date_to)
+        if q:
+            query = query.where(cls._search_condition(q))
+        return query
 
-        query = (
-            query.order_by(desc(PromptHistoryORM.created_at))
-            .limit(limit)
-            .offset(offset)
+    @staticmethod
+    def _search_condition(q: str) -> Any:
+        """
+        prompt_text ILIKE '%q%' OR error_message ILIKE '%q%' (user-021).
+
+        LIKE wildcards in q are escaped, so q is matched literally. Both
+        columns have gin_trgm_ops indexes (migration 0010); the planner
+        combines them with BitmapOr instead of scanning partitions.
+        """
+        escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        pattern = f"%{escaped}%"
+        return or_(
+            PromptHistoryORM.prompt_text.ilike(pattern, escape="\\"),
+            PromptHistoryORM.error_message.ilike(pattern, escape="\\"),
         )
 
-        result = await self.session.execute(query)
-        orm_histories = result.scalars().all()
+    @staticmethod
+    def _journal_page(query: Any, cursor: Optional[HistoryCursor]) -> Any:
+        """
+        Journal order plus keyset seek (user-018).
 
-        return [self._to_domain(orm_history) for orm_history in orm_histories]
+        (created_at, id) is unique, so pages never overlap or skip rows;
+        the row comparison is an index condition on created_at.
+
+        Args:
+            query: SELECT over PromptHistoryORM
+            cursor: (created_at, id) of the last record of the previous page
 
-    async def _cleanup_old_records(self, keep_count: int = 1000) -> None:
+        Returns:
+            Query ordered by created_at DESC, id DESC, past the cursor
         """
-        Удаляет старые записи, оставляя только keep_count последних.
+        if cursor is not None:
+            query = query.where(
+                tuple_(PromptHistoryORM.created_at, PromptHistoryORM.id)
+                < tuple_(
+                    literal(cursor[0], PromptHistoryORM.created_at.type),
+                    literal(cursor[1], PromptHistoryORM.id.type),
+                )
+            )
+        return query.order_by(desc(PromptHistoryORM.created_at), desc(PromptHistoryORM.id))
+
+    async def get_retention_boundary(self, keep_count: int) -> Optional[Tuple[datetime, int]]:
+        """
+        Newest record that falls outside the keep_count newest ones (user-012).
+
+        Uses the created_at index: ORDER BY created_at DESC OFFSET keep_count.
 
         Args:
-            keep_count: Количество записей для сохранения (default: 1000)
+            keep_count: Number of newest records to keep
+
+        Returns:
+            (created_at, id) of the boundary record, or None if the table
+            holds at most keep_count records
         """
-        # Подзапрос: получить ID последних keep_count записей
-        subquery = (
-            select(PromptHistoryORM.id)
-            .order_by(desc(PromptHistoryORM.created_at))
-            .limit(keep_count)
-            .scalar_subquery()
+        query = (
+            select(PromptHistoryORM.created_at, PromptHistoryORM.id)
+            .order_by(desc(PromptHistoryORM.created_at), desc(PromptHistoryORM.id))
+            .offset(keep_count)
+            .limit(1)
         )
+        row = (await self.session.execute(query)).first()
+        return (row[0], row[1]) if row is not None else None
 
-        # Удалить все записи, которые не входят в топ keep_count
-        from sqlalchemy import delete
+    async def purge_batch(
+        self,
+        batch_size: int,
+        older_than: Optional[datetime] = None,
+        boundary: Optional[Tuple[datetime, int]] = None,
+    ) -> int:
+        """
+        Delete up to batch_size oldest records violating a retention policy (user-012).
 
-        delete_query = delete(PromptHistoryORM).where(
-            PromptHistoryORM.id.notin_(subquery)
-        )
+        A record is purged if it is older than older_than (age policy) or is
+        at/below boundary in (created_at, id) order (row-count policy).
+
+        Args:
+            batch_size: Maximum number of records to delete
+            older_than: Age cutoff on created_at (None = no age policy)
+            boundary: Result of get_retention_boundary (None = no row-count policy)
 
-        await self.session.execute(delete_query)
+        Returns:
+            Number of deleted records (0 = nothing left to purge)
+        """
+        conditions = []
+        if older_than is not None:
+            conditions.append(PromptHistoryORM.created_at < older_than)
+        if boundary is not None:
+            conditions.append(
+                tuple_(PromptHistoryORM.created_at, PromptHistoryORM.id)
+                <= tuple_(literal(boundary[0]), literal(boundary[1]))
+            )
+        if not conditions:
+            return 0
+
+        victims = (
+            select(PromptHistoryORM.id)
+            .where(or_(*conditions))
+            .order_by(PromptHistoryORM.created_at, PromptHistoryORM.id)
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        result = await self.session.execute(
+            delete(PromptHistoryORM).where(PromptHistoryORM.id.in_(victims))
+        )
+        return result.rowcount or 0
 
     def _to_domain(self, orm_history: PromptHistoryORM) -> PromptHistory:
         """
@@ -539,4 +1265,5 @@ class PromptHistoryRepository:
             caller=orm_history.caller,
             http_status=orm_history.http_status,
             requested_model=orm_history.requested_model,
+            cache_hit=orm_history.cache_hit,
         )
@@ -0,0 +1,285 @@
+"""
+History retention engine for AI Manager Platform - Data API Service
+
+user-012: Раньше каждый INSERT в prompt_history запускал
+DELETE ... WHERE id NOT IN (последние 5000) — O(таблица) на горячем пути
+записи и блокировки между конкурентными вставками. Теперь вставки — чистый
+append, а старые записи удаляет фоновая задача.
+
+Поведение:
+    - Политики: по числу строк (оставить N новейших) и/или по возрасту;
+      запись удаляется, если нарушает любую из включённых политик
+    - Удаление пачками по HISTORY_RETENTION_BATCH_SIZE строк, каждая пачка —
+      отдельная короткая транзакция
+    - Метрики (удалено строк, длительность прогона) — GET /metrics
+    - user-013: если prompt_history партиционирована (миграция 0007),
+      прогон создаёт партиции наперёд и удаляет целые партиции вне окна
+      (DETACH + DROP TABLE, по партиции на транзакцию, под lock_timeout);
+      построчный DELETE добирает только хвост
+    - user-014: бакеты rollup model_hourly_stats за часы, целиком удалённые
+      из prompt_history, удаляются тем же прогоном
+    - user-015: если прогон что-то удалил, кеш GET /models сбрасывается
+    - user-023: так же чистится rollup caller_hourly_stats (в метрике
+      last_rollup_pruned — сумма по всем rollup)
+    - user-024: и суточные скетчи латентности model_latency_sketches
+    - user-025: и rollup графиков history_series_stats (минутные бакеты
+      старше TIMESERIES_MINUTE_RETENTION_HOURS сворачиваются в часовые)
+
+Configuration:
+    HISTORY_RETENTION_MAX_ROWS: Сколько новейших записей хранить
+        (default: 0 = политика выключена)
+    HISTORY_RETENTION_MAX_AGE_DAYS: Максимальный возраст записи в днях
+        (default: 90, 0 = политика выключена). По возрасту, а не по числу
+        строк: так старые дни уходят целыми партициями (user-013)
+    HISTORY_RETENTION_INTERVAL_SECONDS: Период прогона (default: 300)
+    HISTORY_RETENTION_BATCH_SIZE: Строк в одном DELETE (default: 1000)
+    HISTORY_PARTITION_PREMAKE_DAYS: На сколько дней вперёд создавать
+        партиции (default: 7, 0 = не создавать)
+    HISTORY_PARTITION_LOCK_TIMEOUT_MS: Сколько ждать блокировку на удаление
+        партиции, дальше — до следующего прогона (default: 2000)
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, ClassVar, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.infrastructure.database import partitions
+from app.infrastructure.database.connection import AsyncSessionLocal
+from app.infrastructure.models_cache import ModelsCache
+from app.infrastructure.repositories.caller_hourly_stats_repository import (
+    CallerHourlyStatsRepository,
+)
+from app.infrastructure.repositories.history_series_stats_repository import (
+    HistorySeriesStatsRepository,
+)
+from app.infrastructure.repositories.model_hourly_stats_repository import (
+    ModelHourlyStatsRepository,
+)
+from app.infrastructure.repositories.model_latency_sketch_repository import (
+    ModelLatencySketchRepository,
+)
+from app.infrastructure.repositories.prompt_history_repository import PromptHistoryRepository
+from app.utils.logger import get_logger
+from app.utils.security import sanitize_error_message
+
+logger = get_logger(__name__)
+
+HISTORY_RETENTION_MAX_ROWS = int(os.getenv("HISTORY_RETENTION_MAX_ROWS", "0"))
+HISTORY_RETENTION_MAX_AGE_DAYS = float(os.getenv("HISTORY_RETENTION_MAX_AGE_DAYS", "90"))
+HISTORY_RETENTION_INTERVAL_SECONDS = float(
+    os.getenv("HISTORY_RETENTION_INTERVAL_SECONDS", "300")
+)
+HISTORY_RETENTION_BATCH_SIZE = int(os.getenv("HISTORY_RETENTION_BATCH_SIZE", "1000"))
+HISTORY_PARTITION_PREMAKE_DAYS = int(os.getenv("HISTORY_PARTITION_PREMAKE_DAYS", "7"))
+HISTORY_PARTITION_LOCK_TIMEOUT_MS = int(
+    os.getenv("HISTORY_PARTITION_LOCK_TIMEOUT_MS", str(partitions.PARTITION_LOCK_TIMEOUT_MS))
+)
+
+
+class HistoryRetention:
+    """Периодическая очистка prompt_history по политикам хранения.
+
+    Class-level state: одна фоновая задача на процесс; start()/shutdown()
+    вызываются из lifespan.
+    """
+
+    _task: ClassVar[Optional["asyncio.Task[None]"]] = None
+    # Метрики
+    _runs: ClassVar[int] = 0
+    _failed_runs: ClassVar[int] = 0
+    _total_purged: ClassVar[int] = 0
+    _last_purged: ClassVar[int] = 0
+    _last_batches: ClassVar[int] = 0
+    _last_partitions_dropped: ClassVar[int] = 0
+    _last_partitions_created: ClassVar[int] = 0
+    _last_rollup_pruned: ClassVar[int] = 0
+    _last_duration_ms: ClassVar[float] = 0.0
+    _last_run_at: ClassVar[Optional[datetime]] = None
+    _last_error: ClassVar[Optional[str]] = None
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        """Включена хотя бы одна политика."""
+        return HISTORY_RETENTION_MAX_ROWS > 0 or HISTORY_RETENTION_MAX_AGE_DAYS > 0
+
+    @classmethod
+    def start(cls) -> None:
+        """Запустить фоновую задачу (идемпотентно; no-op без политик и партиций)."""
+        if not cls.is_enabled() and HISTORY_PARTITION_PREMAKE_DAYS <= 0:
+            return
+        if cls._task is not None and not cls._task.done():
+            return
+        cls._task = asyncio.create_task(cls._run_forever())
+        logger.info(
+            "history_retention_started",
+            max_rows=HISTORY_RETENTION_MAX_ROWS,
+            max_age_days=HISTORY_RETENTION_MAX_AGE_DAYS,
+            premake_days=HISTORY_PARTITION_PREMAKE_DAYS,
+            interval_seconds=HISTORY_RETENTION_INTERVAL_SECONDS,
+            batch_size=HISTORY_RETENTION_BATCH_SIZE,
+        )
+
+    @classmethod
+    async def shutdown(cls) -> None:
+        """Остановить фоновую задачу (текущая пачка откатывается)."""
+        task = cls._task
+        cls._task = None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        logger.info("history_retention_stopped", **cls.metrics())
+
+    @classmethod
+    async def run_once(cls, session: AsyncSession) -> int:
+        """
+        Один прогон: удалять пачки, пока политики нарушены.
+
+        Args:
+            session: Сессия БД; commit после каждой пачки
+
+        Returns:
+            Количество удалённых записей
+        """
+        started = time.perf_counter()
+        repository = PromptHistoryRepository(session)
+        older_than = (
+            datetime.utcnow() - timedelta(days=HISTORY_RETENTION_MAX_AGE_DAYS)
+            if HISTORY_RETENTION_MAX_AGE_DAYS > 0
+            else None
+        )
+        # Граница считается один раз: строки, вставленные во время прогона,
+        # новее неё и не удаляются
+        boundary = (
+            await repository.get_retention_boundary(HISTORY_RETENTION_MAX_ROWS)
+            if HISTORY_RETENTION_MAX_ROWS > 0
+            else None
+        )
+
+        purged = 0
+        batches = 0
+        created: list[str] = []
+        dropped: list[str] = []
+        if await partitions.is_partitioned(session):
+            if HISTORY_PARTITION_PREMAKE_DAYS > 0:
+                created = await partitions.ensure_partitions(
+                    session,
+                    datetime.now(timezone.utc).date(),
+                    HISTORY_PARTITION_PREMAKE_DAYS + 1,
+                )
+                await session.commit()
+            # Партиция целиком старше границы любой политики — удаляем таблицей
+            # (commit после каждой партиции — внутри drop_partitions_before)
+            cutoff = partitions.latest_cutoff(older_than, boundary[0] if boundary else None)
+            if cutoff is not None:
+                dropped, purged = await partitions.drop_partitions_before(
+                    session, cutoff, lock_timeout_ms=HISTORY_PARTITION_LOCK_TIMEOUT_MS
+                )
+
+        if older_than is not None or boundary is not None:
+            while True:
+                deleted = await repository.purge_batch(
+                    HISTORY_RETENTION_BATCH_SIZE, older_than=older_than, boundary=boundary
+                )
+                await session.commit()
+                if deleted == 0:
+                    break
+                purged += deleted
+                batches += 1
+                if deleted < HISTORY_RETENTION_BATCH_SIZE:
+                    break
+                await asyncio.sleep(0)  # не монополизировать event loop
+
+        rollup_pruned = await ModelHourlyStatsRepository(session).prune_expired()
+        rollup_pruned += await CallerHourlyStatsRepository(session).prune_expired()
+        rollup_pruned += await ModelLatencySketchRepository(session).prune_expired()
+        rollup_pruned += await HistorySeriesStatsRepository(session).prune_expired()
+        await session.commit()
+        if purged or rollup_pruned:
+            ModelsCache.invalidate()
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        cls._runs += 1
+        cls._total_purged += purged
+        cls._last_purged = purged
+        cls._last_batches = batches
+        cls._last_partitions_created = len(created)
+        cls._last_partitions_dropped = len(dropped)
+        cls._last_rollup_pruned = rollup_pruned
+        cls._last_duration_ms = elapsed_ms
+        cls._last_run_at = datetime.utcnow()
+        cls._last_error = None
+        logger.info(
+            "history_retention_run",
+            purged=purged,
+            batches=batches,
+            partitions_created=len(created),
+            partitions_dropped=len(dropped),
+            rollup_pruned=rollup_pruned,
+            duration_ms=round(elapsed_ms, 2),
+        )
+        return purged
+
+    @classmethod
+    def metrics(cls) -> dict[str, Any]:
+        """Метрики: удалено строк, длительность последнего прогона, ошибки."""
+        return {
+            "enabled": cls.is_enabled(),
+            "running": cls._task is not None and not cls._task.done(),
+            "max_rows": HISTORY_RETENTION_MAX_ROWS,
+            "max_age_days": HISTORY_RETENTION_MAX_AGE_DAYS,
+            "interval_seconds": HISTORY_RETENTION_INTERVAL_SECONDS,
+            "batch_size": HISTORY_RETENTION_BATCH_SIZE,
+            "runs": cls._runs,
+            "failed_runs": cls._failed_runs,
+            "total_purged": cls._total_purged,
+            "last_purged": cls._last_purged,
+            "last_batches": cls._last_batches,
+            "last_partitions_created": cls._last_partitions_created,
+            "last_partitions_dropped": cls._last_partitions_dropped,
+            "last_rollup_pruned": cls._last_rollup_pruned,
+            "last_duration_ms": round(cls._last_duration_ms, 3),
+            "last_run_at": cls._last_run_at.isoformat() if cls._last_run_at else None,
+            "last_error": cls._last_error,
+        }
+
+    @classmethod
+    def reset(cls) -> None:
+        """Сбросить состояние и метрики (для тестов)."""
+        task = cls._task
+        if task is not None and not task.done() and not task.get_loop().is_closed():
+            task.cancel()
+        cls._task = None
+        cls._runs = 0
+        cls._failed_runs = 0
+        cls._total_purged = 0
+        cls._last_purged = 0
+        cls._last_batches = 0
+        cls._last_partitions_created = 0
+        cls._last_partitions_dropped = 0
+        cls._last_rollup_pruned = 0
+        cls._last_duration_ms = 0.0
+        cls._last_run_at = None
+        cls._last_error = None
+
+    @classmethod
+    async def _run_forever(cls) -> None:
+        """Прогон раз в HISTORY_RETENTION_INTERVAL_SECONDS; ошибка не останавливает цикл."""
+        while True:
+            try:
+                async with AsyncSessionLocal() as session:
+                    await cls.run_once(session)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                cls._failed_runs += 1
+                cls._last_error = sanitize_error_message(e)
+                logger.error("history_retention_failed", error=cls._last_error)
+            await asyncio.sleep(HISTORY_RETENTION_INTERVAL_SECONDS)
@@ -28,9 +28,11 @@ from app.utils.security import sanitize_error_message
 from fastapi.responses import JSONResponse
 from sqlalchemy import text
 
-from app.api.v1 import history, models
+from app.api.v1 import history, models, outcomes
 from app.api.v1.schemas import HealthCheckResponse
 from app.infrastructure.database.connection import AsyncSessionLocal, engine
+from app.infrastructure.models_cache import ModelsCache
+from app.infrastructure.retention import HistoryRetention
 
 # =============================================================================
 # Configuration
@@ -71,8 +73,10 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
     Startup:
         - Log service initialization
         - Verify database connection
+        - Start history retention task (user-012)
 
     Shutdown:
+        - Stop history retention task
         - Close database connections
         - Log service shutdown
     """
@@ -95,10 +99,14 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
         )
         raise
 
+    # user-012: старые записи истории удаляет фоновая задача, а не INSERT
+    HistoryRetention.start()
+
     yield
 
     # Shutdown
     logger.info("service_stopping")
+    await HistoryRetention.shutdown()
     await engine.dispose()
 
 
@@ -252,6 +260,21 @@ async def health_check() -> HealthCheckResponse:
     )
 
 
+@app.get("/metrics", tags=["Health"], summary="Background task metrics")
+async def metrics() -> dict:
+    """
+    Метрики фоновых задач сервиса.
+
+    Returns:
+        history_retention: удалено строк, длительность и время прогонов (user-012)
+        models_cache: попадания, промахи и инвалидации кеша GET /models (user-015)
+    """
+    return {
+        "history_retention": HistoryRetention.metrics(),
+        "models_cache": ModelsCache.metrics(),
+    }
+
+
 # =============================================================================
 # API Routes
 # =============================================================================
@@ -259,6 +282,7 @@ async def health_check() -> HealthCheckResponse:
 # Include v1 API routes
 app.include_router(models.router, prefix="/api/v1")
 app.include_router(history.router, prefix="/api/v1")
+app.include_router(outcomes.router, prefix="/api/v1")
 
 
 # =============================================================================
@@ -0,0 +1,57 @@
+"""
+Opaque keyset cursors for the prompt history journal (user-018).
+
+Журнал сортируется по (created_at DESC, id DESC). Курсор — позиция последней
+записи страницы; следующая страница — строки строго «после» неё:
+(created_at, id) < (cursor.created_at, cursor.id). В отличие от OFFSET,
+стоимость страницы не зависит от её номера, а новые записи не сдвигают
+уже выданные страницы.
+
+Формат — base64url от "<created_at ISO 8601>|<id>" без паддинга. Клиенты
+не должны разбирать курсор: они передают обратно значение X-Next-Cursor.
+"""
+
+import base64
+import binascii
+from datetime import datetime
+from typing import Tuple
+
+# (created_at, id) последней записи страницы
+HistoryCursor = Tuple[datetime, int]
+
+
+def encode_cursor(created_at: datetime, history_id: int) -> str:
+    """
+    Encode a journal position into an opaque cursor.
+
+    Args:
+        created_at: created_at of the last record on the page
+        history_id: ID of the last record on the page
+
+    Returns:
+        URL-safe cursor string
+    """
+    raw = f"{created_at.isoformat()}|{history_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> HistoryCursor:
+    """
+    Decode a cursor produced by encode_cursor().
+
+    Args:
+        cursor: Opaque cursor string
+
+    Returns:
+        (created_at, id) of the last record on the previous page
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        created_at, history_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(history_id)
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
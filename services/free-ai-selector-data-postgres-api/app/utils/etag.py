@@ -0,0 +1,108 @@
+"""
+Strong ETag helpers for conditional GET (user-016).
+
+Business API revalidates GET /models and /history/statistics/* with
+If-None-Match; an unchanged representation costs a 304 without a body.
+
+ETag строится из версии каталога (ModelsCache.version(): растёт на каждой
+записи в ai_models / prompt_history) и BOOT_ID процесса — после рестарта
+счётчик начинается с нуля, и старые ETag не должны совпасть с новыми.
+ETag известен до чтения из БД, поэтому 304 обходится без запроса и без
+сериализации — и для статистики, и для списка моделей.
+"""
+
+import hashlib
+import os
+import time
+import uuid
+from typing import Any, Mapping, Optional
+
+from fastapi import Response, status
+
+# Уникален на процесс: ETag прошлого запуска никогда не совпадёт
+BOOT_ID = uuid.uuid4().hex[:12]
+
+# Окно, в пределах которого ответ, зависящий от now() (скользящее окно
+# статистики, decay-веса и cooldown в списке моделей), считается неизменным
+# при неизменной версии
+STATISTICS_ETAG_WINDOW_SECONDS = float(os.getenv("STATISTICS_ETAG_WINDOW_SECONDS", "60"))
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Build a strong ETag from the boot ID and the given parts.
+
+    Args:
+        parts: Values identifying the representation (kind, version, ...)
+
+    Returns:
+        Quoted entity tag, e.g. '"3f2a...-models-12-4"'
+    """
+    return '"' + "-".join(str(part) for part in (BOOT_ID, *parts)) + '"'
+
+
+def statistics_etag(version: int, params: Mapping[str, Any]) -> str:
+    """
+    ETag of a /history/statistics/* response.
+
+    Args:
+        version: Catalog version before the query
+        params: Query parameters that select the representation
+
+    Returns:
+        Strong ETag, stable for STATISTICS_ETAG_WINDOW_SECONDS while no writes happen.
+        Responses over a sliding window (now() - window) can change without
+        writes as rows age out; such a change shows up in the ETag only at
+        the next STATISTICS_ETAG_WINDOW_SECONDS boundary, so a 304 may
+        confirm a copy that is up to that long stale
+    """
+    return _versioned_etag("stats", version, params)
+
+
+def models_etag(version: int, params: Mapping[str, Any]) -> str:
+    """
+    ETag of a GET /models listing.
+
+    Args:
+        version: Catalog version before the query
+        params: Query parameters that select the listing
+
+    Returns:
+        Strong ETag with the same staleness bound as statistics_etag: decay
+        weights of include_recent and models leaving cooldown (available_at)
+        change the listing without writes
+    """
+    return _versioned_etag("models", version, params)
+
+
+def _versioned_etag(kind: str, version: int, params: Mapping[str, Any]) -> str:
+    material = "&".join(f"{key}={params[key]}" for key in sorted(params))
+    digest = hashlib.sha256(material.encode("utf-8")).hexdigest()[:16]
+    window = int(time.time() // STATISTICS_ETAG_WINDOW_SECONDS)
+    return make_etag(kind, version, window, digest)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    If-None-Match check (RFC 9110: weak comparison, "*" matches anything).
+
+    Args:
+        if_none_match: Raw If-None-Match header value
+        etag: Current entity tag
+
+    Returns:
+        True if the client's copy is current
+    """
+    if not if_none_match:
+        return False
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    """304 Not Modified without a body."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
@@ -0,0 +1,63 @@
+"""
+Look-back window and quantile strings for statistics endpoints (user-024).
+
+Окно задаётся числом и единицей: "90m", "24h", "7d"; квантили — списком
+через запятую: "0.5,0.9,0.99". Разбор строгий — вызывающий получает
+ValueError и отвечает 400.
+"""
+
+import re
+from datetime import timedelta
+from typing import List
+
+_WINDOW_PATTERN = re.compile(r"^(\d+)([mhd])$")
+_WINDOW_UNITS = {"m": "minutes", "h": "hours", "d": "days"}
+
+# Rollup-бакеты живут, пока есть история за их час; год — с запасом
+MAX_WINDOW = timedelta(days=365)
+
+# Квантилей в одном запросе
+MAX_QUANTILES = 20
+
+
+def parse_window(window: str) -> timedelta:
+    """
+    Parse a window like "90m", "24h" or "7d".
+
+    Args:
+        window: Positive integer followed by m (minutes), h (hours) or d (days)
+
+    Returns:
+        Window as timedelta
+
+    Raises:
+        ValueError: If the format is wrong or the window is empty / over a year
+    """
+    match = _WINDOW_PATTERN.match(window.strip())
+    if match is None:
+        raise ValueError(f"Invalid window: {window!r} (expected e.g. 90m, 24h, 7d)")
+    value = timedelta(**{_WINDOW_UNITS[match.group(2)]: int(match.group(1))})
+    if not timedelta(0) < value <= MAX_WINDOW:
+        raise ValueError(f"Window must be between 1m and 365d: {window!r}")
+    return value
+
+
+def parse_quantiles(quantiles: str) -> List[float]:
+    """
+    Parse a comma-separated quantile list like "0.5,0.9,0.99".
+
+    Args:
+        quantiles: 1..MAX_QUANTILES numbers in [0, 1]
+
+    Returns:
+        Quantiles in input order
+
+    Raises:
+        ValueError: If a value is not a number in [0, 1] or the count is wrong
+    """
+    values = [float(token) for token in quantiles.split(",") if token.strip()]
+    if not 0 < len(values) <= MAX_QUANTILES:
+        raise ValueError(f"q must list 1-{MAX_QUANTILES} quantiles")
+    if any(not 0.0 <= value <= 1.0 for value in values):
+        raise ValueError("Quantiles must be in [0, 1]")
+    return values
@@ -8,14 +8,28 @@ Pytest configuration and fixtures for Data API tests.
 """
 
 import os
-from typing import AsyncGenerator
+import random
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import (
+    Any,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+)
 
 import pytest
-from sqlalchemy import text
+from sqlalchemy import insert, text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.pool import NullPool
 
-from app.infrastructure.database.models import Base
+from app.infrastructure.database.models import Base, PromptHistoryORM
+from app.infrastructure.models_cache import ModelsCache
+from app.infrastructure.repositories.prompt_history_repository import PromptHistoryRepository
 
 # Реальный PostgreSQL из Docker-контейнера
 TEST_DATABASE_URL = os.getenv(
@@ -24,6 +38,14 @@ TEST_DATABASE_URL = os.getenv(
 )
 
 
+@pytest.fixture(autouse=True)
+def reset_models_cache():
+    """user-015: кеш GET /models живёт в процессе, а данные откатываются после теста."""
+    ModelsCache.reset()
+    yield
+    ModelsCache.reset()
+
+
 @pytest.fixture(scope="function")
 async def test_db() -> AsyncGenerator[AsyncSession, None]:
     """
@@ -49,6 +71,10 @@ async def test_db() -> AsyncGenerator[AsyncSession, None]:
         # Очистить таблицы внутри транзакции — тест видит пустую БД.
         # ROLLBACK после теста восстановит все данные.
         await session.execute(text("DELETE FROM prompt_history"))
+        await session.execute(text("DELETE FROM model_hourly_stats"))
+        await session.execute(text("DELETE FROM caller_hourly_stats"))
+        await session.execute(text("DELETE FROM model_latency_sketches"))
+        await session.execute(text("DELETE FROM history_series_stats"))
         await session.execute(text("DELETE FROM ai_models"))
         await session.flush()
 
@@ -59,3 +85,95 @@ async def test_db() -> AsyncGenerator[AsyncSession, None]:
             await conn.rollback()
 
     await engine.dispose()
+
+
+# =============================================================================
+# История для rollup-тестов (user-014 / user-023 / user-024 / user-025)
+# =============================================================================
+
+
+@pytest.fixture
+def history_row() -> Callable[..., Dict[str, Any]]:
+    """Фабрика строки prompt_history для insert() с явным created_at."""
+
+    def build(created_at: datetime, model_id: int = 1, **overrides: Any) -> Dict[str, Any]:
+        row: Dict[str, Any] = {
+            "user_id": "u",
+            "prompt_text": "p",
+            "selected_model_id": model_id,
+            "response_text": "r",
+            "response_time": Decimal("1.000"),
+            "success": True,
+            "error_message": None,
+            "caller": None,
+            "http_status": 200,
+            "requested_model": None,
+            "cache_hit": False,
+            "created_at": created_at,
+        }
+        row.update(overrides)
+        return row
+
+    return build
+
+
+@pytest.fixture
+def random_history(
+    history_row: Callable[..., Dict[str, Any]],
+) -> Callable[..., List[Dict[str, Any]]]:
+    """
+    Фабрика случайной истории за последние days суток.
+
+    Все классы исходов (успех, 5xx, 429, неизвестный статус), проекты,
+    закреплённые модели, cache hits и длинный хвост латентности (в основном
+    сотни мс, изредка десятки секунд).
+    """
+
+    def build(
+        count: int,
+        days: float = 8,
+        seed: int = 0,
+        models: int = 3,
+        callers: Sequence[Optional[str]] = ("alpha", "beta", None),
+    ) -> List[Dict[str, Any]]:
+        rng = random.Random(seed)
+        now = datetime.now(timezone.utc)
+        rows = []
+        for _ in range(count):
+            outcome = rng.choice(["ok", "ok", "ok", "500", "429", "null"])
+            rows.append(
+                history_row(
+                    now - timedelta(seconds=rng.uniform(0, days * 86400)),
+                    model_id=rng.randint(1, models),
+                    response_time=Decimal(int(rng.lognormvariate(7, 1.2)) + 1) / 1000,
+                    success=outcome == "ok",
+                    http_status={"ok": 200, "500": 500, "429": 429, "null": None}[outcome],
+                    caller=rng.choice(callers),
+                    requested_model=rng.choice([None, None, "m"]),
+                    cache_hit=rng.random() < 0.05,
+                )
+            )
+        return rows
+
+    return build
+
+
+@pytest.fixture
+def insert_history(test_db: AsyncSession) -> Callable[[List[Dict[str, Any]]], Awaitable[List[int]]]:
+    """INSERT с явным created_at + все rollup'ы, как в create_many."""
+
+    async def insert_rows(rows: List[Dict[str, Any]]) -> List[int]:
+        result = await test_db.execute(
+            insert(PromptHistoryORM)
+            .values(rows)
+            .returning(PromptHistoryORM.id, PromptHistoryORM.created_at)
+        )
+        inserted = result.all()
+        await PromptHistoryRepository(test_db).apply_rollups(
+            [row.id for row in inserted],
+            min(row.created_at for row in inserted),
+            max(row.created_at for row in inserted),
+        )
+        return [row.id for row in inserted]
+
+    return insert_rows
@@ -1,9 +1,14 @@
 """Тесты для app/api/v1/history.py — вызов endpoint-функций напрямую."""
+import csv
+import io
+import json
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 from decimal import Decimal
 
 import pytest
-from fastapi import HTTPException
+from fastapi import HTTPException, Response
+from httpx import ASGITransport, AsyncClient
 
 from app.api.v1.history import (
     create_history,
@@ -12,10 +17,13 @@ from app.api.v1.history import (
     get_model_history,
     get_period_statistics,
     get_recent_history,
+    get_timeseries_statistics,
     get_user_history,
 )
 from app.api.v1.schemas import PromptHistoryCreate
+from app.infrastructure.database.connection import get_db, get_session_factory
 from app.infrastructure.database.models import AIModelORM
+from app.main import app
 
 
 @pytest.fixture
@@ -44,6 +52,7 @@ def _make_history_data(
     caller=None,
     http_status=None,
     requested_model=None,
+    cache_hit=False,
 ) -> PromptHistoryCreate:
     return PromptHistoryCreate(
         user_id=user_id,
@@ -55,6 +64,7 @@ def _make_history_data(
         caller=caller,
         http_status=http_status,
         requested_model=requested_model,
+        cache_hit=cache_hit,
     )
 
 
@@ -66,6 +76,11 @@ class TestCreateHistory:
         assert result.success is True
         assert result.id is not None
 
+    async def test_cache_hit_round_trip(self, test_db, sample_model):
+        data = _make_history_data(sample_model.id, cache_hit=True)
+        result = await create_history(data, test_db)
+        assert result.cache_hit is True
+
     async def test_returns_generated_id(self, test_db, sample_model):
         data = _make_history_data(sample_model.id)
         result = await create_history(data, test_db)
@@ -93,31 +108,39 @@ class TestGetUserHistory:
             await create_history(
                 _make_history_data(sample_model.id, user_id="user-42"), test_db
             )
-        result = await get_user_history("user-42", limit=100, offset=0, db=test_db)
+        result = await get_user_history(
+            "user-42", limit=100, offset=0, response=Response(), db=test_db
+        )
         assert len(result) == 3
         assert all(r.user_id == "user-42" for r in result)
 
     async def test_empty_for_unknown_user(self, test_db):
-        result = await get_user_history("nobody", limit=100, offset=0, db=test_db)
+        result = await get_user_history(
+            "nobody", limit=100, offset=0, response=Response(), db=test_db
+        )
         assert result == []
 
 
 class TestGetModelHistory:
     async def test_returns_model_records(self, test_db, sample_model):
         await create_history(_make_history_data(sample_model.id), test_db)
-        result = await get_model_history(sample_model.id, limit=100, offset=0, db=test_db)
+        result = await get_model_history(
+            sample_model.id, limit=100, offset=0, response=Response(), db=test_db
+        )
         assert len(result) >= 1
         assert all(r.selected_model_id == sample_model.id for r in result)
 
     async def test_empty_for_unknown_model(self, test_db):
-        result = await get_model_history(99999, limit=100, offset=0, db=test_db)
+        result = await get_model_history(
+            99999, limit=100, offset=0, response=Response(), db=test_db
+        )
         assert result == []
 
 
 class TestGetRecentHistory:
     async def test_returns_recent(self, test_db, sample_model):
         await create_history(_make_history_data(sample_model.id), test_db)
-        result = await get_recent_history(limit=10, db=test_db)
+        result = await get_recent_history(limit=10, response=Response(), db=test_db)
         assert len(result) >= 1
 
     async def test_success_only_filter(self, test_db, sample_model):
@@ -128,7 +151,7 @@ class TestGetRecentHistory:
             _make_history_data(sample_model.id, success=False), test_db
         )
         result = await get_recent_history(
-            limit=100, success_only=True, db=test_db
+            limit=100, success_only=True, response=Response(), db=test_db
         )
         assert all(r.success for r in result)
 
@@ -141,6 +164,7 @@ class TestGetPeriodStatistics:
             start_date=now - timedelta(hours=1),
             end_date=now + timedelta(hours=1),
             model_id=None,
+            response=Response(),
             db=test_db,
         )
         assert result.total_requests >= 1
@@ -152,6 +176,7 @@ class TestGetPeriodStatistics:
             start_date=far_future,
             end_date=far_future + timedelta(hours=1),
             model_id=None,
+            response=Response(),
             db=test_db,
         )
         assert result.total_requests == 0
@@ -187,7 +212,7 @@ class TestGetCallerStatistics:
     """GET /history/statistics/by-caller endpoint (oxl)."""
 
     async def test_empty_returns_empty_list(self, test_db):
-        result = await get_caller_statistics(window_days=7, db=test_db)
+        result = await get_caller_statistics(window_days=7, response=Response(), db=test_db)
         assert result == []
 
     async def test_aggregates_per_caller(self, test_db, sample_model):
@@ -199,7 +224,7 @@ class TestGetCallerStatistics:
             _make_history_data(sample_model.id, caller="B", success=True), test_db
         )
 
-        result = await get_caller_statistics(window_days=7, db=test_db)
+        result = await get_caller_statistics(window_days=7, response=Response(), db=test_db)
         by_caller = {row.caller: row for row in result}
 
         assert by_caller["A"].request_count == 3
@@ -208,6 +233,151 @@ class TestGetCallerStatistics:
         assert by_caller["B"].request_count == 1
         assert by_caller["B"].success_rate == 1.0
 
+    async def test_fractional_window(self, test_db, sample_model):
+        """user-023: окно может быть короче часа."""
+        await create_history(_make_history_data(sample_model.id, caller="A"), test_db)
+
+        result = await get_caller_statistics(window_days=0.01, response=Response(), db=test_db)
+
+        assert [(row.caller, row.request_count) for row in result] == [("A", 1)]
+
+    async def test_if_none_match_skips_query_until_write(self, test_db, sample_model):
+        """user-016: 304 без запроса в БД, новая запись истории меняет ETag."""
+        response = Response()
+        await get_caller_statistics(window_days=7, response=response, db=test_db)
+        etag = response.headers["etag"]
+
+        not_modified = await get_caller_statistics(
+            window_days=7,
+            if_none_match=etag,
+            response=Response(),
+            db=None,  # type: ignore[arg-type]
+        )
+        assert not_modified.status_code == 304
+
+        await create_history(_make_history_data(sample_model.id, caller="A"), test_db)
+        result = await get_caller_statistics(
+            window_days=7, if_none_match=etag, response=Response(), db=test_db
+        )
+        assert [row.caller for row in result] == ["A"]
+
+
+class TestGetTimeseriesStatistics:
+    """GET /history/statistics/timeseries endpoint (user-025)."""
+
+    async def test_empty_returns_no_series(self, test_db):
+        result = await get_timeseries_statistics(response=Response(), db=test_db)
+
+        assert (result.granularity, result.group_by, result.window) == ("hour", "model", "24h")
+        assert result.series == []
+
+    async def test_series_per_caller(self, test_db, sample_model):
+        await create_history(_make_history_data(sample_model.id, caller="A"), test_db)
+        await create_history(
+            _make_history_data(sample_model.id, caller="A", success=False, http_status=429),
+            test_db,
+        )
+        await create_history(
+            _make_history_data(sample_model.id, caller="B", success=False, http_status=500),
+            test_db,
+        )
+
+        result = await get_timeseries_statistics(
+            granularity="minute",
+            group_by="caller",
+            window="30m",
+            q="0.5,1",
+            response=Response(),
+            db=test_db,
+        )
+
+        assert [(s.caller, s.model_id, s.request_count) for s in result.series] == [
+            ("A", None, 2),
+            ("B", None, 1),
+        ]
+        point = result.series[0].points[-1]
+        assert (point.success_count, point.hard_fail_count, point.rate_limited_count) == (1, 0, 1)
+        assert point.latency_quantiles == {
+            "0.5": pytest.approx(1.5, rel=0.01),
+            "1": pytest.approx(1.5, rel=0.01),
+        }
+
+    async def test_single_model_series(self, test_db, sample_model):
+        await create_history(_make_history_data(sample_model.id), test_db)
+
+        result = await get_timeseries_statistics(
+            granularity="day",
+            window="7d",
+            model_id=sample_model.id,
+            response=Response(),
+            db=test_db,
+        )
+
+        assert [s.model_id for s in result.series] == [sample_model.id]
+        assert result.series[0].points[0].request_count == 1
+
+    @pytest.mark.parametrize(
+        "params",
+        [
+            {"window": "2d", "granularity": "minute"},
+            {"window": "90d", "granularity": "hour"},
+            {"window": "1w"},
+            {"q": "1.5"},
+            {"group_by": "caller", "model_id": 1},
+            {"caller": "A"},
+        ],
+    )
+    async def test_invalid_params_return_400(self, test_db, params):
+        with pytest.raises(HTTPException) as exc_info:
+            await get_timeseries_statistics(response=Response(), db=test_db, **params)
+
+        assert exc_info.value.status_code == 400
+
+    async def test_if_none_match_skips_query_until_write(self, test_db, sample_model):
+        """user-016: 304 без запроса в БД, новая запись истории меняет ETag."""
+        response = Response()
+        await get_timeseries_statistics(response=response, db=test_db)
+        etag = response.headers["etag"]
+
+        not_modified = await get_timeseries_statistics(
+            if_none_match=etag,
+            response=Response(),
+            db=None,  # type: ignore[arg-type]
+        )
+        assert not_modified.status_code == 304
+
+        await create_history(_make_history_data(sample_model.id), test_db)
+        result = await get_timeseries_statistics(
+            if_none_match=etag, response=Response(), db=test_db
+        )
+        assert [s.model_id for s in result.series] == [sample_model.id]
+
+    @pytest.fixture
+    async def client(self, test_db):
+        async def override_get_db():
+            yield test_db
+
+        app.dependency_overrides[get_db] = override_get_db
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            yield ac
+        app.dependency_overrides.clear()
+
+    async def test_over_http(self, client, test_db, sample_model):
+        await create_history(_make_history_data(sample_model.id, caller="A"), test_db)
+
+        ok = await client.get(
+            "/api/v1/history/statistics/timeseries",
+            params={"granularity": "hour", "group_by": "caller", "window": "6h"},
+        )
+        bad = await client.get(
+            "/api/v1/history/statistics/timeseries", params={"granularity": "week"}
+        )
+
+        assert ok.status_code == 200
+        assert ok.json()["series"][0]["caller"] == "A"
+        assert "etag" in ok.headers
+        assert bad.status_code == 422
+
 
 class TestJournalFilters:
     """GET /history extended with journal filters (oxl)."""
@@ -216,7 +386,7 @@ class TestJournalFilters:
         await create_history(_make_history_data(sample_model.id, caller="A"), test_db)
         await create_history(_make_history_data(sample_model.id, caller="B"), test_db)
 
-        result = await get_recent_history(caller="A", db=test_db)
+        result = await get_recent_history(caller="A", response=Response(), db=test_db)
         assert len(result) == 1
         assert result[0].caller == "A"
 
@@ -228,17 +398,233 @@ class TestJournalFilters:
             _make_history_data(sample_model.id, caller="A", success=False), test_db
         )
 
-        failed = await get_recent_history(success=False, db=test_db)
+        failed = await get_recent_history(success=False, response=Response(), db=test_db)
         assert all(r.success is False for r in failed)
         assert len(failed) == 1
 
     async def test_backward_compatible_no_filters(self, test_db, sample_model):
         await create_history(_make_history_data(sample_model.id), test_db)
-        result = await get_recent_history(limit=10, db=test_db)
+        result = await get_recent_history(limit=10, response=Response(), db=test_db)
         assert len(result) >= 1
 
     async def test_offset_triggers_filtered_path(self, test_db, sample_model):
         for _ in range(3):
             await create_history(_make_history_data(sample_model.id, caller="A"), test_db)
-        page = await get_recent_history(limit=2, offset=1, db=test_db)
+        page = await get_recent_history(limit=2, offset=1, response=Response(), db=test_db)
         assert len(page) == 2
+
+
+class TestJournalCursor:
+    """Keyset pagination over the journal routes (user-018)."""
+
+    async def test_next_cursor_header_walks_all_pages(self, test_db, sample_model):
+        for _ in range(5):
+            await create_history(_make_history_data(sample_model.id, caller="A"), test_db)
+
+        seen, cursor = [], None
+        while True:
+            response = Response()
+            page = await get_recent_history(
+                limit=2, caller="A", cursor=cursor, response=response, db=test_db
+            )
+            seen.extend(r.id for r in page)
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+
+        assert len(seen) == 5
+        assert seen == sorted(seen, reverse=True)
+
+    async def test_user_and_model_routes_return_cursor(self, test_db, sample_model):
+        for _ in range(3):
+            await create_history(
+                _make_history_data(sample_model.id, user_id="user-42"), test_db
+            )
+
+        response = Response()
+        first = await get_user_history(
+            "user-42", limit=2, offset=0, response=response, db=test_db
+        )
+        rest = await get_user_history(
+            "user-42",
+            limit=2,
+            offset=0,
+            cursor=response.headers["X-Next-Cursor"],
+            response=Response(),
+            db=test_db,
+        )
+        model_response = Response()
+        by_model = await get_model_history(
+            sample_model.id, limit=3, offset=0, response=model_response, db=test_db
+        )
+
+        assert len(first) == 2 and len(rest) == 1
+        assert rest[0].id < first[-1].id
+        assert len(by_model) == 3
+        assert "X-Next-Cursor" not in model_response.headers
+
+    async def test_malformed_cursor_is_400(self, test_db):
+        with pytest.raises(HTTPException) as exc_info:
+            await get_recent_history(cursor="garbage", response=Response(), db=test_db)
+        assert exc_info.value.status_code == 400
+
+
+class TestJournalSummaryView:
+    """view=summary: метаданные и превью без полных текстов (user-020)."""
+
+    @pytest.fixture
+    async def client(self, test_db):
+        async def override_get_db():
+            yield test_db
+
+        app.dependency_overrides[get_db] = override_get_db
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            yield ac
+        app.dependency_overrides.clear()
+
+    @staticmethod
+    async def _create_long(test_db, model_id: int, caller: str = "A") -> None:
+        data = _make_history_data(model_id, user_id="user-7", caller=caller)
+        data.prompt_text = "p" * 5000
+        data.response_text = "r" * 5000
+        await create_history(data, test_db)
+
+    async def test_summary_rows_carry_previews_only(self, client, test_db, sample_model):
+        for _ in range(3):
+            await self._create_long(test_db, sample_model.id)
+
+        response = await client.get(
+            "/api/v1/history",
+            params={"view": "summary", "preview_chars": 10, "caller": "A", "limit": 2},
+        )
+
+        assert response.status_code == 200
+        rows = response.json()
+        assert len(rows) == 2
+        assert rows[0]["prompt_preview"] == "p" * 10
+        assert rows[0]["response_preview"] == "r" * 10
+        assert "prompt_text" not in rows[0] and "error_message" not in rows[0]
+        assert "X-Next-Cursor" in response.headers
+
+    async def test_full_view_is_default(self, client, test_db, sample_model):
+        await self._create_long(test_db, sample_model.id)
+
+        response = await client.get("/api/v1/history", params={"limit": 1})
+
+        assert response.json()[0]["prompt_text"] == "p" * 5000
+
+    async def test_user_and_model_routes_support_summary(self, test_db, sample_model):
+        await self._create_long(test_db, sample_model.id)
+
+        by_user = await get_user_history(
+            "user-7",
+            limit=10,
+            offset=0,
+            view="summary",
+            preview_chars=3,
+            response=Response(),
+            db=test_db,
+        )
+        by_model = await get_model_history(
+            sample_model.id, limit=10, offset=0, view="summary", response=Response(), db=test_db
+        )
+
+        assert by_user[0].prompt_preview == "ppp"
+        assert len(by_model[0].prompt_preview) == 200
+
+
+class TestJournalSearch:
+    """GET /history?q= (user-021)."""
+
+    async def test_q_filters_by_prompt_substring(self, test_db, sample_model):
+        data = _make_history_data(sample_model.id, caller="A")
+        data.prompt_text = "needle in a haystack"
+        await create_history(data, test_db)
+        await create_history(_make_history_data(sample_model.id, caller="A"), test_db)
+
+        result = await get_recent_history(q="NEEDLE", response=Response(), db=test_db)
+
+        assert [r.prompt_text for r in result] == ["needle in a haystack"]
+
+    async def test_short_query_is_rejected_over_http(self, test_db):
+        async def override_get_db():
+            yield test_db
+
+        app.dependency_overrides[get_db] = override_get_db
+        try:
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                response = await client.get("/api/v1/history", params={"q": "ab"})
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 422
+
+
+class TestHistoryExport:
+    """GET /history/export — потоковая выгрузка журнала (user-022)."""
+
+    @staticmethod
+    async def _export(test_db, params):
+        @asynccontextmanager
+        async def session_factory():
+            yield test_db
+
+        async def override_get_db():
+            yield test_db
+
+        app.dependency_overrides[get_session_factory] = lambda: session_factory
+        app.dependency_overrides[get_db] = override_get_db
+        try:
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                return await client.get("/api/v1/history/export", params=params)
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_ndjson_streams_all_matching_records(
+        self, test_db, sample_model, monkeypatch
+    ):
+        monkeypatch.setattr("app.api.v1.history.HISTORY_EXPORT_BATCH_SIZE", 2)
+        for _ in range(5):
+            await create_history(_make_history_data(sample_model.id, caller="A"), test_db)
+        await create_history(_make_history_data(sample_model.id, caller="B"), test_db)
+
+        response = await self._export(test_db, {"caller": "A"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert len(records) == 5
+        assert {r["caller"] for r in records} == {"A"}
+        assert records[0]["prompt_text"] == "Hello AI"
+        ids = [r["id"] for r in records]
+        assert ids == sorted(ids, reverse=True)
+
+    async def test_csv_has_header_and_quotes_texts(self, test_db, sample_model):
+        data = _make_history_data(sample_model.id, success=False)
+        data.error_message = 'upstream said "no",\nretry later'
+        await create_history(data, test_db)
+
+        response = await self._export(test_db, {"format": "csv", "success": "false"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert 'filename="prompt_history.csv"' in response.headers["content-disposition"]
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 1
+        assert rows[0]["error_message"] == 'upstream said "no",\nretry later'
+        assert rows[0]["selected_model_id"] == str(sample_model.id)
+
+    async def test_empty_export(self, test_db):
+        response = await self._export(test_db, {})
+
+        assert response.status_code == 200
+        assert response.text == ""
+
+    async def test_unknown_format_is_422(self, test_db):
+        response = await self._export(test_db, {"format": "xml"})
+
+        assert response.status_code == 422
@@ -0,0 +1,152 @@
+"""Integration tests for POST /api/v1/history/bulk (user-011)."""
+
+import json
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import func, select
+
+from app.api.v1 import history as history_module
+from app.infrastructure.database.connection import get_db
+from app.infrastructure.database.models import AIModelORM, PromptHistoryORM
+from app.main import app
+
+
+@pytest.fixture
+async def client(test_db):
+    """Test client with get_db override."""
+
+    async def override_get_db():
+        yield test_db
+
+    app.dependency_overrides[get_db] = override_get_db
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+async def model(test_db) -> AIModelORM:
+    orm_model = AIModelORM(
+        name="Bulk Model",
+        provider="TestProvider",
+        api_endpoint="https://test.api/v1",
+        success_count=0,
+        failure_count=0,
+        total_response_time=Decimal("0"),
+        request_count=0,
+        is_active=True,
+        api_format="openai",
+    )
+    test_db.add(orm_model)
+    await test_db.flush()
+    return orm_model
+
+
+def _record(model_id: int, n: int, **overrides) -> dict:
+    record = {
+        "user_id": "health_worker",
+        "prompt_text": f"ping {n}",
+        "selected_model_id": model_id,
+        "response_text": "pong",
+        "response_time": "0.250",
+        "success": True,
+        "caller": "health-worker",
+        "http_status": 200,
+    }
+    record.update(overrides)
+    return record
+
+
+async def _count(test_db) -> int:
+    return (await test_db.execute(select(func.count(PromptHistoryORM.id)))).scalar_one()
+
+
+class TestHistoryBulk:
+    async def test_json_array_returns_ids_in_order(self, client, test_db, model):
+        records = [_record(model.id, n) for n in range(3)]
+
+        response = await client.post("/api/v1/history/bulk", json=records)
+
+        assert response.status_code == 201
+        body = response.json()
+        assert body["count"] == 3
+        assert body["ids"] == sorted(body["ids"])
+        rows = (
+            await test_db.execute(
+                select(PromptHistoryORM).where(PromptHistoryORM.id.in_(body["ids"]))
+            )
+        ).scalars().all()
+        prompts = {row.id: row.prompt_text for row in rows}
+        assert [prompts[i] for i in body["ids"]] == ["ping 0", "ping 1", "ping 2"]
+
+    async def test_ndjson_body(self, client, test_db, model):
+        lines = [json.dumps(_record(model.id, n, cache_hit=n == 1)) for n in range(2)]
+        content = "\n".join(lines) + "\n\n"
+
+        response = await client.post(
+            "/api/v1/history/bulk",
+            content=content,
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+
+        assert response.status_code == 201
+        assert response.json()["count"] == 2
+        cache_hits = (
+            await test_db.execute(
+                select(PromptHistoryORM.cache_hit).where(
+                    PromptHistoryORM.id.in_(response.json()["ids"])
+                )
+            )
+        ).scalars().all()
+        assert sorted(cache_hits) == [False, True]
+
+    async def test_empty_array_inserts_nothing(self, client, test_db):
+        response = await client.post("/api/v1/history/bulk", json=[])
+
+        assert response.status_code == 201
+        assert response.json() == {"ids": [], "count": 0}
+        assert await _count(test_db) == 0
+
+    async def test_invalid_record_rejects_whole_batch(self, client, test_db, model):
+        records = [_record(model.id, 0), _record(model.id, 1, prompt_text="")]
+
+        response = await client.post("/api/v1/history/bulk", json=records)
+
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["loc"][0] == 1
+        assert await _count(test_db) == 0
+
+    async def test_invalid_ndjson_line_reports_line_number(self, client, model):
+        content = json.dumps(_record(model.id, 0)) + "\n{not json}\n"
+
+        response = await client.post(
+            "/api/v1/history/bulk",
+            content=content,
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["loc"][0] == 2
+
+    async def test_too_many_records(self, client, model):
+        with patch.object(history_module, "HISTORY_BULK_MAX_RECORDS", 2):
+            response = await client.post(
+                "/api/v1/history/bulk", json=[_record(model.id, n) for n in range(3)]
+            )
+
+        assert response.status_code == 413
+
+    async def test_large_batch_spans_insert_chunks(self, client, test_db, model):
+        from app.infrastructure.repositories import prompt_history_repository
+
+        with patch.object(prompt_history_repository, "BULK_INSERT_CHUNK_SIZE", 4):
+            response = await client.post(
+                "/api/v1/history/bulk", json=[_record(model.id, n) for n in range(10)]
+            )
+
+        assert response.status_code == 201
+        assert len(set(response.json()["ids"])) == 10
+        assert await _count(test_db) == 10
@@ -3,12 +3,16 @@ Integration tests for AI Models API endpoints.
 Использует test_db с транзакционной изоляцией через dependency override.
 """
 
+import time
+from unittest.mock import patch
+
 import pytest
 from httpx import ASGITransport, AsyncClient
 from uuid import uuid4
 
 from app.main import app
 from app.infrastructure.database.connection import get_db
+from app.infrastructure.models_cache import ModelsCache
 
 
 @pytest.mark.integration
@@ -132,3 +136,217 @@ class TestModelsAPI:
         updated_model = response.json()
         assert updated_model["success_count"] == 1
         assert updated_model["request_count"] == 1
+
+
+@pytest.mark.integration
+class TestModelsResponseCache:
+    """user-015: GET /models из памяти между записями."""
+
+    @pytest.fixture
+    async def client(self, test_db):
+        async def override_get_db():
+            yield test_db
+
+        app.dependency_overrides[get_db] = override_get_db
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            yield ac
+        app.dependency_overrides.clear()
+
+    @staticmethod
+    async def _create_model(client: AsyncClient) -> int:
+        response = await client.post(
+            "/api/v1/models",
+            json={
+                "name": f"Cache-Model-{uuid4().hex[:8]}",
+                "provider": "TestProvider",
+                "api_endpoint": "https://api.test.com",
+                "is_active": True,
+            },
+        )
+        assert response.status_code == 201
+        return response.json()["id"]
+
+    async def test_repeated_reads_served_from_memory(self, client: AsyncClient):
+        await self._create_model(client)
+        first = await client.get("/api/v1/models", params={"include_recent": True})
+
+        with patch(
+            "app.api.v1.models.AIModelRepository.get_all",
+            side_effect=AssertionError("must be served from cache"),
+        ):
+            second = await client.get("/api/v1/models", params={"include_recent": True})
+
+        assert second.status_code == 200
+        assert second.json() == first.json()
+        assert ModelsCache.metrics()["hits"] == 1
+
+    async def test_increment_invalidates(self, client: AsyncClient):
+        model_id = await self._create_model(client)
+        await client.get("/api/v1/models")
+
+        await client.post(
+            f"/api/v1/models/{model_id}/increment-success", params={"response_time": 1.0}
+        )
+        response = await client.get("/api/v1/models")
+
+        assert response.json()[0]["success_count"] == 1
+
+    async def test_history_insert_invalidates_recent_stats(self, client: AsyncClient):
+        model_id = await self._create_model(client)
+        before = await client.get("/api/v1/models", params={"include_recent": True})
+        assert before.json()[0]["recent_request_count"] == 0
+
+        await client.post(
+            "/api/v1/history",
+            json={
+                "user_id": "u",
+                "prompt_text": "p",
+                "selected_model_id": model_id,
+                "response_text": "r",
+                "response_time": 1.0,
+                "success": True,
+            },
+        )
+        after = await client.get("/api/v1/models", params={"include_recent": True})
+
+        assert after.json()[0]["recent_request_count"] == 1
+
+    async def test_availability_cooldown_invalidates_and_expires(self, client: AsyncClient):
+        model_id = await self._create_model(client)
+        assert len((await client.get("/api/v1/models", params={"available_only": True})).json()) == 1
+
+        await client.patch(
+            f"/api/v1/models/{model_id}/availability", params={"retry_after_seconds": 60}
+        )
+        cooling = await client.get("/api/v1/models", params={"available_only": True})
+        assert cooling.json() == []
+
+        # Кеш истекает, когда наступает available_at
+        entry = ModelsCache._entries[(True, True, False, 7)]
+        assert entry.expires_at <= time.monotonic() + 60
+
+    async def test_etag_revalidation(self, client: AsyncClient):
+        """user-016: неизменный каталог — 304 без тела, запись меняет ETag."""
+        model_id = await self._create_model(client)
+        first = await client.get("/api/v1/models")
+        etag = first.headers["etag"]
+
+        unchanged = await client.get("/api/v1/models", headers={"If-None-Match": etag})
+        assert unchanged.status_code == 304
+        assert unchanged.content == b""
+        assert unchanged.headers["etag"] == etag
+
+        # Промах кеша при той же версии — 304 без запроса в БД
+        ModelsCache._entries.clear()
+        with patch(
+            "app.api.v1.models.AIModelRepository.get_all",
+            side_effect=AssertionError("304 must not query"),
+        ):
+            revalidated = await client.get("/api/v1/models", headers={"If-None-Match": etag})
+        assert revalidated.status_code == 304
+        assert revalidated.headers["etag"] == etag
+
+        await client.patch(f"/api/v1/models/{model_id}/active", params={"is_active": False})
+        changed = await client.get(
+            "/api/v1/models", params={"active_only": False}, headers={"If-None-Match": etag}
+        )
+        assert changed.status_code == 200
+        assert changed.headers["etag"] != etag
+        assert changed.json()[0]["is_active"] is False
+
+
+@pytest.mark.integration
+class TestModelLatency:
+    """user-024: GET /models/latency и /models/{id}/latency."""
+
+    @pytest.fixture
+    async def client(self, test_db):
+        async def override_get_db():
+            yield test_db
+
+        app.dependency_overrides[get_db] = override_get_db
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            yield ac
+        app.dependency_overrides.clear()
+
+    @staticmethod
+    async def _model_with_history(client: AsyncClient, latencies: list) -> int:
+        created = await client.post(
+            "/api/v1/models",
+            json={
+                "name": f"Latency-Model-{uuid4().hex[:8]}",
+                "provider": "TestProvider",
+                "api_endpoint": "https://api.test.com",
+                "is_active": True,
+            },
+        )
+        model_id = created.json()["id"]
+        for seconds in latencies:
+            await client.post(
+                "/api/v1/history",
+                json={
+                    "user_id": "u",
+                    "prompt_text": "p",
+                    "selected_model_id": model_id,
+                    "response_text": "r",
+                    "response_time": seconds,
+                    "success": True,
+                },
+            )
+        return model_id
+
+    async def test_model_quantiles(self, client: AsyncClient):
+        model_id = await self._model_with_history(client, [1.0, 2.0, 3.0, 4.0, 5.0])
+
+        response = await client.get(
+            f"/api/v1/models/{model_id}/latency", params={"window": "1h", "q": "0.5,0.9,1"}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["sample_count"] == 5
+        # Ранг percentile_disc, значение бина скетча — в пределах 1%
+        assert data["quantiles"] == {
+            "0.5": pytest.approx(3.0, rel=0.01),
+            "0.9": pytest.approx(5.0, rel=0.01),
+            "1": pytest.approx(5.0, rel=0.01),
+        }
+
+    async def test_model_without_calls_has_null_quantiles(self, client: AsyncClient):
+        model_id = await self._model_with_history(client, [])
+
+        data = (await client.get(f"/api/v1/models/{model_id}/latency")).json()
+
+        assert data["sample_count"] == 0
+        assert data["quantiles"] == {"0.5": None, "0.9": None, "0.99": None}
+
+    async def test_all_models_and_etag(self, client: AsyncClient):
+        first_id = await self._model_with_history(client, [1.0])
+        second_id = await self._model_with_history(client, [2.0, 4.0])
+
+        response = await client.get("/api/v1/models/latency", params={"q": "0.5"})
+
+        assert response.status_code == 200
+        assert [(row["model_id"], row["quantiles"]["0.5"]) for row in response.json()] == [
+            (first_id, pytest.approx(1.0, rel=0.01)),
+            (second_id, pytest.approx(2.0, rel=0.01)),
+        ]
+        unchanged = await client.get(
+            "/api/v1/models/latency",
+            params={"q": "0.5"},
+            headers={"If-None-Match": response.headers["etag"]},
+        )
+        assert unchanged.status_code == 304
+
+    @pytest.mark.parametrize(
+        "params", [{"window": "24"}, {"window": "0h"}, {"q": "0.5,1.5"}, {"q": "p99"}, {"q": ""}]
+    )
+    async def test_bad_params_are_400(self, client: AsyncClient, params: dict):
+        response = await client.get("/api/v1/models/latency", params=params)
+
+        assert response.status_code == 400
+
+    async def test_unknown_model_is_404(self, client: AsyncClient):
+        response = await client.get("/api/v1/models/999999/latency")
+
+        assert response.status_code == 404
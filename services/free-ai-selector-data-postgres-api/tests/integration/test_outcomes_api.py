@@ -0,0 +1,151 @@
+"""Integration tests for POST /api/v1/outcomes (user-010)."""
+
+from decimal import Decimal
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import func, select
+
+from app.infrastructure.database.connection import get_db
+from app.infrastructure.database.models import AIModelORM, PromptHistoryORM
+from app.main import app
+
+
+@pytest.fixture
+async def client(test_db):
+    """Test client with get_db override."""
+
+    async def override_get_db():
+        yield test_db
+
+    app.dependency_overrides[get_db] = override_get_db
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+async def model(test_db) -> AIModelORM:
+    orm_model = AIModelORM(
+        name="Outcome Model",
+        provider="TestProvider",
+        api_endpoint="https://test.api/v1",
+        success_count=0,
+        failure_count=0,
+        total_response_time=Decimal("0"),
+        request_count=0,
+        is_active=True,
+        api_format="openai",
+    )
+    test_db.add(orm_model)
+    await test_db.flush()
+    return orm_model
+
+
+def _history(model_id: int, **overrides) -> dict:
+    history = {
+        "user_id": "api_user",
+        "prompt_text": "hi",
+        "selected_model_id": model_id,
+        "response_text": "hello",
+        "response_time": "1.5",
+        "success": True,
+        "caller": "sensedar",
+        "http_status": 200,
+    }
+    history.update(overrides)
+    return history
+
+
+async def _reload(test_db, model_id: int) -> AIModelORM:
+    result = await test_db.execute(
+        select(AIModelORM)
+        .where(AIModelORM.id == model_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one()
+
+
+@pytest.mark.integration
+class TestRecordOutcome:
+    async def test_success_counter_and_history_in_one_call(self, client, test_db, model):
+        response = await client.post(
+            "/api/v1/outcomes",
+            json={
+                "model_id": model.id,
+                "result": "success",
+                "response_time": 1.5,
+                "history": _history(model.id),
+            },
+        )
+
+        assert response.status_code == 201
+        body = response.json()
+        assert body["model_id"] == model.id
+        assert body["history_id"] is not None
+        assert body["available_at"] is None
+
+        updated = await _reload(test_db, model.id)
+        assert updated.success_count == 1
+        assert updated.request_count == 1
+        assert updated.total_response_time == Decimal("1.5")
+        history = await test_db.get(PromptHistoryORM, body["history_id"])
+        assert history.caller == "sensedar"
+
+    async def test_failure_with_cooldown(self, client, test_db, model):
+        response = await client.post(
+            "/api/v1/outcomes",
+            json={
+                "model_id": model.id,
+                "result": "failure",
+                "response_time": 0.5,
+                "cooldown": {"retry_after_seconds": 3600, "reason": "permanent_error"},
+            },
+        )
+
+        assert response.status_code == 201
+        body = response.json()
+        assert body["available_at"] is not None
+        assert body["history_id"] is None
+        updated = await _reload(test_db, model.id)
+        assert updated.failure_count == 1
+        assert updated.available_at is not None
+
+    async def test_history_only(self, client, test_db, model):
+        response = await client.post(
+            "/api/v1/outcomes",
+            json={"history": _history(model.id, success=False, http_status=500)},
+        )
+
+        assert response.status_code == 201
+        assert response.json()["model_id"] is None
+        updated = await _reload(test_db, model.id)
+        assert updated.request_count == 0
+
+    async def test_unknown_model_returns_404_without_history(self, client, test_db):
+        response = await client.post(
+            "/api/v1/outcomes",
+            json={
+                "model_id": 999999,
+                "result": "success",
+                "history": _history(999999),
+            },
+        )
+
+        assert response.status_code == 404
+        count = await test_db.scalar(select(func.count()).select_from(PromptHistoryORM))
+        assert count == 0
+
+    @pytest.mark.parametrize(
+        "payload",
+        [
+            {},
+            {"result": "success"},
+            {"cooldown": {"retry_after_seconds": 10}},
+            {"model_id": 1, "result": "maybe"},
+        ],
+    )
+    async def test_invalid_payload_rejected(self, client, payload):
+        response = await client.post("/api/v1/outcomes", json=payload)
+
+        assert response.status_code == 422
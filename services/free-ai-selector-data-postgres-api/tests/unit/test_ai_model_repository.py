@@ -6,6 +6,7 @@ from datetime import datetime, timezone
 from decimal import Decimal
 
 import pytest
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.domain.models import AIModel
@@ -449,3 +450,90 @@ class TestF012RateLimitHandling:
         models = await repository.get_all(active_only=True, available_only=False)
 
         assert len(models) == 2
+
+
+@pytest.mark.unit
+class TestUpdateReturning:
+    """user-017: один UPDATE ... RETURNING на вызов."""
+
+    @staticmethod
+    async def _create(repository: AIModelRepository, **overrides) -> AIModel:
+        fields = dict(
+            id=None,
+            name="Returning Model",
+            provider="TestProvider",
+            api_endpoint="https://api.test.com",
+            success_count=0,
+            failure_count=0,
+            total_response_time=Decimal("0.0"),
+            request_count=0,
+            last_checked=None,
+            is_active=True,
+            created_at=datetime.utcnow(),
+            updated_at=datetime.utcnow(),
+        )
+        fields.update(overrides)
+        return await repository.create(AIModel(**fields))
+
+    @staticmethod
+    def _capture_statements(test_db: AsyncSession) -> list[str]:
+        statements: list[str] = []
+        event.listen(
+            test_db.bind.sync_engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: statements.append(statement),
+        )
+        return statements
+
+    async def test_each_write_is_one_statement(self, test_db: AsyncSession):
+        repository = AIModelRepository(test_db)
+        model = await self._create(repository)
+        statements = self._capture_statements(test_db)
+
+        await repository.increment_success(model.id, Decimal("1.0"))
+        await repository.increment_failure(model.id, Decimal("2.0"))
+        await repository.set_active(model.id, False)
+        await repository.set_availability(model.id, 60)
+        updated = await repository.update_stats(model.id, request_count=10)
+
+        assert len(statements) == 5
+        assert all(s.lstrip().startswith("UPDATE") for s in statements)
+        assert updated.success_count == 1
+        assert updated.failure_count == 1
+        assert updated.total_response_time == Decimal("3.000")
+        assert updated.request_count == 10
+        assert updated.is_active is False
+        assert updated.available_at is not None
+
+    async def test_returned_values_are_fresh_for_loaded_model(self, test_db: AsyncSession):
+        repository = AIModelRepository(test_db)
+        model = await self._create(repository)
+        await repository.get_by_id(model.id)  # объект в identity map
+
+        first = await repository.increment_success(model.id, Decimal("1.0"))
+        second = await repository.increment_success(model.id, Decimal("1.0"))
+
+        assert (first.success_count, second.success_count) == (1, 2)
+
+    async def test_set_availability_returns_previous_value(self, test_db: AsyncSession):
+        repository = AIModelRepository(test_db)
+        model = await self._create(repository)
+
+        first_model, first_previous = await repository.set_availability_returning_previous(
+            model.id, 60
+        )
+        second_model, second_previous = await repository.set_availability_returning_previous(
+            model.id, 0
+        )
+
+        assert first_previous is None
+        assert second_previous == first_model.available_at
+        assert second_model.available_at is None
+
+    async def test_missing_model_returns_none(self, test_db: AsyncSession):
+        repository = AIModelRepository(test_db)
+
+        assert await repository.increment_success(999999, Decimal("1.0")) is None
+        assert await repository.set_active(999999, True) is None
+        assert await repository.update_stats(999999, request_count=1) is None
+        assert await repository.set_availability_returning_previous(999999, 10) is None
@@ -0,0 +1,151 @@
+"""
+Unit tests for the caller_hourly_stats rollup (user-023)
+
+Эталон — сырой запрос _get_stats_grouped_by_caller_raw(): rollup-путь обязан
+давать тот же список для любого окна.
+"""
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.models import PromptHistory
+from app.infrastructure.database.models import CallerHourlyStatsORM, PromptHistoryORM
+from app.infrastructure.repositories.caller_hourly_stats_repository import (
+    CallerHourlyStatsRepository,
+)
+from app.infrastructure.repositories.prompt_history_repository import (
+    PromptHistoryRepository,
+)
+
+# Проекты и модели истории для сравнения с сырым запросом
+CALLER_MIX = {"models": 4, "callers": ("sensedar", "taro", "mm", None)}
+
+
+@pytest.mark.unit
+class TestCallerRollupEquivalence:
+    """Rollup-путь == сырой запрос (same dashboard answers)."""
+
+    @pytest.mark.parametrize("window_days", [7, 3.5, 1, 0.25, 1 / 24, 0.01])
+    async def test_matches_raw_query(
+        self, test_db: AsyncSession, window_days: float, insert_history, random_history
+    ):
+        await insert_history(random_history(800, seed=23, **CALLER_MIX))
+        repository = PromptHistoryRepository(test_db)
+
+        rollup = await repository.get_stats_grouped_by_caller(window_days=window_days)
+        raw = await repository._get_stats_grouped_by_caller_raw(window_days)
+
+        assert rollup == raw
+
+    async def test_window_longer_than_history(
+        self, test_db: AsyncSession, insert_history, random_history
+    ):
+        await insert_history(random_history(200, days=2, seed=23, **CALLER_MIX))
+        repository = PromptHistoryRepository(test_db)
+
+        rollup = await repository.get_stats_grouped_by_caller(window_days=30)
+
+        assert {row["caller"] for row in rollup} == {"sensedar", "taro", "mm", None}
+        assert rollup == await repository._get_stats_grouped_by_caller_raw(30)
+
+    async def test_matches_raw_after_retention_purge(
+        self, test_db: AsyncSession, insert_history, random_history
+    ):
+        await insert_history(random_history(400, seed=23, **CALLER_MIX))
+        # Retention удалил старые строки, бакеты их часов ещё в rollup
+        cutoff = datetime.now(timezone.utc) - timedelta(days=3, minutes=17)
+        await test_db.execute(delete(PromptHistoryORM).where(PromptHistoryORM.created_at < cutoff))
+        repository = PromptHistoryRepository(test_db)
+
+        rollup = await repository.get_stats_grouped_by_caller(window_days=7)
+
+        assert rollup == await repository._get_stats_grouped_by_caller_raw(7)
+
+    async def test_top_model_tie_goes_to_lower_id(
+        self, test_db: AsyncSession, insert_history, history_row
+    ):
+        now = datetime.now(timezone.utc)
+        await insert_history(
+            [history_row(now, caller="A", model_id=5), history_row(now, caller="A", model_id=2)],
+        )
+        repository = PromptHistoryRepository(test_db)
+
+        rollup = await repository.get_stats_grouped_by_caller()
+
+        assert rollup[0]["top_model_id"] == 2
+        assert rollup == await repository._get_stats_grouped_by_caller_raw()
+
+    async def test_empty_history(self, test_db: AsyncSession):
+        repository = PromptHistoryRepository(test_db)
+
+        assert await repository.get_stats_grouped_by_caller() == []
+
+
+@pytest.mark.unit
+class TestCallerRollupMaintenance:
+    async def test_upsert_merges_null_caller_bucket(
+        self, test_db: AsyncSession, insert_history, history_row
+    ):
+        hour = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        await insert_history([history_row(hour + timedelta(minutes=5))])
+        await insert_history(
+            [
+                history_row(hour + timedelta(minutes=10), response_time=Decimal("2.5")),
+                history_row(hour + timedelta(minutes=20), success=False, requested_model="m"),
+                history_row(hour + timedelta(minutes=30), cache_hit=True),
+                history_row(hour + timedelta(minutes=40), caller="A"),
+            ],
+        )
+
+        buckets = {
+            bucket.caller: bucket
+            for bucket in (await test_db.execute(select(CallerHourlyStatsORM))).scalars()
+        }
+
+        assert set(buckets) == {None, "A"}
+        bucket = buckets[None]
+        assert bucket.bucket_start == hour
+        assert bucket.request_count == 4
+        assert bucket.success_count == 3
+        assert bucket.auto_count == 3
+        assert bucket.pinned_count == 1
+        assert bucket.response_time_sum == Decimal("5.500")
+
+    async def test_create_and_create_many_update_rollup(self, test_db: AsyncSession):
+        repository = PromptHistoryRepository(test_db)
+        history = PromptHistory(
+            id=None,
+            user_id="u",
+            prompt_text="p",
+            selected_model_id=7,
+            response_text="r",
+            response_time=Decimal("1.0"),
+            success=True,
+            error_message=None,
+            created_at=datetime.utcnow(),
+            caller="sensedar",
+        )
+
+        await repository.create(history)
+        await repository.create_many([history, history])
+
+        bucket = (await test_db.execute(select(CallerHourlyStatsORM))).scalar_one()
+        assert (bucket.caller, bucket.model_id, bucket.request_count) == ("sensedar", 7, 3)
+
+    async def test_prune_expired_keeps_hours_with_history(
+        self, test_db: AsyncSession, insert_history, history_row
+    ):
+        now = datetime.now(timezone.utc)
+        await insert_history([history_row(now - timedelta(days=2)), history_row(now)])
+        await test_db.execute(
+            delete(PromptHistoryORM).where(PromptHistoryORM.created_at < now - timedelta(days=1))
+        )
+        rollup = CallerHourlyStatsRepository(test_db)
+
+        assert await rollup.prune_expired() == 1
+        remaining = (await test_db.execute(select(CallerHourlyStatsORM))).scalars().all()
+        assert len(remaining) == 1
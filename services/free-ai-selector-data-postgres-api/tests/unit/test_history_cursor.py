@@ -0,0 +1,23 @@
+"""Unit tests for opaque journal cursors (user-018)."""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from app.utils.cursor import decode_cursor, encode_cursor
+
+
+@pytest.mark.unit
+class TestHistoryCursor:
+    def test_round_trip(self):
+        created_at = datetime(2026, 10, 17, 12, 30, 5, 123456, tzinfo=timezone.utc)
+
+        cursor = encode_cursor(created_at, 42)
+
+        assert decode_cursor(cursor) == (created_at, 42)
+        assert "=" not in cursor
+
+    @pytest.mark.parametrize("cursor", ["", "not-base64!", "bm9waXBl", "MjAyNnwx"])
+    def test_malformed_cursor_raises_value_error(self, cursor):
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
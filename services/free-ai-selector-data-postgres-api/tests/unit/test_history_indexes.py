@@ -0,0 +1,45 @@
+"""
+ORM-индексы prompt_history совпадают с миграцией 0009 (user-019).
+
+Тесты создают схему через create_all, прод — через Alembic: расхождение
+определений незаметно меняло бы планы запросов только в проде.
+"""
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+from app.infrastructure.database.models import PromptHistoryORM
+
+MIGRATION = (
+    Path(__file__).resolve().parents[2]
+    / "alembic"
+    / "versions"
+    / "20261017_0009_history_composite_indexes.py"
+)
+
+
+def _load_migration():
+    spec = importlib.util.spec_from_file_location("migration_0009", MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.mark.unit
+def test_orm_indexes_match_migration():
+    migration = _load_migration()
+    expected = {
+        f"CREATE INDEX {name} ON prompt_history {definition}"
+        for name, definition in migration.NEW_INDEXES
+    }
+
+    actual = {
+        str(CreateIndex(index).compile(dialect=postgresql.dialect())).strip()
+        for index in PromptHistoryORM.__table__.indexes
+    }
+
+    assert actual == expected
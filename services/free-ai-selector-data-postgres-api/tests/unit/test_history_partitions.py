@@ -0,0 +1,211 @@
+"""
+Unit tests for prompt_history range partition maintenance (user-013)
+
+The test schema comes from create_all (plain table), so each test converts
+prompt_history to a partitioned table inside its own transaction; the
+rollback after the test restores the plain table.
+"""
+
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.infrastructure import retention as retention_module
+from app.infrastructure.database import partitions
+from app.infrastructure.database.models import PromptHistoryORM
+from app.infrastructure.retention import HistoryRetention
+from tests.conftest import TEST_DATABASE_URL
+
+
+@pytest.fixture
+async def partitioned_db(test_db: AsyncSession) -> AsyncSession:
+    """prompt_history as RANGE (created_at) partitioned table with DEFAULT partition."""
+    await test_db.execute(text("ALTER TABLE prompt_history RENAME TO prompt_history_plain"))
+    await test_db.execute(
+        text(
+            "CREATE TABLE prompt_history (LIKE prompt_history_plain INCLUDING DEFAULTS) "
+            "PARTITION BY RANGE (created_at)"
+        )
+    )
+    await test_db.execute(
+        text("CREATE TABLE prompt_history_default PARTITION OF prompt_history DEFAULT")
+    )
+    HistoryRetention.reset()
+    yield test_db
+    HistoryRetention.reset()
+
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+async def _insert(session: AsyncSession, created_at: datetime, count: int = 1) -> None:
+    session.add_all(
+        PromptHistoryORM(
+            user_id="u",
+            prompt_text="p",
+            selected_model_id=1,
+            response_text=None,
+            response_time=Decimal("1.0"),
+            success=True,
+            created_at=created_at,
+        )
+        for _ in range(count)
+    )
+    await session.flush()
+
+
+async def _rows_in(session: AsyncSession, partition: str) -> int:
+    return (await session.execute(text(f"SELECT count(*) FROM {partition}"))).scalar_one()
+
+
+async def _analyze(session: AsyncSession) -> None:
+    """Обновить pg_class.reltuples — по нему считаются строки удалённых партиций."""
+    await session.execute(text("ANALYZE prompt_history"))
+
+
+@pytest.mark.unit
+class TestPartitionMaintenance:
+    async def test_plain_table_is_not_partitioned(self, test_db: AsyncSession):
+        assert await partitions.is_partitioned(test_db) is False
+
+    async def test_ensure_partitions_creates_missing_days(self, partitioned_db):
+        today = _today()
+
+        created = await partitions.ensure_partitions(partitioned_db, today, 3)
+        again = await partitions.ensure_partitions(partitioned_db, today, 4)
+
+        assert created == [partitions.partition_name(today + timedelta(days=i)) for i in range(3)]
+        assert again == [partitions.partition_name(today + timedelta(days=3))]
+        assert [day for _, day in await partitions.list_partitions(partitioned_db)] == [
+            today + timedelta(days=i) for i in range(4)
+        ]
+
+    async def test_rows_move_out_of_default_partition(self, partitioned_db):
+        tomorrow = _today() + timedelta(days=1)
+        await _insert(partitioned_db, partitions.day_start(tomorrow) + timedelta(hours=3), 2)
+        assert await _rows_in(partitioned_db, "prompt_history_default") == 2
+
+        await partitions.ensure_partitions(partitioned_db, tomorrow, 1)
+
+        assert await _rows_in(partitioned_db, "prompt_history_default") == 0
+        assert await _rows_in(partitioned_db, partitions.partition_name(tomorrow)) == 2
+
+    async def test_drop_partitions_before_cutoff(self, partitioned_db):
+        first = _today() - timedelta(days=5)
+        await partitions.ensure_partitions(partitioned_db, first, 6)
+        for offset in range(6):
+            await _insert(partitioned_db, partitions.day_start(first + timedelta(days=offset)))
+        await _analyze(partitioned_db)
+
+        cutoff = partitions.day_start(first + timedelta(days=2)) + timedelta(hours=12)
+        dropped, rows = await partitions.drop_partitions_before(partitioned_db, cutoff)
+
+        assert dropped == [partitions.partition_name(first + timedelta(days=i)) for i in range(2)]
+        assert rows == 2
+        total = (
+            await partitioned_db.execute(select(func.count(PromptHistoryORM.id)))
+        ).scalar_one()
+        assert total == 4
+
+    async def test_drop_stops_at_locked_partition(self):
+        """Занятая партиция не ждёт дольше lock_timeout; удалённые до неё — закоммичены."""
+        engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+        table = "partition_lock_probe"
+        first = _today() - timedelta(days=5)
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(
+                    text(
+                        f"CREATE TABLE {table} (created_at timestamptz) "
+                        "PARTITION BY RANGE (created_at)"
+                    )
+                )
+                await partitions.ensure_partitions(AsyncSession(bind=conn), first, 3, table)
+
+            async with engine.connect() as holder:
+                await holder.begin()
+                locked = partitions.partition_name(first + timedelta(days=1), table)
+                await holder.execute(text(f"SELECT count(*) FROM {locked}"))
+
+                async with AsyncSession(bind=engine) as session:
+                    dropped, _ = await asyncio.wait_for(
+                        partitions.drop_partitions_before(
+                            session, partitions.day_start(_today()), table, lock_timeout_ms=100
+                        ),
+                        timeout=5,
+                    )
+                await holder.rollback()
+
+            assert dropped == [partitions.partition_name(first, table)]
+            async with AsyncSession(bind=engine) as session:
+                days = [day for _, day in await partitions.list_partitions(session, table)]
+            assert days == [first + timedelta(days=1), first + timedelta(days=2)]
+        finally:
+            async with engine.begin() as conn:
+                await conn.execute(text(f"DROP TABLE IF EXISTS {table} CASCADE"))
+                await conn.execute(text(f"DROP TABLE IF EXISTS {table}_p{first:%Y%m%d}"))
+            await engine.dispose()
+
+    def test_latest_cutoff(self):
+        naive = datetime(2026, 1, 2)
+        aware = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+        assert partitions.latest_cutoff(None, None) is None
+        assert partitions.latest_cutoff(naive, aware) == naive.replace(tzinfo=timezone.utc)
+
+
+@pytest.mark.unit
+class TestRetentionOnPartitionedTable:
+    async def test_run_once_drops_old_partitions_and_premakes(self, partitioned_db):
+        today = _today()
+        await partitions.ensure_partitions(partitioned_db, today - timedelta(days=20), 21)
+        await _insert(partitioned_db, datetime.now(timezone.utc) - timedelta(days=15), 3)
+        await _insert(partitioned_db, datetime.now(timezone.utc) - timedelta(hours=1), 2)
+        await _analyze(partitioned_db)
+
+        with patch.multiple(
+            retention_module,
+            HISTORY_RETENTION_MAX_ROWS=0,
+            HISTORY_RETENTION_MAX_AGE_DAYS=10,
+            HISTORY_PARTITION_PREMAKE_DAYS=3,
+        ):
+            purged = await HistoryRetention.run_once(partitioned_db)
+
+        assert purged == 3
+        metrics = HistoryRetention.metrics()
+        assert metrics["last_partitions_dropped"] >= 10
+        assert metrics["last_partitions_created"] == 3
+        assert metrics["last_batches"] == 0
+        days = [day for _, day in await partitions.list_partitions(partitioned_db)]
+        assert days[-1] == today + timedelta(days=3)
+        assert days[0] > today - timedelta(days=11)
+
+    async def test_row_count_policy_drops_partitions_below_boundary(self, partitioned_db):
+        today = _today()
+        await partitions.ensure_partitions(partitioned_db, today - timedelta(days=3), 4)
+        for offset in (3, 2, 1):
+            await _insert(partitioned_db, partitions.day_start(today - timedelta(days=offset)), 2)
+        await _insert(partitioned_db, datetime.now(timezone.utc), 1)
+        await _analyze(partitioned_db)
+
+        with patch.multiple(
+            retention_module,
+            HISTORY_RETENTION_MAX_ROWS=2,
+            HISTORY_RETENTION_MAX_AGE_DAYS=0,
+            HISTORY_PARTITION_PREMAKE_DAYS=0,
+        ):
+            purged = await HistoryRetention.run_once(partitioned_db)
+
+        assert purged == 5
+        assert HistoryRetention.metrics()["last_partitions_dropped"] == 2
+        total = (
+            await partitioned_db.execute(select(func.count(PromptHistoryORM.id)))
+        ).scalar_one()
+        assert total == 2
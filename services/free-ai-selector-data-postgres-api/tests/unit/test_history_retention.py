@@ -0,0 +1,172 @@
+"""
+Unit tests for HistoryRetention (user-012)
+"""
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.models import PromptHistory
+from app.infrastructure import retention as retention_module
+from app.infrastructure.database.models import PromptHistoryORM
+from app.infrastructure.repositories.prompt_history_repository import (
+    PromptHistoryRepository,
+)
+from app.infrastructure.retention import HistoryRetention
+from app.main import app
+
+
+@pytest.fixture(autouse=True)
+def reset_retention():
+    HistoryRetention.reset()
+    yield
+    HistoryRetention.reset()
+
+
+def _policy(max_rows: int = 0, max_age_days: float = 0, batch_size: int = 1000):
+    """Patch retention policy constants for one test."""
+    return patch.multiple(
+        retention_module,
+        HISTORY_RETENTION_MAX_ROWS=max_rows,
+        HISTORY_RETENTION_MAX_AGE_DAYS=max_age_days,
+        HISTORY_RETENTION_BATCH_SIZE=batch_size,
+        HISTORY_PARTITION_PREMAKE_DAYS=0,
+    )
+
+
+async def _insert(test_db: AsyncSession, count: int, age: timedelta = timedelta(0)) -> list[int]:
+    created_at = datetime.now(timezone.utc) - age
+    rows = [
+        PromptHistoryORM(
+            user_id="test_user",
+            prompt_text=f"prompt {i}",
+            selected_model_id=1,
+            response_text="response",
+            response_time=Decimal("1.0"),
+            success=True,
+            created_at=created_at,
+        )
+        for i in range(count)
+    ]
+    test_db.add_all(rows)
+    await test_db.flush()
+    return [row.id for row in rows]
+
+
+async def _remaining_ids(test_db: AsyncSession) -> list[int]:
+    result = await test_db.execute(select(PromptHistoryORM.id).order_by(PromptHistoryORM.id))
+    return list(result.scalars().all())
+
+
+@pytest.mark.unit
+class TestHistoryRetention:
+    """user-012: политики по числу строк и возрасту, удаление пачками."""
+
+    async def test_insert_no_longer_deletes(self, test_db: AsyncSession):
+        repository = PromptHistoryRepository(test_db)
+        await _insert(test_db, 3)
+
+        with patch.object(retention_module, "HISTORY_RETENTION_MAX_ROWS", 1):
+            await repository.create(
+                PromptHistory(
+                    id=None,
+                    user_id="u",
+                    prompt_text="p",
+                    selected_model_id=1,
+                    response_text=None,
+                    response_time=Decimal("0"),
+                    success=False,
+                    error_message="e",
+                    created_at=datetime.utcnow(),
+                )
+            )
+
+        assert len(await _remaining_ids(test_db)) == 4
+
+    async def test_row_count_policy_keeps_newest(self, test_db: AsyncSession):
+        old_ids = await _insert(test_db, 5, age=timedelta(hours=2))
+        new_ids = await _insert(test_db, 3)
+
+        with _policy(max_rows=4, batch_size=2):
+            purged = await HistoryRetention.run_once(test_db)
+
+        assert purged == 4
+        assert await _remaining_ids(test_db) == [old_ids[-1], *new_ids]
+        metrics = HistoryRetention.metrics()
+        assert metrics["last_purged"] == 4
+        assert metrics["last_batches"] == 2
+        assert metrics["total_purged"] == 4
+        assert metrics["runs"] == 1
+
+    async def test_row_count_tie_on_created_at_broken_by_id(self, test_db: AsyncSession):
+        ids = await _insert(test_db, 5)  # один created_at у всех
+
+        with _policy(max_rows=2):
+            await HistoryRetention.run_once(test_db)
+
+        assert await _remaining_ids(test_db) == ids[-2:]
+
+    async def test_age_policy(self, test_db: AsyncSession):
+        await _insert(test_db, 3, age=timedelta(days=10))
+        fresh = await _insert(test_db, 2, age=timedelta(days=1))
+
+        with _policy(max_age_days=7):
+            purged = await HistoryRetention.run_once(test_db)
+
+        assert purged == 3
+        assert await _remaining_ids(test_db) == fresh
+
+    async def test_policies_combined_with_or(self, test_db: AsyncSession):
+        await _insert(test_db, 1, age=timedelta(days=10))
+        fresh = await _insert(test_db, 3, age=timedelta(hours=1))
+
+        with _policy(max_rows=2, max_age_days=7):
+            purged = await HistoryRetention.run_once(test_db)
+
+        assert purged == 2
+        assert await _remaining_ids(test_db) == fresh[-2:]
+
+    async def test_under_limit_purges_nothing(self, test_db: AsyncSession):
+        await _insert(test_db, 2)
+
+        with _policy(max_rows=5):
+            assert await HistoryRetention.run_once(test_db) == 0
+
+        assert HistoryRetention.metrics()["last_batches"] == 0
+
+    async def test_disabled_policies_and_partitions_do_not_start(self):
+        with _policy():
+            HistoryRetention.start()
+
+        assert HistoryRetention.metrics()["running"] is False
+
+    async def test_start_and_shutdown(self):
+        with patch.object(HistoryRetention, "run_once") as run_once, _policy(max_rows=10):
+            HistoryRetention.start()
+            assert HistoryRetention.metrics()["running"] is True
+            await HistoryRetention.shutdown()
+
+        assert HistoryRetention.metrics()["running"] is False
+        assert run_once.call_count <= 1
+
+    async def test_metrics_endpoint(self):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/metrics")
+
+        assert response.status_code == 200
+        body = response.json()["history_retention"]
+        assert {"total_purged", "last_purged", "last_duration_ms", "runs"} <= set(body)
+
+
+@pytest.mark.unit
+async def test_purge_batch_without_policies_is_noop(test_db: AsyncSession):
+    await _insert(test_db, 2)
+
+    assert await PromptHistoryRepository(test_db).purge_batch(10) == 0
+    count = (await test_db.execute(select(func.count(PromptHistoryORM.id)))).scalar_one()
+    assert count == 2
@@ -0,0 +1,216 @@
+"""
+Unit tests for the history_series_stats time-series rollup (user-025)
+
+Эталон — _get_timeseries_raw() (GROUP BY по бакетам сырых строк): счётчики
+rollup обязаны совпадать точно, квантили — с точностью
+SKETCH_RELATIVE_ACCURACY от percentile_disc.
+"""
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.models import PromptHistory
+from app.infrastructure.database.models import HistorySeriesStatsORM, PromptHistoryORM
+from app.infrastructure.repositories.history_series_stats_repository import (
+    TIMESERIES_MINUTE_RETENTION_HOURS,
+    HistorySeriesStatsRepository,
+)
+from app.infrastructure.repositories.model_latency_sketch_repository import (
+    SKETCH_RELATIVE_ACCURACY,
+)
+from app.infrastructure.repositories.prompt_history_repository import (
+    PromptHistoryRepository,
+)
+
+QUANTILES = [0.5, 0.9, 0.99]
+COUNTERS = ("request_count", "success_count", "hard_fail_count", "rate_limited_count")
+
+
+def _assert_matches_raw(series: list[dict], raw: dict) -> None:
+    points = {
+        (entry["group_key"], point["bucket_start"]): point
+        for entry in series
+        for point in entry["points"]
+    }
+    assert set(points) == set(raw)
+    for key, exact in raw.items():
+        point = points[key]
+        assert [point[name] for name in COUNTERS] == [exact[name] for name in COUNTERS]
+        if exact["latency_quantiles"] is None:
+            assert point["latency_quantiles"] is None
+            continue
+        for estimate, value in zip(point["latency_quantiles"], exact["latency_quantiles"]):
+            assert estimate == pytest.approx(value, rel=SKETCH_RELATIVE_ACCURACY + 1e-9)
+
+
+@pytest.mark.unit
+class TestSeriesEquivalence:
+    """Rollup == GROUP BY по сырым строкам (точные счётчики, квантили в пределах α)."""
+
+    @pytest.mark.parametrize(
+        "granularity, group_by, window",
+        [
+            ("hour", "model", timedelta(hours=24)),
+            ("day", "caller", timedelta(days=7)),
+            ("minute", "caller", timedelta(minutes=90)),
+            ("day", "model", timedelta(days=2)),
+        ],
+    )
+    async def test_matches_raw_query(
+        self,
+        test_db: AsyncSession,
+        granularity: str,
+        group_by: str,
+        window: timedelta,
+        insert_history,
+        random_history,
+    ):
+        await insert_history(random_history(700, seed=25))
+        repository = PromptHistoryRepository(test_db)
+
+        series = await repository.get_timeseries(granularity, group_by, window, QUANTILES)
+        raw = await repository._get_timeseries_raw(granularity, group_by, window, QUANTILES)
+
+        assert raw
+        _assert_matches_raw(series, raw)
+
+    async def test_busiest_series_first_and_single_key(
+        self, test_db: AsyncSession, insert_history, history_row
+    ):
+        now = datetime.now(timezone.utc)
+        await insert_history(
+            [history_row(now, model_id=1)]
+            + [history_row(now - timedelta(hours=2), model_id=2)] * 3,
+        )
+        repository = PromptHistoryRepository(test_db)
+
+        series = await repository.get_timeseries("hour", "model", timedelta(hours=6), QUANTILES)
+        single = await repository.get_timeseries(
+            "hour", "model", timedelta(hours=6), QUANTILES, group_key="1"
+        )
+
+        assert [(entry["group_key"], entry["request_count"]) for entry in series] == [
+            ("2", 3),
+            ("1", 1),
+        ]
+        assert [entry["group_key"] for entry in single] == ["1"]
+
+    async def test_empty_history(self, test_db: AsyncSession):
+        repository = PromptHistoryRepository(test_db)
+
+        assert await repository.get_timeseries("hour", "model", timedelta(days=1), QUANTILES) == []
+
+
+@pytest.mark.unit
+class TestSeriesMaintenance:
+    async def test_upsert_merges_counts_and_sketch(
+        self, test_db: AsyncSession, insert_history, history_row
+    ):
+        minute = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+        await insert_history([history_row(minute + timedelta(seconds=5))])
+        await insert_history(
+            [
+                history_row(minute + timedelta(seconds=10), response_time=Decimal("2.5")),
+                history_row(minute + timedelta(seconds=20), success=False, http_status=429),
+                history_row(minute + timedelta(seconds=30), success=False, http_status=None),
+                history_row(minute + timedelta(seconds=40), cache_hit=True),
+            ],
+        )
+
+        bucket = (
+            await test_db.execute(
+                select(HistorySeriesStatsORM).where(HistorySeriesStatsORM.group_by == "model")
+            )
+        ).scalar_one()
+
+        assert (bucket.granularity, bucket.group_key, bucket.bucket_start) == (
+            "minute",
+            "1",
+            minute,
+        )
+        assert [getattr(bucket, name) for name in COUNTERS] == [5, 3, 1, 1]
+        assert bucket.sketch_counts == [3, 1]
+
+    async def test_cache_hits_only_bucket_has_no_latency(
+        self, test_db: AsyncSession, insert_history, history_row
+    ):
+        now = datetime.now(timezone.utc)
+        await insert_history([history_row(now, cache_hit=True)])
+        repository = PromptHistoryRepository(test_db)
+
+        series = await repository.get_timeseries(
+            "minute", "caller", timedelta(minutes=5), QUANTILES
+        )
+
+        assert series[0]["group_key"] is None
+        assert series[0]["points"][0]["request_count"] == 1
+        assert series[0]["points"][0]["latency_quantiles"] is None
+
+    async def test_create_and_create_many_update_rollup(self, test_db: AsyncSession):
+        repository = PromptHistoryRepository(test_db)
+        history = PromptHistory(
+            id=None,
+            user_id="u",
+            prompt_text="p",
+            selected_model_id=7,
+            response_text="r",
+            response_time=Decimal("1.0"),
+            success=True,
+            error_message=None,
+            created_at=datetime.utcnow(),
+        )
+
+        await repository.create(history)
+        await repository.create_many([history, history])
+
+        buckets = (await test_db.execute(select(HistorySeriesStatsORM))).scalars().all()
+        # Только минутные бакеты: (model, caller)
+        assert sorted((bucket.granularity, bucket.group_by) for bucket in buckets) == [
+            ("minute", "caller"),
+            ("minute", "model"),
+        ]
+        assert {bucket.request_count for bucket in buckets} == {3}
+
+    async def test_prune_expired(self, test_db: AsyncSession, insert_history, history_row):
+        now = datetime.now(timezone.utc)
+        await insert_history([history_row(now - timedelta(days=3)), history_row(now)])
+        await test_db.execute(
+            delete(PromptHistoryORM).where(PromptHistoryORM.created_at < now - timedelta(days=2))
+        )
+        series = HistorySeriesStatsRepository(test_db)
+
+        # Бакеты удалённой строки: minute x (model, caller)
+        assert await series.prune_expired() == 2
+        remaining = (await test_db.execute(select(HistorySeriesStatsORM))).scalars().all()
+        assert len(remaining) == 2
+
+        await test_db.execute(delete(PromptHistoryORM))
+        assert await series.prune_expired() == 2
+
+    async def test_prune_folds_old_minutes_into_hours(
+        self, test_db: AsyncSession, insert_history, random_history
+    ):
+        await insert_history(random_history(700, seed=25))
+        repository = PromptHistoryRepository(test_db)
+        horizon = datetime.now(timezone.utc) - timedelta(hours=TIMESERIES_MINUTE_RETENTION_HOURS)
+
+        folded = await HistorySeriesStatsRepository(test_db).prune_expired()
+
+        buckets = (await test_db.execute(select(HistorySeriesStatsORM))).scalars().all()
+        hours = [bucket for bucket in buckets if bucket.granularity == "hour"]
+        assert folded > 0 and hours
+        assert all(bucket.bucket_start < horizon for bucket in hours)
+        assert all(
+            bucket.bucket_start >= horizon - timedelta(hours=1)
+            for bucket in buckets
+            if bucket.granularity == "minute"
+        )
+        for granularity, window in (("hour", timedelta(days=3)), ("day", timedelta(days=4))):
+            _assert_matches_raw(
+                await repository.get_timeseries(granularity, "caller", window, QUANTILES),
+                await repository._get_timeseries_raw(granularity, "caller", window, QUANTILES),
+            )
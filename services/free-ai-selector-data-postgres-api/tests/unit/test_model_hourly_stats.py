@@ -0,0 +1,202 @@
+"""
+Unit tests for the model_hourly_stats rollup (user-014)
+
+Эталон — сырой запрос _get_recent_weighted_stats_raw(): rollup-путь обязан
+давать тот же dict (после округления) для rating_v2.
+"""
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import Float, delete, func, select, text, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.models import PromptHistory
+from app.infrastructure.database.models import ModelHourlyStatsORM, PromptHistoryORM
+from app.infrastructure.repositories.model_hourly_stats_repository import (
+    ModelHourlyStatsRepository,
+    decay_rate_supported,
+)
+from app.infrastructure.repositories.prompt_history_repository import (
+    PromptHistoryRepository,
+)
+
+DECAY = 0.5 ** (1 / 34)
+
+
+@pytest.mark.unit
+class TestRollupEquivalence:
+    """Rollup-путь == сырой запрос (identical rating_v2 inputs)."""
+
+    async def test_matches_raw_query(self, test_db: AsyncSession, insert_history, random_history):
+        await insert_history(random_history(600, seed=14))
+        repository = PromptHistoryRepository(test_db)
+
+        rollup = await repository.get_recent_weighted_stats_for_all_models(
+            window_days=7, decay_per_hour=DECAY
+        )
+        raw = await repository._get_recent_weighted_stats_raw(7, DECAY)
+
+        assert set(raw) == {1, 2, 3}
+        assert rollup == raw
+
+    async def test_matches_raw_query_for_short_window(
+        self, test_db: AsyncSession, insert_history, random_history
+    ):
+        await insert_history(random_history(200, days=2, seed=7))
+        repository = PromptHistoryRepository(test_db)
+
+        rollup = await repository.get_recent_weighted_stats_for_all_models(
+            window_days=1, decay_per_hour=DECAY
+        )
+        raw = await repository._get_recent_weighted_stats_raw(1, DECAY)
+
+        assert rollup == raw
+
+    async def test_matches_raw_after_retention_purge(
+        self, test_db: AsyncSession, insert_history, random_history
+    ):
+        await insert_history(random_history(300, seed=14))
+        # Retention удалил старые строки, бакеты их часов ещё в rollup
+        cutoff = datetime.now(timezone.utc) - timedelta(days=3, minutes=17)
+        await test_db.execute(delete(PromptHistoryORM).where(PromptHistoryORM.created_at < cutoff))
+        repository = PromptHistoryRepository(test_db)
+
+        rollup = await repository.get_recent_weighted_stats_for_all_models(
+            window_days=7, decay_per_hour=DECAY
+        )
+        raw = await repository._get_recent_weighted_stats_raw(7, DECAY)
+
+        assert rollup == raw
+
+    async def test_median_equals_percentile_cont(
+        self, test_db: AsyncSession, insert_history, random_history
+    ):
+        # Без округления _weighted_stats_entry: медиана из гистограмм бит в бит
+        # равна percentile_cont(0.5) по строкам окна (чётные и нечётные N)
+        await insert_history(random_history(401, seed=25))
+        await insert_history(random_history(1, seed=26))
+        repository = PromptHistoryRepository(test_db)
+        cutoff = repository._weighted_stats_cutoff(7)
+        split = (
+            await test_db.execute(
+                select(
+                    func.date_trunc(
+                        "hour", func.greatest(cutoff, func.min(PromptHistoryORM.created_at))
+                    )
+                    + text("interval '1 hour'")
+                )
+            )
+        ).scalar_one()
+        raw = dict(
+            (
+                await test_db.execute(
+                    select(
+                        PromptHistoryORM.selected_model_id,
+                        type_coerce(
+                            func.percentile_cont(0.5).within_group(
+                                PromptHistoryORM.response_time.asc()
+                            ),
+                            Float,
+                        ),
+                    )
+                    .where(
+                        PromptHistoryORM.created_at > cutoff,
+                        PromptHistoryORM.cache_hit.is_(False),
+                    )
+                    .group_by(PromptHistoryORM.selected_model_id)
+                )
+            ).all()
+        )
+
+        medians = await repository.rollup.get_latency_medians(split, timedelta(days=7))
+
+        assert set(raw) == {1, 2, 3}
+        assert medians == raw
+
+    async def test_fast_decay_falls_back_to_raw(
+        self, test_db: AsyncSession, insert_history, random_history
+    ):
+        await insert_history(random_history(50, seed=14))
+        repository = PromptHistoryRepository(test_db)
+
+        assert decay_rate_supported(DECAY) is True
+        assert decay_rate_supported(0.5) is False
+        rollup = await repository.get_recent_weighted_stats_for_all_models(
+            window_days=7, decay_per_hour=0.5
+        )
+
+        assert rollup == await repository._get_recent_weighted_stats_raw(7, 0.5)
+
+    async def test_empty_history(self, test_db: AsyncSession):
+        repository = PromptHistoryRepository(test_db)
+
+        assert await repository.get_recent_weighted_stats_for_all_models() == {}
+
+
+@pytest.mark.unit
+class TestRollupMaintenance:
+    async def test_upsert_merges_counts_and_histogram(
+        self, test_db: AsyncSession, insert_history, history_row
+    ):
+        hour = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        await insert_history([history_row(hour + timedelta(minutes=5))])
+        await insert_history(
+            [
+                history_row(hour + timedelta(minutes=10), response_time=Decimal("2.5")),
+                history_row(hour + timedelta(minutes=20), success=False, http_status=429),
+                history_row(hour + timedelta(minutes=30), success=False, http_status=None),
+                history_row(hour + timedelta(minutes=40), cache_hit=True),
+            ],
+        )
+
+        bucket = (await test_db.execute(select(ModelHourlyStatsORM))).scalar_one()
+
+        assert bucket.bucket_start == hour
+        assert bucket.request_count == 4
+        assert bucket.success_count == 2
+        assert bucket.hard_fail_count == 1
+        assert bucket.rate_limited_count == 1
+        assert bucket.latency_ms == [1000, 2500]
+        assert bucket.latency_counts == [3, 1]
+        assert bucket.weight_moments[0] == 4
+        assert bucket.success_moments[1] == pytest.approx((5 + 10) / 60)
+
+    async def test_create_and_create_many_update_rollup(self, test_db: AsyncSession):
+        repository = PromptHistoryRepository(test_db)
+        history = PromptHistory(
+            id=None,
+            user_id="u",
+            prompt_text="p",
+            selected_model_id=7,
+            response_text="r",
+            response_time=Decimal("1.0"),
+            success=True,
+            error_message=None,
+            created_at=datetime.utcnow(),
+        )
+
+        await repository.create(history)
+        await repository.create_many([history, history])
+
+        bucket = (await test_db.execute(select(ModelHourlyStatsORM))).scalar_one()
+        assert bucket.model_id == 7
+        assert bucket.request_count == 3
+
+    async def test_prune_expired_keeps_hours_with_history(
+        self, test_db: AsyncSession, insert_history, history_row
+    ):
+        now = datetime.now(timezone.utc)
+        await insert_history([history_row(now - timedelta(days=2)), history_row(now)])
+        await test_db.execute(
+            delete(PromptHistoryORM).where(PromptHistoryORM.created_at < now - timedelta(days=1))
+        )
+        rollup = ModelHourlyStatsRepository(test_db)
+
+        assert await rollup.prune_expired() == 1
+        remaining = (await test_db.execute(select(ModelHourlyStatsORM))).scalars().all()
+        assert len(remaining) == 1
+
+        await test_db.execute(delete(PromptHistoryORM))
+        assert await rollup.prune_expired() == 1
@@ -0,0 +1,158 @@
+"""
+Unit tests for the daily latency sketches (user-024)
+
+Эталон — percentile_disc по сырым строкам (_get_latency_quantiles_raw):
+квантиль из скетчей обязан отличаться от него не больше чем на
+SKETCH_RELATIVE_ACCURACY, число вызовов — совпадать.
+"""
+
+import math
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.models import PromptHistory
+from app.infrastructure.database.models import ModelLatencySketchORM, PromptHistoryORM
+from app.infrastructure.repositories.model_latency_sketch_repository import (
+    SKETCH_GAMMA,
+    SKETCH_RELATIVE_ACCURACY,
+    ModelLatencySketchRepository,
+    sketch_quantiles,
+    sketch_value,
+)
+from app.infrastructure.repositories.prompt_history_repository import (
+    PromptHistoryRepository,
+)
+
+QUANTILES = [0.0, 0.5, 0.9, 0.99, 1.0]
+
+
+def _assert_within_accuracy(sketched: dict, raw: dict) -> None:
+    assert set(sketched) == set(raw)
+    for model_id, entry in raw.items():
+        assert sketched[model_id]["sample_count"] == entry["sample_count"]
+        for estimate, exact in zip(sketched[model_id]["quantiles"], entry["quantiles"]):
+            assert estimate == pytest.approx(exact, rel=SKETCH_RELATIVE_ACCURACY + 1e-9)
+
+
+@pytest.mark.unit
+class TestSketchMath:
+    def test_bin_value_within_relative_accuracy(self):
+        for ms in [1, 2, 7, 50, 999, 1000, 1001, 4321, 65_000, 600_000]:
+            key = math.ceil(math.log(ms) / math.log(SKETCH_GAMMA))
+            assert abs(sketch_value(key) - ms) <= SKETCH_RELATIVE_ACCURACY * ms
+
+    def test_quantile_rank_matches_percentile_disc(self):
+        # Выборка из 10: бины 0 (x4), 100 (x5), 300 (x1)
+        keys, counts = [0, 100, 300], [4, 5, 1]
+
+        values = sketch_quantiles(keys, counts, [0.0, 0.4, 0.41, 0.9, 0.91, 1.0])
+
+        assert values == [
+            sketch_value(0),
+            sketch_value(0),
+            sketch_value(100),
+            sketch_value(100),
+            sketch_value(300),
+            sketch_value(300),
+        ]
+
+
+@pytest.mark.unit
+class TestSketchAccuracy:
+    """Скетчи == percentile_disc по сырым строкам с точностью α."""
+
+    @pytest.mark.parametrize(
+        "window",
+        [timedelta(days=30), timedelta(days=7), timedelta(hours=24), timedelta(minutes=90)],
+    )
+    async def test_matches_raw_query(
+        self, test_db: AsyncSession, window: timedelta, insert_history, random_history
+    ):
+        await insert_history(random_history(900, seed=24))
+        repository = PromptHistoryRepository(test_db)
+
+        sketched = await repository.get_latency_quantiles(window, QUANTILES)
+        raw = await repository._get_latency_quantiles_raw(window, QUANTILES)
+
+        _assert_within_accuracy(sketched, raw)
+
+    async def test_single_model_after_retention_purge(
+        self, test_db: AsyncSession, insert_history, random_history
+    ):
+        await insert_history(random_history(400, seed=24))
+        # Retention удалил старые строки, скетчи их суток ещё в таблице
+        cutoff = datetime.now(timezone.utc) - timedelta(days=3, hours=5)
+        await test_db.execute(delete(PromptHistoryORM).where(PromptHistoryORM.created_at < cutoff))
+        repository = PromptHistoryRepository(test_db)
+
+        sketched = await repository.get_latency_quantiles(timedelta(days=7), [0.9], model_id=2)
+        raw = await repository._get_latency_quantiles_raw(timedelta(days=7), [0.9], model_id=2)
+
+        assert set(sketched) == {2}
+        _assert_within_accuracy(sketched, raw)
+
+    async def test_empty_history(self, test_db: AsyncSession):
+        repository = PromptHistoryRepository(test_db)
+
+        assert await repository.get_latency_quantiles(timedelta(days=7), QUANTILES) == {}
+
+
+@pytest.mark.unit
+class TestSketchMaintenance:
+    async def test_upsert_merges_bins(self, test_db: AsyncSession, insert_history, history_row):
+        day = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        await insert_history([history_row(day + timedelta(minutes=5))])
+        await insert_history(
+            [
+                history_row(day + timedelta(minutes=10)),
+                history_row(day + timedelta(minutes=20), response_time=Decimal("2.5")),
+                history_row(day + timedelta(minutes=30), response_time=Decimal("0.000")),
+                history_row(day + timedelta(minutes=40), cache_hit=True),
+            ],
+        )
+
+        sketch = (await test_db.execute(select(ModelLatencySketchORM))).scalar_one()
+
+        assert sketch.day_start == day
+        assert sketch.sketch_counts == [1, 2, 1]
+        assert sketch.sketch_keys[0] == 0
+        assert sketch_value(sketch.sketch_keys[1]) == pytest.approx(1000, rel=0.01)
+        assert sketch_value(sketch.sketch_keys[2]) == pytest.approx(2500, rel=0.01)
+
+    async def test_create_and_create_many_update_sketches(self, test_db: AsyncSession):
+        repository = PromptHistoryRepository(test_db)
+        history = PromptHistory(
+            id=None,
+            user_id="u",
+            prompt_text="p",
+            selected_model_id=7,
+            response_text="r",
+            response_time=Decimal("1.0"),
+            success=True,
+            error_message=None,
+            created_at=datetime.utcnow(),
+        )
+
+        await repository.create(history)
+        await repository.create_many([history, history])
+
+        sketch = (await test_db.execute(select(ModelLatencySketchORM))).scalar_one()
+        assert (sketch.model_id, sketch.sketch_counts) == (7, [3])
+
+    async def test_prune_expired_keeps_days_with_history(
+        self, test_db: AsyncSession, insert_history, history_row
+    ):
+        now = datetime.now(timezone.utc)
+        await insert_history([history_row(now - timedelta(days=3)), history_row(now)])
+        await test_db.execute(
+            delete(PromptHistoryORM).where(PromptHistoryORM.created_at < now - timedelta(days=2))
+        )
+        sketches = ModelLatencySketchRepository(test_db)
+
+        assert await sketches.prune_expired() == 1
+        remaining = (await test_db.execute(select(ModelLatencySketchORM))).scalars().all()
+        assert len(remaining) == 1
@@ -0,0 +1,86 @@
+"""
+Unit tests for ModelsCache (user-015)
+"""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+
+from app.infrastructure import models_cache as models_cache_module
+from app.infrastructure.models_cache import ModelsCache
+
+KEY = (True, False, True, 7)
+ETAG = '"etag"'
+
+
+@pytest.mark.unit
+class TestModelsCache:
+    def test_miss_then_hit(self):
+        assert ModelsCache.get(KEY) is None
+
+        ModelsCache.put(KEY, b"[]", ETAG, version=ModelsCache.version())
+
+        assert ModelsCache.get(KEY).body == b"[]"
+        assert ModelsCache.get((True, False, True, 14)) is None
+        metrics = ModelsCache.metrics()
+        assert metrics["hits"] == 1
+        assert metrics["misses"] == 2
+
+    def test_stores_given_etag(self):
+        assert ModelsCache.put(KEY, b"[]", ETAG, version=0) is True
+
+        assert ModelsCache.get(KEY).etag == ETAG
+
+    def test_invalidate_drops_all_keys(self):
+        ModelsCache.put(KEY, b"[]", ETAG, version=0)
+        ModelsCache.put((False, False, False, 7), b"[]", ETAG, version=0)
+
+        ModelsCache.invalidate()
+
+        assert ModelsCache.get(KEY) is None
+        assert ModelsCache.metrics()["entries"] == 0
+        assert ModelsCache.version() == 1
+
+    def test_put_computed_before_invalidation_is_dropped(self):
+        version = ModelsCache.version()
+        ModelsCache.invalidate()  # запись пришла, пока шло чтение из БД
+
+        ModelsCache.put(KEY, b"[]", ETAG, version=version)
+
+        assert ModelsCache.get(KEY) is None
+
+    def test_expires_at_next_available_at(self):
+        soon = datetime.now(timezone.utc) + timedelta(seconds=5)
+
+        with patch.object(models_cache_module.time, "monotonic", return_value=1000.0):
+            ModelsCache.put(KEY, b"[]", ETAG, version=0, next_available_at=soon)
+        with patch.object(models_cache_module.time, "monotonic", return_value=1004.0):
+            assert ModelsCache.get(KEY) is not None
+        with patch.object(models_cache_module.time, "monotonic", return_value=1005.5):
+            assert ModelsCache.get(KEY) is None
+        # user-016: cooldown кончился без записи — ETag версии 0 устарел
+        assert ModelsCache.version() == 1
+
+    def test_expires_after_ttl(self):
+        with patch.object(models_cache_module, "MODELS_CACHE_TTL_SECONDS", 10), patch.object(
+            models_cache_module.time, "monotonic", return_value=1000.0
+        ):
+            ModelsCache.put(KEY, b"[]", ETAG, version=0)
+        with patch.object(models_cache_module.time, "monotonic", return_value=1010.0):
+            assert ModelsCache.get(KEY) is None
+        assert ModelsCache.version() == 0
+
+    def test_past_available_at_is_not_cached(self):
+        past = datetime.now(timezone.utc) - timedelta(seconds=1)
+
+        assert ModelsCache.put(KEY, b"[]", ETAG, version=0, next_available_at=past) is False
+
+        assert ModelsCache.get(KEY) is None
+
+    def test_disabled(self):
+        with patch.object(models_cache_module, "MODELS_CACHE_TTL_SECONDS", 0):
+            ModelsCache.put(KEY, b"[]", ETAG, version=0)
+
+            assert ModelsCache.is_enabled() is False
+            assert ModelsCache.get(KEY) is None
@@ -10,6 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.domain.models import PromptHistory
 from app.infrastructure.database.models import PromptHistoryORM
+from app.infrastructure.repositories import prompt_history_repository
 from app.infrastructure.repositories.prompt_history_repository import (
     PromptHistoryRepository,
 )
@@ -259,6 +260,7 @@ def _make_history(
     http_status=None,
     requested_model=None,
     created_at=None,
+    cache_hit=False,
 ):
     """Helper building a PromptHistory domain entity for caller tests (oxl)."""
     return PromptHistory(
@@ -274,6 +276,7 @@ def _make_history(
         caller=caller,
         http_status=http_status,
         requested_model=requested_model,
+        cache_hit=cache_hit,
     )
 
 
@@ -516,6 +519,154 @@ class TestGetFiltered:
         assert len(page) == 2
 
 
+@pytest.mark.unit
+class TestKeysetPagination:
+    """Cursor (created_at, id) pagination of journal listings (user-018)."""
+
+    @staticmethod
+    async def _walk(fetch, page_size: int) -> list[list[int]]:
+        pages, cursor = [], None
+        while True:
+            page = await fetch(limit=page_size, cursor=cursor)
+            if not page:
+                return pages
+            pages.append([h.id for h in page])
+            cursor = (page[-1].created_at, page[-1].id)
+
+    async def test_pages_cover_all_rows_once_with_timestamp_ties(
+        self, test_db: AsyncSession
+    ):
+        repository = PromptHistoryRepository(test_db)
+        # create() берёт created_at из now() транзакции — у всех строк он одинаков,
+        # порядок внутри страницы задаёт id
+        for _ in range(7):
+            await repository.create(_make_history(caller="A"))
+
+        pages = await self._walk(repository.get_filtered, page_size=3)
+
+        assert [len(page) for page in pages] == [3, 3, 1]
+        ids = [history_id for page in pages for history_id in page]
+        assert ids == sorted(ids, reverse=True)
+        assert len(set(ids)) == 7
+
+    async def test_new_rows_do_not_shift_later_pages(self, test_db: AsyncSession):
+        repository = PromptHistoryRepository(test_db)
+        for _ in range(4):
+            await repository.create(_make_history(caller="A"))
+        first = await repository.get_recent(limit=2)
+
+        await repository.create(_make_history(caller="A"))
+        second = await repository.get_recent(
+            limit=2, cursor=(first[-1].created_at, first[-1].id)
+        )
+
+        assert [h.id for h in second] == [first[-1].id - 1, first[-1].id - 2]
+
+    async def test_cursor_combines_with_filters(self, test_db: AsyncSession):
+        repository = PromptHistoryRepository(test_db)
+        for caller in ["A", "B", "A", "B", "A"]:
+            await repository.create(_make_history(caller=caller, model_id=3))
+
+        first = await repository.get_by_model(3, limit=2)
+        rest = await repository.get_by_model(
+            3, limit=10, cursor=(first[-1].created_at, first[-1].id)
+        )
+        callers_a = await self._walk(
+            lambda **kw: repository.get_filtered(caller="A", **kw), page_size=2
+        )
+        by_user = await self._walk(
+            lambda **kw: repository.get_by_user("test_user", **kw), page_size=4
+        )
+
+        assert len(first) + len(rest) == 5
+        assert [len(page) for page in callers_a] == [2, 1]
+        assert [len(page) for page in by_user] == [4, 1]
+
+
+@pytest.mark.unit
+class TestGetSummaries:
+    """Slim journal projection (user-020)."""
+
+    async def test_previews_and_filters(self, test_db: AsyncSession):
+        repository = PromptHistoryRepository(test_db)
+        long_ok = _make_history(caller="A", model_id=2)
+        long_ok.prompt_text = "x" * 3000
+        await repository.create(long_ok)
+        await repository.create(_make_history(caller="A", success=False, model_id=2))
+        await repository.create(_make_history(caller="B", model_id=5))
+
+        failed = await repository.get_summaries(50, caller="A", success=False)
+        ok = await repository.get_summaries(4, model_id=2, success=True)
+        by_user = await repository.get_summaries(0, user_id="test_user")
+
+        assert [s.success for s in failed] == [False]
+        assert failed[0].response_preview is None
+        assert ok[0].prompt_preview == "xxxx"
+        assert [s.selected_model_id for s in by_user] == [5, 2, 2]
+        assert by_user[0].prompt_preview == ""
+
+
+@pytest.mark.unit
+class TestJournalSearch:
+    """q: поиск подстроки в prompt_text / error_message (user-021)."""
+
+    async def test_matches_prompt_or_error_case_insensitive(self, test_db: AsyncSession):
+        repository = PromptHistoryRepository(test_db)
+        in_prompt = _make_history(caller="A")
+        in_prompt.prompt_text = "Translate the Invoice to German"
+        in_error = _make_history(caller="A", success=False)
+        in_error.error_message = "upstream INVOICE service timeout"
+        await repository.create(in_prompt)
+        await repository.create(in_error)
+        await repository.create(_make_history(caller="A"))
+
+        found = await repository.get_filtered(q="invoice")
+        summaries = await repository.get_summaries(20, q="INVOICE", success=False)
+
+        assert len(found) == 2
+        assert [s.success for s in summaries] == [False]
+
+    async def test_wildcards_are_literal(self, test_db: AsyncSession):
+        repository = PromptHistoryRepository(test_db)
+        literal = _make_history()
+        literal.prompt_text = "discount 100% off_now"
+        await repository.create(literal)
+        await repository.create(_make_history())
+
+        assert len(await repository.get_filtered(q="100% off_")) == 1
+        assert len(await repository.get_filtered(q="0% ")) == 1
+        assert await repository.get_filtered(q="t_s") == []
+
+
+@pytest.mark.unit
+class TestStreamFiltered:
+    """stream_filtered: фильтры get_filtered, пачки по batch_size (user-022)."""
+
+    async def test_batches_cover_all_matching_rows_in_journal_order(
+        self, test_db: AsyncSession
+    ):
+        repository = PromptHistoryRepository(test_db)
+        base = datetime.utcnow()
+        for minutes in range(5):
+            await repository.create(
+                _make_history(caller="A", created_at=base - timedelta(minutes=minutes))
+            )
+        await repository.create(_make_history(caller="B"))
+
+        batches = [
+            batch async for batch in repository.stream_filtered(caller="A", batch_size=2)
+        ]
+
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        flat = [history for batch in batches for history in batch]
+        assert flat == await repository.get_filtered(caller="A")
+
+    async def test_no_rows(self, test_db: AsyncSession):
+        repository = PromptHistoryRepository(test_db)
+
+        assert [batch async for batch in repository.stream_filtered(q="nothing")] == []
+
+
 @pytest.mark.unit
 class TestRecentWeightedStatsV2:
     """bmm/ADR-0003 (j4v): exercise the v2 weighted-stats SQL on a REAL Postgres —
@@ -567,3 +718,87 @@ class TestRecentWeightedStatsV2:
         assert s["w_success"] + s["w_fail_hard"] == pytest.approx(5.0, abs=0.2)
         # Median latency computed over all 6 response_times [0.5,1,2,3,4,5] → 2.5.
         assert s["median_response_time"] == pytest.approx(2.5, abs=0.6)
+
+
+@pytest.mark.unit
+class TestCacheHitRows:
+    """user-007: cache-hit rows are stored but excluded from model statistics."""
+
+    async def test_cache_hit_persisted(self, test_db: AsyncSession):
+        repository = PromptHistoryRepository(test_db)
+
+        created = await repository.create(_make_history(cache_hit=True))
+        await test_db.commit()
+
+        fetched = await repository.get_by_id(created.id)
+        assert fetched is not None
+        assert fetched.cache_hit is True
+
+    async def test_model_stats_ignore_cache_hits(self, test_db: AsyncSession):
+        repository = PromptHistoryRepository(test_db)
+        await repository.create(_make_history(success=False, http_status=500))
+        for _ in range(3):
+            await repository.create(_make_history(http_status=200, cache_hit=True))
+        await test_db.commit()
+
+        plain = await repository.get_recent_stats_for_all_models(window_days=7)
+        weighted = await repository.get_recent_weighted_stats_for_all_models(
+            window_days=7
+        )
+
+        assert plain[1]["request_count"] == 1
+        assert plain[1]["success_count"] == 0
+        assert weighted[1]["request_count"] == 1
+        assert weighted[1]["w_success"] == pytest.approx(0.0)
+
+    async def test_caller_stats_include_cache_hits(self, test_db: AsyncSession):
+        repository = PromptHistoryRepository(test_db)
+        await repository.create(_make_history(caller="sensedar"))
+        await repository.create(_make_history(caller="sensedar", cache_hit=True))
+        await test_db.commit()
+
+        stats = await repository.get_stats_grouped_by_caller(window_days=7)
+
+        assert stats[0]["request_count"] == 2
+
+
+@pytest.mark.unit
+class TestCreateMany:
+    """user-011: multi-row INSERT returns IDs in input order."""
+
+    async def test_empty_returns_empty_list(self, test_db: AsyncSession):
+        repository = PromptHistoryRepository(test_db)
+
+        assert await repository.create_many([]) == []
+
+    async def test_rows_match_input_order(self, test_db: AsyncSession):
+        repository = PromptHistoryRepository(test_db)
+        histories = [
+            _make_history(caller=f"caller-{i}", success=i % 2 == 0, http_status=200)
+            for i in range(5)
+        ]
+
+        ids = await repository.create_many(histories)
+        await test_db.commit()
+
+        assert len(ids) == 5
+        for i, history_id in enumerate(ids):
+            fetched = await repository.get_by_id(history_id)
+            assert fetched is not None
+            assert fetched.caller == f"caller-{i}"
+            assert fetched.success is (i % 2 == 0)
+
+    async def test_ids_follow_input_order_across_chunks(
+        self, test_db: AsyncSession, monkeypatch: pytest.MonkeyPatch
+    ):
+        monkeypatch.setattr(prompt_history_repository, "BULK_INSERT_CHUNK_SIZE", 3)
+        repository = PromptHistoryRepository(test_db)
+        histories = [_make_history(caller=f"caller-{i}") for i in range(8)]
+
+        ids = await repository.create_many(histories)
+
+        assert len(set(ids)) == 8
+        for i, history_id in enumerate(ids):
+            fetched = await repository.get_by_id(history_id)
+            assert fetched is not None
+            assert fetched.caller == f"caller-{i}"